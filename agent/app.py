@@ -1,28 +1,101 @@
 import chainlit as cl
 import functools
+import logging
 import semantic_kernel as sk
 import os
-from typing import Annotated
-from pydantic import Field
 from dotenv import load_dotenv
 from semantic_kernel.connectors.ai import FunctionChoiceBehavior
 from semantic_kernel.connectors.ai.open_ai import (
     AzureChatCompletion,
     AzureChatPromptExecutionSettings,
 )
-from semantic_kernel.functions import kernel_function
-from semantic_kernel.contents import ChatHistory, ChatMessageContent
-from semantic_kernel.connectors.mcp import MCPSsePlugin
+from semantic_kernel.functions import KernelArguments
+from semantic_kernel.contents import ChatMessageContent
 from semantic_kernel.agents import ChatCompletionAgent
-from semantic_kernel.agents.runtime import InProcessRuntime
+from chainlit.user_session import user_sessions
+
+from lib.artifacts import QUERY_ARTIFACT, ArtifactStore
+from lib.chat_history import CompactedChatHistory
+from lib.mcp_pool import MCPClientPool, MCPServer
+from lib.runtime import SharedRuntime
+from lib.sessions import SessionRegistry
+from lib.streaming import TokenStreamer
+from lib.subagents import AGENT_PLUGIN, INVOKE_AGENTS, AgentPlugin, Subagents
+from lib.tool_catalog import ToolCatalog
+from lib.tool_router import ROUTER_PLUGIN, ToolRouter, ToolSelection
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 AOAI_ENDPOINT_URI = os.getenv("AOAI_ENDPOINT_URI")
 print(f"AOAI_ENDPOINT_URI: {AOAI_ENDPOINT_URI}")
 AOAI_API_KEY = os.getenv("AOAI_API_KEY")
 AOAI_API_VERSION = os.getenv("AOAI_API_VERSION", "2025-03-01-preview")
 
+# MCP servers the agent uses. Clients are connected once per process and
+# shared by every chat session (see lib/mcp_pool.py).
+MCP_SERVERS = [
+    MCPServer(
+        name="ActiveDirectoryAndServicesMCP",
+        description="MCP functionality for Active Directory and Services modifications",
+        url=os.getenv("MCP_SERVER_URL", "http://localhost:8081/mcp"),
+        size=int(os.getenv("MCP_CLIENTS_PER_SERVER", "1")),
+        connect_timeout=float(os.getenv("MCP_CONNECT_TIMEOUT", "10")),
+    ),
+    MCPServer(
+        name="BloodhoundMCP",
+        description="MCP functionality for Bloodhound Community Edition - provides Active Directory security analysis and graph queries",
+        url=os.getenv("BLOODHOUND_MCP_URL", "http://192.168.56.100:8000/sse"),
+        size=int(os.getenv("MCP_CLIENTS_PER_SERVER", "1")),
+        connect_timeout=float(os.getenv("MCP_CONNECT_TIMEOUT", "10")),
+    ),
+]
+
+mcp_clients = MCPClientPool(
+    MCP_SERVERS,
+    health_interval=float(os.getenv("MCP_HEALTH_INTERVAL", "30")),
+    # Tool catalogs by server fingerprint; persisted when a directory is set
+    catalog=ToolCatalog(os.getenv("MCP_CATALOG_CACHE_DIR")),
+)
+
+# Offers the model only the tools relevant to each message (lib/tool_router.py)
+tool_router = ToolRouter(
+    limit=int(os.getenv("TOOL_ROUTER_LIMIT", "12")),
+    enabled=os.getenv("TOOL_ROUTING", "true").lower() != "false",
+)
+
+# Token budget for the history sent with each turn (lib/chat_history.py)
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "12000"))
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", "3"))
+
+# Tool results larger than this are stored per session (lib/artifacts.py)
+ARTIFACT_OFFLOAD_CHARS = int(os.getenv("ARTIFACT_OFFLOAD_CHARS", "4000"))
+
+# Seconds to wait for the subagents of one delegation (lib/subagents.py)
+SUBAGENT_TIMEOUT = float(os.getenv("SUBAGENT_TIMEOUT", "300"))
+
+# Streamed tokens are sent to the UI in batches (lib/streaming.py)
+STREAM_FLUSH_INTERVAL = float(os.getenv("STREAM_FLUSH_INTERVAL_MS", "50")) / 1000
+STREAM_FLUSH_CHARS = int(os.getenv("STREAM_FLUSH_CHARS", "256"))
+
+# One agent runtime for all sessions; each chat gets a scope of it
+agent_runtime = SharedRuntime()
+
+# Releases each chat's resources when it ends or sits idle (lib/sessions.py)
+sessions = SessionRegistry(
+    idle_timeout=float(os.getenv("SESSION_IDLE_TIMEOUT", "1800")),
+    connections=lambda: sum(s["connected"] for s in mcp_clients.status().values()),
+)
+
+# One chat completion client (and its HTTP connection pool) for all sessions
+ai_service = AzureChatCompletion(
+    endpoint=AOAI_ENDPOINT_URI,
+    api_key=AOAI_API_KEY,
+    deployment_name="gpt-4.1",
+    api_version=AOAI_API_VERSION,
+)
+
 
 def prompt_user_confirmation(func):
     @functools.wraps(func)
@@ -42,42 +115,6 @@ def prompt_user_confirmation(func):
     return wrapper
 
 
-def get_agents(kernel: sk.Kernel) -> list[ChatCompletionAgent]:
-    return [
-        ChatCompletionAgent(
-            kernel=kernel,
-            name="GeneralAgent",
-            instructions="You are a helpful assistant that can answer general questions.",
-        ),
-        ChatCompletionAgent(
-            kernel=kernel,
-            name="FirewallAgent",
-            instructions="You are a helpful assistant that can interact with the Firewall MCP to manage firewall rules.",
-        ),
-    ]
-
-
-class AgentPlugin:
-    def __init__(self, agent: ChatCompletionAgent = None):
-        self.name = agent.name
-        self.agent=agent
-
-    @kernel_function(
-        description="Invoke a subagent to analyze Active Directory.",
-    )
-    async def invoke_agent(self, task: Annotated[str, Field(description="The prompt or task for the subagent.")]) -> str:
-        """
-        Invoke the agent with the given task.
-        """
-        if not self.agent:
-            raise ValueError("Agent is not set.")
-        
-        # get string response
-        response = await self.agent.get_response(
-            task
-        )
-        return str(response.content)
-
 @cl.set_starters
 async def set_starters():
     return [
@@ -93,43 +130,58 @@ async def set_starters():
         )
     ]
 
+@cl.on_app_startup
+async def start_mcp_clients():
+    await mcp_clients.start()
+    logger.info(f"MCP clients: {mcp_clients.status()}")
+    logger.info(f"MCP tool catalogs: {mcp_clients.catalog.status()}")
+    sessions.start()
+
+
+@cl.on_app_shutdown
+async def stop_mcp_clients():
+    await sessions.stop()
+    await mcp_clients.close()
+    await agent_runtime.stop()
+
+
+# What on_chat_start keeps in the user session
+SESSION_KEYS = (
+    "kernel", "ai_service", "chat_history", "ai_agent", "runtime", "tool_selection", "artifacts"
+)
+
+
+def forget_session(session_id: str):
+    # Chainlit keeps a user session for an hour after its chat ends
+    user_session = user_sessions.get(session_id, {})
+    for key in SESSION_KEYS:
+        user_session.pop(key, None)
+
+
+def add_mcp_plugin(kernel: sk.Kernel, name: str, plugin):
+    kernel.add_plugin(plugin, plugin_name=name)
+    logger.info(f"MCP server {name} is back; added it to a running chat")
+
+
 @cl.on_chat_start
 async def on_chat_start():
     kernel = sk.Kernel()
-
-    ai_service = AzureChatCompletion(
-        endpoint=AOAI_ENDPOINT_URI,
-        api_key=AOAI_API_KEY,
-        deployment_name="gpt-4.1",
-        api_version=AOAI_API_VERSION,
-    )
-
     kernel.add_service(ai_service)
 
-    try:
-        mcp_plugin = MCPSsePlugin(
-            name="ActiveDirectoryAndServicesMCP",
-            description="MCP functionality for Active Directory and Services modifications",
-            url="http://localhost:8081/mcp",
-        )
-        await mcp_plugin.connect()
-        kernel.add_plugin(mcp_plugin, plugin_name="ActiveDirectoryAndServicesMCP")
-    except Exception as e:
-        print(e)
-        # await cl.Message(content="Failed to connect to ActiveDirectoryAndServices MCP plugin.").send()
-
-    # Add Bloodhound MCP plugin
-    try:
-        bloodhound_mcp_plugin = MCPSsePlugin(
-            name="BloodhoundMCP",
-            description="MCP functionality for Bloodhound Community Edition - provides Active Directory security analysis and graph queries",
-            url="http://192.168.56.100:8000/sse",
-        )
-        await bloodhound_mcp_plugin.connect()
-        kernel.add_plugin(bloodhound_mcp_plugin, plugin_name="BloodhoundMCP")
-    except Exception as e:
-        print(f"Failed to connect to Bloodhound MCP plugin: {e}")
-        # await cl.Message(content="Failed to connect to Bloodhound MCP plugin.").send()
+    # Borrow already connected MCP clients; no network I/O here. Servers
+    # that are down are added to this kernel when the pool reconnects them.
+    plugins = mcp_clients.borrow_all()
+    pending = []
+    for server in MCP_SERVERS:
+        if server.name in plugins:
+            kernel.add_plugin(plugins[server.name], plugin_name=server.name)
+        else:
+            logger.warning(f"MCP server {server.name} is not connected; adding it when it comes back")
+            pending.append(
+                mcp_clients.when_connected(
+                    server.name, functools.partial(add_mcp_plugin, kernel, server.name)
+                )
+            )
 
     ai_agent = ChatCompletionAgent(kernel=kernel, instructions="""
 You are an expert in security hardening and system administration regarding Active Directory and Windows systems.
@@ -146,31 +198,81 @@ When analyzing active directory security, use Bloodhound data to identify the mo
 - Avoid using custom Cypher queries unless existing functions cannot achieve the desired result or they are defined in the example queries function from the MCP
 - Do NOT use API endpoints that are not provided by the MCP plugin.
 - If a user asks to find attack paths from all users to high value targets, use "Domain Admins" as the target unless otherwise specified and use the get_users function to get all starting nodes.
+- Only the tools that look relevant to the current message are available. If none of them fits the task, call ToolRouter-find_tools with a short description of what you need before falling back to custom queries.
+- Large tool results are stored as artifacts and you receive a summary with a handle. Use Artifacts-query_artifact to filter, count or page through them rather than calling the tool again.
+- For broad reviews that span several areas, such as a firewall audit, risky users and certificate services, call AgentPlugin-invoke_agents once with one task per subagent so they run in parallel, then combine their reports into one answer. Use the individual tools for narrow questions and for all changes.
 - If unsure about a users request, ask for clarification or provide a general overview of the available options before proceeding
-- When performing remediation actions on users, utilize the job descriptions as context to determine whether or not the user requires access to the resource. Provide this reasoning to the user.
+- When performing remediation actions on users, utilize the job descriptions as context to determine whether or not the user requires access to the resource. Look up only the affected users with lookup_job_descriptions. Provide this reasoning to the user.
 
 Use markdown format for headings, bold text, lists, and code blocks to enhance readability.
 """)
 
-    runtime = InProcessRuntime()
-    runtime.start()
+    runtime = agent_runtime.scope(cl.context.session.id)
+
+    tool_selection = ToolSelection(tool_router, kernel)
+    artifacts = ArtifactStore(kernel, offload_chars=ARTIFACT_OFFLOAD_CHARS)
+    tool_selection.pin(QUERY_ARTIFACT)
+    artifacts.keep(ROUTER_PLUGIN)
+    kernel.add_plugin(
+        AgentPlugin(Subagents(kernel, runtime, timeout=SUBAGENT_TIMEOUT)),
+        plugin_name=AGENT_PLUGIN,
+    )
+    tool_selection.pin(INVOKE_AGENTS)
+    # The merged subagent reports are the answer's material; keep them whole
+    artifacts.keep(AGENT_PLUGIN)
 
     _ = cl.SemanticKernelFilter(kernel=kernel)
 
+    chat_history = CompactedChatHistory(
+        ai_service, budget=HISTORY_TOKEN_BUDGET, keep_turns=HISTORY_KEEP_TURNS
+    )
+
     cl.user_session.set("kernel", kernel)
     cl.user_session.set("ai_service", ai_service)
-    cl.user_session.set("chat_history", ChatHistory())
+    cl.user_session.set("chat_history", chat_history)
     cl.user_session.set("ai_agent", ai_agent)
     cl.user_session.set("runtime", runtime)
+    cl.user_session.set("tool_selection", tool_selection)
+    cl.user_session.set("artifacts", artifacts)
+
+    await sessions.open(
+        cl.context.session.id,
+        kernel=kernel,
+        chat_history=chat_history,
+        artifacts=artifacts,
+        runtime=runtime,
+        pending=pending,
+        on_close=[functools.partial(forget_session, cl.context.session.id)],
+    )
+    logger.debug(f"Chat sessions: {sessions.status()}")
+
+
+@cl.on_chat_end
+async def on_chat_end():
+    # Stop waiting for MCP servers, release the runtime scope and drop the
+    # history and artifacts now rather than when Chainlit forgets the session
+    await sessions.close(cl.context.session.id)
+    logger.debug(f"Chat sessions: {sessions.status()}")
+    logger.debug(f"Agent runtime: {agent_runtime.status()}")
 
 
 @cl.on_message
 async def on_message(message: cl.Message):
+    # A chat whose session was released while idle starts afresh
+    if sessions.get(cl.context.session.id) is None:
+        await on_chat_start()
+
+    async with sessions.active(cl.context.session.id):
+        await answer_message(message)
+
+
+async def answer_message(message: cl.Message):
     kernel = cl.user_session.get("kernel")  # type: sk.Kernel
     ai_service = cl.user_session.get("ai_service")  # type: AzureChatCompletion
-    chat_history = cl.user_session.get("chat_history")  # type: ChatHistory
+    chat_history = cl.user_session.get("chat_history")  # type: CompactedChatHistory
     ai_agent = cl.user_session.get("ai_agent")  # type: ChatCompletionAgent
-    runtime = cl.user_session.get("runtime")
+    tool_selection = cl.user_session.get("tool_selection")  # type: ToolSelection
+    artifacts = cl.user_session.get("artifacts")  # type: ArtifactStore
 
     # Add user message to history
     chat_history.add_user_message(message.content)
@@ -178,15 +280,33 @@ async def on_message(message: cl.Message):
     # Create a Chainlit message for the response stream
     answer = cl.Message(content="")
 
-    async for msg in ai_agent.invoke_stream(messages=chat_history.messages):
-        if msg.content:
-            await answer.stream_token(str(msg.content))
-
-    print("Chat history")
-    print(chat_history)
+    # Offer the model the tools routed to this message rather than all of them
+    arguments = KernelArguments(settings=tool_selection.settings(message.content))
+
+    # Keep the turn's tool calls and results; compaction shrinks them later
+    async def add_intermediate_message(msg: ChatMessageContent):
+        chat_history.add_message(msg)
+
+    # Batch the streamed tokens rather than sending a frame for each
+    async with TokenStreamer(
+        answer.stream_token, interval=STREAM_FLUSH_INTERVAL, max_chars=STREAM_FLUSH_CHARS
+    ) as streamer:
+        async for msg in ai_agent.invoke_stream(
+            messages=chat_history.messages,
+            arguments=arguments,
+            on_intermediate_message=add_intermediate_message,
+        ):
+            if msg.content:
+                await streamer.add(str(msg.content))
 
     # Add the full assistant response to history
     chat_history.add_assistant_message(answer.content)
 
     # Send the final message
     await answer.send()
+
+    # Compact once the answer is out, so the user never waits for a summary
+    await chat_history.compact()
+    logger.debug(f"Chat history: {chat_history.status()}")
+    logger.debug(f"Tool result artifacts: {artifacts.status()}")
+    logger.debug(f"Token streaming: {streamer.status()}")
@@ -0,0 +1,181 @@
+"""
+Benchmark of chat history compaction.
+
+Replays a long chat session in which every turn calls a BloodHound tool that
+returns a member list or a path graph, and reports the history tokens sent
+with each turn, with the whole history as before and with
+CompactedChatHistory. Without --live, summaries come from a stand-in that
+returns a fixed paragraph.
+
+With --live and the agent's Azure OpenAI settings in the environment, older
+turns are summarized by the model, and the last turn is sent with both
+histories to compare prompt tokens and time to first token.
+
+Usage:
+    python benchmarks/bench_chat_history.py [--turns 20] [--budget 12000]
+        [--live]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from semantic_kernel.connectors.ai.prompt_execution_settings import (  # noqa: E402
+    PromptExecutionSettings,
+)
+from semantic_kernel.contents import (  # noqa: E402
+    ChatHistory,
+    ChatMessageContent,
+    FunctionCallContent,
+    FunctionResultContent,
+)
+from semantic_kernel.contents.utils.author_role import AuthorRole  # noqa: E402
+
+from lib.chat_history import CompactedChatHistory  # noqa: E402
+
+SUMMARY = " ".join(["The user reviewed group memberships and attack paths."] * 10)
+
+
+class StandInSummarizer:
+    """Summarizes instantly with a fixed paragraph"""
+
+    def get_prompt_execution_settings_class(self):
+        return PromptExecutionSettings
+
+    async def get_chat_message_content(self, chat_history, settings):
+        return ChatMessageContent(role=AuthorRole.ASSISTANT, content=SUMMARY)
+
+
+def tool_output(turn: int) -> str:
+    """A BloodHound sized result: a member list or a path graph"""
+    if turn % 2:
+        return json.dumps(
+            [
+                {"name": f"USER{n}@CORP.LOCAL", "objectid": f"S-1-5-21-{n}"}
+                for n in range(400)
+            ]
+        )
+    nodes = {str(n): {"label": f"COMPUTER{n}.CORP.LOCAL"} for n in range(150)}
+    edges = [
+        {"source": str(n), "target": str(n + 1), "kind": "AdminTo"} for n in range(149)
+    ]
+    return json.dumps({"nodes": nodes, "edges": edges})
+
+
+def turn_messages(turn: int) -> list:
+    call = FunctionCallContent(
+        id=f"call{turn}",
+        name="BloodhoundMCP-get_group_members",
+        arguments=json.dumps({"group_id": f"G{turn}"}),
+    )
+    result = FunctionResultContent(
+        id=f"call{turn}", name=call.name, result=tool_output(turn)
+    )
+    return [
+        ChatMessageContent(
+            role=AuthorRole.USER, content=f"Step {turn}: who can reach group G{turn}?"
+        ),
+        ChatMessageContent(role=AuthorRole.ASSISTANT, items=[call]),
+        ChatMessageContent(role=AuthorRole.TOOL, items=[result]),
+        ChatMessageContent(
+            role=AuthorRole.ASSISTANT,
+            content=f"## Findings for G{turn}\n" + "- a finding worth reporting\n" * 40,
+        ),
+    ]
+
+
+async def time_to_first_token(service, messages) -> tuple:
+    """Seconds to the first streamed chunk and the prompt tokens reported"""
+    settings = service.get_prompt_execution_settings_class()()
+    started = time.perf_counter()
+    first = None
+    prompt_tokens = None
+    async for chunks in service.get_streaming_chat_message_contents(
+        ChatHistory(messages=messages), settings
+    ):
+        if first is None:
+            first = time.perf_counter() - started
+        for chunk in chunks:
+            usage = chunk.metadata.get("usage")
+            if usage is not None:
+                prompt_tokens = usage.prompt_tokens
+    return first, prompt_tokens
+
+
+async def run(args):
+    service = StandInSummarizer()
+    if args.live:
+        from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
+
+        service = AzureChatCompletion(
+            endpoint=os.getenv("AOAI_ENDPOINT_URI"),
+            api_key=os.getenv("AOAI_API_KEY"),
+            deployment_name=os.getenv("AOAI_DEPLOYMENT", "gpt-4.1"),
+            api_version=os.getenv("AOAI_API_VERSION", "2025-03-01-preview"),
+        )
+    full = CompactedChatHistory(budget=sys.maxsize)
+    compacted = CompactedChatHistory(service, budget=args.budget)
+    compact_times = []
+
+    print("Estimated history tokens sent per turn")
+    print(f"  {'turn':>4s} {'full':>8s} {'compacted':>10s}")
+    for turn in range(args.turns):
+        messages = turn_messages(turn)
+        # The history a turn is sent with ends at its user message
+        full.add_message(messages[0])
+        compacted.add_message(messages[0])
+        print(f"  {turn + 1:4d} {full.tokens():8d} {compacted.tokens():10d}")
+        for message in messages[1:]:
+            full.add_message(message)
+            compacted.add_message(message)
+        started = time.perf_counter()
+        await compacted.compact()
+        compact_times.append(time.perf_counter() - started)
+
+    status = compacted.status()
+    print(
+        f"  after {args.turns} turns: {full.tokens()} tokens in full, "
+        f"{status['tokens']} compacted ({status['tokens'] / full.tokens():.0%}), "
+        f"{status['summaries']} summaries, {status['references']} tool outputs referenced"
+    )
+    print(
+        f"  compaction took {statistics.median(compact_times) * 1000:.2f} ms median, "
+        f"{max(compact_times) * 1000:.2f} ms max per turn"
+    )
+
+    if not args.live:
+        return
+    question = ChatMessageContent(
+        role=AuthorRole.USER, content="Which of these should I fix first?"
+    )
+    print("\nLast turn: time to first token, prompt tokens")
+    for mode, history in (("full", full), ("compacted", compacted)):
+        ttft, prompt_tokens = await time_to_first_token(
+            service, history.messages + [question]
+        )
+        print(f"  {mode:9s} {ttft:6.2f} s  {prompt_tokens} tokens")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=20, help="Turns in the session")
+    parser.add_argument(
+        "--budget", type=int, default=12000, help="History token budget"
+    )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Summarize and time requests with Azure OpenAI",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Benchmark of streaming answers to the UI with and without TokenStreamer.
+
+Runs concurrent chat sessions that each stream a long report token by token
+at a model's pace. Every frame is encoded the way Chainlit emits a
+stream_token event and written to a local socket, one connection per
+session, like the websocket of a browser tab. For each number of sessions it
+reports frames per second, CPU time per session, the longest a token waited
+to be sent, and how late the event loop woke a 10 ms timer, once sending
+every token and once with the tokens coalesced.
+
+Usage:
+    python benchmarks/bench_token_streaming.py [--sessions 1,25,100]
+        [--tokens 2000] [--rate 400] [--interval-ms 50] [--max-chars 256]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from lib.streaming import TokenStreamer  # noqa: E402
+
+WORDS = (
+    "The account svc_backup has GenericAll on the Domain Admins group, which "
+    "gives it a two hop path to the domain controller. Remove the ACE and "
+    "rotate the password. "
+).split(" ")
+
+
+def report_tokens(count: int):
+    """Chunks of a streamed report, about four characters each"""
+    text = " ".join(WORDS[n % len(WORDS)] for n in range(count))
+    return [text[i : i + 4] for i in range(0, count * 4, 4)]
+
+
+async def discard(reader, writer):
+    while await reader.read(65536):
+        pass
+    writer.close()
+
+
+class Socket:
+    """A session's connection to the UI, sending Chainlit-like frames"""
+
+    def __init__(self, writer, message_id: str):
+        self.writer = writer
+        self.message_id = message_id
+
+    async def stream_token(self, token: str) -> None:
+        frame = json.dumps(
+            ["stream_token", {"id": self.message_id, "token": token}]
+        ).encode()
+        self.writer.write(b"42" + frame)
+        await self.writer.drain()
+
+
+async def session(port: int, n: int, tokens, rate: float, interval: float, chars):
+    _, writer = await asyncio.open_connection("127.0.0.1", port)
+    socket = Socket(writer, f"message-{n}")
+    async with TokenStreamer(
+        socket.stream_token, interval=interval, max_chars=chars
+    ) as streamer:
+        started = time.perf_counter()
+        for i, token in enumerate(tokens):
+            # Keep the model's pace without drifting behind it
+            delay = started + i / rate - time.perf_counter()
+            await asyncio.sleep(max(delay, 0))
+            await streamer.add(token)
+    writer.close()
+    await writer.wait_closed()
+    return streamer.status()
+
+
+async def loop_lag(stop: asyncio.Event, lags: list) -> None:
+    """How late a 10 ms timer fires, as a measure of a busy event loop"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - started - 0.01)
+
+
+async def measure(port, sessions, tokens, args, interval):
+    stop = asyncio.Event()
+    lags = []
+    probe = asyncio.create_task(loop_lag(stop, lags))
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            session(port, n, tokens, args.rate, interval, args.max_chars)
+            for n in range(sessions)
+        )
+    )
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    stop.set()
+    await probe
+    frames = sum(r["frames"] for r in results)
+    return {
+        "frames_per_s": frames / wall,
+        "frames_per_session": frames / sessions,
+        "cpu_ms_per_session": cpu * 1000 / sessions,
+        "max_wait_ms": max(r["max_wait_ms"] for r in results),
+        "lag_ms": statistics.median(lags) * 1000 if lags else 0.0,
+        "lag_max_ms": max(lags) * 1000 if lags else 0.0,
+    }
+
+
+async def run(args):
+    server = await asyncio.start_server(discard, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    tokens = report_tokens(args.tokens)
+    print(
+        f"{args.tokens} tokens per session at {args.rate:.0f} tokens/s; "
+        f"coalesced: {args.interval_ms:.0f} ms or {args.max_chars} characters"
+    )
+    print(
+        f"  {'sessions':>8s} {'mode':10s} {'frames/s':>9s} {'frames':>7s} "
+        f"{'CPU ms':>7s} {'wait ms':>8s} {'loop lag ms':>14s}"
+    )
+    try:
+        for sessions in args.sessions:
+            for mode, interval in (("per token", 0.0), ("coalesced", args.interval)):
+                r = await measure(port, sessions, tokens, args, interval)
+                print(
+                    f"  {sessions:8d} {mode:10s} {r['frames_per_s']:9.0f} "
+                    f"{r['frames_per_session']:7.0f} {r['cpu_ms_per_session']:7.1f} "
+                    f"{r['max_wait_ms']:8.1f} "
+                    f"{r['lag_ms']:6.1f} / {r['lag_max_ms']:5.1f}"
+                )
+    finally:
+        server.close()
+        await server.wait_closed()
+    print(
+        "  frames and CPU ms are per session; wait is the longest a token was "
+        "held back; loop lag is median / max"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sessions",
+        type=lambda s: [int(n) for n in s.split(",")],
+        default=[1, 25, 100],
+        help="Comma separated numbers of concurrent sessions",
+    )
+    parser.add_argument("--tokens", type=int, default=2000, help="Tokens per answer")
+    parser.add_argument(
+        "--rate", type=float, default=400, help="Tokens per second per session"
+    )
+    parser.add_argument(
+        "--interval-ms", type=float, default=50, help="Coalescing interval"
+    )
+    parser.add_argument(
+        "--max-chars", type=int, default=256, help="Characters that fill a batch"
+    )
+    args = parser.parse_args()
+    args.interval = args.interval_ms / 1000
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Benchmark of per-turn tool routing.
+
+Loads the BloodHound MCP server's tool catalog (spawned over stdio, so no
+BloodHound instance is needed) into a kernel alongside any other MCP servers
+given with --server, then for a set of typical requests compares offering
+every tool with offering the routed subset:
+
+- tools offered and the size of their schemas in prompt tokens (counted with
+  tiktoken when it is installed, estimated at four characters per token
+  otherwise)
+- the time routing takes
+- with --live and the agent's Azure OpenAI settings in the environment, the
+  prompt tokens the model reports and the time to first token, for one
+  request per mode and message
+
+Usage:
+    python benchmarks/bench_tool_router.py [--live] [--python python]
+        [--server NAME=URL ...]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import semantic_kernel as sk  # noqa: E402
+from semantic_kernel.connectors.ai import FunctionChoiceBehavior  # noqa: E402
+from semantic_kernel.connectors.ai.function_calling_utils import (  # noqa: E402
+    kernel_function_metadata_to_function_call_format,
+)
+from semantic_kernel.contents import ChatHistory  # noqa: E402
+
+from lib.tool_catalog import CachedSsePlugin, CachedStdioPlugin  # noqa: E402
+from lib.tool_router import ToolRouter, ToolSelection  # noqa: E402
+
+BLOODHOUND_SERVER = os.path.join(
+    os.path.dirname(PROJECT_ROOT), "mcp", "bloodhound", "main.py"
+)
+
+MESSAGES = [
+    "Find attack paths from all users to Domain Admins",
+    "Which users are kerberoastable?",
+    "Show me computers with unconstrained delegation",
+    "Who are the members of the Enterprise Admins group?",
+    "What GPOs are linked to the Servers OU?",
+    "List the sessions on DC01",
+    "Which accounts have DCSync rights?",
+    "Block inbound SMB on the workstations' firewall",
+]
+
+
+def token_counter():
+    """Counts tokens like the model's tokenizer, or estimates them"""
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("o200k_base")
+        return lambda text: len(encoding.encode(text)), "tiktoken o200k_base"
+    except ImportError:
+        return lambda text: len(text) // 4, "estimated, 4 chars per token"
+
+
+def schema_text(kernel: sk.Kernel, included=None) -> str:
+    """The tool schemas a request offering these functions sends"""
+    functions = (
+        kernel.get_list_of_function_metadata({"included_functions": included})
+        if included is not None
+        else kernel.get_full_list_of_function_metadata()
+    )
+    return json.dumps(
+        [kernel_function_metadata_to_function_call_format(f) for f in functions]
+    )
+
+
+async def connect(args) -> tuple:
+    """Kernel with the benchmarked MCP plugins, and the plugins to close"""
+    plugins = [
+        CachedStdioPlugin(
+            name="BloodhoundMCP",
+            command=args.python,
+            args=[BLOODHOUND_SERVER],
+            env={
+                "BLOODHOUND_DOMAIN": "10.255.255.1",
+                "BLOODHOUND_TOKEN_ID": "benchmark",
+                "BLOODHOUND_TOKEN_KEY": "benchmark",
+            },
+        )
+    ]
+    for spec in args.server:
+        name, url = spec.split("=", 1)
+        plugins.append(CachedSsePlugin(name=name, url=url))
+    kernel = sk.Kernel()
+    for plugin in plugins:
+        await plugin.connect()
+        kernel.add_plugin(plugin, plugin_name=plugin.name)
+    return kernel, plugins
+
+
+async def time_to_first_token(service, kernel, message: str, included) -> tuple:
+    """Seconds to the first streamed chunk and the prompt tokens reported"""
+    history = ChatHistory()
+    history.add_user_message(message)
+    filters = {"included_functions": included} if included is not None else None
+    settings = service.get_prompt_execution_settings_class()(
+        function_choice_behavior=FunctionChoiceBehavior.Auto(
+            auto_invoke=False, filters=filters
+        )
+    )
+    started = time.perf_counter()
+    first = None
+    prompt_tokens = None
+    async for chunks in service.get_streaming_chat_message_contents(
+        history, settings, kernel=kernel
+    ):
+        if first is None:
+            first = time.perf_counter() - started
+        for chunk in chunks:
+            usage = chunk.metadata.get("usage")
+            if usage is not None:
+                prompt_tokens = usage.prompt_tokens
+    return first, prompt_tokens
+
+
+async def run(args):
+    count_tokens, tokenizer = token_counter()
+    kernel, plugins = await connect(args)
+    try:
+        selection = ToolSelection(ToolRouter(limit=args.limit), kernel)
+        everything = len(kernel.get_full_list_of_function_metadata())
+        all_tokens = count_tokens(schema_text(kernel))
+
+        print(f"Tool schema tokens ({tokenizer})")
+        print(f"  all tools: {everything} tools, {all_tokens} tokens per request")
+        routed_tokens, route_times = [], []
+        for message in MESSAGES:
+            selection.selected = []  # Each message as the first of a chat
+            started = time.perf_counter()
+            included = selection.route(message)
+            route_times.append(time.perf_counter() - started)
+            tokens = count_tokens(schema_text(kernel, included))
+            routed_tokens.append(tokens)
+            print(f"  {len(included):3d} tools, {tokens:6d} tokens  {message}")
+        print(
+            f"  routed: {statistics.mean(routed_tokens):.0f} tokens per request on "
+            f"average ({statistics.mean(routed_tokens) / all_tokens:.0%} of all), "
+            f"routing took {statistics.mean(route_times) * 1000:.2f} ms"
+        )
+
+        if not args.live:
+            return
+        from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
+
+        service = AzureChatCompletion(
+            endpoint=os.getenv("AOAI_ENDPOINT_URI"),
+            api_key=os.getenv("AOAI_API_KEY"),
+            deployment_name=os.getenv("AOAI_DEPLOYMENT", "gpt-4.1"),
+            api_version=os.getenv("AOAI_API_VERSION", "2025-03-01-preview"),
+        )
+        print("\nLive requests: time to first token, prompt tokens")
+        results = {"all": [], "routed": []}
+        for message in MESSAGES:
+            selection.selected = []
+            for mode, included in (("all", None), ("routed", selection.route(message))):
+                ttft, prompt_tokens = await time_to_first_token(
+                    service, kernel, message, included
+                )
+                results[mode].append(ttft)
+                print(f"  {mode:6s} {ttft:6.2f} s  {prompt_tokens} tokens  {message}")
+        for mode, times in results.items():
+            print(
+                f"  {mode}: median time to first token {statistics.median(times):.2f} s"
+            )
+    finally:
+        for plugin in plugins:
+            await plugin.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--python", default="python", help="Interpreter for the BloodHound server"
+    )
+    parser.add_argument(
+        "--server",
+        action="append",
+        default=[],
+        help="Another MCP server to load, as NAME=SSE_URL",
+    )
+    parser.add_argument(
+        "--limit", type=int, default=12, help="Tools routed per message"
+    )
+    parser.add_argument(
+        "--live", action="store_true", help="Also time requests to Azure OpenAI"
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+# artifacts.py
+"""
+Per-session store for large tool results.
+
+BloodHound tools return member lists, search results and path graphs that
+can run to tens of thousands of tokens. Embedded verbatim, each one is sent
+with every later request of the turn, and with later turns until the history
+is compacted. Instead, results larger than a threshold are kept here and the
+model receives a handle with a compact summary: the tool's message, the size
+of every collection in the result, its fields and a few sample entries.
+
+The model reads what it needs through Artifacts-query_artifact, which selects
+a collection inside an artifact and filters, projects, counts, groups and
+slices it without the full result ever entering the context.
+"""
+
+import json
+import logging
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Annotated, Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import semantic_kernel as sk
+from pydantic import Field
+from semantic_kernel.contents import TextContent
+from semantic_kernel.filters import AutoFunctionInvocationContext
+from semantic_kernel.functions import FunctionResult, kernel_function
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_PLUGIN = "Artifacts"
+QUERY_ARTIFACT = f"{ARTIFACT_PLUGIN}-query_artifact"
+
+OFFLOAD_CHARS = 4000  # Larger tool results are stored and summarized
+MAX_ARTIFACTS = 50  # Per session; the oldest are evicted first
+MAX_STORED_CHARS = 20_000_000  # Per session, across artifacts
+SAMPLE_ITEMS = 3  # Entries of a collection shown in a summary
+SAMPLE_CHARS = 300  # Characters of one sample entry
+MAX_FIELDS = 25  # Field names listed per collection
+MAX_COLLECTIONS = 8  # Collections described in a summary, largest first
+QUERY_LIMIT = 20  # Entries a query returns by default
+MAX_QUERY_LIMIT = 100
+MAX_QUERY_CHARS = 12000  # A query result is cut to this size
+
+
+def result_text(value: Any) -> str:
+    """The text of a function result value, e.g. an MCP tool's contents"""
+    if isinstance(value, list):
+        return "\n".join(
+            item.text if isinstance(item, TextContent) else str(item) for item in value
+        )
+    return "" if value is None else str(value)
+
+
+def is_keyed_collection(data: dict) -> bool:
+    """Whether a dict holds similar objects by key rather than named parts"""
+    values = list(data.values())
+    if len(values) < 2 or not all(isinstance(v, dict) for v in values):
+        return False
+    return bool(set(values[0]).intersection(*values[1:]))
+
+
+def collections(data: Any, path: str = "") -> List[Tuple[str, Any]]:
+    """Every list, and dict of objects, in a JSON value, with its dotted path"""
+    found = []
+    if isinstance(data, list):
+        found.append((path, data))
+    elif isinstance(data, dict):
+        if is_keyed_collection(data):
+            return [(path, data)]  # e.g. a graph's nodes by id
+        for key, value in data.items():
+            if isinstance(value, (list, dict)):
+                found += collections(value, f"{path}.{key}" if path else str(key))
+    return found
+
+
+def records(collection: Any) -> List[Any]:
+    """The entries of a collection; a dict of objects gets their key as "id" """
+    if isinstance(collection, dict):
+        return [{"id": key, **value} for key, value in collection.items()]
+    return list(collection)
+
+
+def lookup(data: Any, path: str) -> Any:
+    """The value at a dotted path, or None"""
+    for part in [p for p in path.split(".") if p]:
+        if isinstance(data, dict):
+            data = data.get(part)
+        elif isinstance(data, list) and part.isdigit() and int(part) < len(data):
+            data = data[int(part)]
+        else:
+            return None
+    return data
+
+
+def field_names(entries: List[Any]) -> List[str]:
+    """The fields of a collection's entries, most common first"""
+    counts = Counter(
+        key for entry in entries if isinstance(entry, dict) for key in entry
+    )
+    return [name for name, _ in counts.most_common(MAX_FIELDS)]
+
+
+def compact(value: Any, limit: int = SAMPLE_CHARS) -> str:
+    text = json.dumps(value, default=str) if not isinstance(value, str) else value
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+@dataclass
+class Artifact:
+    """A stored tool result"""
+
+    handle: str
+    function: str
+    arguments: Dict[str, Any]
+    text: str
+    data: Any = None  # Parsed JSON, None for plain text
+    collections: List[Tuple[str, Any]] = field(default_factory=list)
+
+    def summary(self) -> str:
+        """What the model sees instead of the result"""
+        lines = [
+            f"The result of {self.function} ({len(self.text):,} characters) was stored "
+            f'as artifact "{self.handle}". Call {QUERY_ARTIFACT} with this handle to '
+            "filter, count, group or page through it instead of calling the tool again.",
+        ]
+        if self.data is None:
+            text_lines = self.text.splitlines()
+            lines.append(f"Text, {len(text_lines)} lines. First lines:")
+            lines += [compact(line) for line in text_lines[:SAMPLE_ITEMS]]
+            return "\n".join(lines)
+        if isinstance(self.data, dict):
+            scalars = {
+                k: v for k, v in self.data.items() if not isinstance(v, (list, dict))
+            }
+            if scalars:
+                lines.append(f"Fields: {compact(scalars, 2 * SAMPLE_CHARS)}")
+        largest = sorted(self.collections, key=lambda c: -len(c[1]))
+        for path, collection in largest[:MAX_COLLECTIONS]:
+            entries = records(collection)
+            names = field_names(entries)
+            described = f'- path "{path}": {len(entries)} entries'
+            if names:
+                described += f"; fields: {', '.join(names)}"
+            lines.append(described)
+            for entry in entries[:SAMPLE_ITEMS]:
+                lines.append(f"    {compact(entry)}")
+        return "\n".join(lines)
+
+
+def parse_conditions(where: str) -> List[Tuple[str, str, str]]:
+    """ "kind=User, enabled=true, name~ADMIN" as (field, operator, value)"""
+    conditions = []
+    for clause in [c.strip() for c in (where or "").split(",") if c.strip()]:
+        for operator in ("!=", "~", "="):
+            if operator in clause:
+                name, value = clause.split(operator, 1)
+                conditions.append((name.strip(), operator, value.strip()))
+                break
+        else:
+            raise ValueError(f'Cannot parse condition "{clause}"; use field=value')
+    return conditions
+
+
+def matches(entry: Any, conditions: List[Tuple[str, str, str]], contains: str) -> bool:
+    if contains and contains.lower() not in json.dumps(entry, default=str).lower():
+        return False
+    for name, operator, expected in conditions:
+        value = lookup(entry, name)
+        actual = json.dumps(value) if isinstance(value, bool) else str(value)
+        actual, expected = actual.lower(), expected.lower()
+        if operator == "=" and actual != expected:
+            return False
+        if operator == "!=" and actual == expected:
+            return False
+        if operator == "~" and expected not in actual:
+            return False
+    return True
+
+
+def project(entry: Any, fields: List[str]) -> Any:
+    if not fields or not isinstance(entry, dict):
+        return entry
+    return {name: lookup(entry, name) for name in fields}
+
+
+class ArtifactStore:
+    """The large tool results of one chat session"""
+
+    def __init__(
+        self,
+        kernel: sk.Kernel,
+        offload_chars: int = OFFLOAD_CHARS,
+        max_artifacts: int = MAX_ARTIFACTS,
+        max_chars: int = MAX_STORED_CHARS,
+    ):
+        """
+        Initialize the store and register its plugin and filter on the kernel
+
+        Args:
+            kernel: The chat session's kernel
+            offload_chars: Tool results larger than this are stored
+            max_artifacts: Artifacts kept; the oldest are evicted first
+            max_chars: Characters kept across artifacts
+        """
+        self.offload_chars = offload_chars
+        self.max_artifacts = max_artifacts
+        self.max_chars = max_chars
+        self.artifacts: "OrderedDict[str, Artifact]" = OrderedDict()
+        self.stored_chars = 0
+        self.offloaded = 0
+        self.kept_plugins = {ARTIFACT_PLUGIN}
+        self._next = 1
+        kernel.add_plugin(ArtifactPlugin(self), plugin_name=ARTIFACT_PLUGIN)
+        kernel.add_filter("auto_function_invocation", self.offload_filter)
+
+    def keep(self, plugin_name: str) -> None:
+        """Never store a plugin's results, e.g. reports the model must read whole"""
+        self.kept_plugins.add(plugin_name)
+
+    def put(self, function: str, arguments: Dict[str, Any], text: str) -> Artifact:
+        """Store a tool result"""
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+        handle = f"a{self._next}"
+        self._next += 1
+        artifact = Artifact(
+            handle=handle,
+            function=function,
+            arguments=arguments,
+            text=text,
+            data=data,
+            collections=collections(data) if data is not None else [],
+        )
+        self.artifacts[handle] = artifact
+        self.stored_chars += len(text)
+        self.offloaded += 1
+        while self.artifacts and (
+            len(self.artifacts) > self.max_artifacts
+            or self.stored_chars > self.max_chars
+        ):
+            _, evicted = self.artifacts.popitem(last=False)
+            self.stored_chars -= len(evicted.text)
+        return artifact
+
+    def get(self, handle: str) -> Optional[Artifact]:
+        return self.artifacts.get((handle or "").strip().strip('"'))
+
+    def clear(self) -> None:
+        """Drop every artifact, e.g. when the chat session ends"""
+        self.artifacts.clear()
+        self.stored_chars = 0
+
+    def query(
+        self,
+        handle: str,
+        path: str = "",
+        where: str = "",
+        contains: str = "",
+        fields: str = "",
+        group_by: str = "",
+        count_only: bool = False,
+        offset: int = 0,
+        limit: int = QUERY_LIMIT,
+    ) -> Dict[str, Any]:
+        """
+        Select entries of a stored result
+
+        Args:
+            handle: The artifact's handle
+            path: Dotted path of the collection (default: the largest one;
+                the lines of a text result)
+            where: Comma separated conditions: field=value, field!=value or
+                field~substring, case-insensitive; fields may be dotted
+            contains: Substring anywhere in an entry, case-insensitive
+            fields: Comma separated fields to return per entry
+            group_by: Field to count the matching entries by
+            count_only: Return only the number of matching entries
+            offset: Matching entries to skip
+            limit: Matching entries to return
+
+        Raises:
+            KeyError: When there is no artifact with that handle
+            ValueError: When the path or a condition is not usable
+        """
+        artifact = self.get(handle)
+        if artifact is None:
+            known = ", ".join(self.artifacts) or "none"
+            raise KeyError(f'No artifact "{handle}"; stored artifacts: {known}')
+        if artifact.data is None:
+            path, entries = "", artifact.text.splitlines()
+        elif path:
+            collection = lookup(artifact.data, path)
+            if not isinstance(collection, (list, dict)):
+                paths = ", ".join(p for p, _ in artifact.collections) or "none"
+                raise ValueError(f'No collection at "{path}"; collections: {paths}')
+            entries = records(collection)
+        elif artifact.collections:
+            path, collection = max(artifact.collections, key=lambda c: len(c[1]))
+            entries = records(collection)
+        else:
+            entries = [artifact.data]
+
+        conditions = parse_conditions(where)
+        selected = [e for e in entries if matches(e, conditions, contains)]
+        result: Dict[str, Any] = {"handle": artifact.handle, "path": path}
+        result["total"] = len(entries)
+        result["matched"] = len(selected)
+        if group_by:
+            groups = Counter(str(lookup(e, group_by)) for e in selected)
+            result["groups"] = dict(groups.most_common(MAX_QUERY_LIMIT))
+        if count_only or group_by:
+            return result
+        limit = max(1, min(limit, MAX_QUERY_LIMIT))
+        offset = max(0, offset)
+        names = [f.strip() for f in fields.split(",") if f.strip()]
+        page = [project(e, names) for e in selected[offset : offset + limit]]
+        while page and len(json.dumps(page, default=str)) > MAX_QUERY_CHARS:
+            page = page[: len(page) // 2]  # Too large; return fewer entries
+        result["offset"] = offset
+        result["returned"] = len(page)
+        result["entries"] = page
+        return result
+
+    async def offload_filter(
+        self,
+        context: AutoFunctionInvocationContext,
+        next: Callable[[AutoFunctionInvocationContext], Awaitable[None]],
+    ) -> None:
+        """Replace a large tool result with its artifact's summary"""
+        await next(context)
+        function = context.function.fully_qualified_name
+        if context.function.plugin_name in self.kept_plugins:
+            return
+        if context.function_result is None:
+            return
+        text = result_text(context.function_result.value)
+        if len(text) <= self.offload_chars:
+            return
+        arguments = dict(context.arguments or {})
+        artifact = self.put(function, arguments, text)
+        logger.info(
+            f"Stored {len(text)} characters from {function} as {artifact.handle}"
+        )
+        context.function_result = FunctionResult(
+            function=context.function.metadata, value=artifact.summary()
+        )
+
+    def status(self) -> Dict[str, Any]:
+        """Summary of the store for logging and diagnostics"""
+        return {
+            "artifacts": len(self.artifacts),
+            "stored_chars": self.stored_chars,
+            "offloaded": self.offloaded,
+        }
+
+
+class ArtifactPlugin:
+    """Lets the model read stored tool results piece by piece"""
+
+    def __init__(self, store: ArtifactStore):
+        self.store = store
+
+    @kernel_function(
+        name="query_artifact",
+        description=(
+            "Read a stored tool result by its artifact handle: select a "
+            "collection, filter, count, group or page through its entries. "
+            "Use it whenever a tool result says it was stored as an artifact."
+        ),
+    )
+    def query_artifact(
+        self,
+        handle: Annotated[str, Field(description='The artifact handle, e.g. "a1".')],
+        path: Annotated[
+            str,
+            Field(
+                description="Dotted path of the collection listed in the summary. "
+                "Empty for the largest one."
+            ),
+        ] = "",
+        where: Annotated[
+            str,
+            Field(
+                description="Comma separated conditions on entry fields: "
+                "field=value, field!=value or field~substring. Case-insensitive."
+            ),
+        ] = "",
+        contains: Annotated[
+            str, Field(description="Text that must appear anywhere in the entry.")
+        ] = "",
+        fields: Annotated[
+            str, Field(description="Comma separated fields to return per entry.")
+        ] = "",
+        group_by: Annotated[
+            str, Field(description="Field to count matching entries by.")
+        ] = "",
+        count_only: Annotated[
+            bool, Field(description="Only count the matching entries.")
+        ] = False,
+        offset: Annotated[int, Field(description="Matching entries to skip.")] = 0,
+        limit: Annotated[
+            int, Field(description=f"Entries to return, at most {MAX_QUERY_LIMIT}.")
+        ] = QUERY_LIMIT,
+    ) -> str:
+        try:
+            result = self.store.query(
+                handle,
+                path=path,
+                where=where,
+                contains=contains,
+                fields=fields,
+                group_by=group_by,
+                count_only=count_only,
+                offset=offset,
+                limit=limit,
+            )
+        except (KeyError, ValueError) as e:
+            return json.dumps({"error": e.args[0]})
+        return json.dumps(result, default=str)
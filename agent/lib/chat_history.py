@@ -0,0 +1,272 @@
+# chat_history.py
+"""
+Chat history with a token budget for the AutoFortify agent.
+
+Every turn sends the whole conversation to the model, so BloodHound results
+and long reports from early in a chat make every later turn slower and more
+expensive. CompactedChatHistory keeps the conversation within a budget:
+
+- the most recent turns are kept verbatim
+- tool results in older turns that exceed a size limit are replaced with a
+  reference naming the call, which the model can repeat if it needs the data;
+  if needed, so are those of recent turns other than the last
+- when the history is still over budget, the older turns are summarized with
+  the chat completion service into one message, which later summaries fold
+  in; without a service, or when summarizing fails, they are dropped
+
+A turn starts at a user message, so tool calls and their results are never
+separated. Token counts are estimates (four characters per token); the
+budget is meant to bound growth, not to match the tokenizer exactly.
+"""
+
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from semantic_kernel.contents import (
+    ChatHistory,
+    ChatMessageContent,
+    FunctionCallContent,
+    FunctionResultContent,
+    TextContent,
+)
+from semantic_kernel.contents.history_reducer.chat_history_reducer_utils import (
+    SUMMARY_METADATA_KEY,
+)
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET = 12000  # Estimated tokens of history sent per turn
+KEEP_TURNS = 3  # Most recent turns, never summarized
+TOOL_OUTPUT_TOKENS = 500  # Larger tool results in older turns become references
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD = 4  # Tokens of role and framing per message
+SUMMARY_INPUT_CHARS = 2000  # Characters of one tool result shown to the summarizer
+
+SUMMARIZATION_PROMPT = """
+Summarize the conversation below between a user and a security hardening assistant so the assistant can continue it.
+
+Keep:
+- what the user asked for and decided, including approvals and refusals
+- the findings: affected users, groups, computers, attack paths, firewall rules and ports, by name
+- the actions taken, with their outcome, and any actions still pending
+- the content of any earlier summary
+
+Leave out greetings, formatting and raw tool output. Do not exceed 15 sentences.
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimated tokens of a text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN if text else 0
+
+
+def item_text(item: Any) -> str:
+    """The text a message item is sent to the model as"""
+    if isinstance(item, FunctionCallContent):
+        arguments = item.arguments
+        if not isinstance(arguments, str):
+            arguments = json.dumps(arguments or {})
+        return f"{item.name or ''}{arguments}"
+    if isinstance(item, FunctionResultContent):
+        return str(item.result)
+    if isinstance(item, TextContent):
+        return item.text or ""
+    return ""
+
+
+def message_tokens(message: ChatMessageContent) -> int:
+    """Estimated tokens of a message"""
+    if message.items:
+        text = "".join(item_text(item) for item in message.items)
+    else:
+        text = message.content or ""
+    return MESSAGE_OVERHEAD + estimate_tokens(text)
+
+
+def tool_reference(result: FunctionResultContent, tokens: int) -> str:
+    """Stands in for a tool result dropped from the history"""
+    return (
+        f"[Output of {result.function_name or 'a tool'} omitted from the history "
+        f"(~{tokens} tokens). Call the tool again if you need it.]"
+    )
+
+
+class CompactedChatHistory:
+    """The conversation of one chat session, kept within a token budget"""
+
+    def __init__(
+        self,
+        service=None,
+        budget: int = DEFAULT_BUDGET,
+        keep_turns: int = KEEP_TURNS,
+        tool_output_tokens: int = TOOL_OUTPUT_TOKENS,
+    ):
+        """
+        Initialize the history
+
+        Args:
+            service: Chat completion service that summarizes older turns
+                (default: older turns are dropped instead)
+            budget: Estimated tokens of history to send per turn
+            keep_turns: Most recent turns kept verbatim; 0 keeps none
+            tool_output_tokens: Tool results in older turns above this size
+                are replaced with a reference
+        """
+        self.service = service
+        self.budget = budget
+        self.keep_turns = keep_turns
+        self.tool_output_tokens = tool_output_tokens
+        self.history = ChatHistory()
+        self.compactions = 0
+        self.summaries = 0
+        self.references = 0
+        self.saved_tokens = 0
+        self.last_compaction: Dict[str, Any] = {}
+
+    @property
+    def messages(self) -> List[ChatMessageContent]:
+        """The messages to send to the model"""
+        return self.history.messages
+
+    def add_user_message(self, content: str) -> None:
+        self.history.add_user_message(content)
+
+    def add_assistant_message(self, content: str) -> None:
+        self.history.add_assistant_message(content)
+
+    def add_message(self, message: ChatMessageContent) -> None:
+        """Add a message, e.g. a tool call or result from the agent's turn"""
+        self.history.add_message(message)
+
+    def clear(self) -> None:
+        """Drop the conversation, e.g. when the chat session ends"""
+        self.history.messages.clear()
+
+    def tokens(self) -> int:
+        """Estimated tokens of the history"""
+        return sum(message_tokens(message) for message in self.history.messages)
+
+    def _turn_starts(self) -> List[int]:
+        messages = self.history.messages
+        starts = [i for i, m in enumerate(messages) if m.role == AuthorRole.USER]
+        if not starts or starts[0] != 0:
+            starts.insert(0, 0)  # A summary or other messages before the first turn
+        return starts
+
+    def _reference_tool_outputs(self, start: int, end: int) -> None:
+        """Replace the large tool results in a range of messages"""
+        messages = self.history.messages
+        for index in range(start, end):
+            items, changed = [], False
+            for item in messages[index].items:
+                if isinstance(item, FunctionResultContent):
+                    tokens = estimate_tokens(str(item.result))
+                    if tokens > self.tool_output_tokens:
+                        # A copy; the agent may still hold the original
+                        reference = tool_reference(item, tokens)
+                        item = item.model_copy(update={"result": reference})
+                        self.references += 1
+                        changed = True
+                items.append(item)
+            if changed:
+                messages[index] = messages[index].model_copy(update={"items": items})
+
+    def _transcript(self, messages: List[ChatMessageContent]) -> str:
+        lines = []
+        for message in messages:
+            if message.metadata.get(SUMMARY_METADATA_KEY):
+                lines.append(f"Earlier summary: {message.content}")
+                continue
+            for item in message.items:
+                if isinstance(item, FunctionCallContent):
+                    lines.append(f"Assistant called {item.name}({item.arguments})")
+                elif isinstance(item, FunctionResultContent):
+                    result = str(item.result)[:SUMMARY_INPUT_CHARS]
+                    lines.append(f"{item.function_name} returned: {result}")
+                elif isinstance(item, TextContent) and item.text:
+                    lines.append(f"{message.role.value.capitalize()}: {item.text}")
+        return "\n".join(lines)
+
+    async def _summarize(self, messages: List[ChatMessageContent]) -> Optional[str]:
+        if self.service is None:
+            return None
+        request = ChatHistory(system_message=SUMMARIZATION_PROMPT)
+        request.add_user_message(self._transcript(messages))
+        settings = self.service.get_prompt_execution_settings_class()()
+        try:
+            response = await self.service.get_chat_message_content(request, settings)
+        except Exception as e:
+            logger.warning(f"Could not summarize the chat history, dropping it: {e}")
+            return None
+        return str(response.content) if response and response.content else None
+
+    async def compact(self) -> int:
+        """
+        Bring the history within its budget
+
+        Cheap steps first: large tool results outside the recent turns become
+        references, then those of the recent turns but the last, which were
+        answered already. Only if that is not enough are the older turns
+        summarized. Call it between turns, e.g. after the answer was sent, so
+        the user does not wait for a summary.
+
+        Returns:
+            Estimated tokens removed from the history
+        """
+        before = self.tokens()
+        if before <= self.budget:
+            return 0
+        started = time.perf_counter()
+        starts = self._turn_starts()
+        if self.keep_turns < 1:
+            recent = len(self.history.messages)  # No turn is kept verbatim
+        else:
+            recent = starts[-self.keep_turns] if len(starts) > self.keep_turns else 0
+
+        self._reference_tool_outputs(0, recent)
+        if self.tokens() > self.budget:
+            self._reference_tool_outputs(recent, starts[-1])
+        summary = None
+        older = self.history.messages[:recent]
+        # A summary alone is not summarized again; that would only lose detail
+        if self.tokens() > self.budget and not all(
+            m.metadata.get(SUMMARY_METADATA_KEY) for m in older
+        ):
+            summary = await self._summarize(older)
+            kept = self.history.messages[recent:]
+            if summary is not None:
+                message = ChatMessageContent(
+                    role=AuthorRole.ASSISTANT,
+                    content=f"Summary of the earlier conversation:\n{summary}",
+                    metadata={SUMMARY_METADATA_KEY: True},
+                )
+                kept = [message] + kept
+                self.summaries += 1
+            self.history.messages = kept
+
+        after = self.tokens()
+        self.compactions += 1
+        self.saved_tokens += before - after
+        self.last_compaction = {
+            "tokens_before": before,
+            "tokens_after": after,
+            "summarized": summary is not None,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info(f"Compacted chat history: {self.last_compaction}")
+        return before - after
+
+    def status(self) -> Dict[str, Any]:
+        """Summary of the history for logging and diagnostics"""
+        return {
+            "messages": len(self.history.messages),
+            "tokens": self.tokens(),
+            "budget": self.budget,
+            "compactions": self.compactions,
+            "summaries": self.summaries,
+            "references": self.references,
+            "saved_tokens": self.saved_tokens,
+        }
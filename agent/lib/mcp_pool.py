@@ -0,0 +1,365 @@
+# mcp_pool.py
+"""
+Process-wide pool of connected MCP clients for the AutoFortify agent.
+
+Connecting an MCP plugin opens an SSE stream and lists the server's tools, so
+doing it in on_chat_start made every new chat wait on the network. The pool
+connects each configured server once when the app starts and keeps the
+clients connected: a health check pings every client periodically and
+reconnects the ones that stopped answering.
+
+Servers are connected concurrently, each bounded by its own connect timeout,
+so an unreachable host delays nothing but itself. A client that fails to
+connect is retried in the background with backoff, and sessions that started
+without it can ask to be handed the plugin once it comes up
+(MCPClientPool.when_connected).
+
+Chat sessions borrow connected clients and add them to their kernel, which
+involves no network I/O. A client is shared by many sessions at once; MCP
+multiplexes concurrent requests over one session, and the client object
+survives reconnects, so the kernel functions sessions already hold keep
+working. Those kernel functions are built once per client and tool catalog
+rather than per session, and the catalogs themselves are cached by server
+fingerprint (see lib/tool_catalog.py).
+"""
+
+import asyncio
+import itertools
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from semantic_kernel.connectors.mcp import MCPPluginBase
+from semantic_kernel.functions import KernelPlugin
+
+from lib.tool_catalog import CachedSsePlugin, ToolCatalog
+
+logger = logging.getLogger(__name__)
+
+HEALTH_INTERVAL = 30.0
+PING_TIMEOUT = 5.0
+RETRY_DELAY = 1.0  # First background retry; doubles up to RETRY_MAX_DELAY
+RETRY_MAX_DELAY = 30.0
+
+
+@dataclass
+class MCPServer:
+    """An MCP server the agent uses"""
+
+    name: str  # Plugin name in the kernel
+    description: str
+    url: str
+    size: int = 1  # Connected clients kept for this server
+    timeout: int = 30  # Seconds for each request
+    connect_timeout: float = 10.0  # Seconds for establishing the session
+
+
+def sse_plugin(server: MCPServer, catalog: ToolCatalog) -> MCPPluginBase:
+    """Default client factory: an SSE plugin for the server's URL"""
+    return CachedSsePlugin(
+        name=server.name,
+        description=server.description,
+        url=server.url,
+        timeout=server.timeout,
+        request_timeout=server.timeout,
+        catalog=catalog,
+    )
+
+
+class PooledClient:
+    """One MCP plugin and its connection state"""
+
+    def __init__(
+        self,
+        server: MCPServer,
+        plugin: MCPPluginBase,
+        on_connect: Optional[Callable[["PooledClient"], None]] = None,
+    ):
+        self.server = server
+        self.plugin = plugin
+        self.connected = False
+        self.connects = 0
+        self.last_error: Optional[str] = None
+        self.retrying: Optional[asyncio.Task] = None
+        self._on_connect = on_connect
+        self._lock = asyncio.Lock()
+        self._functions: Optional[KernelPlugin] = None
+        self._functions_key = None
+
+    @property
+    def functions(self) -> KernelPlugin:
+        """
+        The plugin's tools as kernel functions, ready to add to any kernel
+
+        Built once per tool load rather than by every kernel.add_plugin() call.
+        Adding a prebuilt KernelPlugin skips the plugin's added_to_kernel hook,
+        which only matters for MCP sampling, which these servers do not use.
+        """
+        key = (self.connects, getattr(self.plugin, "tools_loaded", 0))
+        if self._functions is None or key != self._functions_key:
+            self._functions = KernelPlugin.from_object(
+                plugin_name=self.server.name,
+                plugin_instance=self.plugin,
+                description=self.server.description,
+            )
+            self._functions_key = key
+        return self._functions
+
+    async def connect(self) -> bool:
+        """(Re)connect the plugin; returns whether it is connected"""
+        async with self._lock:
+            if self.connected:
+                await self._close()
+            try:
+                await asyncio.wait_for(
+                    self.plugin.connect(), self.server.connect_timeout
+                )
+            except asyncio.CancelledError:
+                self._abandon()
+                raise
+            except Exception as e:
+                self._abandon()
+                self.last_error = str(e) or type(e).__name__
+                logger.warning(
+                    f"Failed to connect to MCP server {self.server.name}: "
+                    f"{self.last_error}"
+                )
+                return False
+            self.connected = True
+            self.connects += 1
+            self.last_error = None
+            logger.info(f"Connected to MCP server {self.server.name}")
+        if self._on_connect is not None:
+            self._on_connect(self)
+        return True
+
+    async def ping(self, timeout: float = PING_TIMEOUT) -> bool:
+        session = self.plugin.session
+        if not self.connected or session is None:
+            return False
+        try:
+            await asyncio.wait_for(session.send_ping(), timeout)
+            return True
+        except Exception as e:
+            self.last_error = str(e) or type(e).__name__
+            return False
+
+    def _abandon(self) -> None:
+        # MCPPluginBase.connect() waits for a task that never signals when the
+        # session fails to initialize, so a failed or timed-out connect leaves
+        # that task behind; cancel it so the next connect starts clean
+        task = getattr(self.plugin, "_current_task", None)
+        if task is not None and not task.done():
+            task.cancel()
+        self.plugin._current_task = None
+        self.plugin.session = None
+
+    async def _close(self) -> None:
+        self.connected = False
+        try:
+            await self.plugin.close()
+        except Exception as e:
+            # The transport already failed; the plugin is reset either way
+            logger.debug(f"Error closing MCP client {self.server.name}: {e}")
+            self.plugin.session = None
+
+    async def close(self) -> None:
+        if self.retrying is not None:
+            self.retrying.cancel()
+            self.retrying = None
+        async with self._lock:
+            await self._close()
+
+
+class MCPClientPool:
+    """Connected MCP clients shared by all chat sessions"""
+
+    def __init__(
+        self,
+        servers: List[MCPServer],
+        factory: Callable[[MCPServer, ToolCatalog], MCPPluginBase] = sse_plugin,
+        health_interval: float = HEALTH_INTERVAL,
+        ping_timeout: float = PING_TIMEOUT,
+        retry_delay: float = RETRY_DELAY,
+        catalog: Optional[ToolCatalog] = None,
+    ):
+        """
+        Initialize the pool; nothing connects until start()
+
+        Args:
+            servers: Servers to connect to
+            factory: Creates an unconnected plugin for a server, given the
+                tool catalog cache
+            health_interval: Seconds between health checks
+            ping_timeout: Seconds a client has to answer a ping
+            retry_delay: Seconds before the first background retry of a
+                client that failed to connect
+            catalog: Tool catalog cache shared by the clients (default: a new
+                in-memory one)
+        """
+        self.servers = servers
+        self.health_interval = health_interval
+        self.ping_timeout = ping_timeout
+        self.retry_delay = retry_delay
+        self.catalog = catalog or ToolCatalog()
+        self.clients: Dict[str, List[PooledClient]] = {
+            server.name: [
+                PooledClient(server, factory(server, self.catalog), self._connected)
+                for _ in range(server.size)
+            ]
+            for server in servers
+        }
+        self._next = {server.name: itertools.count() for server in servers}
+        self._waiters: Dict[str, List[Callable[[KernelPlugin], None]]] = {
+            server.name: [] for server in servers
+        }
+        self._health_task: Optional[asyncio.Task] = None
+
+    def _all(self) -> List[PooledClient]:
+        return [client for clients in self.clients.values() for client in clients]
+
+    async def start(self) -> None:
+        """
+        Connect every client concurrently and start the periodic health check
+
+        Returns after at most the longest connect timeout; clients that failed
+        to connect keep being retried in the background.
+        """
+        clients = self._all()
+        connected = await asyncio.gather(*(client.connect() for client in clients))
+        for client, ok in zip(clients, connected):
+            if not ok:
+                self._retry_later(client)
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    def _retry_later(self, client: PooledClient) -> None:
+        if client.retrying is None or client.retrying.done():
+            client.retrying = asyncio.create_task(self._retry(client))
+
+    async def _retry(self, client: PooledClient) -> None:
+        delay = self.retry_delay
+        while True:
+            await asyncio.sleep(delay)
+            if await client.connect():
+                return
+            delay = min(delay * 2, RETRY_MAX_DELAY)
+
+    def _connected(self, client: PooledClient) -> None:
+        name = client.server.name
+        waiters, self._waiters[name] = self._waiters[name], []
+        for callback in waiters:
+            try:
+                callback(client.functions)
+            except Exception as e:
+                logger.error(f"Failed to hand out MCP client {name}: {e}")
+
+    def when_connected(
+        self, name: str, callback: Callable[[KernelPlugin], None]
+    ) -> Callable[[], None]:
+        """
+        Call callback with a plugin once a client of the server connects
+
+        Meant for sessions that started while the server was down, to add the
+        plugin to their kernel when it comes back. The callback runs once, on
+        the pool's task rather than the session's.
+
+        Returns:
+            A function that cancels the request, for sessions that end first
+        """
+        plugin = self.borrow(name)
+        if plugin is not None:  # Came back before the session asked
+            callback(plugin)
+            return lambda: None
+        self._waiters[name].append(callback)
+
+        def cancel() -> None:
+            if callback in self._waiters[name]:
+                self._waiters[name].remove(callback)
+
+        return cancel
+
+    def borrow(self, name: str) -> Optional[KernelPlugin]:
+        """
+        The kernel functions of a connected client, without any network I/O
+
+        Clients of the same server are handed out in turn. Returns None when
+        none of them is connected.
+        """
+        clients = self.clients.get(name, [])
+        for _ in range(len(clients)):
+            client = clients[next(self._next[name]) % len(clients)]
+            if client.connected:
+                return client.functions
+        return None
+
+    def borrow_all(self) -> Dict[str, KernelPlugin]:
+        """A connected plugin for every server that has one, by name"""
+        plugins = {}
+        for server in self.servers:
+            plugin = self.borrow(server.name)
+            if plugin is not None:
+                plugins[server.name] = plugin
+        return plugins
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Ping every client and reconnect the ones that do not answer"""
+        clients = self._all()
+        answered = await asyncio.gather(
+            *(client.ping(self.ping_timeout) for client in clients)
+        )
+        # Clients already being retried in the background are left to it
+        failed = [
+            client
+            for client, ok in zip(clients, answered)
+            if not ok and (client.retrying is None or client.retrying.done())
+        ]
+        for client in failed:
+            logger.warning(
+                f"MCP client {client.server.name} failed its health check"
+                f" ({client.last_error}); reconnecting"
+            )
+        reconnected = await asyncio.gather(*(client.connect() for client in failed))
+        for client, ok in zip(failed, reconnected):
+            if not ok:
+                self._retry_later(client)
+        return {
+            "checked": len(clients),
+            "failed": len(failed),
+            "reconnected": sum(reconnected),
+            **self.status(),
+        }
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self.health_check()
+            except Exception as e:
+                logger.error(f"MCP health check failed: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        """Connected clients per server, for logging and diagnostics"""
+        return {
+            name: {
+                "connected": sum(client.connected for client in clients),
+                "size": len(clients),
+                "connects": sum(client.connects for client in clients),
+                "waiting": len(self._waiters[name]),
+            }
+            for name, clients in self.clients.items()
+        }
+
+    async def close(self) -> None:
+        """Stop health checks and disconnect every client"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        for client in self._all():
+            await client.close()
+        for waiters in self._waiters.values():
+            waiters.clear()
@@ -0,0 +1,164 @@
+# runtime.py
+"""
+One agent runtime for all chat sessions of the AutoFortify agent.
+
+An InProcessRuntime runs a message loop task for as long as it is started,
+and every orchestration run registers agent factories and subscriptions on it
+that the runtime never removes; the actors it instantiates keep their agent
+threads, chat histories included. A runtime per chat multiplies the loops,
+and a runtime that lives for the process accumulates every run.
+
+SharedRuntime starts one runtime for the process and hands each chat session
+a RuntimeScope: a view of the runtime that records what is registered
+through it. Releasing a scope, when a delegation finishes or the chat ends,
+removes its factories, actor instances, subscriptions and topics again.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+from semantic_kernel.agents.runtime import InProcessRuntime
+
+logger = logging.getLogger(__name__)
+
+
+class RuntimeScope:
+    """
+    The part of a SharedRuntime one chat session or orchestration run uses
+
+    Pass it wherever a runtime is expected, e.g. to an orchestration's
+    invoke(); everything else is delegated to the shared runtime.
+    """
+
+    def __init__(self, shared: "SharedRuntime", name: str, parent=None):
+        self.shared = shared
+        self.name = name
+        self.parent: Optional[RuntimeScope] = parent
+        self.children: List[RuntimeScope] = []
+        self.agent_types: Set[str] = set()
+        self.subscriptions: Set[str] = set()
+        self.topic_types: Set[str] = set()
+        self.topic_prefixes: Set[str] = set()
+        self.released = False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.shared.runtime, name)
+
+    async def register_factory(self, type, agent_factory, *, expected_class=None):
+        agent_type = await self.shared.runtime.register_factory(
+            type=type, agent_factory=agent_factory, expected_class=expected_class
+        )
+        self.agent_types.add(agent_type.type)
+        return agent_type
+
+    async def add_subscription(self, subscription) -> None:
+        await self.shared.runtime.add_subscription(subscription)
+        self.subscriptions.add(subscription.id)
+        if getattr(subscription, "topic_type", None):
+            self.topic_types.add(subscription.topic_type)
+        if getattr(subscription, "topic_type_prefix", None):
+            self.topic_prefixes.add(subscription.topic_type_prefix)
+
+    async def remove_subscription(self, id: str) -> None:
+        await self.shared.runtime.remove_subscription(id)
+        self.subscriptions.discard(id)
+
+    def child(self, name: str = "run") -> "RuntimeScope":
+        """A scope for one run within this one, released on its own"""
+        scope = RuntimeScope(self.shared, f"{self.name}/{name}", parent=self)
+        self.children.append(scope)
+        return scope
+
+    async def release(self) -> None:
+        """Remove everything registered through this scope and its children"""
+        if self.released:
+            return
+        self.released = True
+        for child in list(self.children):
+            await child.release()
+        await self.shared._release(self)
+        if self.parent is not None and self in self.parent.children:
+            self.parent.children.remove(self)
+        if self.shared.scopes.get(self.name) is self:
+            del self.shared.scopes[self.name]
+
+
+class SharedRuntime:
+    """An InProcessRuntime shared by every chat session"""
+
+    def __init__(self):
+        self.runtime = InProcessRuntime()
+        self.scopes: Dict[str, RuntimeScope] = {}
+        self.started = False
+
+    def start(self) -> None:
+        if not self.started:
+            self.runtime.start()
+            self.started = True
+
+    async def stop(self) -> None:
+        """Release every scope and stop the runtime"""
+        for scope in list(self.scopes.values()):
+            await scope.release()
+        if self.started:
+            # stop() can cancel a message mid-delivery and fail on the queue
+            await self.runtime.stop_when_idle()
+            self.started = False
+
+    def scope(self, name: str) -> RuntimeScope:
+        """The scope of a chat session, created on first use"""
+        self.start()
+        scope = self.scopes.get(name)
+        if scope is None:
+            scope = self.scopes[name] = RuntimeScope(self, name)
+        return scope
+
+    async def _release(self, scope: RuntimeScope) -> None:
+        # InProcessRuntime has no API to unregister agents; drop them from its
+        # registries directly, as it would have had they never been added
+        runtime = self.runtime
+        manager = runtime._subscription_manager
+        # Topics first: removing a subscription rebuilds every seen topic
+        stale = {
+            topic
+            for topic in manager._seen_topics
+            if topic.type in scope.topic_types
+            or any(topic.type.startswith(p) for p in scope.topic_prefixes)
+        }
+        manager._seen_topics -= stale
+        for topic in stale:
+            manager._subscribed_recipients.pop(topic, None)
+        for subscription_id in list(scope.subscriptions):
+            try:
+                await runtime.remove_subscription(subscription_id)
+            except ValueError:
+                pass  # Removed already
+        for agent_type in scope.agent_types:
+            runtime._agent_factories.pop(agent_type, None)
+        for agent_id in [
+            agent_id
+            for agent_id in runtime._instantiated_agents
+            if agent_id.type in scope.agent_types
+        ]:
+            del runtime._instantiated_agents[agent_id]
+        logger.debug(
+            f"Released runtime scope {scope.name}: {len(scope.agent_types)} agent "
+            f"types, {len(scope.subscriptions)} subscriptions, {len(stale)} topics"
+        )
+        scope.agent_types.clear()
+        scope.subscriptions.clear()
+        scope.topic_types.clear()
+        scope.topic_prefixes.clear()
+
+    def status(self) -> Dict[str, Any]:
+        """Counts of what the runtime holds, for logging and leak checks"""
+        runtime = self.runtime
+        return {
+            "scopes": len(self.scopes),
+            "agent_types": len(runtime._agent_factories),
+            "agents": len(runtime._instantiated_agents),
+            "subscriptions": len(runtime._subscription_manager.subscriptions),
+            "topics": len(runtime._subscription_manager._seen_topics),
+            "background_tasks": len(runtime._background_tasks),
+            "queued_messages": runtime.unprocessed_messages_count,
+        }
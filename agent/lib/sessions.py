@@ -0,0 +1,229 @@
+# sessions.py
+"""
+Lifecycle of the chat sessions of the AutoFortify agent.
+
+Each chat holds a kernel with the MCP plugins it borrowed, a chat history, a
+tool result artifact store and a scope of the shared agent runtime. Chainlit
+keeps a session's user_session for an hour after the browser disconnects, so
+a reconnecting tab can resume, and for as long as an idle tab stays open;
+nothing in it was released before then, and BloodHound-sized histories and
+artifacts of abandoned chats added up.
+
+SessionRegistry tracks the resources of every live session and releases
+them explicitly, when the chat ends and when a session has been idle longer
+than the idle timeout: it cancels the session's requests for MCP servers that
+were down, drops the borrowed plugins from its kernel (the clients belong to
+the process-wide pool and stay connected), releases its runtime scope and
+clears its history and artifacts. A chat that sends a message after its
+session was released is started afresh by the app.
+
+status() reports the live sessions, the open MCP connections and the
+process's resident memory, for logging and leak checks.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import semantic_kernel as sk
+
+from lib.artifacts import ArtifactStore
+from lib.chat_history import CompactedChatHistory
+from lib.runtime import RuntimeScope
+
+logger = logging.getLogger(__name__)
+
+IDLE_TIMEOUT = 1800.0  # Seconds without a message before a session is released
+REAP_INTERVAL = 60.0  # Seconds between checks for idle sessions
+
+
+def rss_bytes() -> Optional[int]:
+    """The resident memory of this process, or None where it is not known"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    # Peak rather than current where /proc is missing; kilobytes but on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class ChatSession:
+    """The resources of one chat session"""
+
+    id: str
+    kernel: Optional[sk.Kernel] = None
+    chat_history: Optional[CompactedChatHistory] = None
+    artifacts: Optional[ArtifactStore] = None
+    runtime: Optional[RuntimeScope] = None
+    # Cancel the session's requests for MCP servers that were down
+    pending: List[Callable[[], None]] = field(default_factory=list)
+    # Called last on close, e.g. to drop the app's references to the session
+    on_close: List[Callable[[], None]] = field(default_factory=list)
+    started: float = field(default_factory=time.monotonic)
+    last_active: float = field(default_factory=time.monotonic)
+    busy: int = 0  # Messages being answered
+    closed: bool = False
+
+    async def close(self) -> None:
+        """Release the session's resources; safe to call more than once"""
+        if self.closed:
+            return
+        self.closed = True
+        for cancel in self.pending:
+            cancel()
+        if self.runtime is not None:
+            await self.runtime.release()
+        if self.chat_history is not None:
+            self.chat_history.clear()
+        if self.artifacts is not None:
+            self.artifacts.clear()
+        if self.kernel is not None:
+            # Borrowed plugins and filters hold the session's objects
+            self.kernel.plugins.clear()
+            for filters in (
+                self.kernel.function_invocation_filters,
+                self.kernel.prompt_rendering_filters,
+                self.kernel.auto_function_invocation_filters,
+            ):
+                filters.clear()
+        for callback in self.on_close:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Failed to clean up session {self.id}: {e}")
+        self.pending.clear()
+        self.on_close.clear()
+        self.kernel = self.chat_history = self.artifacts = self.runtime = None
+
+
+class SessionRegistry:
+    """The live chat sessions of the process"""
+
+    def __init__(
+        self,
+        idle_timeout: float = IDLE_TIMEOUT,
+        reap_interval: float = REAP_INTERVAL,
+        connections: Optional[Callable[[], int]] = None,
+    ):
+        """
+        Initialize the registry; idle sessions are released after start()
+
+        Args:
+            idle_timeout: Seconds without a message before a session is
+                released; 0 keeps sessions until their chat ends
+            reap_interval: Seconds between checks for idle sessions
+            connections: Counts the open MCP connections, for status()
+        """
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self.connections = connections
+        self.sessions: Dict[str, ChatSession] = {}
+        self.opened = 0
+        self.ended = 0
+        self.reaped = 0
+        self._reap_task: Optional[asyncio.Task] = None
+
+    async def open(self, id: str, **resources: Any) -> ChatSession:
+        """Track a new session's resources, releasing any it replaces"""
+        previous = self.sessions.pop(id, None)
+        if previous is not None:
+            await previous.close()
+        session = self.sessions[id] = ChatSession(id=id, **resources)
+        self.opened += 1
+        return session
+
+    def get(self, id: str) -> Optional[ChatSession]:
+        """The live session, or None if it ended or was released"""
+        return self.sessions.get(id)
+
+    @asynccontextmanager
+    async def active(self, id: str) -> AsyncIterator[Optional[ChatSession]]:
+        """Mark the session busy while answering a message"""
+        session = self.sessions.get(id)
+        if session is None:
+            yield None
+            return
+        session.busy += 1
+        session.last_active = time.monotonic()
+        try:
+            yield session
+        finally:
+            session.busy -= 1
+            session.last_active = time.monotonic()
+
+    async def close(self, id: str) -> bool:
+        """Release a session whose chat ended; False if it was not live"""
+        session = self.sessions.pop(id, None)
+        if session is None:
+            return False
+        await session.close()
+        self.ended += 1
+        return True
+
+    async def reap(self, now: Optional[float] = None) -> List[str]:
+        """Release the sessions idle longer than the idle timeout"""
+        if not self.idle_timeout:
+            return []
+        now = time.monotonic() if now is None else now
+        idle = [
+            session
+            for session in self.sessions.values()
+            if not session.busy and now - session.last_active > self.idle_timeout
+        ]
+        for session in idle:
+            del self.sessions[session.id]
+            await session.close()
+        self.reaped += len(idle)
+        if idle:
+            logger.info(f"Released {len(idle)} idle chat sessions")
+        return [session.id for session in idle]
+
+    async def _reap_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.error(f"Releasing idle chat sessions failed: {e}")
+
+    def start(self) -> None:
+        """Start releasing idle sessions periodically"""
+        if self._reap_task is None and self.idle_timeout:
+            self._reap_task = asyncio.create_task(self._reap_loop())
+
+    async def stop(self) -> None:
+        """Stop releasing idle sessions and release every session"""
+        if self._reap_task is not None:
+            self._reap_task.cancel()
+            try:
+                await self._reap_task
+            except asyncio.CancelledError:
+                pass
+            self._reap_task = None
+        for id in list(self.sessions):
+            await self.close(id)
+
+    def status(self) -> Dict[str, Any]:
+        """Live sessions, connections and memory, for logging and leak checks"""
+        rss = rss_bytes()
+        return {
+            "live_sessions": len(self.sessions),
+            "busy_sessions": sum(bool(s.busy) for s in self.sessions.values()),
+            "opened": self.opened,
+            "ended": self.ended,
+            "reaped": self.reaped,
+            "open_connections": self.connections() if self.connections else None,
+            "rss_mb": round(rss / 2**20, 1) if rss is not None else None,
+        }
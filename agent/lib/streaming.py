@@ -0,0 +1,124 @@
+# streaming.py
+"""
+Coalesced token streaming for the AutoFortify agent.
+
+The model streams its answer a few characters at a time, and every
+cl.Message.stream_token() call is a websocket frame: a long report became
+thousands of tiny frames, each costing the event loop an emit and a write
+that every concurrent chat waits behind.
+
+TokenStreamer buffers the tokens and hands them to Chainlit in batches: the
+first token is sent at once, so the answer starts appearing as soon as it
+would have, and after that a batch is sent when it reaches max_chars or
+when its oldest token has waited interval seconds, whichever comes first. A
+timer flushes the batch if the model pauses, so no token waits longer than
+the interval for the next one.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 0.05  # Seconds a token may wait before its batch is sent
+FLUSH_CHARS = 256  # Characters that make a batch full
+
+
+class TokenStreamer:
+    """Batches streamed tokens into fewer, larger UI updates"""
+
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[Any]],
+        interval: float = FLUSH_INTERVAL,
+        max_chars: int = FLUSH_CHARS,
+    ):
+        """
+        Initialize the streamer
+
+        Args:
+            send: Sends a batch of text, e.g. a cl.Message's stream_token
+            interval: Seconds a token may wait before its batch is sent;
+                0 sends every token as it comes
+            max_chars: Characters at which a batch is sent without waiting
+        """
+        self.send = send
+        self.interval = interval
+        self.max_chars = max_chars
+        self.tokens = 0
+        self.frames = 0
+        self.chars = 0
+        self.max_wait = 0.0  # Longest a token waited to be sent, in seconds
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._since: Optional[float] = None  # When the oldest buffered token came
+        self._timer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def add(self, token: str) -> None:
+        """Stream a token; it is sent now or with its batch"""
+        if not token:
+            return
+        self.tokens += 1
+        self._buffer.append(token)
+        self._buffered += len(token)
+        if self._since is None:
+            self._since = time.perf_counter()
+        if (
+            self.frames == 0
+            or self._buffered >= self.max_chars
+            or time.perf_counter() - self._since >= self.interval
+        ):
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.interval)
+        self._timer = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to stream tokens: {e}")
+
+    async def flush(self) -> None:
+        """Send the buffered tokens, if any"""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        async with self._lock:  # Batches are sent one at a time, in order
+            if not self._buffer:
+                return
+            text = "".join(self._buffer)
+            self.max_wait = max(self.max_wait, time.perf_counter() - self._since)
+            self._buffer.clear()
+            self._buffered = 0
+            self._since = None
+            self.frames += 1
+            self.chars += len(text)
+            await self.send(text)
+
+    async def close(self) -> None:
+        """Send what is left; call once the stream has ended"""
+        await self.flush()
+
+    async def __aenter__(self) -> "TokenStreamer":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if exc_info[0] is None:
+            await self.close()
+
+    def status(self) -> Dict[str, Any]:
+        """Tokens and frames streamed, for logging and diagnostics"""
+        return {
+            "tokens": self.tokens,
+            "frames": self.frames,
+            "chars": self.chars,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+        }
@@ -0,0 +1,263 @@
+# subagents.py
+"""
+Parallel subagents for the AutoFortify agent.
+
+A broad request such as "review my domain for risky users" spans independent
+reviews, each needing its own tools and many tool calls. Done by the chat's
+agent they run one after another in a single context that grows with every
+result. Instead, the agent can hand each review to a specialist subagent
+through AgentPlugin-invoke_agents. The subagents run concurrently as a
+ConcurrentOrchestration on the shared runtime (lib/runtime.py), in a scope of
+the session's that is released when the run ends, each with only the
+read-only tools of its area, and their reports come back merged into one
+tool result for the agent to build its answer from.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from typing import Annotated, Dict, List, Optional, Sequence, Tuple
+
+import semantic_kernel as sk
+from pydantic import BaseModel, Field
+from semantic_kernel.agents import ChatCompletionAgent, ConcurrentOrchestration
+from semantic_kernel.connectors.ai import FunctionChoiceBehavior
+from semantic_kernel.contents import ChatMessageContent
+from semantic_kernel.functions import kernel_function
+
+from lib.artifacts import QUERY_ARTIFACT
+from lib.runtime import RuntimeScope
+
+logger = logging.getLogger(__name__)
+
+AGENT_PLUGIN = "AgentPlugin"
+INVOKE_AGENTS = f"{AGENT_PLUGIN}-invoke_agents"
+
+SUBAGENT_TIMEOUT = 300.0  # Seconds for all subagents of one call
+
+
+@dataclass(frozen=True)
+class Specialist:
+    """A subagent the chat's agent can delegate to"""
+
+    name: str
+    description: str  # Shown to the delegating agent
+    instructions: str
+    tools: Tuple[str, ...]  # fnmatch patterns over fully qualified function names
+
+
+SPECIALISTS = (
+    Specialist(
+        name="FirewallAuditor",
+        description="Audits the Windows Firewall rules for exposure and gaps",
+        instructions=(
+            "You audit Windows Firewall configurations. List the inbound rules, "
+            "analyze their exposure and report risky or overly broad rules with "
+            "the ports, programs and profiles involved, most critical first."
+        ),
+        tools=(
+            "ActiveDirectoryAndServicesMCP-list_inbound_firewall_rules",
+            "ActiveDirectoryAndServicesMCP-analyze_firewall_exposure",
+        ),
+    ),
+    Specialist(
+        name="RiskyUsersAnalyst",
+        description=(
+            "Finds risky users, groups and delegations in Active Directory "
+            "with BloodHound"
+        ),
+        instructions=(
+            "You analyze Active Directory for risky users and roles using "
+            "BloodHound data: excessive privileges, DCSync rights, attack paths "
+            "to Domain Admins, foreign principals and constrained delegation. "
+            "Use the job descriptions of the affected users to judge whether "
+            "their access is needed. Report the users and groups by name with "
+            "the risk and a remediation, most critical first."
+        ),
+        tools=(
+            "BloodhoundMCP-get_domains",
+            "BloodhoundMCP-search_objects",
+            "BloodhoundMCP-get_users",
+            "BloodhoundMCP-get_user_*",
+            "BloodhoundMCP-get_group_*",
+            "BloodhoundMCP-get_dc_syncers",
+            "BloodhoundMCP-get_foreign_*",
+            "BloodhoundMCP-get_shortest_path",
+            "BloodhoundMCP-run_cypher_query",
+            "ActiveDirectoryAndServicesMCP-lookup_job_descriptions",
+            "ActiveDirectoryAndServicesMCP-list_*constrained_delegation",
+        ),
+    ),
+    Specialist(
+        name="ADCSReviewer",
+        description="Reviews Active Directory Certificate Services for abuse paths",
+        instructions=(
+            "You review Active Directory Certificate Services with BloodHound "
+            "data: certificate templates, enterprise and root CAs and who "
+            "controls them. Report templates and CAs that allow escalation "
+            "(ESC1-ESC8 style) with the principals involved and a remediation."
+        ),
+        tools=(
+            "BloodhoundMCP-get_domains",
+            "BloodhoundMCP-search_objects",
+            "BloodhoundMCP-get_cert_template_*",
+            "BloodhoundMCP-get_*ca_*",
+            "BloodhoundMCP-run_cypher_query",
+        ),
+    ),
+)
+
+
+class SubagentTask(BaseModel):
+    """One assignment for a subagent"""
+
+    agent: Annotated[
+        str,
+        Field(
+            description="The subagent: "
+            + "; ".join(f"{s.name} ({s.description})" for s in SPECIALISTS)
+        ),
+    ]
+    task: Annotated[
+        str, Field(description="What the subagent should find out, in full.")
+    ]
+
+
+def specialist_tools(kernel: sk.Kernel, specialist: Specialist) -> List[str]:
+    """The kernel functions a specialist may call"""
+    patterns = specialist.tools + (QUERY_ARTIFACT,)
+    return [
+        f.fully_qualified_name
+        for f in kernel.get_full_list_of_function_metadata()
+        if any(fnmatch(f.fully_qualified_name, p) for p in patterns)
+    ]
+
+
+class Subagents:
+    """Runs specialist subagents concurrently for one chat session"""
+
+    def __init__(
+        self,
+        kernel: sk.Kernel,
+        runtime: RuntimeScope,
+        specialists: Sequence[Specialist] = SPECIALISTS,
+        timeout: float = SUBAGENT_TIMEOUT,
+    ):
+        """
+        Initialize the subagents
+
+        Args:
+            kernel: The chat session's kernel, with its AI service and plugins
+            runtime: The session's scope of the shared runtime
+            specialists: The subagents that can be delegated to
+            timeout: Seconds to wait for all subagents of one call
+        """
+        self.kernel = kernel
+        self.runtime = runtime
+        self.specialists = {s.name: s for s in specialists}
+        self.timeout = timeout
+
+    def agent(self, specialist: Specialist, tasks: List[str]) -> ChatCompletionAgent:
+        """A subagent for its assignments, offered only its own tools"""
+        assignment = "\n".join(f"- {task}" for task in tasks)
+        return ChatCompletionAgent(
+            kernel=self.kernel,
+            name=specialist.name,
+            instructions=(
+                f"{specialist.instructions}\n\nYour assignment:\n{assignment}\n\n"
+                "Only report; do not change the system. Be concise."
+            ),
+            function_choice_behavior=FunctionChoiceBehavior.Auto(
+                filters={
+                    "included_functions": specialist_tools(self.kernel, specialist)
+                }
+            ),
+        )
+
+    async def run(self, assignments: List[SubagentTask]) -> str:
+        """Run the assigned subagents concurrently and merge their reports"""
+        tasks: Dict[str, List[str]] = {}
+        unknown = []
+        for assignment in assignments:
+            if assignment.agent in self.specialists:
+                tasks.setdefault(assignment.agent, []).append(assignment.task)
+            else:
+                unknown.append(assignment.agent)
+        if not tasks:
+            return (
+                f"No such subagent: {', '.join(unknown) or 'none given'}. "
+                f"Available: {', '.join(self.specialists)}"
+            )
+
+        reports: Dict[str, ChatMessageContent] = {}
+        finished: Dict[str, float] = {}
+        started = time.perf_counter()
+
+        def collect(message: ChatMessageContent) -> None:
+            reports[message.name] = message
+            finished[message.name] = time.perf_counter() - started
+
+        orchestration = ConcurrentOrchestration(
+            members=[self.agent(self.specialists[n], t) for n, t in tasks.items()],
+            agent_response_callback=collect,
+        )
+        problem: Optional[str] = None
+        scope = self.runtime.child()
+        try:
+            result = await orchestration.invoke(
+                task="Carry out your assignment and report your findings.",
+                runtime=scope,
+            )
+            await result.get(timeout=self.timeout)
+        except asyncio.TimeoutError:
+            result.cancel()
+            problem = f"did not finish within {self.timeout:.0f} seconds"
+        except Exception as e:
+            logger.error(f"Subagent failed: {e}")
+            problem = f"failed: {e}"
+        finally:
+            await scope.release()
+        elapsed = time.perf_counter() - started
+        logger.info(f"Subagents {', '.join(tasks)} took {elapsed:.1f}s")
+
+        sections = []
+        for name, assigned in tasks.items():
+            heading = f"## {name}: {'; '.join(assigned)}"
+            if name in reports:
+                sections.append(
+                    f"{heading}\n(finished in {finished[name]:.1f}s)\n\n"
+                    f"{reports[name].content}"
+                )
+            else:
+                sections.append(f"{heading}\n\nNo report: the run {problem}.")
+        if unknown:
+            sections.append(f"Unknown subagents skipped: {', '.join(unknown)}")
+        return "\n\n".join(sections)
+
+
+class AgentPlugin:
+    """Lets the chat's agent delegate independent reviews to subagents"""
+
+    def __init__(self, subagents: Subagents):
+        self.subagents = subagents
+
+    @kernel_function(
+        name="invoke_agents",
+        description=(
+            "Run specialist subagents in parallel, one task each, and get their "
+            "merged reports. Use it for broad reviews that span several areas "
+            "(firewall, risky users, certificate services) instead of running "
+            "the individual tools one by one. The subagents only read; make "
+            "changes yourself after the user confirms."
+        ),
+    )
+    async def invoke_agents(
+        self,
+        assignments: Annotated[
+            List[SubagentTask],
+            Field(description="One task per subagent; they run concurrently."),
+        ],
+    ) -> str:
+        return await self.subagents.run(assignments)
@@ -0,0 +1,180 @@
+# tool_catalog.py
+"""
+Cached MCP tool catalogs for the AutoFortify agent.
+
+Connecting a Semantic Kernel MCP plugin lists the server's tools and turns
+each one into a kernel function; for the BloodHound server that is ~90 tool
+schemas with long descriptions. Servers that advertise a fingerprint of their
+catalog (the experimental "toolCatalog" capability, see
+mcp/bloodhound/lib/catalog.py) let the agent skip that listing: ToolCatalog
+keeps every catalog it listed under the server's name and fingerprint, and
+the plugins below reuse it whenever the server advertises a fingerprint they
+have seen. A changed fingerprint, a server without one, or a tools
+list_changed notification all lead to a full listing as before.
+
+Catalogs are kept in memory and, when a directory is configured, on disk, so
+a restarted agent does not list unchanged catalogs again either.
+"""
+
+import logging
+import os
+import re
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp import ClientSession, types
+from semantic_kernel.connectors.mcp import (
+    MCPSsePlugin,
+    MCPStdioPlugin,
+    _get_parameter_dicts_from_mcp_tool,
+    _normalize_mcp_name,
+)
+from semantic_kernel.functions import kernel_function
+
+logger = logging.getLogger(__name__)
+
+CAPABILITY = "toolCatalog"
+
+
+def server_fingerprint(session: Optional[ClientSession]) -> Optional[str]:
+    """The tool catalog fingerprint the server advertised on initialize"""
+    capabilities = session.get_server_capabilities() if session else None
+    experimental = (capabilities and capabilities.experimental) or {}
+    fingerprint = experimental.get(CAPABILITY, {}).get("fingerprint")
+    return fingerprint if isinstance(fingerprint, str) and fingerprint else None
+
+
+class ToolCatalog:
+    """Tool lists by server name and catalog fingerprint"""
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Initialize the catalog cache
+
+        Args:
+            directory: Where to persist catalogs across restarts (default:
+                memory only)
+        """
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._tools: Dict[Tuple[str, str], List[types.Tool]] = {}
+
+    def _path(self, name: str, fingerprint: str) -> str:
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+        return os.path.join(self.directory, f"{safe_name}-{fingerprint[:32]}.json")
+
+    def get(self, name: str, fingerprint: str) -> Optional[List[types.Tool]]:
+        """The cached tools for a server's catalog, or None"""
+        tools = self._tools.get((name, fingerprint))
+        if tools is None and self.directory:
+            try:
+                with open(self._path(name, fingerprint), encoding="utf-8") as f:
+                    tools = types.ListToolsResult.model_validate_json(f.read()).tools
+                self._tools[(name, fingerprint)] = tools
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable tool catalog for {name}: {e}")
+        if tools is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return tools
+
+    def put(self, name: str, fingerprint: str, tools: List[types.Tool]) -> None:
+        """Remember the tools listed for a server's catalog"""
+        self._tools[(name, fingerprint)] = tools
+        if not self.directory:
+            return
+        path = self._path(name, fingerprint)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                f.write(types.ListToolsResult(tools=tools).model_dump_json())
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.warning(f"Could not save tool catalog for {name}: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        """Summary of the cache for logging and diagnostics"""
+        return {"catalogs": len(self._tools), "hits": self.hits, "misses": self.misses}
+
+
+class CachedCatalogMixin:
+    """
+    Loads an MCP plugin's tools from a ToolCatalog when the server's
+    fingerprint is known
+
+    Mixed in before a Semantic Kernel MCP plugin class; takes the catalog as
+    the catalog keyword argument.
+    """
+
+    def __init__(self, *args, catalog: Optional[ToolCatalog] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.catalog = catalog
+        self.fingerprint: Optional[str] = None
+        self.tools_loaded = 0  # Bumped whenever the kernel functions may change
+
+    async def load_tools(self):
+        """Load tools from the catalog cache, listing them only on a miss"""
+        self.fingerprint = server_fingerprint(self.session)
+        tools = None
+        if self.catalog is not None and self.fingerprint:
+            tools = self.catalog.get(self.name, self.fingerprint)
+        if tools is None:
+            try:
+                tools = (await self.session.list_tools()).tools
+            except Exception as e:
+                logger.warning(f"Failed to list tools of MCP server {self.name}: {e}")
+                tools = []
+            else:
+                if self.catalog is not None and self.fingerprint:
+                    self.catalog.put(self.name, self.fingerprint, tools)
+        else:
+            # ClientSession lists the tools again on the first call of any tool
+            # whose output schema it has not seen; hand it the cached ones
+            schemas = getattr(self.session, "_tool_output_schemas", None)
+            if schemas is not None:
+                schemas.update({tool.name: tool.outputSchema for tool in tools})
+        self._register_tools(tools)
+        self.tools_loaded += 1
+
+    def _register_tools(self, tools: List[types.Tool]) -> None:
+        # Same registration as MCPPluginBase.load_tools, minus the listing
+        for tool in tools:
+            local_name = _normalize_mcp_name(tool.name)
+            if self._is_mcp_local_name_taken("tool", tool.name, local_name):
+                continue
+            if self._has_mcp_function_name_conflict("tool", tool.name, local_name):
+                continue
+            self._mcp_registered_names[local_name] = ("tool", tool.name)
+            func = kernel_function(name=local_name, description=tool.description)(
+                partial(self.call_tool, tool.name)
+            )
+            func.__kernel_function_parameters__ = _get_parameter_dicts_from_mcp_tool(
+                tool
+            )
+            setattr(self, local_name, func)
+
+    async def message_handler(self, message) -> None:
+        # The fingerprint from initialize no longer describes a changed list
+        if (
+            isinstance(message, types.ServerNotification)
+            and message.root.method == "notifications/tools/list_changed"
+        ):
+            catalog, self.catalog = self.catalog, None
+            try:
+                await super().message_handler(message)
+            finally:
+                self.catalog = catalog
+            return
+        await super().message_handler(message)
+
+
+class CachedSsePlugin(CachedCatalogMixin, MCPSsePlugin):
+    """MCPSsePlugin with a cached tool catalog"""
+
+
+class CachedStdioPlugin(CachedCatalogMixin, MCPStdioPlugin):
+    """MCPStdioPlugin with a cached tool catalog"""
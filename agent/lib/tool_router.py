@@ -0,0 +1,282 @@
+# tool_router.py
+"""
+Per-turn tool selection for the AutoFortify agent.
+
+Every function in the kernel is sent to the model as a tool schema on every
+request: ~90 BloodHound tools plus the firewall and Active Directory tools,
+tens of thousands of prompt tokens before the conversation even starts. The
+router sends only the tools relevant to the user's message instead.
+
+Relevance comes from a local BM25 keyword index over each function's name,
+plugin, description and parameters; no embedding service is involved. Tools
+offered on the previous turn stay available, so a follow-up like "yes, go
+ahead" can still call the tool it refers to. When the subset misses a tool,
+the model can call ToolRouter-find_tools with a description of what it needs,
+and the matching tools are added to the request it is working on.
+"""
+
+import json
+import logging
+import math
+import re
+from collections import Counter
+from typing import Annotated, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import semantic_kernel as sk
+from pydantic import Field
+from semantic_kernel.connectors.ai import FunctionChoiceBehavior
+from semantic_kernel.connectors.ai.function_calling_utils import (
+    kernel_function_metadata_to_function_call_format,
+    update_settings_from_function_call_configuration,
+)
+from semantic_kernel.connectors.ai.prompt_execution_settings import (
+    PromptExecutionSettings,
+)
+from semantic_kernel.filters import AutoFunctionInvocationContext
+from semantic_kernel.functions import KernelFunctionMetadata, kernel_function
+
+logger = logging.getLogger(__name__)
+
+ROUTER_PLUGIN = "ToolRouter"
+FIND_TOOLS = f"{ROUTER_PLUGIN}-find_tools"
+
+DEFAULT_LIMIT = 12  # Tools routed to a message
+MAX_TOOLS = 32  # Routed, carried over and found tools per request
+FIND_LIMIT = 8  # Tools one find_tools call adds
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+NAME_WEIGHT = 3  # A match in a function's name counts this many times
+
+STOPWORDS = {
+    "a", "all", "an", "and", "any", "are", "as", "be", "by", "can", "do",
+    "does", "for", "from", "get", "give", "has", "have", "how", "i", "in",
+    "is", "it", "list", "me", "my", "of", "on", "or", "please", "show", "that",
+    "the", "their", "them", "there", "these", "this", "to", "what", "which",
+    "who", "with", "you",
+}  # fmt: skip
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word stems; splits snake_case, kebab-case and camelCase"""
+    text = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", text or "")
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def function_terms(function: KernelFunctionMetadata) -> List[str]:
+    """The terms a function is indexed under"""
+    terms = tokenize(function.name) * NAME_WEIGHT
+    terms += tokenize(function.plugin_name or "")
+    terms += tokenize(function.description or "")
+    for parameter in function.parameters:
+        terms += tokenize(parameter.name or "")
+        terms += tokenize(parameter.description or "")
+    return terms
+
+
+class ToolIndex:
+    """BM25 index over a fixed set of kernel functions"""
+
+    def __init__(self, functions: Iterable[KernelFunctionMetadata]):
+        self.functions = {f.fully_qualified_name: f for f in functions}
+        self._terms = {
+            name: Counter(function_terms(function))
+            for name, function in self.functions.items()
+        }
+        lengths = [sum(terms.values()) for terms in self._terms.values()]
+        self._average_length = sum(lengths) / len(lengths) if lengths else 0.0
+        frequency = Counter(term for terms in self._terms.values() for term in terms)
+        count = len(self._terms)
+        self._idf = {
+            term: math.log(1 + (count - n + 0.5) / (n + 0.5))
+            for term, n in frequency.items()
+        }
+
+    def search(self, text: str, limit: int = DEFAULT_LIMIT) -> List[Tuple[str, float]]:
+        """Best matching functions for the text, by fully qualified name"""
+        query = set(tokenize(text))
+        scores = []
+        for name, terms in self._terms.items():
+            length = sum(terms.values())
+            score = 0.0
+            for term in query:
+                tf = terms.get(term)
+                if tf:
+                    norm = K1 * (1 - B + B * length / self._average_length)
+                    score += self._idf[term] * tf * (K1 + 1) / (tf + norm)
+            if score > 0:
+                scores.append((name, score))
+        scores.sort(key=lambda item: (-item[1], item[0]))
+        return scores[:limit]
+
+
+class ToolRouter:
+    """Builds and caches tool indexes; shared by all chat sessions"""
+
+    def __init__(
+        self,
+        limit: int = DEFAULT_LIMIT,
+        max_tools: int = MAX_TOOLS,
+        enabled: bool = True,
+    ):
+        """
+        Initialize the router
+
+        Args:
+            limit: Tools routed to a message
+            max_tools: Tools offered to the model per request at most
+            enabled: False offers every tool, as without a router
+        """
+        self.limit = limit
+        self.max_tools = max_tools
+        self.enabled = enabled
+        self._indexes: Dict[Tuple, ToolIndex] = {}
+
+    def index(self, kernel: sk.Kernel) -> ToolIndex:
+        """
+        The index over a kernel's functions
+
+        Chat sessions add the same KernelPlugin objects from the MCP client
+        pool, so their kernels share an index; it is rebuilt only when a
+        plugin is added, reconnected or changes its tools.
+        """
+        plugins = [p for p in kernel.plugins.values() if p.name != ROUTER_PLUGIN]
+        key = tuple((p.name, id(p), len(p.functions)) for p in plugins)
+        index = self._indexes.get(key)
+        if index is None:
+            if len(self._indexes) >= 16:  # Stale plugin sets
+                self._indexes.clear()
+            index = ToolIndex(f.metadata for p in plugins for f in p.functions.values())
+            self._indexes[key] = index
+        return index
+
+
+class ToolSelection:
+    """The tools offered to the model in one chat session"""
+
+    def __init__(self, router: ToolRouter, kernel: sk.Kernel):
+        self.router = router
+        self.kernel = kernel
+        self.selected: List[str] = []
+        self.pinned: List[str] = [FIND_TOOLS]  # Offered with every message
+        kernel.add_plugin(ToolRouterPlugin(self), plugin_name=ROUTER_PLUGIN)
+        kernel.add_filter("auto_function_invocation", self.expand_filter)
+
+    def route(self, message: str) -> List[str]:
+        """
+        Choose the tools for a user message
+
+        The pinned tools come first, then the message's best matches, then
+        the tools offered on the previous turn, up to the router's max_tools.
+        """
+        index = self.router.index(self.kernel)
+        routed = [name for name, _ in index.search(message, self.router.limit)]
+        carried = [name for name in self.selected if name in index.functions]
+        selected = list(dict.fromkeys(routed + carried))[: self.router.max_tools]
+        self.selected = self.pinned + [n for n in selected if n not in self.pinned]
+        return self.selected
+
+    def pin(self, name: str) -> None:
+        """Offer a function with every message, e.g. a companion tool"""
+        if name not in self.pinned:
+            self.pinned.append(name)
+
+    def settings(self, message: str) -> PromptExecutionSettings:
+        """Execution settings offering only the tools routed to the message"""
+        if not self.router.enabled:
+            return PromptExecutionSettings(
+                function_choice_behavior=FunctionChoiceBehavior.Auto()
+            )
+        included = self.route(message)
+        logger.info(f"Routed {len(included)} tools: {', '.join(included)}")
+        return PromptExecutionSettings(
+            function_choice_behavior=FunctionChoiceBehavior.Auto(
+                filters={"included_functions": included}
+            )
+        )
+
+    def find(self, need: str) -> List[KernelFunctionMetadata]:
+        """Add the tools matching a described need to the selection"""
+        index = self.router.index(self.kernel)
+        matches = [name for name, _ in index.search(need, FIND_LIMIT)]
+        self.selected += [name for name in matches if name not in self.selected]
+        return [index.functions[name] for name in matches]
+
+    async def expand_filter(
+        self,
+        context: AutoFunctionInvocationContext,
+        next: Callable[[AutoFunctionInvocationContext], Awaitable[None]],
+    ) -> None:
+        """
+        After find_tools, offer the found tools in the running request
+
+        The tool list of a request is fixed when the model is first called,
+        so it is rebuilt here from the grown selection; the function call
+        loop then sends it with the model's next request in the same turn.
+        """
+        await next(context)
+        if context.function.fully_qualified_name != FIND_TOOLS:
+            return
+        settings = context.execution_settings
+        behavior = settings.function_choice_behavior if settings else None
+        if behavior is None or not behavior.filters:
+            return  # Routing is off; every tool is offered already
+        behavior.filters = {"included_functions": list(self.selected)}
+        behavior.configure(
+            kernel=context.kernel,
+            update_settings_callback=update_settings_from_function_call_configuration,
+            settings=settings,
+        )
+
+
+class ToolRouterPlugin:
+    """The escape hatch: lets the model ask for tools it was not offered"""
+
+    def __init__(self, selection: ToolSelection):
+        self.selection = selection
+
+    @kernel_function(
+        name="find_tools",
+        description=(
+            "Find more tools when none of the available ones fits the task. "
+            "Describe what you need to do; matching tools become available "
+            "for your next call."
+        ),
+    )
+    def find_tools(
+        self,
+        need: Annotated[
+            str, Field(description="What the tool should do, in a few words.")
+        ],
+    ) -> str:
+        found = self.selection.find(need)
+        if not found:
+            return "No matching tools. Describe the task with different words."
+        lines = [
+            f"- {f.fully_qualified_name}: {(f.description or '').strip()[:200]}"
+            for f in found
+        ]
+        return "These tools are now available:\n" + "\n".join(lines)
+
+
+def schema_size(kernel: sk.Kernel, included: Optional[List[str]] = None) -> int:
+    """Characters of tool schema sent to the model, for benchmarks and logs"""
+    functions = (
+        kernel.get_list_of_function_metadata({"included_functions": included})
+        if included is not None
+        else kernel.get_full_list_of_function_metadata()
+    )
+    return sum(
+        len(json.dumps(kernel_function_metadata_to_function_call_format(f)))
+        for f in functions
+    )
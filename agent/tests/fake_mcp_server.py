@@ -0,0 +1,76 @@
+"""
+Stand-in MCP server used by the agent tests.
+
+Serves a few tools over stdio so the tests can connect real MCP clients
+without the AutoFortify server, PowerShell or a network:
+
+    echo(text)         -> text
+    pid()              -> the server's process ID, so tests can kill it
+    sleep(seconds)     -> waits, then returns "done"
+    listings()         -> how many times clients listed this server's tools
+
+With FAKE_TOOL_FINGERPRINT set, the server advertises it as its tool catalog
+fingerprint on initialize, like the BloodHound server does.
+"""
+
+import asyncio
+import os
+
+from mcp import types
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("fake")
+served = {"listings": 0}
+
+
+@mcp.tool()
+def echo(text: str) -> str:
+    """Return the text unchanged"""
+    return text
+
+
+@mcp.tool()
+def pid() -> int:
+    """Process ID of this server"""
+    return os.getpid()
+
+
+@mcp.tool()
+async def sleep(seconds: float) -> str:
+    """Wait before answering"""
+    await asyncio.sleep(seconds)
+    return "done"
+
+
+@mcp.tool()
+def listings() -> int:
+    """Number of tools/list requests served"""
+    return served["listings"]
+
+
+def count_listings(server):
+    handler = server.request_handlers[types.ListToolsRequest]
+
+    async def counting(request):
+        if request is not None:  # None: the server refreshing its own cache
+            served["listings"] += 1
+        return await handler(request)
+
+    server.request_handlers[types.ListToolsRequest] = counting
+
+
+def advertise_fingerprint(server, fingerprint):
+    create_initialization_options = server.create_initialization_options
+
+    def with_fingerprint(notification_options=None, experimental_capabilities=None):
+        experimental = {"toolCatalog": {"fingerprint": fingerprint}}
+        return create_initialization_options(notification_options, experimental)
+
+    server.create_initialization_options = with_fingerprint
+
+
+if __name__ == "__main__":
+    count_listings(mcp._mcp_server)
+    if os.getenv("FAKE_TOOL_FINGERPRINT"):
+        advertise_fingerprint(mcp._mcp_server, os.environ["FAKE_TOOL_FINGERPRINT"])
+    mcp.run()
@@ -0,0 +1,179 @@
+import asyncio
+import json
+
+import semantic_kernel as sk
+from semantic_kernel.contents import TextContent
+from semantic_kernel.filters import AutoFunctionInvocationContext
+from semantic_kernel.filters.kernel_filters_extension import (
+    _rebuild_auto_function_invocation_context,
+)
+from semantic_kernel.functions import KernelArguments, kernel_function
+
+from lib.artifacts import QUERY_ARTIFACT, ArtifactStore
+from lib.tool_router import ToolRouter, ToolSelection
+
+_rebuild_auto_function_invocation_context()
+
+MEMBERS = {
+    "message": "Found 500 members of group DOMAIN USERS@CORP.LOCAL",
+    "members": [
+        {
+            "name": f"USER{n}@CORP.LOCAL",
+            "objectid": f"S-1-5-21-{n}",
+            "properties": {"enabled": n % 5 != 0, "department": ["IT", "HR"][n % 2]},
+        }
+        for n in range(500)
+    ],
+    "count": 500,
+}
+
+GRAPH = {
+    "data": {
+        "nodes": {
+            str(n): {"label": f"COMPUTER{n}.CORP.LOCAL", "kind": "Computer"}
+            for n in range(200)
+        },
+        "edges": [
+            {"source": str(n), "target": str(n + 1), "kind": "AdminTo"}
+            for n in range(199)
+        ],
+    }
+}
+
+
+class Bloodhound:
+    @kernel_function(description="List the members of a group")
+    def get_group_members(self, group_id: str) -> list:
+        # MCP tools return their result as text contents
+        return [TextContent(text=json.dumps(MEMBERS))]
+
+    @kernel_function(description="Get a group's name")
+    def get_group(self, group_id: str) -> str:
+        return json.dumps({"name": "DOMAIN USERS@CORP.LOCAL"})
+
+
+def make_store(**kwargs):
+    kernel = sk.Kernel()
+    kernel.add_plugin(Bloodhound(), plugin_name="BloodhoundMCP")
+    return kernel, ArtifactStore(kernel, **kwargs)
+
+
+async def auto_invoke(kernel, store, function, **arguments):
+    """Call a function the way the function call loop does, through the filter"""
+    context = AutoFunctionInvocationContext(
+        function=kernel.get_function(*function.split("-")),
+        kernel=kernel,
+        arguments=KernelArguments(**arguments),
+    )
+
+    async def invoke(context):
+        context.function_result = await context.function.invoke(
+            context.kernel, context.arguments
+        )
+
+    await store.offload_filter(context, invoke)
+    return str(context.function_result)
+
+
+class TestArtifacts:
+    """
+    Test storing large tool results outside the model's context
+    """
+
+    def test_large_result_becomes_handle_and_summary(self):
+        kernel, store = make_store()
+
+        summary = asyncio.run(
+            auto_invoke(
+                kernel, store, "BloodhoundMCP-get_group_members", group_id="S-1"
+            )
+        )
+        small = asyncio.run(
+            auto_invoke(kernel, store, "BloodhoundMCP-get_group", group_id="S-1")
+        )
+
+        full = len(json.dumps(MEMBERS))
+        assert '"a1"' in summary and QUERY_ARTIFACT in summary
+        assert "Found 500 members" in summary
+        assert 'path "members": 500 entries' in summary
+        assert "objectid" in summary  # Fields are listed
+        assert len(summary) < full / 20
+        assert json.loads(small) == {"name": "DOMAIN USERS@CORP.LOCAL"}
+        assert store.status()["artifacts"] == 1
+        assert store.get("a1").arguments == {"group_id": "S-1"}
+
+        print(f"✅ A {full} character result became a {len(summary)} character summary")
+
+    def test_query_filters_counts_and_slices(self):
+        kernel, store = make_store()
+        asyncio.run(
+            auto_invoke(
+                kernel, store, "BloodhoundMCP-get_group_members", group_id="S-1"
+            )
+        )
+
+        def query(**kwargs):
+            return json.loads(
+                asyncio.run(
+                    kernel.invoke(
+                        function_name="query_artifact",
+                        plugin_name="Artifacts",
+                        **{"handle": "a1", **kwargs},
+                    )
+                ).value
+            )
+
+        disabled = query(where="properties.enabled=false", count_only=True)
+        assert disabled["matched"] == 100 and "entries" not in disabled
+
+        page = query(
+            where="properties.department=hr, properties.enabled!=false",
+            fields="name",
+            offset=10,
+            limit=5,
+        )
+        assert page["matched"] == 200
+        assert page["entries"] == [
+            {"name": f"USER{n}@CORP.LOCAL"} for n in (27, 29, 31, 33, 37)
+        ]
+
+        groups = query(group_by="properties.department")
+        assert groups["groups"] == {"IT": 250, "HR": 250}
+
+        assert query(contains="user499@")["entries"][0]["objectid"] == "S-1-5-21-499"
+        assert "No artifact" in query(handle="a9")["error"]
+        assert "use field=value" in query(where="enabled")["error"]
+
+        print("✅ Queried an artifact without reloading it into the context")
+
+    def test_graph_collections_and_eviction(self):
+        kernel, store = make_store(max_artifacts=2)
+        store.put("BloodhoundMCP-run_cypher_query", {}, json.dumps(GRAPH))
+
+        summary = store.get("a1").summary()
+        assert 'path "data.nodes": 200 entries' in summary
+        assert 'path "data.edges": 199 entries' in summary
+        nodes = store.query("a1", path="data.nodes", where="id=42")
+        assert nodes["entries"] == [
+            {"id": "42", "label": "COMPUTER42.CORP.LOCAL", "kind": "Computer"}
+        ]
+        # Without a path, the largest collection
+        assert store.query("a1", count_only=True)["path"] == "data.nodes"
+
+        store.put("BloodhoundMCP-get_users", {}, "plain\ntext\nresult")
+        store.put("BloodhoundMCP-get_users", {}, "x" * 10)
+        assert list(store.artifacts) == ["a2", "a3"]
+        assert store.query("a2", contains="text")["entries"] == ["text"]
+
+        print("✅ Graph collections were addressable and old artifacts evicted")
+
+    def test_query_tool_is_always_offered(self):
+        kernel = sk.Kernel()
+        kernel.add_plugin(Bloodhound(), plugin_name="BloodhoundMCP")
+        selection = ToolSelection(ToolRouter(limit=2), kernel)
+        ArtifactStore(kernel)
+        selection.pin(QUERY_ARTIFACT)
+
+        assert QUERY_ARTIFACT in selection.route("Block port 445 in the firewall")
+
+        print("✅ The artifact query tool is routed with every message")
@@ -0,0 +1,174 @@
+import asyncio
+
+from semantic_kernel.connectors.ai.prompt_execution_settings import (
+    PromptExecutionSettings,
+)
+from semantic_kernel.contents import (
+    ChatMessageContent,
+    FunctionCallContent,
+    FunctionResultContent,
+)
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+from lib.chat_history import CompactedChatHistory, estimate_tokens
+
+MEMBERS = "\n".join(f"user{n}@corp.local" for n in range(3000))  # ~15k tokens
+
+
+class FakeSummarizer:
+    """Chat completion service that summarizes with a fixed sentence"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.requests = []
+
+    def get_prompt_execution_settings_class(self):
+        return PromptExecutionSettings
+
+    async def get_chat_message_content(self, chat_history, settings):
+        self.requests.append(chat_history.messages[-1].content)
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return ChatMessageContent(
+            role=AuthorRole.ASSISTANT, content="The user reviewed Domain Admins."
+        )
+
+
+def add_turn(history, n, result=MEMBERS):
+    """A user question answered with one tool call"""
+    history.add_user_message(f"Question {n}: who is in Domain Admins?")
+    history.add_message(
+        ChatMessageContent(
+            role=AuthorRole.ASSISTANT,
+            items=[
+                FunctionCallContent(
+                    id=f"call{n}",
+                    name="BloodhoundMCP-get_group_members",
+                    arguments='{"group_id": "DA"}',
+                )
+            ],
+        )
+    )
+    history.add_message(
+        ChatMessageContent(
+            role=AuthorRole.TOOL,
+            items=[
+                FunctionResultContent(
+                    id=f"call{n}",
+                    name="BloodhoundMCP-get_group_members",
+                    result=result,
+                )
+            ],
+        )
+    )
+    history.add_assistant_message(f"Answer {n}: 3000 members.")
+
+
+def tool_results(history):
+    return [
+        str(item.result)
+        for message in history.messages
+        for item in message.items
+        if isinstance(item, FunctionResultContent)
+    ]
+
+
+class TestChatHistory:
+    """
+    Test keeping the chat history sent per turn within a token budget
+    """
+
+    def test_small_history_is_untouched(self):
+        history = CompactedChatHistory(FakeSummarizer(), budget=1000)
+        for n in range(5):
+            add_turn(history, n, result="3 members")
+
+        saved = asyncio.run(history.compact())
+
+        assert saved == 0
+        assert len(history.messages) == 20
+        assert history.service.requests == []
+
+        print("✅ A history within budget was left as it is")
+
+    def test_old_tool_outputs_become_references(self):
+        history = CompactedChatHistory(FakeSummarizer(), budget=50000, keep_turns=2)
+        for n in range(4):
+            add_turn(history, n)
+
+        saved = asyncio.run(history.compact())
+        results = tool_results(history)
+
+        assert saved > 25000
+        assert history.tokens() <= 50000
+        # Older turns refer to the call; the recent ones keep the data
+        assert all("omitted" in r for r in results[:2])
+        assert "get_group_members" in results[0]
+        assert results[2:] == [MEMBERS, MEMBERS]
+        assert history.service.requests == []  # No summary needed
+        assert history.status()["references"] == 2
+
+        print(f"✅ Referencing old tool outputs saved ~{saved} tokens")
+
+    def test_older_turns_are_summarized(self):
+        summarizer = FakeSummarizer()
+        history = CompactedChatHistory(
+            summarizer, budget=500, keep_turns=2, tool_output_tokens=100
+        )
+        for n in range(6):
+            add_turn(history, n, result="Domain Admins: " + ", ".join(["jdoe"] * 60))
+        before = history.tokens()
+
+        asyncio.run(history.compact())
+
+        first = history.messages[0]
+        assert "The user reviewed Domain Admins." in first.content
+        assert first.role == AuthorRole.ASSISTANT
+        # The two recent turns follow verbatim; call/result pairs intact
+        assert [m.role for m in history.messages[1:5]] == [
+            AuthorRole.USER,
+            AuthorRole.ASSISTANT,
+            AuthorRole.TOOL,
+            AuthorRole.ASSISTANT,
+        ]
+        assert history.messages[1].content.startswith("Question 4")
+        assert len(history.messages) == 9
+        assert "Question 0" in summarizer.requests[0]
+        assert history.tokens() < before / 2
+
+        # The next summary folds in the previous one
+        add_turn(history, 6, result="Domain Admins: " + ", ".join(["jdoe"] * 60))
+        history.budget = 100
+        asyncio.run(history.compact())
+        assert "Earlier summary: " in summarizer.requests[1]
+        assert history.status()["summaries"] == 2
+
+        print(f"✅ Summarized older turns: {before} -> {history.tokens()} tokens")
+
+    def test_history_is_dropped_without_summary(self):
+        history = CompactedChatHistory(FakeSummarizer(fail=True), budget=500)
+        for n in range(5):
+            add_turn(history, n)
+
+        asyncio.run(history.compact())
+
+        assert history.messages[0].content.startswith("Question 2")
+        assert len(history.messages) == 12
+        assert history.status()["summaries"] == 0
+        assert estimate_tokens(MEMBERS) > history.budget
+
+        print("✅ Older turns were dropped when summarizing failed")
+
+    def test_no_turns_kept_verbatim(self):
+        summarizer = FakeSummarizer()
+        history = CompactedChatHistory(summarizer, budget=100, keep_turns=0)
+        for n in range(3):
+            add_turn(history, n, result="Domain Admins: " + ", ".join(["jdoe"] * 60))
+
+        asyncio.run(history.compact())
+
+        # Every turn, the last one included, went into the summary
+        assert len(history.messages) == 1
+        assert history.messages[0].content.startswith("Summary of the earlier")
+        assert "Question 2" in summarizer.requests[0]
+        assert history.tokens() <= history.budget
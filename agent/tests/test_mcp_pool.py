@@ -0,0 +1,163 @@
+import asyncio
+import os
+import shutil
+import signal
+import sys
+import time
+
+import semantic_kernel as sk
+from lib.mcp_pool import MCPClientPool, MCPServer
+from lib.tool_catalog import CachedStdioPlugin
+
+FAKE_MCP_SERVER = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "fake_mcp_server.py"
+)
+
+
+def stdio_factory(fingerprint=None):
+    """Client factory starting the stand-in server; url holds its script"""
+
+    def stdio_plugin(server, catalog):
+        return CachedStdioPlugin(
+            name=server.name,
+            description=server.description,
+            command=sys.executable,
+            args=[server.url],
+            env={"FAKE_TOOL_FINGERPRINT": fingerprint} if fingerprint else None,
+            request_timeout=server.timeout,
+            catalog=catalog,
+        )
+
+    return stdio_plugin
+
+
+def fake_pool(*servers, fingerprint=None, **kwargs):
+    servers = servers or (MCPServer("Fake", "Stand-in server", FAKE_MCP_SERVER),)
+    return MCPClientPool(list(servers), factory=stdio_factory(fingerprint), **kwargs)
+
+
+async def text(plugin, tool, **arguments):
+    result = await plugin.call_tool(tool, **arguments)
+    return result[0].text
+
+
+class TestMCPClientPool:
+    """
+    Test connecting once, borrowing without I/O, and reconnecting
+    """
+
+    def test_sessions_borrow_connected_clients(self):
+        async def run():
+            pool = fake_pool(MCPServer("Fake", "Stand-in", FAKE_MCP_SERVER, size=2))
+            assert pool.borrow("Fake") is None  # Nothing connects before start()
+            await pool.start()
+            try:
+                started = time.perf_counter()
+                kernels = []
+                for _ in range(30):  # 30 chats starting
+                    kernel = sk.Kernel()
+                    for name, plugin in pool.borrow_all().items():
+                        kernel.add_plugin(plugin, plugin_name=name)
+                    kernels.append(kernel)
+                elapsed = time.perf_counter() - started
+
+                plugins = {id(k.get_plugin("Fake")) for k in kernels}
+                function = kernels[7].get_function("Fake", "echo")
+                result = await function.invoke(kernels[7], text="hello")
+                return elapsed, pool.status()["Fake"], str(result), len(plugins)
+            finally:
+                await pool.close()
+
+        elapsed, status, result, built = asyncio.run(run())
+
+        assert status == {"connected": 2, "size": 2, "connects": 2, "waiting": 0}
+        assert result == "hello"
+        assert built == 2  # Kernel functions built once per client, not per chat
+        assert elapsed < 0.5
+
+        print(f"✅ 30 chat starts borrowed 2 clients in {elapsed * 1000:.0f} ms")
+
+    def test_health_check_reconnects(self):
+        async def run():
+            pool = fake_pool(health_interval=3600)
+            await pool.start()
+            try:
+                plugin = pool.clients["Fake"][0].plugin
+                os.kill(int(await text(plugin, "pid")), signal.SIGKILL)
+                await asyncio.sleep(0.2)
+
+                report = await pool.health_check()
+                # Sessions keep the plugin they borrowed, and it works again
+                return report, await text(plugin, "echo", text="back")
+            finally:
+                await pool.close()
+
+        report, echoed = asyncio.run(run())
+
+        assert report["failed"] == 1
+        assert report["reconnected"] == 1
+        assert report["Fake"]["connects"] == 2
+        assert echoed == "back"
+
+        print("✅ Dead MCP server was detected and the client reconnected")
+
+    def test_unreachable_server_is_skipped(self):
+        async def run():
+            pool = fake_pool(
+                MCPServer("Fake", "Stand-in", FAKE_MCP_SERVER),
+                MCPServer("Down1", "No server", "/nonexistent/1.py", connect_timeout=1),
+                MCPServer("Down2", "No server", "/nonexistent/2.py", connect_timeout=1),
+            )
+            started = time.perf_counter()
+            await pool.start()
+            elapsed = time.perf_counter() - started
+            try:
+                return elapsed, set(pool.borrow_all()), pool.status()["Down1"]
+            finally:
+                await pool.close()
+
+        elapsed, borrowed, missing = asyncio.run(run())
+
+        assert borrowed == {"Fake"}
+        assert missing["connected"] == 0
+        # Both unreachable servers time out together, not one after the other
+        assert elapsed < 1.8
+
+        print(f"✅ Unreachable MCP servers were skipped; start took {elapsed:.2f} s")
+
+    def test_server_that_comes_back_is_hot_added(self, tmp_path):
+        script = str(tmp_path / "server.py")
+
+        async def run():
+            pool = fake_pool(
+                MCPServer("Late", "Starts later", script, connect_timeout=1),
+                retry_delay=0.1,
+            )
+            await pool.start()
+            try:
+                kernel = sk.Kernel()  # A chat that started while it was down
+                assert not pool.borrow_all()
+                pool.when_connected(
+                    "Late", lambda plugin: kernel.add_plugin(plugin, plugin_name="Late")
+                )
+                assert pool.status()["Late"]["waiting"] == 1
+
+                shutil.copy(FAKE_MCP_SERVER, script)
+                for _ in range(100):
+                    if pool.status()["Late"]["connected"]:
+                        break
+                    await asyncio.sleep(0.1)
+
+                function = kernel.get_function("Late", "echo")
+                result = await function.invoke(kernel, text="hot")
+                return str(result), pool.status()["Late"]
+            finally:
+                await pool.close()
+
+        result, status = asyncio.run(run())
+
+        assert result == "hot"
+        assert status["connected"] == 1
+        assert status["waiting"] == 0
+
+        print("✅ Server that came back was retried and added to a running chat")
@@ -0,0 +1,140 @@
+import asyncio
+import gc
+import tracemalloc
+from typing import ClassVar
+
+import semantic_kernel as sk
+from semantic_kernel.agents import ConcurrentOrchestration
+from semantic_kernel.connectors.ai.chat_completion_client_base import (
+    ChatCompletionClientBase,
+)
+from semantic_kernel.connectors.ai.function_calling_utils import (
+    update_settings_from_function_call_configuration,
+)
+from semantic_kernel.connectors.ai.open_ai import AzureChatPromptExecutionSettings
+from semantic_kernel.contents import ChatMessageContent, StreamingChatMessageContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+from lib.runtime import SharedRuntime
+from lib.subagents import SubagentTask, Subagents
+
+SESSIONS = 2000  # Simulated chat sessions, each delegating once
+WARMUP = 100  # Sessions before measuring, to fill caches and free lists
+
+
+class FastModel(ChatCompletionClientBase):
+    """Answers at once, so sessions churn as fast as the runtime allows"""
+
+    SUPPORTS_FUNCTION_CALLING: ClassVar[bool] = True
+
+    def get_prompt_execution_settings_class(self):
+        return AzureChatPromptExecutionSettings
+
+    def _update_function_choice_settings_callback(self):
+        return update_settings_from_function_call_configuration
+
+    async def _inner_get_chat_message_contents(self, chat_history, settings):
+        return [ChatMessageContent(role=AuthorRole.ASSISTANT, content="No findings")]
+
+    async def _inner_get_streaming_chat_message_contents(
+        self, chat_history, settings, function_invoke_attempt: int = 0
+    ):
+        yield [
+            StreamingChatMessageContent(
+                role=AuthorRole.ASSISTANT, content="No findings", choice_index=0
+            )
+        ]
+
+
+ASSIGNMENTS = [
+    SubagentTask(agent="FirewallAuditor", task="Audit inbound rules"),
+    SubagentTask(agent="RiskyUsersAnalyst", task="Find risky users"),
+]
+
+
+async def session(shared: SharedRuntime, n: int, release: bool = True) -> str:
+    """One chat session: start, delegate once, end"""
+    kernel = sk.Kernel()
+    kernel.add_service(FastModel(ai_model_id="fast"))
+    scope = shared.scope(f"session-{n}")
+    report = await Subagents(kernel, scope).run(ASSIGNMENTS)
+    if release:
+        await scope.release()
+    return report
+
+
+async def churn(sessions: int):
+    shared = SharedRuntime()
+    try:
+        for n in range(WARMUP):
+            await session(shared, n)
+        gc.collect()
+        tasks = len(asyncio.all_tasks())
+        baseline = shared.status()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+
+        for n in range(WARMUP, WARMUP + sessions):
+            report = await session(shared, n)
+            assert "No findings" in report
+
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        return baseline, shared.status(), tasks, len(asyncio.all_tasks()), growth
+    finally:
+        await shared.stop()
+
+
+class TestSharedRuntime:
+    """
+    Test sharing one agent runtime across chat sessions
+    """
+
+    def test_session_churn_leaves_runtime_flat(self):
+        baseline, after, tasks_before, tasks_after, growth = asyncio.run(
+            churn(SESSIONS)
+        )
+
+        assert after == baseline
+        assert after["scopes"] == 0 and after["agent_types"] == 0
+        assert after["subscriptions"] == 0 and after["topics"] == 0
+        assert tasks_after == tasks_before
+        # Well under a kilobyte per session; a leaked run holds tens of them
+        assert growth < SESSIONS * 512
+
+        print(
+            f"✅ {SESSIONS} sessions left the runtime at {after}, "
+            f"{tasks_after} tasks and {growth / 1024:.0f} KiB more memory"
+        )
+
+    def test_chat_end_releases_what_runs_left(self):
+        async def run():
+            shared = SharedRuntime()
+            try:
+                kernel = sk.Kernel()
+                kernel.add_service(FastModel(ai_model_id="fast"))
+                subagents = Subagents(kernel, shared.scope("session"))
+                agents = [
+                    subagents.agent(subagents.specialists[a.agent], [a.task])
+                    for a in ASSIGNMENTS
+                ]
+                # A run straight on the session's scope, not a released child
+                result = await ConcurrentOrchestration(members=agents).invoke(
+                    task="Report", runtime=shared.scopes["session"]
+                )
+                await result.get(timeout=10)
+                held = shared.status()
+                await shared.scopes["session"].release()
+                return held, shared.status()
+            finally:
+                await shared.stop()
+
+        held, released = asyncio.run(run())
+
+        assert held["agent_types"] == 3 and held["subscriptions"] == 5
+        for registry in ("scopes", "agent_types", "agents", "subscriptions"):
+            assert released[registry] == 0
+        assert released["topics"] == 0
+
+        print(f"✅ A session held {held} until its chat ended, then nothing")
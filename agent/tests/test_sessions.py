@@ -0,0 +1,149 @@
+import asyncio
+import functools
+import gc
+import time
+import tracemalloc
+import weakref
+
+import semantic_kernel as sk
+
+from lib.artifacts import ArtifactStore
+from lib.chat_history import CompactedChatHistory
+from lib.mcp_pool import MCPServer
+from lib.runtime import SharedRuntime
+from lib.sessions import SessionRegistry
+from tests.test_mcp_pool import FAKE_MCP_SERVER, fake_pool
+
+SESSIONS = 1000  # Simulated chats; every other one is abandoned and reaped
+WARMUP = 50
+IDLE_TIMEOUT = 60.0
+REPORT = "x" * 50_000  # A BloodHound-sized tool result per session
+
+
+def connected(pool) -> int:
+    return sum(s["connected"] for s in pool.status().values())
+
+
+async def start_chat(pool, shared, sessions, n: int, refs: list) -> None:
+    """What on_chat_start builds for a session, with one answered message"""
+    kernel = sk.Kernel()
+    for name, plugin in pool.borrow_all().items():
+        kernel.add_plugin(plugin, plugin_name=name)
+    pending = [
+        pool.when_connected("Down", functools.partial(kernel.add_plugin, "Down"))
+    ]
+    chat_history = CompactedChatHistory()
+    chat_history.add_user_message("Find risky users")
+    chat_history.add_assistant_message(REPORT)
+    artifacts = ArtifactStore(kernel)
+    artifacts.put("BloodhoundMCP-get_users", {}, REPORT)
+    await sessions.open(
+        f"chat-{n}",
+        kernel=kernel,
+        chat_history=chat_history,
+        artifacts=artifacts,
+        runtime=shared.scope(f"chat-{n}"),
+        pending=pending,
+    )
+    refs.extend(weakref.ref(o) for o in (kernel, chat_history, artifacts))
+
+
+async def churn(pool, shared, sessions, first: int, count: int, refs: list):
+    for n in range(first, first + count):
+        await start_chat(pool, shared, sessions, n, refs)
+        if n % 2:
+            await sessions.close(f"chat-{n}")  # Chat ended
+    # The abandoned chats go idle
+    await sessions.reap(time.monotonic() + IDLE_TIMEOUT + 1)
+
+
+class TestSessions:
+    """
+    Test releasing the resources of chats that ended or went idle
+    """
+
+    def test_session_churn_does_not_leak(self):
+        async def run():
+            pool = fake_pool(
+                MCPServer("Fake", "Stand-in", FAKE_MCP_SERVER),
+                MCPServer("Down", "No server", "/nonexistent.py", connect_timeout=1),
+                retry_delay=3600,
+            )
+            shared = SharedRuntime()
+            sessions = SessionRegistry(
+                idle_timeout=IDLE_TIMEOUT, connections=lambda: connected(pool)
+            )
+            await pool.start()
+            try:
+                refs = []
+                await churn(pool, shared, sessions, 0, WARMUP, refs)
+                gc.collect()
+                tasks = len(asyncio.all_tasks())
+                tracemalloc.start()
+                before = tracemalloc.get_traced_memory()[0]
+
+                await churn(pool, shared, sessions, WARMUP, SESSIONS, refs)
+                gc.collect()
+                growth = tracemalloc.get_traced_memory()[0] - before
+                tracemalloc.stop()
+                alive = sum(ref() is not None for ref in refs)
+                return (
+                    sessions.status(),
+                    pool.status()["Down"]["waiting"],
+                    shared.status(),
+                    tasks,
+                    len(asyncio.all_tasks()),
+                    alive,
+                    growth,
+                )
+            finally:
+                await sessions.stop()
+                await shared.stop()
+                await pool.close()
+
+        status, waiting, runtime, tasks_before, tasks_after, alive, growth = (
+            asyncio.run(run())
+        )
+
+        total = WARMUP + SESSIONS
+        assert status["live_sessions"] == 0
+        assert status["opened"] == total
+        assert status["ended"] == status["reaped"] == total // 2
+        assert status["open_connections"] == 1  # The pool's, not per session
+        assert status["rss_mb"] > 0
+        assert waiting == 0
+        assert runtime["scopes"] == 0
+        assert tasks_after == tasks_before
+        # Kernels, histories and artifact stores were all freed
+        assert alive == 0
+        # Each leaked session would hold two 50 KB copies of its report
+        assert growth < SESSIONS * 1024
+
+        print(
+            f"✅ {SESSIONS} chats left {status['live_sessions']} sessions, "
+            f"{alive} objects and {growth / 1024:.0f} KiB more memory "
+            f"(RSS {status['rss_mb']} MB)"
+        )
+
+    def test_idle_sessions_are_released_unless_busy(self):
+        async def run():
+            sessions = SessionRegistry(idle_timeout=IDLE_TIMEOUT)
+            history = CompactedChatHistory()
+            history.add_user_message("Audit my firewall")
+            await sessions.open("idle", chat_history=history)
+            await sessions.open("answering")
+            await sessions.open("recent")
+            later = time.monotonic() + IDLE_TIMEOUT + 1
+
+            async with sessions.active("answering"):
+                sessions.get("recent").last_active = later
+                reaped = await sessions.reap(later)
+            return reaped, sorted(sessions.sessions), history
+
+        reaped, live, history = asyncio.run(run())
+
+        assert reaped == ["idle"]
+        assert live == ["answering", "recent"]
+        assert history.messages == []
+
+        print("✅ Only the idle session was released; the busy one was kept")
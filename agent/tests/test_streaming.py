@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+from lib.streaming import TokenStreamer
+
+
+class Frames:
+    """Records what reaches the UI and when"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, text: str) -> None:
+        self.sent.append((time.perf_counter(), text))
+
+    @property
+    def texts(self):
+        return [text for _, text in self.sent]
+
+
+async def stream(tokens, delay: float = 0.0, **kwargs):
+    frames = Frames()
+    async with TokenStreamer(frames.send, **kwargs) as streamer:
+        for token in tokens:
+            await streamer.add(token)
+            await asyncio.sleep(delay)
+    return frames, streamer
+
+
+class TestTokenStreamer:
+    """
+    Test batching streamed tokens into fewer UI frames
+    """
+
+    def test_fast_tokens_are_batched_by_size(self):
+        tokens = [f"tok{n:03d} " for n in range(1000)]  # 7 characters each
+
+        frames, streamer = asyncio.run(stream(tokens, interval=10, max_chars=256))
+
+        assert "".join(frames.texts) == "".join(tokens)
+        assert frames.texts[0] == tokens[0]  # The first token is not held back
+        assert all(256 <= len(text) < 256 + 7 for text in frames.texts[1:-1])
+        assert streamer.status()["frames"] == len(frames.sent) < 40
+
+        print(f"✅ {len(tokens)} tokens were sent in {len(frames.sent)} frames")
+
+    def test_slow_tokens_wait_at_most_the_interval(self):
+        async def run():
+            frames = Frames()
+            streamer = TokenStreamer(frames.send, interval=0.05, max_chars=10_000)
+            await streamer.add("Analyzing")
+            await streamer.add(" the")
+            added = time.perf_counter()
+            await streamer.add(" firewall")
+            # The model pauses, e.g. for a tool call; the batch goes out anyway
+            await asyncio.sleep(0.2)
+            return frames, added
+
+        frames, added = asyncio.run(run())
+
+        assert frames.texts == ["Analyzing", " the firewall"]
+        waited = frames.sent[1][0] - added
+        assert 0.04 < waited < 0.15
+
+        print(f"✅ A batch was sent {waited * 1000:.0f} ms into a pause")
+
+    def test_zero_interval_sends_every_token(self):
+        tokens = ["a", "b", "", "c"]
+
+        frames, streamer = asyncio.run(stream(tokens, interval=0))
+
+        assert frames.texts == ["a", "b", "c"]
+        assert streamer.status()["tokens"] == 3
+
+        print("✅ With no interval every token was its own frame")
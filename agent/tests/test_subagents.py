@@ -0,0 +1,209 @@
+import asyncio
+import time
+from typing import Any, ClassVar, List
+
+import semantic_kernel as sk
+from semantic_kernel.connectors.ai.chat_completion_client_base import (
+    ChatCompletionClientBase,
+)
+from semantic_kernel.connectors.ai.function_calling_utils import (
+    update_settings_from_function_call_configuration,
+)
+from semantic_kernel.connectors.ai.open_ai import AzureChatPromptExecutionSettings
+from semantic_kernel.contents import ChatMessageContent, StreamingChatMessageContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+from semantic_kernel.functions import KernelArguments, kernel_function
+
+from lib.artifacts import ArtifactStore
+from lib.runtime import SharedRuntime
+from lib.subagents import (
+    AGENT_PLUGIN,
+    INVOKE_AGENTS,
+    SPECIALISTS,
+    AgentPlugin,
+    Specialist,
+    SubagentTask,
+    Subagents,
+)
+from tests.test_artifacts import auto_invoke
+
+DELAY = 0.5  # Seconds a subagent takes, like a model call
+
+
+class SlowModel(ChatCompletionClientBase):
+    """Answers after DELAY with the tools it was offered and its assignment"""
+
+    SUPPORTS_FUNCTION_CALLING: ClassVar[bool] = True
+
+    def get_prompt_execution_settings_class(self):
+        return AzureChatPromptExecutionSettings
+
+    def _update_function_choice_settings_callback(self):
+        return update_settings_from_function_call_configuration
+
+    def _reply(self, chat_history, settings) -> str:
+        if "FAIL" in chat_history.messages[0].content:
+            raise RuntimeError("model unavailable")
+        tools = sorted(tool["function"]["name"] for tool in settings.tools or [])
+        assignment = chat_history.messages[0].content.split("Your assignment:")[1]
+        return f"tools={','.join(tools)} assignment={assignment.split(chr(10))[1]}"
+
+    async def _inner_get_chat_message_contents(self, chat_history, settings):
+        await asyncio.sleep(DELAY)
+        content = self._reply(chat_history, settings)
+        return [ChatMessageContent(role=AuthorRole.ASSISTANT, content=content)]
+
+    async def _inner_get_streaming_chat_message_contents(
+        self, chat_history, settings, function_invoke_attempt: int = 0
+    ):
+        await asyncio.sleep(DELAY)
+        content = self._reply(chat_history, settings)
+        yield [
+            StreamingChatMessageContent(
+                role=AuthorRole.ASSISTANT, content=content, choice_index=0
+            )
+        ]
+
+
+class ActiveDirectoryAndServices:
+    @kernel_function(description="List inbound Windows Firewall rules")
+    def list_inbound_firewall_rules(self) -> str:
+        return "[]"
+
+    @kernel_function(description="Block or allow a port in the Windows Firewall")
+    def apply_firewall_changes(self, port: int, action: str) -> str:
+        return action
+
+    @kernel_function(description="Look up job descriptions")
+    def lookup_job_descriptions(self, users: str) -> str:
+        return users
+
+
+class Bloodhound:
+    @kernel_function(description="List the users")
+    def get_users(self, domain_id: str) -> str:
+        return "[]"
+
+    @kernel_function(description="List the controllers of an Enterprise CA")
+    def get_enterprise_ca_controllers(self, ca_id: str) -> str:
+        return "[]"
+
+
+def make_kernel():
+    kernel = sk.Kernel()
+    kernel.add_service(SlowModel(ai_model_id="slow"))
+    kernel.add_plugin(
+        ActiveDirectoryAndServices(), plugin_name="ActiveDirectoryAndServicesMCP"
+    )
+    kernel.add_plugin(Bloodhound(), plugin_name="BloodhoundMCP")
+    return kernel
+
+
+async def delegate(kernel, assignments: List[Any], specialists=SPECIALISTS, **kw):
+    shared = SharedRuntime()
+    runtime = shared.scope("session")
+    try:
+        kernel.add_plugin(
+            AgentPlugin(Subagents(kernel, runtime, specialists, **kw)),
+            plugin_name=AGENT_PLUGIN,
+        )
+        started = time.perf_counter()
+        result = await kernel.invoke(
+            plugin_name=AGENT_PLUGIN,
+            function_name="invoke_agents",
+            arguments=KernelArguments(assignments=assignments),
+        )
+        return str(result), time.perf_counter() - started
+    finally:
+        await shared.stop()
+
+
+class TestSubagents:
+    """
+    Test fanning independent reviews out to subagents on the runtime
+    """
+
+    def test_subagents_run_concurrently_with_own_tools(self):
+        report, elapsed = asyncio.run(
+            delegate(
+                make_kernel(),
+                [
+                    {"agent": "FirewallAuditor", "task": "Audit inbound rules"},
+                    {"agent": "RiskyUsersAnalyst", "task": "Find risky users"},
+                    {"agent": "ADCSReviewer", "task": "Review the CAs"},
+                ],
+            )
+        )
+        sections = report.split("## ")[1:]
+
+        assert len(sections) == 3
+        firewall, users, adcs = sections
+        assert firewall.startswith("FirewallAuditor: Audit inbound rules")
+        assert (
+            "tools=ActiveDirectoryAndServicesMCP-list_inbound_firewall_rules "
+            "assignment=- Audit inbound rules" in firewall
+        )
+        # Read-only: no subagent gets the tools that change the system
+        assert "apply_firewall_changes" not in report
+        assert "BloodhoundMCP-get_users" in users
+        assert "lookup_job_descriptions" in users
+        assert "tools=BloodhoundMCP-get_enterprise_ca_controllers " in adcs
+        # Concurrent: about one model call, not three in a row
+        assert elapsed < 2 * DELAY
+
+        print(f"✅ Three subagents reported in {elapsed:.2f}s ({DELAY}s each)")
+
+    def test_failures_and_unknown_agents_are_reported(self):
+        specialists = SPECIALISTS + (
+            Specialist(name="Broken", description="", instructions="FAIL", tools=()),
+        )
+        report, _ = asyncio.run(
+            delegate(
+                make_kernel(),
+                [
+                    SubagentTask(agent="Broken", task="Anything"),
+                    SubagentTask(agent="NoSuchAgent", task="Anything"),
+                ],
+                specialists=specialists,
+            )
+        )
+
+        assert "## Broken: Anything" in report
+        assert "No report: the run failed" in report
+        assert "Unknown subagents skipped: NoSuchAgent" in report
+
+        print("✅ A failed subagent and an unknown one were reported, not raised")
+
+    def test_reports_are_not_stored_as_artifacts(self):
+        async def run():
+            kernel = make_kernel()
+            store = ArtifactStore(kernel, offload_chars=100)
+            store.keep(AGENT_PLUGIN)
+            shared = SharedRuntime()
+            try:
+                kernel.add_plugin(
+                    AgentPlugin(Subagents(kernel, shared.scope("session"))),
+                    plugin_name=AGENT_PLUGIN,
+                )
+                report = await auto_invoke(
+                    kernel,
+                    store,
+                    INVOKE_AGENTS,
+                    assignments=[
+                        SubagentTask(agent="FirewallAuditor", task="Audit rules"),
+                        SubagentTask(agent="RiskyUsersAnalyst", task="Review users"),
+                    ],
+                )
+            finally:
+                await shared.stop()
+            return report, store.status()
+
+        report, status = asyncio.run(run())
+
+        # The main agent gets the reports it combines, not an artifact handle
+        assert len(report) > 100
+        assert "## FirewallAuditor: Audit rules" in report
+        assert "## RiskyUsersAnalyst: Review users" in report
+        assert status["artifacts"] == 0
+
+        print("✅ Merged subagent reports reached the main agent verbatim")
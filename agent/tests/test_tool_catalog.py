@@ -0,0 +1,87 @@
+import asyncio
+import os
+import signal
+
+import semantic_kernel as sk
+
+from lib.tool_catalog import ToolCatalog
+from tests.test_mcp_pool import fake_pool, text
+
+
+async def listings(pool):
+    """tools/list requests served by the current stand-in server process"""
+    return int(await text(pool.clients["Fake"][0].plugin, "listings"))
+
+
+async def restart_server(pool):
+    plugin = pool.clients["Fake"][0].plugin
+    os.kill(int(await text(plugin, "pid")), signal.SIGKILL)
+    await asyncio.sleep(0.2)
+    await pool.health_check()
+
+
+class TestToolCatalog:
+    """
+    Test reusing tool catalogs across reconnects and restarts by fingerprint
+    """
+
+    def test_reconnect_reuses_catalog(self):
+        async def run():
+            pool = fake_pool(fingerprint="v1", health_interval=3600)
+            await pool.start()
+            try:
+                first = await listings(pool)
+                await restart_server(pool)
+                functions = pool.borrow("Fake")
+                echoed = await functions["echo"].invoke(sk.Kernel(), text="hi")
+                return first, await listings(pool), str(echoed), pool.catalog.status()
+            finally:
+                await pool.close()
+
+        first, second, echoed, status = asyncio.run(run())
+
+        assert first == 1
+        assert second == 0  # The reconnected client never listed the tools
+        assert echoed == "hi"
+        assert status == {"catalogs": 1, "hits": 1, "misses": 1}
+
+        print("✅ Reconnect reused the cached tool catalog")
+
+    def test_catalog_persists_until_fingerprint_changes(self, tmp_path):
+        async def served(fingerprint):
+            # A fresh pool and cache, as after an agent restart
+            catalog = ToolCatalog(str(tmp_path))
+            pool = fake_pool(fingerprint=fingerprint, catalog=catalog)
+            await pool.start()
+            try:
+                return await listings(pool), sorted(pool.borrow("Fake").functions)
+            finally:
+                await pool.close()
+
+        async def run():
+            return [await served(fingerprint) for fingerprint in ("v1", "v1", "v2")]
+
+        (first, tools), (restarted, cached), (changed, _) = asyncio.run(run())
+
+        assert (first, restarted, changed) == (1, 0, 1)
+        assert cached == tools == ["echo", "listings", "pid", "sleep"]
+        assert len(os.listdir(tmp_path)) == 2
+
+        print("✅ Restart reused the saved catalog; a new fingerprint listed again")
+
+    def test_server_without_fingerprint_always_lists(self):
+        async def run():
+            pool = fake_pool(health_interval=3600)
+            await pool.start()
+            try:
+                await restart_server(pool)
+                return await listings(pool), pool.catalog.status()
+            finally:
+                await pool.close()
+
+        second, status = asyncio.run(run())
+
+        assert second == 1
+        assert status["catalogs"] == 0
+
+        print("✅ Server without a fingerprint had its tools listed on reconnect")
@@ -0,0 +1,187 @@
+import asyncio
+
+import semantic_kernel as sk
+from semantic_kernel.connectors.ai.open_ai import (
+    AzureChatPromptExecutionSettings,
+)
+from semantic_kernel.connectors.ai.function_calling_utils import (
+    update_settings_from_function_call_configuration,
+)
+from semantic_kernel.filters import AutoFunctionInvocationContext
+from semantic_kernel.filters.kernel_filters_extension import (
+    _rebuild_auto_function_invocation_context,
+)
+from semantic_kernel.functions import KernelArguments, kernel_function
+
+from lib.tool_router import FIND_TOOLS, ToolRouter, ToolSelection, schema_size
+
+# Built by the kernel's function call loop in the app; resolve its forward
+# references to build one here
+_rebuild_auto_function_invocation_context()
+
+
+class Bloodhound:
+    """A slice of the BloodHound tool catalog, plus filler like the rest of it"""
+
+    @kernel_function(description="List users that can be Kerberoasted")
+    def get_kerberoastable_users(self, domain_id: str) -> str:
+        return domain_id
+
+    @kernel_function(description="Find the shortest attack path between nodes")
+    def get_shortest_path(self, start_node: str, end_node: str) -> str:
+        return start_node
+
+    @kernel_function(description="List the members of a group")
+    def get_group_members(self, group_id: str) -> str:
+        return group_id
+
+    @kernel_function(description="List computers with unconstrained delegation")
+    def get_unconstrained_delegation(self, domain_id: str) -> str:
+        return domain_id
+
+    @kernel_function(description="Run a custom Cypher query against the graph")
+    def run_cypher_query(self, query: str) -> str:
+        return query
+
+
+for n in range(60):
+    setattr(
+        Bloodhound,
+        f"get_ou_detail_{n}",
+        kernel_function(
+            lambda self, ou_id: ou_id,
+            name=f"get_ou_detail_{n}",
+            description=f"Detail {n} of an organizational unit",
+        ),
+    )
+
+
+class ActiveDirectoryAndServices:
+    @kernel_function(description="List Windows Firewall rules")
+    def list_firewall_rules(self) -> str:
+        return "[]"
+
+    @kernel_function(description="Block or allow a port in the Windows Firewall")
+    def apply_firewall_changes(self, port: int, action: str) -> str:
+        return action
+
+    @kernel_function(description="Disable an Active Directory user account")
+    def disable_user(self, identity: str) -> str:
+        return identity
+
+
+def make_kernel():
+    kernel = sk.Kernel()
+    kernel.add_plugin(Bloodhound(), plugin_name="BloodhoundMCP")
+    kernel.add_plugin(
+        ActiveDirectoryAndServices(), plugin_name="ActiveDirectoryAndServicesMCP"
+    )
+    return kernel
+
+
+def offered(kernel, settings):
+    """The tool names a request with these settings sends to the model"""
+    settings = AzureChatPromptExecutionSettings.from_prompt_execution_settings(settings)
+    settings.function_choice_behavior.configure(
+        kernel=kernel,
+        update_settings_callback=update_settings_from_function_call_configuration,
+        settings=settings,
+    )
+    return settings, [tool["function"]["name"] for tool in settings.tools]
+
+
+class TestToolRouter:
+    """
+    Test routing a relevant subset of tools to each user message
+    """
+
+    def test_message_gets_relevant_tools(self):
+        kernel = make_kernel()
+        selection = ToolSelection(ToolRouter(limit=4), kernel)
+
+        _, tools = offered(
+            kernel, selection.settings("Which users are kerberoastable?")
+        )
+
+        assert FIND_TOOLS in tools  # The escape hatch is always offered
+        assert "BloodhoundMCP-get_kerberoastable_users" in tools
+        assert len(tools) <= 5
+
+        _, tools = offered(kernel, selection.settings("Block port 445 in the firewall"))
+        assert "ActiveDirectoryAndServicesMCP-apply_firewall_changes" in tools
+
+        print(
+            f"✅ Routed {len(tools)} of {len(kernel.get_full_list_of_function_metadata())} tools"
+        )
+
+    def test_follow_up_keeps_previous_tools(self):
+        kernel = make_kernel()
+        selection = ToolSelection(ToolRouter(limit=4), kernel)
+
+        selection.settings("Disable the user account jdoe")
+        _, tools = offered(kernel, selection.settings("Yes, go ahead."))
+
+        assert "ActiveDirectoryAndServicesMCP-disable_user" in tools
+
+        print("✅ A follow-up without keywords kept the previous turn's tools")
+
+    def test_find_tools_expands_running_request(self):
+        kernel = make_kernel()
+        selection = ToolSelection(ToolRouter(limit=2), kernel)
+        settings, before = offered(kernel, selection.settings("kerberoastable users"))
+        assert "BloodhoundMCP-run_cypher_query" not in before
+
+        async def call_find_tools():
+            context = AutoFunctionInvocationContext(
+                function=kernel.get_function("ToolRouter", "find_tools"),
+                kernel=kernel,
+                arguments=KernelArguments(need="run a custom cypher query"),
+                execution_settings=settings,
+            )
+
+            async def invoke(context):
+                context.function_result = await context.function.invoke(
+                    context.kernel, context.arguments
+                )
+
+            await selection.expand_filter(context, invoke)
+            return str(context.function_result)
+
+        result = asyncio.run(call_find_tools())
+        after = [tool["function"]["name"] for tool in settings.tools]
+
+        assert "BloodhoundMCP-run_cypher_query" in result
+        assert "BloodhoundMCP-run_cypher_query" in after
+        assert set(before) < set(after)
+        # The function call loop only lets the model call offered tools
+        allowed = kernel.get_list_of_function_metadata(
+            settings.function_choice_behavior.filters
+        )
+        assert "BloodhoundMCP-run_cypher_query" in {
+            f.fully_qualified_name for f in allowed
+        }
+
+        print(
+            f"✅ find_tools grew the request from {len(before)} to {len(after)} tools"
+        )
+
+    def test_routed_schema_is_a_fraction(self):
+        kernel = make_kernel()
+        router = ToolRouter()
+        selection = ToolSelection(router, kernel)
+
+        full = schema_size(kernel)
+        routed = schema_size(
+            kernel, selection.route("Find attack paths to Domain Admins")
+        )
+        disabled = ToolSelection(ToolRouter(enabled=False), make_kernel())
+        _, everything = offered(disabled.kernel, disabled.settings("anything"))
+
+        assert routed < full / 3
+        assert len(everything) == len(
+            disabled.kernel.get_full_list_of_function_metadata()
+        )
+        # Sessions sharing plugins share the index
+        assert router.index(kernel) is router.index(kernel)
+
+        print(f"✅ Tool schema per request: {full} chars unrouted, {routed} routed")
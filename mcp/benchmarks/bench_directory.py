@@ -0,0 +1,147 @@
+"""
+Benchmark of the PowerShell and LDAP Active Directory backends.
+
+Runs the same work on both backends:
+
+- per-operation: one disable_account call per user, like the single tools
+- batch: removing every user from one group with apply_operations(), like
+  apply_ad_changes
+
+The PowerShell backend runs on pooled stand-in hosts (tests/fake_powershell.py)
+and the LDAP backend on pooled ldap3 mock connections. Neither talks to a
+domain controller, and the mock evaluates LDAP filters in pure Python, so the
+request counts matter more than the timings: against a real DC every request
+is a network round trip, plus a cmdlet's module and ADWS overhead for
+PowerShell.
+
+Usage:
+    python benchmarks/bench_directory.py [--users 500] [--pool-size 2]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import ldap3  # noqa: E402
+
+from lib.directory import PowerShellDirectory  # noqa: E402
+from lib.ldap_directory import LdapConnectionPool, LdapDirectory  # noqa: E402
+from lib.powershell import PowerShellPool  # noqa: E402
+
+FAKE_POWERSHELL = os.path.join(PROJECT_ROOT, "tests", "fake_powershell.py")
+BASE_DN = "DC=corp,DC=local"
+USERS = f"CN=Users,{BASE_DN}"
+GROUP = f"CN=Staff,{USERS}"
+
+
+def ldap_directory(users: list, size: int):
+    """LdapDirectory on mock connections sharing one directory of users"""
+    server = ldap3.Server("mock-dc")
+    admin = f"CN=admin,{USERS}"
+    seeded = []
+    connections = []
+
+    def connect():
+        connection = ldap3.Connection(
+            server,
+            user=admin,
+            password="secret",
+            client_strategy=ldap3.MOCK_SYNC,
+            collect_usage=True,
+        )
+        connections.append(connection)
+        if seeded:
+            connection.strategy.entries = seeded[0].strategy.entries
+            return connection
+        connection.strategy.add_entry(admin, {"userPassword": "secret"})
+        for user in users:
+            connection.strategy.add_entry(
+                f"CN={user},{USERS}",
+                {"sAMAccountName": user, "userAccountControl": "512"},
+            )
+        connection.strategy.add_entry(
+            GROUP,
+            {
+                "sAMAccountName": "Staff",
+                "member": [f"CN={user},{USERS}" for user in users],
+            },
+        )
+        seeded.append(connection)
+        return connection
+
+    def requests() -> int:
+        return sum(c.usage.operations - c.usage.bind_operations for c in connections)
+
+    return LdapDirectory(LdapConnectionPool(connect, size), BASE_DN), requests
+
+
+def counting_pool(size: int):
+    """Pooled stand-in hosts and a counter of the scripts they ran"""
+    pool = PowerShellPool([sys.executable, FAKE_POWERSHELL], size=size)
+    calls = []
+    run = pool.run
+
+    def counted(*args, **kwargs):
+        calls.append(1)
+        return run(*args, **kwargs)
+
+    pool.run = counted
+    return pool, lambda: len(calls)
+
+
+def measure(label: str, work, operations: int, requests) -> None:
+    before = requests()
+    started = time.perf_counter()
+    work()
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:<24} {elapsed * 1000:9.1f} ms   "
+        f"{operations / elapsed:9.0f} operations/s   "
+        f"{requests() - before:5d} requests"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=500, help="Accounts to change")
+    parser.add_argument("--pool-size", type=int, default=2, help="Pooled sessions")
+    args = parser.parse_args()
+
+    users = [f"user{i:05d}" for i in range(args.users)]
+    batch = [
+        {"operation": "remove_group_member", "identity": "Staff", "member": user}
+        for user in users
+    ]
+    print(f"{args.users} accounts, {args.pool_size} pooled sessions per backend")
+
+    pool, scripts = counting_pool(args.pool_size)
+    ldap, ldap_requests = ldap_directory(users, args.pool_size)
+    try:
+        for name, directory, requests in (
+            ("powershell", PowerShellDirectory(pool), scripts),
+            ("ldap", ldap, ldap_requests),
+        ):
+            directory.disable_account(users[0])  # Start the host / bind first
+            measure(
+                f"{name} per-operation",
+                lambda: [directory.disable_account(user) for user in users],
+                len(users),
+                requests,
+            )
+            measure(
+                f"{name} batch",
+                lambda: directory.apply_operations(batch),
+                len(batch),
+                requests,
+            )
+    finally:
+        pool.shutdown()
+        ldap.pool.close()
+
+
+if __name__ == "__main__":
+    main()
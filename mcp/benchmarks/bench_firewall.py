@@ -0,0 +1,120 @@
+"""
+Benchmark of the netsh firewall rule parser.
+
+Compares the previous whole-output regex parser with the streaming
+parse_netsh_rules() on a 10,000 rule `netsh advfirewall firewall show rule`
+dump. The dump is generated from the captured sample in
+tests/fixtures/netsh_show_rule.txt rather than committed (it is ~6 MB).
+
+Usage:
+    python benchmarks/bench_firewall.py [--rules 10000] [--runs 5]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from lib.firewall import parse_netsh_rules  # noqa: E402
+
+SAMPLE = os.path.join(PROJECT_ROOT, "tests", "fixtures", "netsh_show_rule.txt")
+
+
+def build_dump(rule_count: int) -> str:
+    """Repeat the captured rule blocks, renamed, until rule_count rules exist"""
+    with open(SAMPLE, encoding="utf-8") as f:
+        blocks = [
+            b for b in re.split(r"\n\s*\n", f.read().replace("Ok.", "")) if b.strip()
+        ]
+    out = [""]
+    for i in range(rule_count):
+        block = blocks[i % len(blocks)].strip("\n")
+        out.append(block.replace("Rule Name:", f"Rule Name: {i:05d}", 1))
+        out.append("")
+    out.append("Ok.")
+    return "\n".join(out) + "\n"
+
+
+def legacy_parse(path: str) -> list:
+    """The parser list_inbound_firewall_rules used before the streaming parser"""
+    with open(path, "rb") as f:
+        out_bytes = f.read()  # subprocess.check_output() buffered everything
+    out_str = out_bytes.decode("utf-8").replace("Ok.", "")
+    temp = [k for x in re.split(r"\n\s*\n", out_str) if (k := x.strip())]
+    rule_lines = [
+        {
+            z[0].strip(): z[1].strip()
+            for k in x.split("\n")
+            if (y := k.strip())
+            and not y.startswith("------")
+            and len(z := y.split(": ", 1)) == 2
+        }
+        for x in temp
+    ]
+    return [
+        rule
+        for rule in rule_lines
+        if rule.get("Enabled", "") == "Yes"
+        and rule.get("Direction", "") == "In"
+        and rule.get("Action", "") == "Allow"
+    ]
+
+
+def streaming_parse(path: str) -> list:
+    with open(path, encoding="utf-8") as f:  # Read like a process's stdout
+        return [
+            rule
+            for rule in parse_netsh_rules(f)
+            if rule.enabled and rule.direction == "In" and rule.action == "Allow"
+        ]
+
+
+def measure(parse, path: str, runs: int) -> tuple:
+    """Median seconds, peak traced memory in bytes and number of matching rules"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        rules = parse(path)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    parse(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak, len(rules)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rules", type=int, default=10_000, help="Rules in the dump")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per parser")
+    args = parser.parse_args()
+
+    dump = build_dump(args.rules)
+    print(f"{args.rules} rules, {len(dump) / 1e6:.1f} MB of netsh output")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "netsh_show_rule.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(dump)
+        del dump
+
+        for label, parse in (
+            ("regex (previous)", legacy_parse),
+            ("streaming", streaming_parse),
+        ):
+            elapsed, peak, matched = measure(parse, path, args.runs)
+            print(
+                f"{label:<18} median {elapsed * 1000:8.1f} ms   "
+                f"peak {peak / 1e6:6.1f} MB   {matched} inbound allow rules"
+            )
+
+
+if __name__ == "__main__":
+    main()
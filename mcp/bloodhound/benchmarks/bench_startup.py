@@ -0,0 +1,123 @@
+"""
+Startup benchmark for the BloodHound MCP server.
+
+Measures, over several fresh interpreters:
+  - the time to import main.py once the MCP SDK is loaded
+  - the time from spawning `python main.py` (stdio) to the tools/list response
+
+Usage:
+    uv run python benchmarks/bench_startup.py [--runs 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_TIMER = """
+import json, time
+import mcp.server.fastmcp
+started = time.perf_counter()
+import main
+print(json.dumps(time.perf_counter() - started))
+"""
+
+ENV = dict(
+    os.environ,
+    BLOODHOUND_DOMAIN="10.255.255.1",
+    BLOODHOUND_TOKEN_ID="benchmark",
+    BLOODHOUND_TOKEN_KEY="benchmark",
+)
+
+
+def time_import() -> float:
+    """Seconds spent importing main.py in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_TIMER],
+        cwd=PROJECT_ROOT,
+        env=ENV,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _send(proc, message):
+    proc.stdin.write(json.dumps(message) + "\n")
+    proc.stdin.flush()
+
+
+def _wait_for(proc, request_id):
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"Server exited early: {proc.stderr.read()}")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+
+def time_first_tools_list() -> tuple:
+    """Seconds from process spawn to the tools/list response, and the tool count"""
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "main.py"],
+        cwd=PROJECT_ROOT,
+        env=ENV,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        _send(
+            proc,
+            {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "initialize",
+                "params": {
+                    "protocolVersion": "2025-03-26",
+                    "capabilities": {},
+                    "clientInfo": {"name": "bench-startup", "version": "0"},
+                },
+            },
+        )
+        _wait_for(proc, 1)
+        _send(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        _send(proc, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        tools = _wait_for(proc, 2)["result"]["tools"]
+        return time.perf_counter() - started, len(tools)
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def summarize(label: str, samples: list) -> None:
+    print(
+        f"{label:<28} median {statistics.median(samples) * 1000:8.1f} ms"
+        f"   min {min(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10, help="Samples per measurement")
+    args = parser.parse_args()
+
+    imports = [time_import() for _ in range(args.runs)]
+    listings = [time_first_tools_list() for _ in range(args.runs)]
+
+    print(f"Runs: {args.runs}, tools listed: {listings[0][1]}")
+    summarize("import main", imports)
+    summarize("spawn to first tools/list", [elapsed for elapsed, _ in listings])
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,20 @@ import base64
 import datetime
 import hashlib
 import hmac
+import inspect
 import json
 import os
+import threading
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 
-import requests
 from dotenv import load_dotenv
 
+from lib.endpoints import ENDPOINTS, SCOPES, Endpoint
+
+if TYPE_CHECKING:
+    import requests
+
 # Load environment variables from .env file
 env_path = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
@@ -37,7 +43,7 @@ class BloodhoundConnectionError(BlooodhoundError):
 class BloodhoundAPIError(BlooodhoundError):
     """Custom exception for BloodHound API errors"""
 
-    def __init__(self, message: str, response: requests.Response):
+    def __init__(self, message: str, response: "requests.Response"):
         super().__init__(message)
         self.response = response
         self.status_code = response.status_code if response else None
@@ -51,6 +57,8 @@ class BloodhoundBaseClient:
         token_key: str = None,
         port: int = 8080,
         scheme: str = "http",
+        cache=None,
+        timeout: Optional[float] = None,
     ):
         """
         Initialize BloodHound API base client
@@ -61,9 +69,14 @@ class BloodhoundBaseClient:
             token_key: API token key
             port: API port (default: 443)
             scheme: URL scheme (default: https)
+            cache: Optional response cache backend (see lib.cache)
+            timeout: Seconds to wait for the API before giving up
+                (default: BLOODHOUND_TIMEOUT environment variable, or 30)
         """
         # Load from parameters or environment variables
         self.scheme = scheme
+        self.cache = cache
+        self.timeout = timeout or float(os.getenv("BLOODHOUND_TIMEOUT", "30"))
         self.domain = domain or os.getenv("BLOODHOUND_DOMAIN")
         self.port = port
         self.token_id = token_id or os.getenv("BLOODHOUND_TOKEN_ID")
@@ -93,7 +106,7 @@ class BloodhoundBaseClient:
 
     def _request(
         self, method: str, uri: str, body: Optional[bytes] = None
-    ) -> requests.Response:
+    ) -> "requests.Response":
         """
         Make a signed request to the BloodHound API
 
@@ -105,6 +118,9 @@ class BloodhoundBaseClient:
         Returns:
             Response from the API
         """
+        # requests is imported on first use so the MCP server starts quickly
+        import requests
+
         # Digester is initialized with HMAC-SHA-256 using the token key as the HMAC digest key
         digester = hmac.new(self.token_key.encode(), None, hashlib.sha256)
 
@@ -138,7 +154,10 @@ class BloodhoundBaseClient:
                     "Content-Type": "application/json",
                 },
                 data=body,
+                timeout=self.timeout,
             )
+        except requests.exceptions.Timeout as e:
+            raise BloodhoundConnectionError(f"BloodHound API timed out: {e}")
         except requests.exceptions.ConnectionError as e:
             raise BloodhoundConnectionError(f"Failed to connect to BloodHound API: {e}")
 
@@ -148,6 +167,7 @@ class BloodhoundBaseClient:
         uri: str,
         params: Optional[Dict[str, Any]] = None,
         data: Optional[Dict[str, Any]] = None,
+        cacheable: Optional[bool] = None,
     ) -> Dict[str, Any]:
         """
         Make an API request and return the parsed JSON response
@@ -157,6 +177,8 @@ class BloodhoundBaseClient:
             uri: Request URI
             params: Optional query parameters
             data: Optional request body data (will be JSON encoded)
+            cacheable: Whether the response may be served from the cache
+                (default: True for GET requests when a cache is configured)
 
         Returns:
             Parsed JSON response
@@ -168,6 +190,16 @@ class BloodhoundBaseClient:
                 param_strings.append(f"{key}={value}")
             uri = f"{uri}?{'&'.join(param_strings)}"
 
+        # Serve repeated reads from the cache when one is configured
+        if cacheable is None:
+            cacheable = method == "GET"
+        cache_key = None
+        if cacheable and self.cache is not None:
+            cache_key = f"{method} {self._format_url(uri)}"
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         # Prepare request body if provided
         body = None
         if data:
@@ -177,9 +209,14 @@ class BloodhoundBaseClient:
         response = self._request(method, uri, body)
 
         # Handle response
+        import requests
+
         try:
             response.raise_for_status()
-            return response.json()
+            result = response.json()
+            if cache_key is not None:
+                self.cache.set(cache_key, result)
+            return result
         except requests.exceptions.HTTPError as e:
             error_msg = f"HTTP Error: {e}"
             try:
@@ -207,6 +244,7 @@ class BloodhoundAPI:
         token_key: str = None,
         port: int = 8080,
         scheme: str = "http",
+        cache=None,
     ):
         """
         Initialize BloodHound API client
@@ -217,13 +255,14 @@ class BloodhoundAPI:
             token_key: API token key
             port: API port (default: 443)
             scheme: URL scheme (default: https)
+            cache: Optional response cache backend shared by all resource clients
 
         If domain, token_id, or token_key are not provided, they will be loaded from
         environment variables: BLOODHOUND_DOMAIN, BLOODHOUND_TOKEN_ID, BLOODHOUND_TOKEN_KEY
         """
         # Initialize base client
         self.base_client = BloodhoundBaseClient(
-            domain, token_id, token_key, port, scheme
+            domain, token_id, token_key, port, scheme, cache
         )
 
         # Initialize resource clients
@@ -245,7 +284,7 @@ class BloodhoundAPI:
             API version information
         """
         try:
-            response = self.base_client.request("GET", "/api/version")
+            response = self.base_client.request("GET", "/api/version", cacheable=False)
             return response["data"]
         except Exception as e:
             print(f"Connection test failed: {e}")
@@ -259,12 +298,56 @@ class BloodhoundAPI:
             User information dictionary
         """
         try:
-            return self.base_client.request("GET", "/api/v2/self")
+            return self.base_client.request("GET", "/api/v2/self", cacheable=False)
         except Exception as e:
             print(f"Failed to get user info: {e}")
             return None
 
 
+class LazyBloodhoundAPI:
+    """
+    Stand-in for BloodhoundAPI that builds the real client on first use.
+
+    Importing the MCP server must not depend on BloodHound credentials or
+    connectivity, so the client is only constructed when a tool needs it.
+    """
+
+    def __init__(self, factory: Callable[[], BloodhoundAPI]):
+        """
+        Initialize the lazy client
+
+        Args:
+            factory: Callable that constructs the BloodhoundAPI instance
+        """
+        self._factory = factory
+        self._client: Optional[BloodhoundAPI] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_initialized(self) -> bool:
+        """Whether the real client has been constructed yet"""
+        return self._client is not None
+
+    def get_client(self) -> BloodhoundAPI:
+        """Return the real client, constructing it if needed"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    def reset(self) -> None:
+        """Drop the real client so the next use rebuilds it"""
+        with self._lock:
+            self._client = None
+
+    def __getattr__(self, name: str) -> Any:
+        # Introspection (mock.patch, inspect, copy) must not build the client
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.get_client(), name)
+
+
 class DomainClient:
     """Client for domain-related BloodHound API endpoints"""
 
@@ -314,1512 +397,268 @@ class DomainClient:
 
         return self.base_client.request("GET", "/api/v2/search", params=params)
 
-    def get_users(
-        self, domain_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get users in a specific domain
-
-        Args:
-            domain_id: The ID of the domain to query
-            limit: Maximum number of users to return
-            skip: Number of users to skip for pagination
 
-        Returns:
-            Dictionary with data (list of users) and count (total number of users)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/domains/{domain_id}/users", params=params
-        )
+class UserClient:
+    """Client for user-related BloodHound API endpoints"""
 
-    def get_groups(
-        self, domain_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get groups in a specific domain
+    def __init__(self, base_client: BloodhoundBaseClient):
+        self.base_client = base_client
 
-        Args:
-            domain_id: The ID of the domain to query
-            limit: Maximum number of groups to return
-            skip: Number of groups to skip for pagination
 
-        Returns:
-            Dictionary with data (list of groups) and count (total number of groups)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/domains/{domain_id}/groups", params=params
-        )
+class GroupClient:
+    """Client for group-related BloodHound API endpoints"""
 
-    def get_computers(
-        self, domain_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get computers in a specific domain
+    def __init__(self, base_client: BloodhoundBaseClient):
+        self.base_client = base_client
 
-        Args:
-            domain_id: The ID of the domain to query
-            limit: Maximum number of computers to return
-            skip: Number of computers to skip for pagination
 
-        Returns:
-            Dictionary with data (list of computers) and count (total number of computers)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/domains/{domain_id}/computers", params=params
-        )
+class ComputerClient:
+    """Client for computer-related BloodHound API endpoints"""
 
-    def get_controllers(
-        self, domain_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get controllers in a specific domain
+    def __init__(self, base_client: BloodhoundBaseClient):
+        self.base_client = base_client
 
-        Args:
-            domain_id: The ID of the domain to query
-            limit: Maximum number of controllers to return
-            skip: Number of controllers to skip for pagination
 
-        Returns:
-            Dictionary with data (list of controllers) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/domains/{domain_id}/controllers", params=params
-        )
+class OUsClient:
+    """Client for OU related BloodHound API endpoints"""
 
-    def get_gpos(
-        self, domain_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get Group Policy Objects (GPOs) in a specific domain
+    def __init__(self, base_client: BloodhoundBaseClient):
+        self.base_client = base_client
 
-        Args:
-            domain_id: The ID of the domain to query
-            limit: Maximum number of GPOs to return
-            skip: Number of GPOs to skip for pagination
 
-        Returns:
-            Dictionary with data (list of GPOs) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/domains/{domain_id}/gpos", params=params
-        )
+# /api/v2/graphs/cypher api use
+# for custom cypher queries
 
-    def get_ous(
-        self, domain_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get Organizational Units (OUs) in a specific domain
 
-        Args:
-            domain_id: The ID of the domain to query
-            limit: Maximum number of OUs to return
-            skip: Number of OUs to skip for pagination
+class GPOsClient:
+    """Client for GPO related Bloodhound API Endpoints"""
 
-        Returns:
-            Dictionary with data (list of OUs) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/domains/{domain_id}/ous", params=params
-        )
+    def __init__(self, base_client: BloodhoundBaseClient):
+        self.base_client = base_client
 
-    def get_dc_syncers(
-        self, domain_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get DC Syncers in a specific domain
 
-        Args:
-            domain_id: The ID of the domain to query
-            limit: Maximum number of DC Syncers to return
-            skip: Number of DC Syncers to skip for pagination
+class GraphClient:
+    """Client for Graph related Bloodhound API Endpoints"""
 
-        Returns:
-            Dictionary with data (list of DC Syncers) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/domains/{domain_id}/dc-syncers", params=params
-        )
+    def __init__(self, base_client: BloodhoundBaseClient):
+        self.base_client = base_client
 
-    def get_foreign_admins(
-        self, domain_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
+    # I am getting a 401 error when searching for some objects and it works on others
+    # for example if i search for Domain Admins it fails with a 401 error but if i search for TargetUserB it works fine
+    def search(self, query: str, search_type: str = "fuzzy") -> Dict[str, Any]:
         """
-        Get foreign admins in a specific domain
+        Search for nodes in the graph by name
 
         Args:
-            domain_id: The ID of the domain to query
-            limit: Maximum number of foreign admins to return
-            skip: Number of foreign admins to skip for pagination
+            query: Search query text
+            search_type: Type of search strategy ('fuzzy' or 'exact')
 
         Returns:
-            Dictionary with data (list of foreign admins) and count (total number)
+            Search results
         """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/domains/{domain_id}/foreign-admins", params=params
-        )
+        params = {"query": query, "type": search_type}
+        return self.base_client.request("GET", "/api/v2/graph-search", params=params)
 
-    def get_foreign_gpo_controllers(
-        self, domain_id: str, limit: int = 100, skip: int = 0
+    def get_shortest_path(
+        self, start_node: str, end_node: str, relationship_kinds: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        Get foreign GPO controllers in a specific domain
+        Get the shortest path between two nodes in the graph
 
         Args:
-            domain_id: The ID of the domain to query
-            limit: Maximum number of foreign GPO controllers to return
-            skip: Number of foreign GPO controllers to skip for pagination
+            start_node: The object ID of the starting node
+            end_node: The object ID of the ending node
+            relationship_kinds: Optional filter for relationship types
 
         Returns:
-            Dictionary with data (list of foreign GPO controllers) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/domains/{domain_id}/foreign-gpo-controllers", params=params
-        )
-
-    def get_foreign_groups(
-        self, domain_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
+            Graph data of the shortest path
         """
-        Get foreign groups in a specific domain
+        params = {"start_node": start_node, "end_node": end_node}
 
-        Args:
-            domain_id: The ID of the domain to query
-            limit: Maximum number of foreign groups to return
-            skip: Number of foreign groups to skip for pagination
+        if relationship_kinds:
+            params["relationshipkinds"] = relationship_kinds
 
-        Returns:
-            Dictionary with data (list of foreign groups) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
         return self.base_client.request(
-            "GET", f"/api/v2/domains/{domain_id}/foreign-groups", params=params
+            "GET", "/api/v2/graphs/shortest-path", params=params
         )
 
-    def get_foreign_users(
-        self, domain_id: str, limit: int = 100, skip: int = 0
+    def get_edge_composition(
+        self, source_node: int, target_node: int, edge_type: str
     ) -> Dict[str, Any]:
         """
-        Get foreign users in a specific domain
+        Get the composition of a complex edge between two nodes
 
         Args:
-            domain_id: The ID of the domain to query
-            limit: Maximum number of foreign users to return
-            skip: Number of foreign users to skip for pagination
+            source_node: ID of the source node
+            target_node: ID of the target node
+            edge_type: Type of edge to analyze
 
         Returns:
-            Dictionary with data (list of foreign users) and count (total number)
+            Graph data showing the composition of the edge
         """
-        params = {"limit": limit, "skip": skip, "type": "list"}
+        params = {
+            "sourcenode": source_node,
+            "targetnode": target_node,
+            "edgetype": edge_type,
+        }
+
         return self.base_client.request(
-            "GET", f"/api/v2/domains/{domain_id}/foreign-users", params=params
+            "GET", "/api/v2/graphs/edge-composition", params=params
         )
 
-    def get_inbound_trusts(
-        self, domain_id: str, limit: int = 100, skip: int = 0
+    def get_relay_targets(
+        self, source_node: int, target_node: int, edge_type: str
     ) -> Dict[str, Any]:
         """
-        Get inbound trusts in a specific domain
+        Get nodes that are valid relay targets for a given edge
 
         Args:
-            domain_id: The ID of the domain to query
-            limit: Maximum number of inbound trusts to return
-            skip: Number of inbound trusts to skip for pagination
+            source_node: ID of the source node
+            target_node: ID of the target node
+            edge_type: Type of edge
 
         Returns:
-            Dictionary with data (list of inbound trusts) and count (total number)
+            Graph data with valid relay targets
         """
-        params = {"limit": limit, "skip": skip, "type": "list"}
+        params = {
+            "sourcenode": source_node,
+            "targetnode": target_node,
+            "edgetype": edge_type,
+        }
+
         return self.base_client.request(
-            "GET", f"/api/v2/domains/{domain_id}/inbound-trusts", params=params
+            "GET", "/api/v2/graphs/relay-targets", params=params
         )
 
-    def get_outbound_trusts(
-        self, domain_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get outbound trusts in a specific domain
 
-        Args:
-            domain_id: The ID of the domain to query
-            limit: Maximum number of outbound trusts to return
-            skip: Number of outbound trusts to skip for pagination
+class ADCSClient:
+    """Client for ADCS-related Bloodhound API endpoints"""
 
-        Returns:
-            Dictionary with data (list of outbound trusts) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/domains/{domain_id}/outbound-trusts", params=params
-        )
+    def __init__(self, base_client: BloodhoundBaseClient):
+        self.base_client = base_client
 
 
-class UserClient:
-    """Client for user-related BloodHound API endpoints"""
+class CypherClient:
+    """Client for Cypher query related BloodHound API endpoints"""
 
     def __init__(self, base_client: BloodhoundBaseClient):
         self.base_client = base_client
 
-    def get_info(self, user_id: str) -> Dict[str, Any]:
+    def run_query(self, query: str, include_properties: bool = True) -> Dict[str, Any]:
         """
-        Get information about a specific user
+        Run a custom Cypher query directly against the database
 
         Args:
-            user_id: The ID of the user to query
+            query: The Cypher query to execute
+            include_properties: Whether to include node/edge properties in response
 
         Returns:
-            User information dictionary
+            Dictionary with graph data (nodes and edges)
+
+        Important: Since you're using BloodHound CE, you need to ensure you have the
+        correct endpoint for running Cypher queries. This might be /api/v2/graphs/cypher
+        based on the Swagger file.
         """
-        params = {"counts": "true"}
-        return self.base_client.request(
-            "GET", f"/api/v2/users/{user_id}", params=params
-        )
+        data = {"query": query, "includeproperties": include_properties}
+        return self.base_client.request("POST", "/api/v2/graphs/cypher", data=data)
 
-    def get_admin_rights(
-        self, user_id: str, limit: int = 100, skip: int = 0
+    def list_saved_queries(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        sort_by: str = None,
+        name: str = None,
+        query: str = None,
+        user_id: str = None,
+        scope: str = None,
     ) -> Dict[str, Any]:
         """
-        Get administrative rights of a specific user
+        List saved Cypher queries
 
         Args:
-            user_id: The ID of the user to query
-            limit: Maximum number of rights to return
-            skip: Number of rights to skip for pagination
+            skip: Number of queries to skip
+            limit: Maximum queries to return
+            sort_by: Field to sort by (userid, name, query, id, createdat)
+            name: Filter by query name
+            query: Filter by query string
+            user_id: Filter by user ID
+            scope: Filter by scope
 
         Returns:
-            Dictionary with data (list of rights) and count (total number of rights)
+            Dictionary with array of saved queries
         """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/users/{user_id}/admin-rights", params=params
-        )
+        params = {"skip": skip, "limit": limit}
 
-    def get_constrained_delegation_rights(
-        self, user_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
+        if sort_by:
+            params["sortby"] = sort_by
+        if name:
+            params["name"] = name
+        if query:
+            params["query"] = query
+        if user_id:
+            params["userid"] = user_id
+        if scope:
+            params["scope"] = scope
+
+        return self.base_client.request("GET", "/api/v2/saved-queries", params=params)
+
+    def create_saved_query(self, name: str, query: str) -> Dict[str, Any]:
         """
-        Get constrained delegation rights of a specific user
+        Create a new saved Cypher query
 
         Args:
-            user_id: The ID of the user to query
-            limit: Maximum number of constrained delegation rights to return
-            skip: Number of constrained delegation rights to skip for pagination
+            name: Name of the saved query
+            query: The Cypher query to save
 
         Returns:
-            Dictionary with data (list of rights) and count (total number)
+            Dictionary with the created saved query
         """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET",
-            f"/api/v2/users/{user_id}/constrained-delegation-rights",
-            params=params,
-        )
+        data = {"name": name, "query": query}
+        return self.base_client.request("POST", "/api/v2/saved-queries", data=data)
 
-    def get_controllables(
-        self, user_id: str, limit: int = 100, skip: int = 0
+    def update_saved_query(
+        self, query_id: int, name: str = None, query: str = None
     ) -> Dict[str, Any]:
         """
-        Get controllable objects for a specific user
+        Update an existing saved query
 
         Args:
-            user_id: The ID of the user to query
-            limit: Maximum number of controllables to return
-            skip: Number of controllables to skip for pagination
+            query_id: ID of the saved query to update
+            name: New name for the query (optional)
+            query: New query string (optional)
 
         Returns:
-            Dictionary with data (list of controllables) and count (total number)
+            Dictionary with the updated saved query
         """
-        params = {"limit": limit, "skip": skip, "type": "list"}
+        data = {}
+        if name:
+            data["name"] = name
+        if query:
+            data["query"] = query
+
         return self.base_client.request(
-            "GET", f"/api/v2/users/{user_id}/controllables", params=params
+            "PUT", f"/api/v2/saved-queries/{query_id}", data=data
         )
 
-    def get_controllers(
-        self, user_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
+    def delete_saved_query(self, query_id: int) -> None:
         """
-        Get controllers of a specific user
+        Delete a saved query
 
         Args:
-            user_id: The ID of the user to query
-            limit: Maximum number of controllers to return
-            skip: Number of controllers to skip for pagination
-
-        Returns:
-            Dictionary with data (list of controllers) and count (total number)
+            query_id: ID of the saved query to delete
         """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/users/{user_id}/controllers", params=params
-        )
+        self.base_client.request("DELETE", f"/api/v2/saved-queries/{query_id}")
 
-    def get_dcom_rights(
-        self, user_id: str, limit: int = 100, skip: int = 0
+    def share_saved_query(
+        self, query_id: int, user_ids: List[str] = None, public: bool = False
     ) -> Dict[str, Any]:
         """
-        Get DCOM rights of a specific user
+        Share a saved query with users or make it public
 
         Args:
-            user_id: The ID of the user to query
-            limit: Maximum number of DCOM rights to return
-            skip: Number of DCOM rights to skip for pagination
-
-        Returns:
-            Dictionary with data (list of DCOM rights) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/users/{user_id}/dcom-rights", params=params
-        )
-
-    def get_memberships(
-        self, user_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get group memberships of a specific user
-
-        Args:
-            user_id: The ID of the user to query
-            limit: Maximum number of memberships to return
-            skip: Number of memberships to skip for pagination
-
-        Returns:
-            Dictionary with data (list of memberships) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/users/{user_id}/memberships", params=params
-        )
-
-    def get_ps_remote_rights(
-        self, user_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get PowerShell Remote rights of a specific user
-
-        Args:
-            user_id: The ID of the user to query
-            limit: Maximum number of PS Remote rights to return
-            skip: Number of PS Remote rights to skip for pagination
-
-        Returns:
-            Dictionary with data (list of PS Remote rights) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/users/{user_id}/ps-remote-rights", params=params
-        )
-
-    def get_rdp_rights(
-        self, user_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get RDP rights of a specific user
-
-        Args:
-            user_id: The ID of the user to query
-            limit: Maximum number of RDP rights to return
-            skip: Number of RDP rights to skip for pagination
-
-        Returns:
-            Dictionary with data (list of RDP rights) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/users/{user_id}/rdp-rights", params=params
-        )
-
-    def get_sessions(
-        self, user_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get active sessions of a specific user
-
-        Args:
-            user_id: The ID of the user to query
-            limit: Maximum number of sessions to return
-            skip: Number of sessions to skip for pagination
-
-        Returns:
-            Dictionary with data (list of sessions) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/users/{user_id}/sessions", params=params
-        )
-
-    def get_sql_admin_rights(
-        self, user_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get SQL admin rights of a specific user
-
-        Args:
-            user_id: The ID of the user to query
-            limit: Maximum number of SQL admin rights to return
-            skip: Number of SQL admin rights to skip for pagination
-
-        Returns:
-            Dictionary with data (list of SQL admin rights) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/users/{user_id}/sql-admin-rights", params=params
-        )
-
-
-class GroupClient:
-    """Client for group-related BloodHound API endpoints"""
-
-    def __init__(self, base_client: BloodhoundBaseClient):
-        self.base_client = base_client
-
-    def get_info(self, group_id: str) -> Dict[str, Any]:
-        """
-        Get information about a specific group
-
-        Args:
-            group_id: The ID of the group to query
-
-        Returns:
-            Group information dictionary
-        """
-        params = {"counts": "true"}
-        return self.base_client.request(
-            "GET", f"/api/v2/groups/{group_id}", params=params
-        )
-
-    def get_admin_rights(
-        self, group_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get administrative rights of a specific group
-
-        Args:
-            group_id: The ID of the group to query
-            limit: Maximum number of rights to return
-            skip: Number of rights to skip for pagination
-
-        Returns:
-            Dictionary with data (list of rights) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/groups/{group_id}/admin-rights", params=params
-        )
-
-    def get_controllables(
-        self, group_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get controllable objects for a specific group
-
-        Args:
-            group_id: The ID of the group to query
-            limit: Maximum number of controllables to return
-            skip: Number of controllables to skip for pagination
-
-        Returns:
-            Dictionary with data (list of controllables) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/groups/{group_id}/controllables", params=params
-        )
-
-    def get_controllers(
-        self, group_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get controllers of a specific group
-
-        Args:
-            group_id: The ID of the group to query
-            limit: Maximum number of controllers to return
-            skip: Number of controllers to skip for pagination
-
-        Returns:
-            Dictionary with data (list of controllers) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/groups/{group_id}/controllers", params=params
-        )
-
-    def get_dcom_rights(
-        self, group_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get DCOM rights of a specific group
-
-        Args:
-            group_id: The ID of the group to query
-            limit: Maximum number of DCOM rights to return
-            skip: Number of DCOM rights to skip for pagination
-
-        Returns:
-            Dictionary with data (list of DCOM rights) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/groups/{group_id}/dcom-rights", params=params
-        )
-
-    def get_members(
-        self, group_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get members of a specific group
-
-        Args:
-            group_id: The ID of the group to query
-            limit: Maximum number of members to return
-            skip: Number of members to skip for pagination
-
-        Returns:
-            Dictionary with data (list of members) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/groups/{group_id}/members", params=params
-        )
-
-    def get_memberships(
-        self, group_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get group memberships of a specific group
-
-        Args:
-            group_id: The ID of the group to query
-            limit: Maximum number of memberships to return
-            skip: Number of memberships to skip for pagination
-
-        Returns:
-            Dictionary with data (list of memberships) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/groups/{group_id}/memberships", params=params
-        )
-
-    def get_ps_remote_rights(
-        self, group_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get PowerShell Remote rights of a specific group
-
-        Args:
-            group_id: The ID of the group to query
-            limit: Maximum number of PS Remote rights to return
-            skip: Number of PS Remote rights to skip for pagination
-
-        Returns:
-            Dictionary with data (list of PS Remote rights) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/groups/{group_id}/ps-remote-rights", params=params
-        )
-
-    def get_rdp_rights(
-        self, group_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get RDP rights of a specific group
-        Args:
-            group_id: The ID of the group to query
-            limit: Maximum number of RDP rights to return
-            skip: Number of RDP rights to skip for pagination
-        Returns:
-            Dictionary with data (list of RDP rights) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/groups/{group_id}/rdp-rights", params=params
-        )
-
-    def get_sessions(
-        self, group_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get active sessions of a specific group
-
-        Args:
-            group_id: The ID of the group to query
-            limit: Maximum number of sessions to return
-            skip: Number of sessions to skip for pagination
-
-        Returns:
-            Dictionary with data (list of sessions) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/groups/{group_id}/sessions", params=params
-        )
-
-
-class ComputerClient:
-    """Client for computer-related BloodHound API endpoints"""
-
-    def __init__(self, base_client: BloodhoundBaseClient):
-        self.base_client = base_client
-
-    def get_info(self, computer_id: str) -> Dict[str, Any]:
-        """
-        Get information about a specific computer
-
-        Args:
-            computer_id: The ID of the computer to query
-
-        Returns:
-            Computer information dictionary
-        """
-        params = {"counts": "true"}
-        return self.base_client.request(
-            "GET", f"/api/v2/computers/{computer_id}", params=params
-        )
-
-    def get_admin_rights(
-        self, computer_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get administrative rights of a specific computer
-
-        Args:
-            computer_id: The ID of the computer to query
-            limit: Maximum number of rights to return
-            skip: Number of rights to skip for pagination
-
-        Returns:
-            Dictionary with data (list of rights) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/computers/{computer_id}/admin-rights", params=params
-        )
-
-    def get_admin_users(
-        self, computer_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get administrative users of a specific computer
-
-        Args:
-            computer_id: The ID of the computer to query
-            limit: Maximum number of users to return
-            skip: Number of users to skip for pagination
-
-        Returns:
-            Dictionary with data (list of users) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/computers/{computer_id}/admin-users", params=params
-        )
-
-    def get_constrained_delegation_rights(
-        self, computer_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the principals that this computer has constrained delegations rights to.
-        This is a list of the computers that this computer can impersonate.
-
-        Args:
-            computer_id: The ID of the computer to query
-            limit: Maximum number of rights to return
-            skip: Number of rights to skip for pagination
-
-        Returns:
-            Dictionary with data (list of rights) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET",
-            f"/api/v2/computers/{computer_id}/constrained-delegation-rights",
-            params=params,
-        )
-
-    def get_constrained_users(
-        self, computer_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the principals that have constrained delegation rights to this computer
-
-        Args:
-            computer_id: The ID of the computer to query
-            limit: Maximum number of users to return
-            skip: Number of users to skip for pagination
-
-        Returns:
-            Dictionary with data (list of users) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/computers/{computer_id}/constrained-users", params=params
-        )
-
-    def get_controllables(
-        self, computer_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the principals this computer can control.
-
-
-        Args:
-            computer_id: The ID of the computer to query
-            limit: Maximum number of controllables to return
-            skip: Number of controllables to skip for pagination
-
-        Returns:
-            Dictionary with data (list of controllables) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/computers/{computer_id}/controllables", params=params
-        )
-
-    def get_controllers(
-        self, computer_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the principals that can control this computer
-
-        Args:
-            computer_id: The ID of the computer to query
-            limit: Maximum number of controllers to return
-            skip: Number of controllers to skip for pagination
-
-        Returns:
-            Dictionary with data (list of controllers) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/computers/{computer_id}/controllers", params=params
-        )
-
-    def get_dcom_rights(
-        self, computer_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the systems this computer can execute DCOM on.
-        This is a list of the computers that this computer can impersonate.
-        Args:
-            computer_id: The ID of the computer to query
-            limit: Maximum number of DCOM rights to return
-            skip: Number of DCOM rights to skip for pagination""
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/computers/{computer_id}/dcom-rights", params=params
-        )
-
-    def get_dcom_users(
-        self, computer_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the users that have DCOM rights to this computer
-
-        Args:
-            computer_id: The ID of the computer to query
-            limit: Maximum number of users to return
-            skip: Number of users to skip for pagination
-
-        Returns:
-            Dictionary with data (list of users) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/computers/{computer_id}/dcom-users", params=params
-        )
-
-    def get_group_membership(
-        self, computer_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the groups this computer is a member of
-
-        Args:
-            computer_id: The ID of the computer to query
-            limit: Maximum number of memberships to return
-            skip: Number of memberships to skip for pagination
-
-        Returns:
-            Dictionary with data (list of memberships) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/computers/{computer_id}/group-membership", params=params
-        )
-
-    def get_ps_remote_rights(
-        self, computer_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the systems this computer has remote PowerShell rights on.
-
-
-        Args:
-            computer_id: The ID of the computer to query
-            limit: Maximum number of PS Remote rights to return
-            skip: Number of PS Remote rights to skip for pagination
-
-        Returns:
-            Dictionary with data (list of PS Remote rights) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/computers/{computer_id}/ps-remote-rights", params=params
-        )
-
-    def get_ps_remote_users(
-        self, computer_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the users that have remote PowerShell rights to this computer
-
-        Args:
-            computer_id: The ID of the computer to query
-            limit: Maximum number of users to return
-            skip: Number of users to skip for pagination
-
-        Returns:
-            Dictionary with data (list of users) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/computers/{computer_id}/ps-remote-users", params=params
-        )
-
-    def get_rdp_rights(
-        self, computer_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the systems this computer has RDP rights on.
-
-        Args:
-            computer_id: The ID of the computer to query
-            limit: Maximum number of RDP rights to return
-            skip: Number of RDP rights to skip for pagination
-        Returns:
-            Dictionary with data (list of RDP rights) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/computers/{computer_id}/rdp-rights", params=params
-        )
-
-    def get_rdp_users(
-        self, computer_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the users that have RDP rights to this computer
-
-        Args:
-            computer_id: The ID of the computer to query
-            limit: Maximum number of users to return
-            skip: Number of users to skip for pagination
-
-        Returns:
-            Dictionary with data (list of users) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/computers/{computer_id}/rdp-users", params=params
-        )
-
-    def get_sessions(
-        self, computer_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the principals with active sessions on this computer.
-
-        Args:
-            computer_id: The ID of the computer to query
-            limit: Maximum number of sessions to return
-            skip: Number of sessions to skip for pagination
-
-        Returns:
-            Dictionary with data (list of sessions) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/computers/{computer_id}/sessions", params=params
-        )
-
-    def get_sql_admins(
-        self, computer_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the SQL administrators on this computer
-
-        Args:
-            computer_id: The ID of the computer to query
-            limit: Maximum number of SQL admins to return
-            skip: Number of SQL admins to skip for pagination
-
-        Returns:
-            Dictionary with data (list of SQL admins) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/computers/{computer_id}/sql-admins", params=params
-        )
-
-
-class OUsClient:
-    """Client for OU related BloodHound API endpoints"""
-
-    def __init__(self, base_client: BloodhoundBaseClient):
-        self.base_client = base_client
-
-    def get_info(self, ou_id: str) -> Dict[str, Any]:
-        """
-        Get information about a specific OU
-        Args:
-            ou_id: The ID of the OU to query
-        Returns:
-            OU information dictionary
-        """
-        params = {"counts": "true"}
-        return self.base_client.request("GET", f"/api/v2/ous/{ou_id}", params=params)
-
-    def get_computers(
-        self, ou_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the computers contained by this OU.
-
-        Args:
-            ou_id: The ID of the OU to query
-            limit: Maximum number of computers to return
-            skip: Number of computers to skip for pagination
-
-        Returns:
-            Dictionary with data (list of computers) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/ous/{ou_id}/computers", params=params
-        )
-
-    def get_gpos(self, ou_id: str, limit: int = 100, skip: int = 0) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the GPOs that affect this OU.
-
-
-        Args:
-            ou_id: The ID of the OU to query
-            limit: Maximum number of GPOs to return
-            skip: Number of GPOs to skip for pagination
-
-        Returns:
-            Dictionary with data (list of GPOs) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/ous/{ou_id}/gpos", params=params
-        )
-
-    def get_groups(self, ou_id: str, limit: int = 100, skip: int = 0) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the groups contained by this OU.
-
-        Args:
-            ou_id: The ID of the OU to query
-            limit: Maximum number of groups to return
-            skip: Number of groups to skip for pagination
-
-        Returns:
-            Dictionary with data (list of groups) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/ous/{ou_id}/groups", params=params
-        )
-
-    def get_users(self, ou_id: str, limit: int = 100, skip: int = 0) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the users contained by this OU.
-
-        Args:
-            ou_id: The ID of the OU to query
-            limit: Maximum number of users to return
-            skip: Number of users to skip for pagination
-
-        Returns:
-            Dictionary with data (list of users) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/ous/{ou_id}/users", params=params
-        )
-
-
-# /api/v2/ous/{ou_id}/ api use
-
-
-# /api/v2/gpos/{gpo_id}/ api use
-
-
-# /api/v2/graphs/cypher api use
-# for custom cypher queries
-
-
-class GPOsClient:
-    """Client for GPO related Bloodhound API Endpoints"""
-
-    def __init__(self, base_client: BloodhoundBaseClient):
-        self.base_client = base_client
-
-    def get_info(self, gpo_id: str) -> Dict[str, Any]:
-        """
-        Get information about a specific GPO
-
-        Args:
-            gpo_id: The ID of the GPO to query
-
-        Returns:
-            GPO information dictionary
-        """
-        params = {"counts": "true"}
-        return self.base_client.request("GET", f"/api/v2/gpos/{gpo_id}", params=params)
-
-    def get_computer(
-        self, gpo_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the computers that this GPO applies to.
-
-        Args:
-            gpo_id: The ID of the GPO to query
-            limit: Maximum number of computers to return
-            skip: Number of computers to skip for pagination
-
-        Returns:
-            Dictionary with data (list of computers) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/gpos/{gpo_id}/computers", params=params
-        )
-
-    def get_controllers(
-        self, gpo_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the Security Prinicipals that can control this GPO.
-
-        Args:
-            gpo_id: The ID of the GPO to query
-            limit: the maximum number of controller security principals to return (default is 100)
-            skip: Number of controller security principals to skip for pagination (Default is 0)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/gpos/{gpo_id}/controllers", params=params
-        )
-
-    def get_ous(self, gpo_id: str, limit: int = 100, skip: int = 0) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the OUs that this GPO applies to.
-
-        Args:
-            gpo_id: The ID of the GPO to query
-            limit: Maximum number of OUs to return
-            skip: Number of OUs to skip for pagination
-
-        Returns:
-            Dictionary with data (list of OUs) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/gpos/{gpo_id}/ous", params=params
-        )
-
-    def get_tier_zeros(
-        self, gpo_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the Tier zero security principals that this GPO applies to.
-
-        Args:
-            gpo_id: The ID of the GPO to query
-            limit: Maximum number of Tier 0s to return
-            skip: Number of Tier 0s to skip for pagination
-
-        Returns:
-            Dictionary with data (list of Tier 0s) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/gpos/{gpo_id}/tier-zeros", params=params
-        )
-
-    def get_users(self, gpo_id: str, limit: int = 100, skip: int = 0) -> Dict[str, Any]:
-        """
-        Get a list, graph, or count of the users that this GPO applies to.
-
-        Args:
-            gpo_id: The ID of the GPO to query
-            limit: Maximum number of users to return
-            skip: Number of users to skip for pagination
-
-        Returns:
-            Dictionary with data (list of users) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/gpos/{gpo_id}/users", params=params
-        )
-
-
-class GraphClient:
-    """Client for Graph related Bloodhound API Endpoints"""
-
-    def __init__(self, base_client: BloodhoundBaseClient):
-        self.base_client = base_client
-
-    # I am getting a 401 error when searching for some objects and it works on others
-    # for example if i search for Domain Admins it fails with a 401 error but if i search for TargetUserB it works fine
-    def search(self, query: str, search_type: str = "fuzzy") -> Dict[str, Any]:
-        """
-        Search for nodes in the graph by name
-
-        Args:
-            query: Search query text
-            search_type: Type of search strategy ('fuzzy' or 'exact')
-
-        Returns:
-            Search results
-        """
-        params = {"query": query, "type": search_type}
-        return self.base_client.request("GET", "/api/v2/graph-search", params=params)
-
-    def get_shortest_path(
-        self, start_node: str, end_node: str, relationship_kinds: Optional[str] = None
-    ) -> Dict[str, Any]:
-        """
-        Get the shortest path between two nodes in the graph
-
-        Args:
-            start_node: The object ID of the starting node
-            end_node: The object ID of the ending node
-            relationship_kinds: Optional filter for relationship types
-
-        Returns:
-            Graph data of the shortest path
-        """
-        params = {"start_node": start_node, "end_node": end_node}
-
-        if relationship_kinds:
-            params["relationshipkinds"] = relationship_kinds
-
-        return self.base_client.request(
-            "GET", "/api/v2/graphs/shortest-path", params=params
-        )
-
-    def get_edge_composition(
-        self, source_node: int, target_node: int, edge_type: str
-    ) -> Dict[str, Any]:
-        """
-        Get the composition of a complex edge between two nodes
-
-        Args:
-            source_node: ID of the source node
-            target_node: ID of the target node
-            edge_type: Type of edge to analyze
-
-        Returns:
-            Graph data showing the composition of the edge
-        """
-        params = {
-            "sourcenode": source_node,
-            "targetnode": target_node,
-            "edgetype": edge_type,
-        }
-
-        return self.base_client.request(
-            "GET", "/api/v2/graphs/edge-composition", params=params
-        )
-
-    def get_relay_targets(
-        self, source_node: int, target_node: int, edge_type: str
-    ) -> Dict[str, Any]:
-        """
-        Get nodes that are valid relay targets for a given edge
-
-        Args:
-            source_node: ID of the source node
-            target_node: ID of the target node
-            edge_type: Type of edge
-
-        Returns:
-            Graph data with valid relay targets
-        """
-        params = {
-            "sourcenode": source_node,
-            "targetnode": target_node,
-            "edgetype": edge_type,
-        }
-
-        return self.base_client.request(
-            "GET", "/api/v2/graphs/relay-targets", params=params
-        )
-
-
-class ADCSClient:
-    """Client for ADCS-related Bloodhound API endpoints"""
-
-    def __init__(self, base_client: BloodhoundBaseClient):
-        self.base_client = base_client
-
-    # Certificate Templates methods
-    def get_cert_template_info(self, template_id: str) -> Dict[str, Any]:
-        """
-        Get information about a specific Certificate Template
-
-        Args:
-            template_id: The ID of the Certificate Template to query
-
-        Returns:
-            Certificate Template information dictionary
-        """
-        return self.base_client.request("GET", f"/api/v2/certtemplates/{template_id}")
-
-    def get_cert_template_controllers(
-        self, template_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get controllers of a specific Certificate Template
-
-        Args:
-            template_id: The ID of the Certificate Template to query
-            limit: Maximum number of controllers to return
-            skip: Number of controllers to skip for pagination
-
-        Returns:
-            Dictionary with data (list of controllers) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/certtemplates/{template_id}/controllers", params=params
-        )
-
-    # Root Certificate Authorities methods
-    def get_root_ca_info(self, ca_id: str) -> Dict[str, Any]:
-        """
-        Get information about a specific Root Certificate Authority
-
-        Args:
-            ca_id: The ID of the Root CA to query
-
-        Returns:
-            Root CA information dictionary
-        """
-        return self.base_client.request("GET", f"/api/v2/rootcas/{ca_id}")
-
-    def get_root_ca_controllers(
-        self, ca_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get controllers of a specific Root Certificate Authority
-
-        Args:
-            ca_id: The ID of the Root CA to query
-            limit: Maximum number of controllers to return
-            skip: Number of controllers to skip for pagination
-
-        Returns:
-            Dictionary with data (list of controllers) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/rootcas/{ca_id}/controllers", params=params
-        )
-
-    # Enterprise Certificate Authorities methods
-    def get_enterprise_ca_info(self, ca_id: str) -> Dict[str, Any]:
-        """
-        Get information about a specific Enterprise Certificate Authority
-
-        Args:
-            ca_id: The ID of the Enterprise CA to query
-
-        Returns:
-            Enterprise CA information dictionary
-        """
-        return self.base_client.request("GET", f"/api/v2/enterprisecas/{ca_id}")
-
-    def get_enterprise_ca_controllers(
-        self, ca_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get controllers of a specific Enterprise Certificate Authority
-
-        Args:
-            ca_id: The ID of the Enterprise CA to query
-            limit: Maximum number of controllers to return
-            skip: Number of controllers to skip for pagination
-
-        Returns:
-            Dictionary with data (list of controllers) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/enterprisecas/{ca_id}/controllers", params=params
-        )
-
-    # AIA Certificate Authorities methods
-    def get_aia_ca_controllers(
-        self, ca_id: str, limit: int = 100, skip: int = 0
-    ) -> Dict[str, Any]:
-        """
-        Get controllers of a specific AIA Certificate Authority
-
-        Args:
-            ca_id: The ID of the AIA CA to query
-            limit: Maximum number of controllers to return
-            skip: Number of controllers to skip for pagination
-
-        Returns:
-            Dictionary with data (list of controllers) and count (total number)
-        """
-        params = {"limit": limit, "skip": skip, "type": "list"}
-        return self.base_client.request(
-            "GET", f"/api/v2/aia-cas/{ca_id}/controllers", params=params
-        )
-
-
-class CypherClient:
-    """Client for Cypher query related BloodHound API endpoints"""
-
-    def __init__(self, base_client: BloodhoundBaseClient):
-        self.base_client = base_client
-
-    def run_query(self, query: str, include_properties: bool = True) -> Dict[str, Any]:
-        """
-        Run a custom Cypher query directly against the database
-
-        Args:
-            query: The Cypher query to execute
-            include_properties: Whether to include node/edge properties in response
-
-        Returns:
-            Dictionary with graph data (nodes and edges)
-
-        Important: Since you're using BloodHound CE, you need to ensure you have the
-        correct endpoint for running Cypher queries. This might be /api/v2/graphs/cypher
-        based on the Swagger file.
-        """
-        data = {"query": query, "includeproperties": include_properties}
-        return self.base_client.request("POST", "/api/v2/graphs/cypher", data=data)
-
-    def list_saved_queries(
-        self,
-        skip: int = 0,
-        limit: int = 100,
-        sort_by: str = None,
-        name: str = None,
-        query: str = None,
-        user_id: str = None,
-        scope: str = None,
-    ) -> Dict[str, Any]:
-        """
-        List saved Cypher queries
-
-        Args:
-            skip: Number of queries to skip
-            limit: Maximum queries to return
-            sort_by: Field to sort by (userid, name, query, id, createdat)
-            name: Filter by query name
-            query: Filter by query string
-            user_id: Filter by user ID
-            scope: Filter by scope
-
-        Returns:
-            Dictionary with array of saved queries
-        """
-        params = {"skip": skip, "limit": limit}
-
-        if sort_by:
-            params["sortby"] = sort_by
-        if name:
-            params["name"] = name
-        if query:
-            params["query"] = query
-        if user_id:
-            params["userid"] = user_id
-        if scope:
-            params["scope"] = scope
-
-        return self.base_client.request("GET", "/api/v2/saved-queries", params=params)
-
-    def create_saved_query(self, name: str, query: str) -> Dict[str, Any]:
-        """
-        Create a new saved Cypher query
-
-        Args:
-            name: Name of the saved query
-            query: The Cypher query to save
-
-        Returns:
-            Dictionary with the created saved query
-        """
-        data = {"name": name, "query": query}
-        return self.base_client.request("POST", "/api/v2/saved-queries", data=data)
-
-    def update_saved_query(
-        self, query_id: int, name: str = None, query: str = None
-    ) -> Dict[str, Any]:
-        """
-        Update an existing saved query
-
-        Args:
-            query_id: ID of the saved query to update
-            name: New name for the query (optional)
-            query: New query string (optional)
-
-        Returns:
-            Dictionary with the updated saved query
-        """
-        data = {}
-        if name:
-            data["name"] = name
-        if query:
-            data["query"] = query
-
-        return self.base_client.request(
-            "PUT", f"/api/v2/saved-queries/{query_id}", data=data
-        )
-
-    def delete_saved_query(self, query_id: int) -> None:
-        """
-        Delete a saved query
-
-        Args:
-            query_id: ID of the saved query to delete
-        """
-        self.base_client.request("DELETE", f"/api/v2/saved-queries/{query_id}")
-
-    def share_saved_query(
-        self, query_id: int, user_ids: List[str] = None, public: bool = False
-    ) -> Dict[str, Any]:
-        """
-        Share a saved query with users or make it public
-
-        Args:
-            query_id: ID of the saved query to share
-            user_ids: List of user IDs to share with
-            public: Whether to make the query public
+            query_id: ID of the saved query to share
+            user_ids: List of user IDs to share with
+            public: Whether to make the query public
 
         Returns:
             Dictionary with sharing information
@@ -1846,3 +685,66 @@ class CypherClient:
         self.base_client.request(
             "DELETE", f"/api/v2/saved-queries/{query_id}/permissions", data=data
         )
+
+
+def make_client_method(endpoint: Endpoint) -> Callable[..., Dict[str, Any]]:
+    """Build the resource client method for a table endpoint"""
+    scope = SCOPES[endpoint.scope]
+    kind = inspect.Parameter.POSITIONAL_OR_KEYWORD
+    params = [
+        inspect.Parameter("self", kind),
+        inspect.Parameter(scope.id_param, kind, annotation=str),
+    ]
+    args = [f"    {scope.id_param}: The ID of the {scope.label} to query"]
+    if endpoint.paginated:
+        params.append(inspect.Parameter("limit", kind, default=100, annotation=int))
+        params.append(inspect.Parameter("skip", kind, default=0, annotation=int))
+        args.append(f"    limit: Maximum number of {endpoint.noun} to return")
+        args.append(f"    skip: Number of {endpoint.noun} to skip for pagination")
+        summary = f"Get {endpoint.noun} for a specific {scope.label}"
+        returns = f"Dictionary with data (list of {endpoint.noun}) and count"
+    else:
+        summary = f"Get information about a specific {scope.label}"
+        returns = f"Dictionary with {scope.label} information"
+    signature = inspect.Signature(params, return_annotation=Dict[str, Any])
+
+    def method(*args, **kwargs):
+        # Accept the arguments as advertised, e.g. get_info(user_id="S-1")
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+        self, object_id = arguments["self"], arguments[scope.id_param]
+        request_args = {}
+        params = endpoint.params(
+            limit=arguments.get("limit", 100), skip=arguments.get("skip", 0)
+        )
+        if params is not None:
+            request_args["params"] = params
+        if not endpoint.cacheable:
+            request_args["cacheable"] = False
+        return self.base_client.request("GET", endpoint.uri(object_id), **request_args)
+
+    method.__name__ = endpoint.method.split(".")[1]
+    method.__qualname__ = method.__name__
+    method.__signature__ = signature
+    method.__doc__ = (
+        f"{summary}\n\nArgs:\n" + "\n".join(args) + f"\n\nReturns:\n    {returns}"
+    )
+    return method
+
+
+# Resource clients whose per-object methods are generated from lib/endpoints.py
+RESOURCE_CLIENTS = {
+    "domains": DomainClient,
+    "users": UserClient,
+    "groups": GroupClient,
+    "computers": ComputerClient,
+    "ous": OUsClient,
+    "gpos": GPOsClient,
+    "adcs": ADCSClient,
+}
+
+for _endpoint in ENDPOINTS:
+    _resource, _name = _endpoint.method.split(".")
+    setattr(RESOURCE_CLIENTS[_resource], _name, make_client_method(_endpoint))
+del _endpoint, _resource, _name
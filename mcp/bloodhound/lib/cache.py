@@ -0,0 +1,150 @@
+# cache.py
+"""
+Response cache backends for the BloodHound API client.
+
+The memory backend is private to a single process. The SQLite backend lives in
+a file, so every worker process serving the same HTTP listener shares it.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+DEFAULT_TTL = 60.0
+
+
+class MemoryCache:
+    """In-process LRU cache with per-entry expiry"""
+
+    def __init__(self, default_ttl: float = DEFAULT_TTL, max_entries: int = 1024):
+        """
+        Initialize the memory cache
+
+        Args:
+            default_ttl: Seconds an entry stays valid when no TTL is given
+            max_entries: Maximum number of entries kept before evicting the oldest
+        """
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value under key for ttl seconds"""
+        expires = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+
+
+class SqliteCache:
+    """File-backed cache that can be shared between worker processes"""
+
+    def __init__(self, path: str, default_ttl: float = DEFAULT_TTL):
+        """
+        Initialize the SQLite cache
+
+        Args:
+            path: Path of the database file (created if missing)
+            default_ttl: Seconds an entry stays valid when no TTL is given
+        """
+        self.path = path
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            # WAL lets readers in other workers proceed while one worker writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired"""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value, expires FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires = row
+        if expires < time.time():
+            with conn:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value under key for ttl seconds"""
+        expires = time.time() + (self.default_ttl if ttl is None else ttl)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires),
+            )
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM cache")
+
+
+def create_cache(url: Optional[str], default_ttl: float = DEFAULT_TTL):
+    """
+    Create a cache backend from a URL
+
+    Args:
+        url: One of "none", "memory://" or "sqlite:///path/to/cache.sqlite3"
+        default_ttl: Seconds an entry stays valid when no TTL is given
+
+    Returns:
+        A cache backend, or None when caching is disabled
+    """
+    if not url or url == "none":
+        return None
+    if url == "memory://":
+        return MemoryCache(default_ttl=default_ttl)
+    if url.startswith("sqlite://"):
+        path = url[len("sqlite://") :]
+        # sqlite:///abs/path keeps the leading slash, sqlite://rel/path does not
+        return SqliteCache(path, default_ttl=default_ttl)
+    raise ValueError(
+        f"Unsupported cache URL '{url}'. Use 'none', 'memory://' or 'sqlite:///path'"
+    )
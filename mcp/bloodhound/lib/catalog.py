@@ -0,0 +1,83 @@
+# catalog.py
+"""
+Tool catalog fingerprint for the BloodHound MCP server.
+
+Listing ~90 tool schemas is the largest message a client receives from this
+server, and it never changes between releases. The server therefore advertises
+a fingerprint of its tool catalog in the initialize response, as the
+experimental "toolCatalog" capability, so clients can reuse a catalog they
+listed before and only list the tools again when the fingerprint changes.
+
+The fingerprint is a SHA-256 over the name, description and input schema of
+every tool, so every worker process of one release advertises the same value.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.tools import Tool
+
+CAPABILITY = "toolCatalog"
+
+
+def tool_fingerprint(tools: Iterable[Tool]) -> str:
+    """Fingerprint of a tool catalog; independent of registration order"""
+    catalog = sorted(
+        (
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "inputSchema": tool.parameters,
+            }
+            for tool in tools
+        ),
+        key=lambda entry: entry["name"],
+    )
+    encoded = json.dumps(catalog, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CatalogFingerprint:
+    """Computes the server's fingerprint, again only when its tools change"""
+
+    def __init__(self, server: FastMCP):
+        self.server = server
+        self._key: Optional[Tuple[int, ...]] = None
+        self._fingerprint = ""
+
+    def __call__(self) -> str:
+        tools = self.server._tool_manager.list_tools()
+        key = tuple(id(tool) for tool in tools)
+        if key != self._key:
+            self._fingerprint = tool_fingerprint(tools)
+            self._key = key
+        return self._fingerprint
+
+
+def advertise_tool_fingerprint(server: FastMCP) -> CatalogFingerprint:
+    """
+    Add the tool catalog fingerprint to the server's initialize response
+
+    Every transport builds its initialization options through the low-level
+    server's create_initialization_options(), so wrapping it covers stdio, SSE
+    and streamable HTTP alike.
+
+    Returns:
+        The fingerprint source, for diagnostics and tests
+    """
+    fingerprint = CatalogFingerprint(server)
+    lowlevel = server._mcp_server
+    create_initialization_options = lowlevel.create_initialization_options
+
+    def with_fingerprint(
+        notification_options=None,
+        experimental_capabilities: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
+        experimental = dict(experimental_capabilities or {})
+        experimental[CAPABILITY] = {"fingerprint": fingerprint()}
+        return create_initialization_options(notification_options, experimental)
+
+    lowlevel.create_initialization_options = with_fingerprint
+    return fingerprint
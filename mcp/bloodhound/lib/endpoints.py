@@ -0,0 +1,819 @@
+# endpoints.py
+"""
+Declarative table of the BloodHound per-object endpoints.
+
+Every entry becomes one client method in bloodhound_api.py and one tool in
+main.py. An endpoint either returns a single object ("info" endpoints, noun is
+None) or a paginated list of related objects described by noun (e.g.
+"administrative rights"). Query parameters, messages, error texts and the Args
+section of the tool description are derived from the scope and noun, so
+adding an endpoint is one table row.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Scope:
+    """The kind of object an endpoint is called on"""
+
+    id_param: str  # Tool argument carrying the object ID
+    label: str  # Used in messages, e.g. "user" or "Certificate Template"
+    phrase: str  # Completes "Found N <noun> ...", e.g. "for the user"
+
+
+SCOPES: Dict[str, Scope] = {
+    "domain": Scope("domain_id", "domain", "in the domain"),
+    "user": Scope("user_id", "user", "for the user"),
+    "group": Scope("group_id", "group", "for the group"),
+    "computer": Scope("computer_id", "computer", "for the computer"),
+    "ou": Scope("ou_id", "OU", "for the OU"),
+    "gpo": Scope("gpo_id", "GPO", "for the GPO"),
+    "cert_template": Scope(
+        "template_id", "Certificate Template", "for the Certificate Template"
+    ),
+    "root_ca": Scope("ca_id", "Root CA", "for the Root CA"),
+    "enterprise_ca": Scope("ca_id", "Enterprise CA", "for the Enterprise CA"),
+    "aia_ca": Scope("ca_id", "AIA CA", "for the AIA CA"),
+}
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """One BloodHound endpoint exposed as an MCP tool"""
+
+    tool: str  # MCP tool name
+    method: str  # Client method as "<resource client>.<method>"
+    path: str  # URI template, formatted with the scope's id_param
+    scope: str  # Key into SCOPES
+    noun: Optional[str]  # What a paginated endpoint lists; None for info endpoints
+    summary: str  # Tool description shown to the LLM, without the Args section
+    counts: bool = False  # Ask info endpoints for relationship counts
+    cacheable: bool = True  # Responses may be served from the client cache
+    key: Optional[str] = None  # Result key, when not derived from the tool name
+    listed: Optional[str] = None  # Noun in the Args section, when not the noun
+
+    @property
+    def paginated(self) -> bool:
+        return self.noun is not None
+
+    def uri(self, object_id: str) -> str:
+        """Request URI for the given object"""
+        return self.path.format(**{SCOPES[self.scope].id_param: object_id})
+
+    def params(self, limit: int = 100, skip: int = 0) -> Optional[Dict[str, Any]]:
+        """Query parameters for a request to this endpoint"""
+        if self.paginated:
+            return {"limit": limit, "skip": skip, "type": "list"}
+        if self.counts:
+            return {"counts": "true"}
+        return None
+
+    @property
+    def result_key(self) -> str:
+        """JSON key holding the result, e.g. "user_admin_rights" """
+        return self.key or self.tool[len("get_") :]
+
+    @property
+    def subject(self) -> str:
+        """What the tool retrieves, used in error messages"""
+        scope = SCOPES[self.scope]
+        if not self.paginated:
+            return f"{scope.label} information"
+        if self.scope == "domain":
+            return self.noun
+        return f"{scope.label} {self.noun}"
+
+    @property
+    def description(self) -> str:
+        """Full tool description including the Args section"""
+        scope = SCOPES[self.scope]
+        args = [f"    {scope.id_param}: The ID of the {scope.label} to query"]
+        if self.paginated:
+            listed = self.listed or self.noun
+            args.append(
+                f"    limit: Maximum number of {listed} to return (default: 100)"
+            )
+            args.append(
+                f"    skip: Number of {listed} to skip for pagination (default: 0)"
+            )
+        return f"{self.summary}\n\nArgs:\n" + "\n".join(args)
+
+    def message(self, result: dict, object_id: str) -> str:
+        """Human readable summary of a successful call"""
+        scope = SCOPES[self.scope]
+        if not self.paginated:
+            label = scope.label[0].upper() + scope.label[1:]
+            return f"{label} information for {result.get('name', object_id)}"
+        return f"Found {result.get('count', 0)} {self.noun} {scope.phrase}"
+
+
+ENDPOINTS: Tuple[Endpoint, ...] = (
+    Endpoint(
+        "get_users",
+        "domains.get_users",
+        "/api/v2/domains/{domain_id}/users",
+        "domain",
+        "users",
+        "Retrieves users from a specific domain in the Bloodhound database.",
+    ),
+    Endpoint(
+        "get_groups",
+        "domains.get_groups",
+        "/api/v2/domains/{domain_id}/groups",
+        "domain",
+        "groups",
+        "Retrieves groups from a specific domain in the Bloodhound database.",
+    ),
+    Endpoint(
+        "get_computers",
+        "domains.get_computers",
+        "/api/v2/domains/{domain_id}/computers",
+        "domain",
+        "computers",
+        "Retrieves computers from a specific domain in the Bloodhound database.",
+    ),
+    Endpoint(
+        "get_security_controllers",
+        "domains.get_controllers",
+        "/api/v2/domains/{domain_id}/controllers",
+        "domain",
+        "controllers",
+        "Retrieves security principals that have control relationships over other objects in the domain.\n"
+        "\n"
+        'In Bloodhound terminology, a "controller" is any security principal (user, group, computer)\n'
+        "that has some form of control relationship (like AdminTo, WriteOwner, GenericAll, etc.)\n"
+        "over another security object in the domain. These are NOT domain controllers (AD servers),\n"
+        "but rather represent control edges in the graph.\n"
+        "\n"
+        "These control relationships are key for identifying potential attack paths in the domain.\n"
+        "\n"
+        "Example controllers might include:\n"
+        "- A user with AdminTo rights on a computer\n"
+        "- A group with GenericAll rights over another group\n"
+        "- A user with WriteOwner rights over another user",
+        key="controllers",
+        listed="control relationships",
+    ),
+    Endpoint(
+        "get_gpos",
+        "domains.get_gpos",
+        "/api/v2/domains/{domain_id}/gpos",
+        "domain",
+        "GPOs",
+        "Retrieves Group Policy Objects (GPOs) from a specific domain in the Bloodhound database.\n"
+        "GPOs are containers for policy settings that can be applied to users and computers in Active Directory.\n"
+        "These can be abused for persistence and privilege escalation and are key in idenitfying GPO related edges.",
+    ),
+    Endpoint(
+        "get_ous",
+        "domains.get_ous",
+        "/api/v2/domains/{domain_id}/ous",
+        "domain",
+        "OUs",
+        "Retrieves Organizational Units (OUs) from a specific domain in the Bloodhound database.\n"
+        "OUs are containers within a domain that can hold users, groups, computers, and other OUs.\n"
+        "These are key in understanding the structure of the domain.",
+    ),
+    Endpoint(
+        "get_dc_syncers",
+        "domains.get_dc_syncers",
+        "/api/v2/domains/{domain_id}/dc-syncers",
+        "domain",
+        "DC Syncers",
+        'Retrieves security principals (users, groups, computers ) that are given the "GetChanges" and "GetChangesAll" permissions on the domain.\n'
+        "The security principals are therefore able to perform a DCSync attack.\n"
+        "They are are great targets for lateral movement or privilege escalation or domain compromise.",
+    ),
+    Endpoint(
+        "get_foreign_admins",
+        "domains.get_foreign_admins",
+        "/api/v2/domains/{domain_id}/foreign-admins",
+        "domain",
+        "foreign admins",
+        "Retrieves foreign admins from a specific domain in the Bloodhound database.\n"
+        ' "Foreign Admins" are defined as security principals (users, groups, or computers) from one domain that have administrative privileges in another domain within the same forest.\n'
+        "These are potential targets for lateral movement and privilege escalation as well as cross domain compromise.",
+    ),
+    Endpoint(
+        "get_foreign_gpo_controllers",
+        "domains.get_foreign_gpo_controllers",
+        "/api/v2/domains/{domain_id}/foreign-gpo-controllers",
+        "domain",
+        "foreign GPO controllers",
+        "Retrieves foreign GPO controllers from a specific domain in the Bloodhound database.\n"
+        '"Foreign GPO Controllers" are defined as security principals (users, groups, or computers) from one domain that have the ability to modify or control Group Policy Objects (GPOs) in another domain within the same forest\n'
+        "These are potential targets for lateral movement and privilege escalation as well as cross domain compromise.",
+    ),
+    Endpoint(
+        "get_foreign_groups",
+        "domains.get_foreign_groups",
+        "/api/v2/domains/{domain_id}/foreign-groups",
+        "domain",
+        "foreign groups",
+        "Retrieves foreign groups from a specific domain in the Bloodhound database.\n"
+        '"Foreign Groups" are defined as security groups from one domain that have members from another domain within the same forest. They represent cross-domain group memberships in Active Directory.\n'
+        "These are potential targets for lateral movement and privilege escalation as well as cross domain compromise.",
+    ),
+    Endpoint(
+        "get_foreign_users",
+        "domains.get_foreign_users",
+        "/api/v2/domains/{domain_id}/foreign-users",
+        "domain",
+        "foreign users",
+        "Retrieves foreign users from a specific domain in the Bloodhound database.\n"
+        '"Foreign Users" are defined as user accounts from one domain that are referenced in another domain within the same forest. These represent user accounts that have some form of relationship or access across domain boundaries.\n'
+        "These are potential targets for lateral movement and privilege escalation as well as cross domain compromise.",
+    ),
+    Endpoint(
+        "get_inbound_trusts",
+        "domains.get_inbound_trusts",
+        "/api/v2/domains/{domain_id}/inbound-trusts",
+        "domain",
+        "inbound trusts",
+        "Retrieves inbound trusts from a specific domain in the Bloodhound database.\n"
+        '"Inbound Trusts" are defined as trust relationships where the domain is the trusted domain and other domains trust it.\n'
+        "These are potential targets for moving to other external domains or other domains within the forest",
+    ),
+    Endpoint(
+        "get_linked_gpos",
+        "domains.get_linked_gpos",
+        "/api/v2/domains/{domain_id}/linked-gpos",
+        "domain",
+        "linked GPOs",
+        "Retrieves linked GPOs from a specific domain in the Bloodhound database.\n"
+        '"Linked GPOs" are defined as Group Policy Objects that have been linked to or associated with specific Active Directory containers such as domains, organizational units (OUs), or sites\n'
+        "These are potential targets for moving laterally, elevating privileges, or maintaining persistence in the domain.",
+    ),
+    Endpoint(
+        "get_outbound_trusts",
+        "domains.get_outbound_trusts",
+        "/api/v2/domains/{domain_id}/outbound-trusts",
+        "domain",
+        "outbound trusts",
+        "Retrieves outbound trusts from a specific domain in the Bloodhound database.\n"
+        '"Outbound Trusts" are defined as trust relationships where the domain trusts other domains.\n'
+        "These are potential targets for accessing resources within another domain and may provide a path into the domain if the external one has weaker security.",
+    ),
+    Endpoint(
+        "get_user_info",
+        "users.get_info",
+        "/api/v2/users/{user_id}",
+        "user",
+        None,
+        "Retrieves information about a specific user in a specific domain.\n"
+        "This provides a general overview of a user's information including their name, domain, and other attributes.\n"
+        "It can be used to conduct reconnaissance and start formulating and targeting users within the domain",
+        counts=True,
+    ),
+    Endpoint(
+        "get_user_admin_rights",
+        "users.get_admin_rights",
+        "/api/v2/users/{user_id}/admin-rights",
+        "user",
+        "administrative rights",
+        "Retrieves the administrative rights of a specific user in the domain.\n"
+        "Administrative rights are privileges that allow a user to perform administrative tasks on a Security Principal (user, group, or computer) in Active Directory.\n"
+        "These rights can be abused in a variety of ways include lateral movement, persistence, and privilege escalation.",
+    ),
+    Endpoint(
+        "get_user_constrained_delegation_rights",
+        "users.get_constrained_delegation_rights",
+        "/api/v2/users/{user_id}/constrained-delegation-rights",
+        "user",
+        "constrained delegation rights",
+        "Retrieves the constrained delegation rights of a specific user within the domain.\n"
+        "Constrained delegation rights allow a user to impersonate another user or service when communicating with a service on another computer.\n"
+        "These rights can be abused for privilege escalation and lateral movement within the domain.",
+    ),
+    Endpoint(
+        "get_user_controllables",
+        "users.get_controllables",
+        "/api/v2/users/{user_id}/controllables",
+        "user",
+        "controlables",
+        "Retrieves the Security Princiapls within the domain that a specific user has administrative control over in the domain.\n"
+        "These are entities that the user can control and manipulate within the domain.\n"
+        "These are potential targets for lateral movement, privilege escalation, and persistence.",
+        key="user_controlables",
+        listed="controllables",
+    ),
+    Endpoint(
+        "get_user_controllers",
+        "users.get_controllers",
+        "/api/v2/users/{user_id}/controllers",
+        "user",
+        "controllers",
+        "Retrieves the controllers of a specific user in the domain.\n"
+        "Controllers are entities that have control over the specified user\n"
+        "This can be used to help identify paths to gain access to a specific user.",
+    ),
+    Endpoint(
+        "get_user_dcom_rights",
+        "users.get_dcom_rights",
+        "/api/v2/users/{user_id}/dcom-rights",
+        "user",
+        "DCOM rights",
+        "Retrieves the DCOM rights of a specific user within the domain.\n"
+        "DCOM rights allow a user to communicate with COM objects on another computer in the network.\n"
+        "These rights can be abused for privilege escalation and lateral movement within the domain.",
+    ),
+    Endpoint(
+        "get_user_memberships",
+        "users.get_memberships",
+        "/api/v2/users/{user_id}/memberships",
+        "user",
+        "memberships",
+        "Retrieves the group memberships of a specific user within the domain.\n"
+        "Group memberships are the groups that a user is a member of within the domain.\n"
+        "These memberships can be used to identify potential targets for lateral movement and privilege escalation.",
+    ),
+    Endpoint(
+        "get_user_ps_remote_rights",
+        "users.get_ps_remote_rights",
+        "/api/v2/users/{user_id}/ps-remote-rights",
+        "user",
+        "remote PowerShell rights",
+        "Retrieves the remote PowerShell rights of a specific user within the domain.\n"
+        "Remote PowerShell rights allow a user to execute PowerShell commands on a remote computer.\n"
+        "These rights can be abused for lateral movement and privilege escalation within the domain.",
+    ),
+    Endpoint(
+        "get_user_rdp_rights",
+        "users.get_rdp_rights",
+        "/api/v2/users/{user_id}/rdp-rights",
+        "user",
+        "RDP rights",
+        "Retrieves the RDP rights of a specific user within the domain.\n"
+        "RDP rights allow a user to remotely connect to another computer using the Remote Desktop Protocol.\n"
+        "These rights can be abused for lateral movement and privilege escalation within the domain.",
+    ),
+    Endpoint(
+        "get_user_sessions",
+        "users.get_sessions",
+        "/api/v2/users/{user_id}/sessions",
+        "user",
+        "sessions",
+        "Retrieves the active sessions of a specific user within the domain.\n"
+        "Active sessions are the current sessions that a user has within the domain.\n"
+        "These sessions can be used to identify potential targets for lateral movement and privilege escalation.\n"
+        "It can also be used to indentify and plan attack paths within the domain.",
+    ),
+    Endpoint(
+        "get_user_sql_admin_rights",
+        "users.get_sql_admin_rights",
+        "/api/v2/users/{user_id}/sql-admin-rights",
+        "user",
+        "SQL administrative rights",
+        "Retrieves the SQL administrative rights of a specific user within the domain.\n"
+        "SQL administrative rights allow a user to perform administrative tasks on a SQL Server.\n"
+        "These rights can be abused for lateral movement and privilege escalation within the domain.",
+    ),
+    Endpoint(
+        "get_group_info",
+        "groups.get_info",
+        "/api/v2/groups/{group_id}",
+        "group",
+        None,
+        "Retrieves information about a specific group in a specific domain.\n"
+        "This provides a general overview of a group's information including their name, domain, and other attributes.\n"
+        "It can be used to conduct reconnaissance and start formulating and targeting groups within the domain",
+        counts=True,
+    ),
+    Endpoint(
+        "get_group_admin_rights",
+        "groups.get_admin_rights",
+        "/api/v2/groups/{group_id}/admin-rights",
+        "group",
+        "administrative rights",
+        "Retrieves the administrative rights of a specific group in the domain.\n"
+        "Administrative rights are privileges that allow a group to perform administrative tasks on a Security Principal (user, group, or computer) in Active Directory.\n"
+        "These rights can be abused in a variety of ways include lateral movement, persistence, and privilege escalation.",
+    ),
+    Endpoint(
+        "get_group_controllables",
+        "groups.get_controllables",
+        "/api/v2/groups/{group_id}/controllables",
+        "group",
+        "controlables",
+        "Retrieves the Security Princiapls within the domain that a specific group has administrative control over in the domain.\n"
+        "These are entities that the group can control and manipulate within the domain.\n"
+        "These are potential targets for lateral movement, privilege escalation, and persistence.",
+        key="group_controlables",
+        listed="controllables",
+    ),
+    Endpoint(
+        "get_group_controllers",
+        "groups.get_controllers",
+        "/api/v2/groups/{group_id}/controllers",
+        "group",
+        "controllers",
+        "Retrieves the controllers of a specific group in the domain.\n"
+        "Controllers are entities that have control over the specified group\n"
+        "This can be used to help identify paths to gain access to a specific group.",
+    ),
+    Endpoint(
+        "get_group_dcom_rights",
+        "groups.get_dcom_rights",
+        "/api/v2/groups/{group_id}/dcom-rights",
+        "group",
+        "DCOM rights",
+        "Retrieves the DCOM rights of a specific group within the domain.\n"
+        "DCOM rights allow a group to communicate with COM objects on another computer in the network.\n"
+        "These rights can be abused for privilege escalation and lateral movement within the domain.",
+    ),
+    Endpoint(
+        "get_group_members",
+        "groups.get_members",
+        "/api/v2/groups/{group_id}/members",
+        "group",
+        "members",
+        "Retrieves the members of a specific group within the domain.\n"
+        "Group members are the users and groups that are members of the specified group.\n"
+        "These memberships can be used to identify potential targets for lateral movement and privilege escalation.",
+    ),
+    Endpoint(
+        "get_group_memberships",
+        "groups.get_memberships",
+        "/api/v2/groups/{group_id}/memberships",
+        "group",
+        "memberships",
+        "Retrieves the group memberships of a specific group within the domain.\n"
+        "Group memberships are the groups that the specified group is a member of within the domain.\n"
+        "These memberships can be used to identify potential targets for lateral movement and privilege escalation.",
+    ),
+    Endpoint(
+        "get_group_ps_remote_rights",
+        "groups.get_ps_remote_rights",
+        "/api/v2/groups/{group_id}/ps-remote-rights",
+        "group",
+        "remote PowerShell rights",
+        "Retrieves the remote PowerShell rights of a specific group within the domain.\n"
+        "Remote PowerShell rights allow a group to execute PowerShell commands on a remote computer.\n"
+        "These rights can be abused for lateral movement and privilege escalation within the domain.",
+    ),
+    Endpoint(
+        "get_group_rdp_rights",
+        "groups.get_rdp_rights",
+        "/api/v2/groups/{group_id}/rdp-rights",
+        "group",
+        "RDP rights",
+        "Retrieves the RDP rights of a specific group within the domain.\n"
+        "RDP rights allow a group to remotely connect to another computer using the Remote Desktop Protocol.\n"
+        "These rights can be abused for lateral movement and privilege escalation within the domain.",
+    ),
+    Endpoint(
+        "get_group_sessions",
+        "groups.get_sessions",
+        "/api/v2/groups/{group_id}/sessions",
+        "group",
+        "sessions",
+        "Retrieves the active sessions of the members of a specific group within the domain.\n"
+        "Active sessions are the current sessions that hte members of this group have within the domain.\n"
+        "These sessions can be used to identify potential targets for lateral movement and privilege escalation.",
+    ),
+    Endpoint(
+        "get_computer_info",
+        "computers.get_info",
+        "/api/v2/computers/{computer_id}",
+        "computer",
+        None,
+        "Retrieves information about a specific computer in a specific domain.\n"
+        "This provides a general overview of a computer's information including their name, domain, and other attributes.\n"
+        "It can be used to conduct reconnaissance and start formulating and targeting computers within the domain",
+        counts=True,
+    ),
+    Endpoint(
+        "get_computer_admin_rights",
+        "computers.get_admin_rights",
+        "/api/v2/computers/{computer_id}/admin-rights",
+        "computer",
+        "administrative rights",
+        "Retrieves the administrative rights of a specific computer in the domain.\n"
+        "Administrative rights are privileges that allow a computer to perform administrative tasks on a Security Principal (user, group, or computer) in Active Directory.\n"
+        "These rights can be abused in a variety of ways include lateral movement, persistence, and privilege escalation.",
+    ),
+    Endpoint(
+        "get_computer_admin_users",
+        "computers.get_admin_users",
+        "/api/v2/computers/{computer_id}/admin-users",
+        "computer",
+        "administrative users",
+        "Retrieves the administrative users of a specific computer in the domain.\n"
+        "Administrative users are the users that have administrative access to the specified computer.\n"
+        "These users can be used to identify potential targets for lateral movement and privilege escalation.",
+    ),
+    Endpoint(
+        "get_computer_constrained_delegation_rights",
+        "computers.get_constrained_delegation_rights",
+        "/api/v2/computers/{computer_id}/constrained-delegation-rights",
+        "computer",
+        "constrained delegation rights",
+        "Retrieves the constrained delegation rights of a specific computer within the domain.\n"
+        "Constrained delegation rights allow a computer to impersonate another user or service when communicating with a service on another computer.\n"
+        "These rights can be abused for privilege escalation and lateral movement within the domain.",
+    ),
+    Endpoint(
+        "get_computer_constrained_users",
+        "computers.get_constrained_users",
+        "/api/v2/computers/{computer_id}/constrained-users",
+        "computer",
+        "constrained users",
+        "Retrieves the constrained users of a specific computer in the domain.\n"
+        "Constrained users are the users that have constrained delegation access to the specified computer.\n"
+        "These users can be used to identify potential targets for lateral movement and privilege escalation.",
+    ),
+    Endpoint(
+        "get_computer_controllables",
+        "computers.get_controllables",
+        "/api/v2/computers/{computer_id}/controllables",
+        "computer",
+        "controlables",
+        "Retrieves the Security Princiapls within the domain that a specific computer has administrative control over in the domain.\n"
+        "These are entities that the computer can control and manipulate within the domain.\n"
+        "These are potential targets for lateral movement, privilege escalation, and persistence.",
+        key="computer_controlables",
+        listed="controllables",
+    ),
+    Endpoint(
+        "get_computer_controllers",
+        "computers.get_controllers",
+        "/api/v2/computers/{computer_id}/controllers",
+        "computer",
+        "controllers",
+        "Retrieves the controllers of a specific computer in the domain.\n"
+        "Controllers are entities that have control over the specified computer\n"
+        "This can be used to help identify paths to gain access to a specific computer.",
+    ),
+    Endpoint(
+        "get_computer_dcom_rights",
+        "computers.get_dcom_rights",
+        "/api/v2/computers/{computer_id}/dcom-rights",
+        "computer",
+        "DCOM rights",
+        "Retrieves the a list of security principals that a specific computer to execute COM on\n"
+        "DCOM rights allow a computer to communicate with COM objects on another computer in the network.\n"
+        "These rights can be abused for privilege escalation and lateral movement within the domain.",
+    ),
+    Endpoint(
+        "get_computer_dcom_users",
+        "computers.get_dcom_users",
+        "/api/v2/computers/{computer_id}/dcom-users",
+        "computer",
+        "DCOM users",
+        "Retrieves the users that have DCOM rights to a specific computer in the domain.\n"
+        "DCOM rights allow a user to communicate with COM objects on another computer in the network.\n"
+        "These rights can be abused for privilege escalation and lateral movement within the domain.",
+        listed="DCOM rights",
+    ),
+    Endpoint(
+        "get_computer_memberships",
+        "computers.get_group_membership",
+        "/api/v2/computers/{computer_id}/group-membership",
+        "computer",
+        "memberships",
+        "Retrieves the group memberships of a specific computer within the domain.\n"
+        "Group memberships are the groups that the specified computer is a member of within the domain.\n"
+        "These memberships can be used to identify potential targets for lateral movement and privilege escalation.",
+    ),
+    Endpoint(
+        "get_computer_ps_remote_rights",
+        "computers.get_ps_remote_rights",
+        "/api/v2/computers/{computer_id}/ps-remote-rights",
+        "computer",
+        "remote PowerShell rights",
+        "Retrieves a list of hosts that this specific computer has the right to PS remote to\n"
+        "Remote PowerShell rights allow a computer to execute PowerShell commands on a remote computer.\n"
+        "These rights can be abused for lateral movement and privilege escalation within the domain.",
+    ),
+    Endpoint(
+        "get_computer_ps_remote_users",
+        "computers.get_ps_remote_users",
+        "/api/v2/computers/{computer_id}/ps-remote-users",
+        "computer",
+        "remote PowerShell users",
+        "This retieves the users that have PS remote rights to this specific computer in the domain.\n"
+        "Remote PowerShell rights allow a user to execute PowerShell commands on a remote computer.\n"
+        "These rights can be abused for lateral movement and privilege escalation within the domain.",
+        listed="remote PowerShell rights",
+    ),
+    Endpoint(
+        "get_computer_rdp_rights",
+        "computers.get_rdp_rights",
+        "/api/v2/computers/{computer_id}/rdp-rights",
+        "computer",
+        "RDP rights",
+        "Retrieves a list of hosts that this specific computer has the right to RDP to\n"
+        "RDP rights allow a computer to remotely connect to another computer using the Remote Desktop Protocol.\n"
+        "These rights can be abused for lateral movement and privilege escalation within the domain.",
+    ),
+    Endpoint(
+        "get_computer_rdp_users",
+        "computers.get_rdp_users",
+        "/api/v2/computers/{computer_id}/rdp-users",
+        "computer",
+        "RDP users",
+        "This retieves the users that have RDP rights to this specific computer in the domain.\n"
+        "RDP rights allow a user to remotely connect to another computer using the Remote Desktop Protocol.\n"
+        "These rights can be abused for lateral movement and privilege escalation within the domain.",
+        listed="RDP rights",
+    ),
+    Endpoint(
+        "get_computer_sessions",
+        "computers.get_sessions",
+        "/api/v2/computers/{computer_id}/sessions",
+        "computer",
+        "sessions",
+        "Retrieves the active sessions of a specific computer within the domain.\n"
+        "Active sessions are the current sessions that a computer has within the domain.\n"
+        "These sessions can be used to identify potential targets for lateral movement and privilege escalation.\n"
+        "These sessions can also be used to formulate and inform on attack paths because if a user has an active session on a host their credentials are cached in memory",
+    ),
+    Endpoint(
+        "get_computer_sql_admin_rights",
+        "computers.get_sql_admins",
+        "/api/v2/computers/{computer_id}/sql-admins",
+        "computer",
+        "SQL administrative rights",
+        "Retrieves the SQL administrative rights of a specific computer within the domain.\n"
+        "SQL administrative rights allow a computer to perform administrative tasks on a SQL Server.\n"
+        "These rights can be abused for lateral movement and privilege escalation within the domain.",
+    ),
+    Endpoint(
+        "get_ou_info",
+        "ous.get_info",
+        "/api/v2/ous/{ou_id}",
+        "ou",
+        None,
+        "Retrieves information about a specific OU in a specific domain.\n"
+        "This provides a general overview of an OU's information including their name, domain, and other attributes.\n"
+        "It can be used to conduct reconnaissance and start formulating and targeting OUs within the domain",
+        counts=True,
+    ),
+    Endpoint(
+        "get_ou_computers",
+        "ous.get_computers",
+        "/api/v2/ous/{ou_id}/computers",
+        "ou",
+        "computers",
+        "Retrieves the computers within a specific OU in the domain.\n"
+        "This can be used to identify potential targets for lateral movement and privilege escalation.",
+    ),
+    Endpoint(
+        "get_ou_groups",
+        "ous.get_groups",
+        "/api/v2/ous/{ou_id}/groups",
+        "ou",
+        "groups",
+        "Retrieves the list of groups contained within the specific Organizational Unit\n"
+        "This can be used to identify potential targets for lateral movemner and privilege escalation\n"
+        "This can also be used to help identify attack paths",
+    ),
+    Endpoint(
+        "get_ou_gpos",
+        "ous.get_gpos",
+        "/api/v2/ous/{ou_id}/gpos",
+        "ou",
+        "GPOs",
+        "Retrieves the GPOs within a specific OU in the domain.\n"
+        "This can be used to identify potential targets for lateral movement and privilege escalation.",
+    ),
+    Endpoint(
+        "get_ou_users",
+        "ous.get_users",
+        "/api/v2/ous/{ou_id}/users",
+        "ou",
+        "users",
+        "Retrieves the users within a specific OU in the domain.\n"
+        "This can be used to identify potential targets for lateral movement and privilege escalation.",
+    ),
+    Endpoint(
+        "get_gpo_info",
+        "gpos.get_info",
+        "/api/v2/gpos/{gpo_id}",
+        "gpo",
+        None,
+        "Retrieves information about a specific GPO in a specific domain.\n"
+        "This provides a general overview of a GPO's information including their name, domain, and other attributes.\n"
+        "It can be used to conduct reconnaissance and start formulating and targeting GPOs within the domain",
+        counts=True,
+    ),
+    Endpoint(
+        "get_gpo_computers",
+        "gpos.get_computer",
+        "/api/v2/gpos/{gpo_id}/computers",
+        "gpo",
+        "computers",
+        "Retrieves the computers within a specific GPO in the domain.\n"
+        "This can be used to identify potential targets for lateral movement and privilege escalation.",
+    ),
+    Endpoint(
+        "get_gpo_controllers",
+        "gpos.get_controllers",
+        "/api/v2/gpos/{gpo_id}/controllers",
+        "gpo",
+        "controllers",
+        "Retrieves the controllers of a specific GPO in the domain.\n"
+        "Controllers are entities that have control over the specified GPO\n"
+        "This can be used to help identify paths to gain access to a specific GPO.",
+    ),
+    Endpoint(
+        "get_gpo_ous",
+        "gpos.get_ous",
+        "/api/v2/gpos/{gpo_id}/ous",
+        "gpo",
+        "OUs",
+        "Retrieves the OUs that are linked to a specific GPO in the domain.\n"
+        "This can be used to identify potential targets for lateral movement and privilege escalation.",
+    ),
+    Endpoint(
+        "get_gpo_tier_zeros",
+        "gpos.get_tier_zeros",
+        "/api/v2/gpos/{gpo_id}/tier-zeros",
+        "gpo",
+        "Tier 0 groups",
+        "Retrieves the Tier 0 groups that are linked to a specific GPO in the domain.\n"
+        "Tier 0 groups are the highest privileged groups in the domain and have access to all resources.\n"
+        "This can be used to identify potential targets for lateral movement and privilege escalation.",
+    ),
+    Endpoint(
+        "get_gpo_users",
+        "gpos.get_users",
+        "/api/v2/gpos/{gpo_id}/users",
+        "gpo",
+        "users",
+        "Retrieves the users within a specific GPO in the domain.\n"
+        "This can be used to identify potential targets for lateral movement and privilege escalation.",
+    ),
+    Endpoint(
+        "get_cert_template_info",
+        "adcs.get_cert_template_info",
+        "/api/v2/certtemplates/{template_id}",
+        "cert_template",
+        None,
+        "Retrieves information about a specific Certificate Template.\n"
+        "Certificate Templates define the properties and security settings for certificates that can be issued.\n"
+        "They can be abused for privilege escalation if misconfigured.",
+    ),
+    Endpoint(
+        "get_cert_template_controllers",
+        "adcs.get_cert_template_controllers",
+        "/api/v2/certtemplates/{template_id}/controllers",
+        "cert_template",
+        "controllers",
+        "Retrieves the controllers of a specific Certificate Template.\n"
+        "Controllers are security principals that can modify the Certificate Template or its properties.\n"
+        "This is critical for identifying ESC2 vulnerabilities (vulnerable Certificate Template access control).",
+    ),
+    Endpoint(
+        "get_root_ca_info",
+        "adcs.get_root_ca_info",
+        "/api/v2/rootcas/{ca_id}",
+        "root_ca",
+        None,
+        "Retrieves information about a specific Root Certificate Authority.\n"
+        "Root CAs are the foundation of trust in a PKI infrastructure.\n"
+        "Controlling a Root CA allows an attacker to issue trusted certificates.",
+    ),
+    Endpoint(
+        "get_root_ca_controllers",
+        "adcs.get_root_ca_controllers",
+        "/api/v2/rootcas/{ca_id}/controllers",
+        "root_ca",
+        "controllers",
+        "Retrieves the controllers of a specific Root Certificate Authority.\n"
+        "Controllers of a Root CA can compromise the entire PKI infrastructure.\n"
+        "This is critical for identifying ESC4 and ESC5 attack paths.",
+    ),
+    Endpoint(
+        "get_enterprise_ca_info",
+        "adcs.get_enterprise_ca_info",
+        "/api/v2/enterprisecas/{ca_id}",
+        "enterprise_ca",
+        None,
+        "Retrieves information about a specific Enterprise Certificate Authority.\n"
+        "Enterprise CAs issue certificates within the organization based on Certificate Templates.\n"
+        "They are critical components in the Active Directory PKI infrastructure.",
+    ),
+    Endpoint(
+        "get_enterprise_ca_controllers",
+        "adcs.get_enterprise_ca_controllers",
+        "/api/v2/enterprisecas/{ca_id}/controllers",
+        "enterprise_ca",
+        "controllers",
+        "Retrieves the controllers of a specific Enterprise Certificate Authority.\n"
+        "Controllers of an Enterprise CA can issue arbitrary certificates and potentially compromise the domain.\n"
+        "This is critical for identifying ESC3 and ESC6 attack paths.",
+    ),
+    Endpoint(
+        "get_aia_ca_controllers",
+        "adcs.get_aia_ca_controllers",
+        "/api/v2/aia-cas/{ca_id}/controllers",
+        "aia_ca",
+        "controllers",
+        "Retrieves the controllers of a specific AIA Certificate Authority.\n"
+        "AIA (Authority Information Access) CAs provide additional trust information.\n"
+        "Controllers of an AIA CA may be able to perform certificate-based attacks.",
+    ),
+)
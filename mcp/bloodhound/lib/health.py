@@ -0,0 +1,103 @@
+# health.py
+"""
+Background health probe for the BloodHound API.
+
+The server must start serving without waiting on BloodHound, so connectivity
+is checked on a daemon thread and the latest result is kept for the
+bloodhound://status resource.
+"""
+import datetime
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from lib.bloodhound_api import BloodhoundAuthError
+
+logger = logging.getLogger(__name__)
+
+STATUS_STARTING = "starting"
+STATUS_OK = "ok"
+STATUS_UNREACHABLE = "unreachable"
+STATUS_MISCONFIGURED = "misconfigured"
+
+
+class HealthProbe:
+    """Periodically checks the BloodHound API and records the outcome"""
+
+    def __init__(self, check: Callable[[], Any], interval: float = 60.0):
+        """
+        Initialize the health probe
+
+        Args:
+            check: Callable that returns version information or raises on failure
+            interval: Seconds between checks once the probe is started
+        """
+        self.check = check
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._status: Dict[str, Any] = {
+            "status": STATUS_STARTING,
+            "version": None,
+            "error": None,
+            "latency_ms": None,
+            "checked_at": None,
+        }
+
+    def probe_once(self) -> Dict[str, Any]:
+        """Run a single check synchronously and return the new status"""
+        started = time.perf_counter()
+        version, error = None, None
+        try:
+            version = self.check()
+            status = STATUS_OK if version else STATUS_UNREACHABLE
+            if not version:
+                error = "BloodHound API returned no version information"
+        except BloodhoundAuthError as e:
+            status, error = STATUS_MISCONFIGURED, str(e)
+        except Exception as e:
+            status, error = STATUS_UNREACHABLE, str(e)
+
+        result = {
+            "status": status,
+            "version": version,
+            "error": error,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "checked_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+        with self._lock:
+            previous = self._status["status"]
+            self._status = result
+        if status != previous:
+            if status == STATUS_OK:
+                logger.info(f"Connected to Bloodhound API. Version: {version}")
+            else:
+                logger.error(f"Bloodhound API is {status}: {error}")
+        return result
+
+    def start(self) -> None:
+        """Start probing on a daemon thread; returns immediately"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="bloodhound-health", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Ask the probe thread to exit after its current check"""
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.probe_once()
+            self._stop.wait(self.interval)
+
+    @property
+    def status(self) -> Dict[str, Any]:
+        """Latest probe result"""
+        with self._lock:
+            return dict(self._status)
@@ -5,18 +5,25 @@ This server provides an interface between an LLM and the Bloodhound CE data
 """
 
 import argparse
+import inspect
 import json
 import logging
 import os
-from typing import Any, Dict, List, Optional
+import tempfile
+from typing import Any, Callable, Dict, List, Optional
 
 from dotenv import load_dotenv
 
 # Import FastMCP
 from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.tools import Tool
 
 # Import Bloodhound API client
-from lib.bloodhound_api import BloodhoundAPI
+from lib.bloodhound_api import BloodhoundAPI, LazyBloodhoundAPI
+from lib.cache import DEFAULT_TTL, create_cache
+from lib.catalog import advertise_tool_fingerprint
+from lib.endpoints import ENDPOINTS, SCOPES, Endpoint
+from lib.health import HealthProbe
 
 # Set up logging
 logging.basicConfig(
@@ -28,9 +35,138 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-# Initialize the MCP server and Bloodhound API client
-mcp = FastMCP("bloodhound_mcp")
-bloodhound_api = BloodhoundAPI()
+# Transport settings; worker processes inherit these through the environment
+TRANSPORTS = ("stdio", "sse", "streamable-http")
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+SHARED_CACHE_URL = "sqlite:///" + os.path.join(
+    tempfile.gettempdir(), "bloodhound_mcp_cache.sqlite3"
+)
+
+
+def create_bloodhound_api() -> BloodhoundAPI:
+    """Construct the Bloodhound API client from the environment"""
+    return BloodhoundAPI(
+        cache=create_cache(
+            os.getenv("BLOODHOUND_CACHE_URL", "memory://"),
+            float(os.getenv("BLOODHOUND_CACHE_TTL", DEFAULT_TTL)),
+        )
+    )
+
+
+def check_bloodhound_api():
+    """Fetch the API version, raising on any failure (used by the health probe)"""
+    response = bloodhound_api.base_client.request(
+        "GET", "/api/version", cacheable=False
+    )
+    return response.get("data")
+
+
+def _endpoint_signature(endpoint: Endpoint) -> inspect.Signature:
+    """Python signature of the tool generated for a table endpoint"""
+    kind = inspect.Parameter.POSITIONAL_OR_KEYWORD
+    params = [inspect.Parameter(SCOPES[endpoint.scope].id_param, kind, annotation=str)]
+    if endpoint.paginated:
+        params.append(inspect.Parameter("limit", kind, default=100, annotation=int))
+        params.append(inspect.Parameter("skip", kind, default=0, annotation=int))
+    return inspect.Signature(params)
+
+
+def make_endpoint_tool(endpoint: Endpoint) -> Callable[..., str]:
+    """Build the MCP tool function for a table endpoint"""
+    signature = _endpoint_signature(endpoint)
+    resource, method_name = endpoint.method.split(".")
+
+    def tool(*args, **kwargs) -> str:
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        object_id = arguments.args[0]
+        try:
+            method = getattr(getattr(bloodhound_api, resource), method_name)
+            if not endpoint.paginated:
+                result = method(object_id)
+                return json.dumps(
+                    {
+                        "message": endpoint.message(result, object_id),
+                        endpoint.result_key: result,
+                    }
+                )
+            result = method(
+                object_id,
+                limit=arguments.arguments["limit"],
+                skip=arguments.arguments["skip"],
+            )
+            return json.dumps(
+                {
+                    "message": endpoint.message(result, object_id),
+                    endpoint.result_key: result.get("data", []),
+                    "count": result.get("count", 0),
+                }
+            )
+        except Exception as e:
+            logger.error(f"Error retrieving {endpoint.subject}: {e}")
+            return json.dumps(
+                {"error": f"Failed to retrieve {endpoint.subject}: {str(e)}"}
+            )
+
+    tool.__name__ = endpoint.tool
+    tool.__doc__ = endpoint.description
+    tool.__signature__ = signature
+    return tool
+
+
+def build_endpoint_tools(functions: Dict[str, Callable[..., str]]) -> List[Tool]:
+    """
+    Create MCP Tool objects for the generated endpoint functions.
+
+    Building the pydantic argument model is most of the cost of registering a
+    tool, and the table only has a few distinct signatures, so each model is
+    built once and shared by every tool with that signature.
+    """
+    templates: Dict[str, Tool] = {}
+    tools = []
+    for endpoint in ENDPOINTS:
+        fn = functions[endpoint.tool]
+        key = str(fn.__signature__)
+        if key not in templates:
+            templates[key] = Tool.from_function(fn)
+        template = templates[key]
+        tools.append(
+            template.model_copy(
+                update={
+                    "fn": fn,
+                    "name": endpoint.tool,
+                    "description": endpoint.description,
+                    "parameters": {
+                        **template.parameters,
+                        "title": f"{endpoint.tool}Arguments",
+                    },
+                }
+            )
+        )
+    return tools
+
+
+# Expose the generated tools as module functions (get_users, get_user_info, ...)
+ENDPOINT_TOOLS = {endpoint.tool: make_endpoint_tool(endpoint) for endpoint in ENDPOINTS}
+globals().update(ENDPOINT_TOOLS)
+
+# Initialize the MCP server and Bloodhound API client. Neither the client nor
+# the connectivity check touch the network until the server is running.
+mcp = FastMCP("bloodhound_mcp", tools=build_endpoint_tools(ENDPOINT_TOOLS))
+# Lets clients reuse a tool catalog they listed before (see lib/catalog.py)
+catalog_fingerprint = advertise_tool_fingerprint(mcp)
+bloodhound_api = LazyBloodhoundAPI(create_bloodhound_api)
+health_probe = HealthProbe(
+    check_bloodhound_api,
+    interval=float(os.getenv("BLOODHOUND_HEALTH_INTERVAL", "60")),
+)
+
+
+@mcp.resource("bloodhound://status")
+def bloodhound_status() -> str:
+    """Reports whether the BloodHound API is reachable, from the background health probe"""
+    return json.dumps(health_probe.status)
 
 
 # Create Resources for the LLM
@@ -333,7 +469,8 @@ def bloodhound_assistant() -> str:
 
 
 # Define tools for the MCP server
-# mcp tools for the /domains apis
+# Per-object tools for domains, users, groups, computers, OUs, GPOs and AD CS
+# are generated from lib/endpoints.py; the tools below need custom handling.
 @mcp.tool()
 def get_domains():
     try:
@@ -381,2179 +518,320 @@ def search_objects(
         return json.dumps({"error": f"Failed to search for objects: {str(e)}"})
 
 
+# MCP tools for the /graph apis except for cypher queries to be implemented later
 @mcp.tool()
-def get_users(domain_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves users from a specific domain in the Bloodhound database.
-
-    Args:
-        domain_id: The ID of the domain to query
-        limit: Maximum number of users to return (default: 100)
-        skip: Number of users to skip for pagination (default: 0)
-    """
-    try:
-        users = bloodhound_api.domains.get_users(domain_id, limit=limit, skip=skip)
-        return json.dumps(
-            {
-                "message": f"Found {users.get('count', 0)} users in the domain",
-                "users": users.get("data", []),
-                "count": users.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving users: {e}")
-        return json.dumps({"error": f"Failed to retrieve users: {str(e)}"})
-
-
-@mcp.tool()
-def get_groups(domain_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves groups from a specific domain in the Bloodhound database.
-
-    Args:
-        domain_id: The ID of the domain to query
-        limit: Maximum number of groups to return (default: 100)
-        skip: Number of groups to skip for pagination (default: 0)
-    """
-    try:
-        groups = bloodhound_api.domains.get_groups(domain_id, limit=limit, skip=skip)
-        return json.dumps(
-            {
-                "message": f"Found {groups.get('count', 0)} groups in the domain",
-                "groups": groups.get("data", []),
-                "count": groups.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving groups: {e}")
-        return json.dumps({"error": f"Failed to retrieve groups: {str(e)}"})
-
-
-@mcp.tool()
-def get_computers(domain_id: str, limit: int = 100, skip: int = 0):
+def search_graph(query: str, search_type: str = "fuzzy"):
     """
-    Retrieves computers from a specific domain in the Bloodhound database.
+    Search for nodes in the Bloodhound graph by name.
+    This function lets you find specific nodes in the graph based on a search query.
+    Results are typically returned as matches on node names.
 
     Args:
-        domain_id: The ID of the domain to query
-        limit: Maximum number of computers to return (default: 100)
-        skip: Number of computers to skip for pagination (default: 0)
+        query: Search text to find nodes by name
+        search_type: Type of search to perform - "fuzzy" (default) for approximate matches, "exact" for exact matches
     """
     try:
-        computers = bloodhound_api.domains.get_computers(
-            domain_id, limit=limit, skip=skip
-        )
+        results = bloodhound_api.graph.search(query, search_type)
         return json.dumps(
             {
-                "message": f"Found {computers.get('count', 0)} computers in the domain",
-                "computers": computers.get("data", []),
-                "count": computers.get("count", 0),
+                "message": f"Search results for '{query}'",
+                "results": results.get("data", []),
             }
         )
     except Exception as e:
-        logger.error(f"Error retrieving computers: {e}")
-        return json.dumps({"error": f"Failed to retrieve computers: {str(e)}"})
+        logger.error(f"Error searching graph: {e}")
+        return json.dumps({"error": f"Failed to search graph: {str(e)}"})
 
 
 @mcp.tool()
-def get_security_controllers(domain_id: str, limit: int = 100, skip: int = 0):
+def get_shortest_path(start_node: str, end_node: str, relationship_kinds: str = None):
     """
-    Retrieves security principals that have control relationships over other objects in the domain.
-
-    In Bloodhound terminology, a "controller" is any security principal (user, group, computer)
-    that has some form of control relationship (like AdminTo, WriteOwner, GenericAll, etc.)
-    over another security object in the domain. These are NOT domain controllers (AD servers),
-    but rather represent control edges in the graph.
-
-    These control relationships are key for identifying potential attack paths in the domain.
-
-    Example controllers might include:
-    - A user with AdminTo rights on a computer
-    - A group with GenericAll rights over another group
-    - A user with WriteOwner rights over another user
+    Find the shortest path between two nodes in the Bloodhound graph.
+    This is useful for attack path analysis, showing the most direct route between two security principals.
+    The path will show all the intermediary nodes and the types of relationships connecting them.
+    If this returns a 500 or 404 error it is likely that the path does not exist within bloodhound
 
     Args:
-        domain_id: The ID of the domain to query
-        limit: Maximum number of control relationships to return (default: 100)
-        skip: Number of control relationships to skip for pagination (default: 0)
+        start_node: Object ID of the starting node (source)
+        end_node: Object ID of the ending node (target)
+        relationship_kinds: Optional comma-separated list of relationship types to include in the path
     """
     try:
-        controllers = bloodhound_api.domains.get_controllers(
-            domain_id, limit=limit, skip=skip
+        path = bloodhound_api.graph.get_shortest_path(
+            start_node, end_node, relationship_kinds
         )
         return json.dumps(
             {
-                "message": f"Found {controllers.get('count', 0)} controllers",
-                "controllers": controllers.get("data", []),
-                "count": controllers.get("count", 0),
+                "message": f"Shortest path from {start_node} to {end_node}",
+                "path": path.get("data", {}),
             }
         )
     except Exception as e:
-        logger.error(f"Error retrieving controllers: {e}")
-        return json.dumps({"error": f"Failed to retrieve controllers: {str(e)}"})
+        logger.error(f"Error getting shortest path: {e}")
+        return json.dumps({"error": f"Failed to get shortest path: {str(e)}"})
 
 
 @mcp.tool()
-def get_gpos(domain_id: str, limit: int = 100, skip: int = 0):
+def get_edge_composition(source_node: int, target_node: int, edge_type: str):
     """
-    Retrieves Group Policy Objects (GPOs) from a specific domain in the Bloodhound database.
-    GPOs are containers for policy settings that can be applied to users and computers in Active Directory.
-    These can be abused for persistence and privilege escalation and are key in idenitfying GPO related edges.
+    Analyze the components of a complex edge between two nodes.
+    In Bloodhound, many high-level edges (like "HasPath" or "AdminTo") are composed of multiple
+    individual relationships. This function reveals those underlying components.
+    This is useful for understanding exactly how security principals are connected.
 
     Args:
-        domain_id: The ID of the domain to query
-        limit: Maximum number of GPOs to return (default: 100)
-        skip: Number of GPOs to skip for pagination (default: 0)
+        source_node: ID of the source node
+        target_node: ID of the target node
+        edge_type: Type of edge to analyze (e.g., "MemberOf", "AdminTo", "CanRDP")
     """
     try:
-        gpos = bloodhound_api.domains.get_gpos(domain_id, limit=limit, skip=skip)
-        return json.dumps(
-            {
-                "message": f"Found {gpos.get('count', 0)} GPOs in the domain",
-                "gpos": gpos.get("data", []),
-                "count": gpos.get("count", 0),
-            }
+        composition = bloodhound_api.graph.get_edge_composition(
+            source_node, target_node, edge_type
         )
-    except Exception as e:
-        logger.error(f"Error retrieving GPOs: {e}")
-        return json.dumps({"error": f"Failed to retrieve GPOs: {str(e)}"})
-
-
-@mcp.tool()
-def get_ous(domain_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves Organizational Units (OUs) from a specific domain in the Bloodhound database.
-    OUs are containers within a domain that can hold users, groups, computers, and other OUs.
-    These are key in understanding the structure of the domain.
-
-    Args:
-        domain_id: The ID of the domain to query
-        limit: Maximum number of OUs to return (default: 100)
-        skip: Number of OUs to skip for pagination (default
-    """
-    try:
-        ous = bloodhound_api.domains.get_ous(domain_id, limit=limit, skip=skip)
         return json.dumps(
             {
-                "message": f"Found {ous.get('count', 0)} OUs in the domain",
-                "ous": ous.get("data", []),
-                "count": ous.get("count", 0),
+                "message": f"Edge composition for {edge_type} edge from {source_node} to {target_node}",
+                "composition": composition.get("data", {}),
             }
         )
     except Exception as e:
-        logger.error(f"Error retrieving OUs: {e}")
-        return json.dumps({"error": f"Failed to retrieve OUs: {str(e)}"})
+        logger.error(f"Error getting edge composition: {e}")
+        return json.dumps({"error": f"Failed to get edge composition: {str(e)}"})
 
 
 @mcp.tool()
-def get_dc_syncers(domain_id: str, limit: int = 100, skip: int = 0):
+def get_relay_targets(source_node: int, target_node: int, edge_type: str):
     """
-    Retrieves security principals (users, groups, computers ) that are given the "GetChanges" and "GetChangesAll" permissions on the domain.
-    The security principals are therefore able to perform a DCSync attack.
-    They are are great targets for lateral movement or privilege escalation or domain compromise.
+    Find valid relay targets for a given edge in the Bloodhound graph.
+    Relay targets represent potential nodes that could be used to relay an attack or
+    privilege escalation between two nodes. This is critical for advanced attack path planning.
 
     Args:
-        domain_id: The ID of the domain to query
-        limit: Maximum number of DC Syncers to return (default: 100)
-        skip: Number of DC Syncers to skip for pagination (default: 0)
+        source_node: ID of the source node
+        target_node: ID of the target node
+        edge_type: Type of edge (relationship) between the nodes
     """
     try:
-        dc_syncers = bloodhound_api.domains.get_dc_syncers(
-            domain_id, limit=limit, skip=skip
+        targets = bloodhound_api.graph.get_relay_targets(
+            source_node, target_node, edge_type
         )
         return json.dumps(
             {
-                "message": f"Found {dc_syncers.get('count', 0)} DC Syncers in the domain",
-                "dc_syncers": dc_syncers.get("data", []),
-                "count": dc_syncers.get("count", 0),
+                "message": f"Relay targets for {edge_type} edge from {source_node} to {target_node}",
+                "targets": targets.get("data", {}),
             }
         )
     except Exception as e:
-        logger.error(f"Error retrieving DC Syncers: {e}")
-        return json.dumps({"error": f"Failed to retrieve DC Syncers: {str(e)}"})
+        logger.error(f"Error getting relay targets: {e}")
+        return json.dumps({"error": f"Failed to get relay targets: {str(e)}"})
 
 
+# MCP tools for getting the AI to leverage Cypher Queries
 @mcp.tool()
-def get_foreign_admins(domain_id: str, limit: int = 100, skip: int = 0):
+def run_cypher_query(query: str, include_properties: bool = True):
     """
-    Retrieves foreign admins from a specific domain in the Bloodhound database.
-     "Foreign Admins" are defined as security principals (users, groups, or computers) from one domain that have administrative privileges in another domain within the same forest.
-    These are potential targets for lateral movement and privilege escalation as well as cross domain compromise.
+    Run a custom Cypher query on the BloodHound Neo4j database.
 
     Args:
-        domain_id: The ID of the domain to query
-        limit: Maximum number of foreign admins to return (default: 100)
-        skip: Number of foreign admins to skip for pagination (default: 0)
-    """
-    try:
-        foreign_admins = bloodhound_api.domains.get_foreign_admins(
-            domain_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {foreign_admins.get('count', 0)} foreign admins in the domain",
-                "foreign_admins": foreign_admins.get("data", []),
-                "count": foreign_admins.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving foreign admins: {e}")
-        return json.dumps({"error": f"Failed to retrieve foreign admins: {str(e)}"})
-
-
-@mcp.tool()
-def get_foreign_gpo_controllers(domain_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves foreign GPO controllers from a specific domain in the Bloodhound database.
-    "Foreign GPO Controllers" are defined as security principals (users, groups, or computers) from one domain that have the ability to modify or control Group Policy Objects (GPOs) in another domain within the same forest
-    These are potential targets for lateral movement and privilege escalation as well as cross domain compromise.
+        query: The Cypher query to execute
+        include_properties: Whether to include node/edge properties in the response
 
-    Args:
-        domain_id: The ID of the domain to query
-        limit: Maximum number of foreign GPO controllers to return (default: 100)
-        skip: Number of foreign GPO controllers to skip for pagination (default: 0)
+    Returns:
+        JSON response with graph data (nodes and edges)
     """
     try:
-        foreign_gpo_controllers = bloodhound_api.domains.get_foreign_gpo_controllers(
-            domain_id, limit=limit, skip=skip
-        )
+        result = bloodhound_api.cypher.run_query(query, include_properties)
         return json.dumps(
             {
-                "message": f"Found {foreign_gpo_controllers.get('count', 0)} foreign GPO controllers in the domain",
-                "foreign_gpo_controllers": foreign_gpo_controllers.get("data", []),
-                "count": foreign_gpo_controllers.get("count", 0),
+                "message": "Cypher query executed successfully",
+                "result": result.get("data", {}),
             }
         )
     except Exception as e:
-        logger.error(f"Error retrieving foreign GPO controllers: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve foreign GPO controllers: {str(e)}"}
-        )
+        logger.error(f"Error executing Cypher query: {e}")
+        return json.dumps({"error": f"Failed to execute Cypher query: {str(e)}"})
 
 
+# Create saved query management tools
 @mcp.tool()
-def get_foreign_groups(domain_id: str, limit: int = 100, skip: int = 0):
+def create_saved_query(name: str, query: str):
     """
-    Retrieves foreign groups from a specific domain in the Bloodhound database.
-    "Foreign Groups" are defined as security groups from one domain that have members from another domain within the same forest. They represent cross-domain group memberships in Active Directory.
-    These are potential targets for lateral movement and privilege escalation as well as cross domain compromise.
+    Create a new saved Cypher query.
 
     Args:
-        domain_id: The ID of the domain to query
-        limit: Maximum number of foreign groups to return (default: 100)
-        skip: Number of foreign groups to skip for pagination (default: 0)
-    """
-    try:
-        foreign_groups = bloodhound_api.domains.get_foreign_groups(
-            domain_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {foreign_groups.get('count', 0)} foreign groups in the domain",
-                "foreign_groups": foreign_groups.get("data", []),
-                "count": foreign_groups.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving foreign groups: {e}")
-        return json.dumps({"error": f"Failed to retrieve foreign groups: {str(e)}"})
-
-
-@mcp.tool()
-def get_foreign_users(domain_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves foreign users from a specific domain in the Bloodhound database.
-    "Foreign Users" are defined as user accounts from one domain that are referenced in another domain within the same forest. These represent user accounts that have some form of relationship or access across domain boundaries.
-    These are potential targets for lateral movement and privilege escalation as well as cross domain compromise.
+        name: Name for the saved query
+        query: The Cypher query to save
 
-    Args:
-        domain_id: The ID of the domain to query
-        limit: Maximum number of foreign users to return (default: 100)
-        skip: Number of foreign users to skip for pagination (default: 0)
+    Returns:
+        JSON response with the created saved query data
     """
     try:
-        foreign_users = bloodhound_api.domains.get_foreign_users(
-            domain_id, limit=limit, skip=skip
-        )
+        saved_query = bloodhound_api.cypher.create_saved_query(name, query)
         return json.dumps(
             {
-                "message": f"Found {foreign_users.get('count', 0)} foreign users in the domain",
-                "foreign_users": foreign_users.get("data", []),
-                "count": foreign_users.get("count", 0),
+                "message": f"Successfully created saved query: {name}",
+                "query": saved_query,
             }
         )
     except Exception as e:
-        logger.error(f"Error retrieving foreign users: {e}")
-        return json.dumps({"error": f"Failed to retrieve foreign users: {str(e)}"})
+        logger.error(f"Error creating saved query: {e}")
+        return json.dumps({"error": f"Failed to create saved query: {str(e)}"})
 
 
+# list already saved queries
 @mcp.tool()
-def get_inbound_trusts(domain_id: str, limit: int = 100, skip: int = 0):
+def list_saved_queries(skip: int = 0, limit: int = 100, name: str = None):
     """
-    Retrieves inbound trusts from a specific domain in the Bloodhound database.
-    "Inbound Trusts" are defined as trust relationships where the domain is the trusted domain and other domains trust it.
-    These are potential targets for moving to other external domains or other domains within the forest
+    List saved Cypher queries.
 
     Args:
-        domain_id: The ID of the domain to query
-        limit: Maximum number of inbound trusts to return (default: 100)
-        skip: Number of inbound trusts to skip for pagination (default: 0)
-    """
-    try:
-        inbound_trusts = bloodhound_api.domains.get_inbound_trusts(
-            domain_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {inbound_trusts.get('count', 0)} inbound trusts in the domain",
-                "inbound_trusts": inbound_trusts.get("data", []),
-                "count": inbound_trusts.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving inbound trusts: {e}")
-        return json.dumps({"error": f"Failed to retrieve inbound trusts: {str(e)}"})
-
-
-@mcp.tool()
-def get_linked_gpos(domain_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves linked GPOs from a specific domain in the Bloodhound database.
-    "Linked GPOs" are defined as Group Policy Objects that have been linked to or associated with specific Active Directory containers such as domains, organizational units (OUs), or sites
-    These are potential targets for moving laterally, elevating privileges, or maintaining persistence in the domain.
+        skip: Number of queries to skip for pagination
+        limit: Maximum number of queries to return
+        name: Filter by query name
 
-    Args:
-        domain_id: The ID of the domain to query
-        limit: Maximum number of linked GPOs to return (default: 100)
-        skip: Number of linked GPOs to skip for pagination (default: 0)
+    Returns:
+        JSON response with list of saved queries
     """
     try:
-        linked_gpos = bloodhound_api.domains.get_linked_gpos(
-            domain_id, limit=limit, skip=skip
-        )
+        queries = bloodhound_api.cypher.list_saved_queries(skip, limit, name)
         return json.dumps(
-            {
-                "message": f"Found {linked_gpos.get('count', 0)} linked GPOs in the domain",
-                "linked_gpos": linked_gpos.get("data", []),
-                "count": linked_gpos.get("count", 0),
-            }
+            {"message": f"Found {len(queries)} saved queries", "queries": queries}
         )
     except Exception as e:
-        logger.error(f"Error retrieving linked GPOs: {e}")
-        return json.dumps({"error": f"Failed to retrieve linked GPOs: {str(e)}"})
+        logger.error(f"Error listing saved queries: {e}")
+        return json.dumps({"error": f"Failed to list saved queries: {str(e)}"})
 
 
-@mcp.tool()
-def get_outbound_trusts(domain_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves outbound trusts from a specific domain in the Bloodhound database.
-    "Outbound Trusts" are defined as trust relationships where the domain trusts other domains.
-    These are potential targets for accessing resources within another domain and may provide a path into the domain if the external one has weaker security.
+# main function to start the server
+async def main(transport: str = "stdio"):
+    """Main function to start the server"""
+    # Check the Bloodhound API in the background so a slow or unreachable
+    # instance never delays the server from accepting clients
+    health_probe.start()
 
-    Args:
-        domain_id: The ID of the domain to query
-        limit: Maximum number of outbound trusts to return (default: 100)
-        skip: Number of outbound trusts to skip for pagination (default: 0)
-    """
-    try:
-        outbound_trusts = bloodhound_api.domains.get_outbound_trusts(
-            domain_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {outbound_trusts.get('count', 0)} outbound trusts in the domain",
-                "outbound_trusts": outbound_trusts.get("data", []),
-                "count": outbound_trusts.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving outbound trusts: {e}")
-        return json.dumps({"error": f"Failed to retrieve outbound trusts: {str(e)}"})
+    # Run the MCP server
+    if transport == "sse":
+        await mcp.run_sse_async()
+    elif transport == "streamable-http":
+        await mcp.run_streamable_http_async()
+    else:
+        await mcp.run_stdio_async()
 
 
-# mcp tools for the /users apis
-@mcp.tool()
-def get_user_info(user_id: str):
+def create_app():
     """
-    Retrieves information about a specific user in a specific domain.
-    This provides a general overview of a user's information including their name, domain, and other attributes.
-    It can be used to conduct reconnaissance and start formulating and targeting users within the domain
+    Build the ASGI app for an HTTP transport.
 
-    Args:
-        user_id: The ID of the user to query
+    Used as the uvicorn application factory, so it runs once in every worker
+    process and reads its settings from the environment set up by run_workers().
     """
-    try:
-        user_info = bloodhound_api.users.get_info(user_id)
-        return json.dumps(
-            {
-                "message": f"User information for {user_info.get('name')}",
-                "user_info": user_info,
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving user information: {e}")
-        return json.dumps({"error": f"Failed to retrieve user information: {str(e)}"})
+    health_probe.start()
+    if os.getenv("BLOODHOUND_MCP_TRANSPORT", "streamable-http") == "sse":
+        return mcp.sse_app()
+    return mcp.streamable_http_app()
 
 
-@mcp.tool()
-def get_user_admin_rights(user_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the administrative rights of a specific user in the domain.
-    Administrative rights are privileges that allow a user to perform administrative tasks on a Security Principal (user, group, or computer) in Active Directory.
-    These rights can be abused in a variety of ways include lateral movement, persistence, and privilege escalation.
+def run_workers(args: argparse.Namespace):
+    """Serve an HTTP transport from several worker processes on one listener"""
+    import uvicorn
 
-    Args:
-        user_id: The ID of the user to query
-        limit: Maximum number of administrative rights to return (default: 100)
-        skip: Number of administrative rights to skip for pagination (default: 0)
-    """
-    try:
-        user_admin_rights = bloodhound_api.users.get_admin_rights(
-            user_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {user_admin_rights.get('count', 0)} administrative rights for the user",
-                "user_admin_rights": user_admin_rights.get("data", []),
-                "count": user_admin_rights.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving user administrative rights: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve user administrative rights: {str(e)}"}
-        )
+    # Workers re-import this module, so hand the settings over via environment
+    os.environ["BLOODHOUND_MCP_TRANSPORT"] = args.transport
+    os.environ["BLOODHOUND_CACHE_URL"] = args.cache
+    os.environ["BLOODHOUND_CACHE_TTL"] = str(args.cache_ttl)
+    # Any worker may receive any request, so no per-session state can be kept
+    os.environ["FASTMCP_STATELESS_HTTP"] = "true"
 
+    uvicorn.run(
+        "main:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        log_level=mcp.settings.log_level.lower(),
+    )
 
-@mcp.tool()
-def get_user_constrained_delegation_rights(
-    user_id: str, limit: int = 100, skip: int = 0
-):
-    """
-    Retrieves the constrained delegation rights of a specific user within the domain.
-    Constrained delegation rights allow a user to impersonate another user or service when communicating with a service on another computer.
-    These rights can be abused for privilege escalation and lateral movement within the domain.
 
-    Args:
-        user_id: The ID of the user to query
-        limit: Maximum number of constrained delegation rights to return (default: 100)
-        skip: Number of constrained delegation rights to skip for pagination (default: 0)
-    """
-    try:
-        user_constrained_delegation_rights = (
-            bloodhound_api.users.get_constrained_delegation_rights(
-                user_id, limit=limit, skip=skip
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser"""
+    parser = argparse.ArgumentParser(description="Bloodhound CE MCP Server")
+    parser.add_argument(
+        "--transport",
+        choices=TRANSPORTS,
+        default=os.getenv("BLOODHOUND_MCP_TRANSPORT", "stdio"),
+        help="Transport to serve the MCP protocol over (default: stdio)",
+    )
+    parser.add_argument(
+        "--host",
+        default=os.getenv("BLOODHOUND_MCP_HOST", DEFAULT_HOST),
+        help=f"Address to listen on for HTTP transports (default: {DEFAULT_HOST})",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=int(os.getenv("BLOODHOUND_MCP_PORT", DEFAULT_PORT)),
+        help=f"Port to listen on for HTTP transports (default: {DEFAULT_PORT})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes behind the listener (streamable-http only)",
+    )
+    parser.add_argument(
+        "--cache",
+        default=os.getenv("BLOODHOUND_CACHE_URL"),
+        help="API response cache: 'none', 'memory://' or 'sqlite:///path' "
+        "(default: memory://, or a shared SQLite file when --workers > 1)",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=float(os.getenv("BLOODHOUND_CACHE_TTL", DEFAULT_TTL)),
+        help=f"Seconds an API response stays cached (default: {DEFAULT_TTL:g})",
+    )
+    return parser
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse and validate the command line"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1:
+        if args.transport != "streamable-http":
+            # An SSE stream and the POSTs that belong to it must reach the same
+            # process, which a shared listener cannot guarantee
+            parser.error("--workers > 1 requires --transport streamable-http")
+        if args.cache is None:
+            args.cache = SHARED_CACHE_URL
+        elif args.cache == "memory://":
+            logger.warning(
+                "memory:// cache is not shared between workers; "
+                "use sqlite:///path to share cached responses"
             )
-        )
-        return json.dumps(
-            {
-                "message": f"Found {user_constrained_delegation_rights.get('count', 0)} constrained delegation rights for the user",
-                "user_constrained_delegation_rights": user_constrained_delegation_rights.get(
-                    "data", []
-                ),
-                "count": user_constrained_delegation_rights.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving user constrained delegation rights: {e}")
-        return json.dumps(
-            {
-                "error": f"Failed to retrieve user constrained delegation rights: {str(e)}"
-            }
-        )
+    if args.cache is None:
+        args.cache = "memory://"
 
-
-@mcp.tool()
-def get_user_controllables(user_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the Security Princiapls within the domain that a specific user has administrative control over in the domain.
-    These are entities that the user can control and manipulate within the domain.
-    These are potential targets for lateral movement, privilege escalation, and persistence.
-
-    Args:
-        user_id: The ID of the user to query
-        limit: Maximum number of controllables to return (default: 100)
-        skip: Number of controllables to skip for pagination (default: 0)
-    """
-    try:
-        user_controlables = bloodhound_api.users.get_controllables(
-            user_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {user_controlables.get('count', 0)} controlables for the user",
-                "user_controlables": user_controlables.get("data", []),
-                "count": user_controlables.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving user controlables: {e}")
-        return json.dumps({"error": f"Failed to retrieve user controlables: {str(e)}"})
-
-
-@mcp.tool()
-def get_user_controllers(user_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the controllers of a specific user in the domain.
-    Controllers are entities that have control over the specified user
-    This can be used to help identify paths to gain access to a specific user.
-
-    Args:
-        user_id: The ID of the user to query
-        limit: Maximum number of controllers to return (default: 100)
-        skip: Number of controllers to skip for pagination (default: 0)
-    """
-    try:
-        user_controllers = bloodhound_api.users.get_controllers(
-            user_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {user_controllers.get('count', 0)} controllers for the user",
-                "user_controllers": user_controllers.get("data", []),
-                "count": user_controllers.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving user controllers: {e}")
-        return json.dumps({"error": f"Failed to retrieve user controllers: {str(e)}"})
-
-
-@mcp.tool()
-def get_user_dcom_rights(user_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the DCOM rights of a specific user within the domain.
-    DCOM rights allow a user to communicate with COM objects on another computer in the network.
-    These rights can be abused for privilege escalation and lateral movement within the domain.
-
-    Args:
-        user_id: The ID of the user to query
-        limit: Maximum number of DCOM rights to return (default: 100)
-        skip: Number of DCOM rights to skip for pagination (default: 0)
-    """
-    try:
-        user_dcom_rights = bloodhound_api.users.get_dcom_rights(
-            user_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {user_dcom_rights.get('count', 0)} DCOM rights for the user",
-                "user_dcom_rights": user_dcom_rights.get("data", []),
-                "count": user_dcom_rights.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving user DCOM rights: {e}")
-        return json.dumps({"error": f"Failed to retrieve user DCOM rights: {str(e)}"})
-
-
-@mcp.tool()
-def get_user_memberships(user_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the group memberships of a specific user within the domain.
-    Group memberships are the groups that a user is a member of within the domain.
-    These memberships can be used to identify potential targets for lateral movement and privilege escalation.
-
-    Args:
-        user_id: The ID of the user to query
-        limit: Maximum number of memberships to return (default: 100)
-        skip: Number of memberships to skip for pagination (default: 0)
-    """
-    try:
-        user_memberships = bloodhound_api.users.get_memberships(
-            user_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {user_memberships.get('count', 0)} memberships for the user",
-                "user_memberships": user_memberships.get("data", []),
-                "count": user_memberships.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving user memberships: {e}")
-        return json.dumps({"error": f"Failed to retrieve user memberships: {str(e)}"})
-
-
-@mcp.tool()
-def get_user_ps_remote_rights(user_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the remote PowerShell rights of a specific user within the domain.
-    Remote PowerShell rights allow a user to execute PowerShell commands on a remote computer.
-    These rights can be abused for lateral movement and privilege escalation within the domain.
-
-    Args:
-        user_id: The ID of the user to query
-        limit: Maximum number of remote PowerShell rights to return (default: 100)
-        skip: Number of remote PowerShell rights to skip for pagination
-    """
-    try:
-        user_ps_remote_rights = bloodhound_api.users.get_ps_remote_rights(
-            user_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {user_ps_remote_rights.get('count', 0)} remote PowerShell rights for the user",
-                "user_ps_remote_rights": user_ps_remote_rights.get("data", []),
-                "count": user_ps_remote_rights.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving user remote PowerShell rights: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve user remote PowerShell rights: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_user_rdp_rights(user_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the RDP rights of a specific user within the domain.
-    RDP rights allow a user to remotely connect to another computer using the Remote Desktop Protocol.
-    These rights can be abused for lateral movement and privilege escalation within the domain.
-
-    Args:
-        user_id: The ID of the user to query
-        limit: Maximum number of RDP rights to return (default: 100)
-        skip: Number of RDP rights to skip for pagination (default: 0)
-    """
-    try:
-        user_rdp_rights = bloodhound_api.users.get_rdp_rights(
-            user_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {user_rdp_rights.get('count', 0)} RDP rights for the user",
-                "user_rdp_rights": user_rdp_rights.get("data", []),
-                "count": user_rdp_rights.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving user RDP rights: {e}")
-        return json.dumps({"error": f"Failed to retrieve user RDP rights: {str(e)}"})
-
-
-@mcp.tool()
-def get_user_sessions(user_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the active sessions of a specific user within the domain.
-    Active sessions are the current sessions that a user has within the domain.
-    These sessions can be used to identify potential targets for lateral movement and privilege escalation.
-    It can also be used to indentify and plan attack paths within the domain.
-
-    Args:
-        user_id: The ID of the user to query
-        limit: Maximum number of sessions to return (default: 100)
-        skip: Number of sessions to skip for pagination (default: 0)
-    """
-    try:
-        user_sessions = bloodhound_api.users.get_sessions(
-            user_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {user_sessions.get('count', 0)} sessions for the user",
-                "user_sessions": user_sessions.get("data", []),
-                "count": user_sessions.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving user sessions: {e}")
-        return json.dumps({"error": f"Failed to retrieve user sessions: {str(e)}"})
-
-
-@mcp.tool()
-def get_user_sql_admin_rights(user_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the SQL administrative rights of a specific user within the domain.
-    SQL administrative rights allow a user to perform administrative tasks on a SQL Server.
-    These rights can be abused for lateral movement and privilege escalation within the domain.
-
-    Args:
-        user_id: The ID of the user to query
-        limit: Maximum number of SQL administrative rights to return (default: 100)
-        skip: Number of SQL administrative rights to skip for pagination (default: 0)
-    """
-    try:
-        user_sql_admin_rights = bloodhound_api.users.get_sql_admin_rights(
-            user_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {user_sql_admin_rights.get('count', 0)} SQL administrative rights for the user",
-                "user_sql_admin_rights": user_sql_admin_rights.get("data", []),
-                "count": user_sql_admin_rights.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving user SQL administrative rights: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve user SQL administrative rights: {str(e)}"}
-        )
-
-
-# mcp tools for the /groups apis
-@mcp.tool()
-def get_group_info(group_id: str):
-    """
-    Retrieves information about a specific group in a specific domain.
-    This provides a general overview of a group's information including their name, domain, and other attributes.
-    It can be used to conduct reconnaissance and start formulating and targeting groups within the domain
-    Args:
-        group_id: The ID of the group to query
-    """
-    try:
-        group_info = bloodhound_api.groups.get_info(group_id)
-        return json.dumps(
-            {
-                "message": f"Group information for {group_info.get('name')}",
-                "group_info": group_info,
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving group information: {e}")
-        return json.dumps({"error": f"Failed to retrieve group information: {str(e)}"})
-
-
-@mcp.tool()
-def get_group_admin_rights(group_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the administrative rights of a specific group in the domain.
-    Administrative rights are privileges that allow a group to perform administrative tasks on a Security Principal (user, group, or computer) in Active Directory.
-    These rights can be abused in a variety of ways include lateral movement, persistence, and privilege escalation.
-
-    Args:
-        group_id: The ID of the group to query
-        limit: Maximum number of administrative rights to return (default: 100)
-        skip: Number of administrative rights to skip for pagination (default: 0)
-    """
-    try:
-        group_admin_rights = bloodhound_api.groups.get_admin_rights(
-            group_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {group_admin_rights.get('count', 0)} administrative rights for the group",
-                "group_admin_rights": group_admin_rights.get("data", []),
-                "count": group_admin_rights.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving group administrative rights: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve group administrative rights: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_group_controllables(group_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the Security Princiapls within the domain that a specific group has administrative control over in the domain.
-    These are entities that the group can control and manipulate within the domain.
-    These are potential targets for lateral movement, privilege escalation, and persistence.
-
-    Args:
-        group_id: The ID of the group to query
-        limit: Maximum number of controllables to return (default: 100)
-        skip: Number of controllables to skip for pagination (default: 0)
-    """
-    try:
-        group_controlables = bloodhound_api.groups.get_controllables(
-            group_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {group_controlables.get('count', 0)} controlables for the group",
-                "group_controlables": group_controlables.get("data", []),
-                "count": group_controlables.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving group controlables: {e}")
-        return json.dumps({"error": f"Failed to retrieve group controlables: {str(e)}"})
-
-
-@mcp.tool()
-def get_group_controllers(group_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the controllers of a specific group in the domain.
-    Controllers are entities that have control over the specified group
-    This can be used to help identify paths to gain access to a specific group.
-
-    Args:
-        group_id: The ID of the group to query
-        limit: Maximum number of controllers to return (default: 100)
-        skip: Number of controllers to skip for pagination (default: 0)
-    """
-    try:
-        group_controllers = bloodhound_api.groups.get_controllers(
-            group_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {group_controllers.get('count', 0)} controllers for the group",
-                "group_controllers": group_controllers.get("data", []),
-                "count": group_controllers.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving group controllers: {e}")
-        return json.dumps({"error": f"Failed to retrieve group controllers: {str(e)}"})
-
-
-@mcp.tool()
-def get_group_dcom_rights(group_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the DCOM rights of a specific group within the domain.
-    DCOM rights allow a group to communicate with COM objects on another computer in the network.
-    These rights can be abused for privilege escalation and lateral movement within the domain.
-    Args:
-        group_id: The ID of the group to query
-        limit: Maximum number of DCOM rights to return (default: 100)
-        skip: Number of DCOM rights to skip for pagination (default: 0)
-    """
-    try:
-        group_dcom_rights = bloodhound_api.groups.get_dcom_rights(
-            group_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {group_dcom_rights.get('count', 0)} DCOM rights for the group",
-                "group_dcom_rights": group_dcom_rights.get("data", []),
-                "count": group_dcom_rights.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving group DCOM rights: {e}")
-        return json.dumps({"error": f"Failed to retrieve group DCOM rights: {str(e)}"})
-
-
-@mcp.tool()
-def get_group_members(group_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the members of a specific group within the domain.
-    Group members are the users and groups that are members of the specified group.
-    These memberships can be used to identify potential targets for lateral movement and privilege escalation.
-
-    Args:
-        group_id: The ID of the group to query
-        limit: Maximum number of members to return (default: 100)
-        skip: Number of members to skip for pagination (default: 0)
-    """
-    try:
-        group_members = bloodhound_api.groups.get_members(
-            group_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {group_members.get('count', 0)} members for the group",
-                "group_members": group_members.get("data", []),
-                "count": group_members.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving group members: {e}")
-        return json.dumps({"error": f"Failed to retrieve group members: {str(e)}"})
-
-
-@mcp.tool()
-def get_group_memberships(group_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the group memberships of a specific group within the domain.
-    Group memberships are the groups that the specified group is a member of within the domain.
-    These memberships can be used to identify potential targets for lateral movement and privilege escalation.
-
-    Args:
-        group_id: The ID of the group to query
-        limit: Maximum number of memberships to return (default: 100)
-        skip: Number of memberships to skip for pagination (default: 0)
-    """
-    try:
-        group_memberships = bloodhound_api.groups.get_memberships(
-            group_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {group_memberships.get('count', 0)} memberships for the group",
-                "group_memberships": group_memberships.get("data", []),
-                "count": group_memberships.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving group memberships: {e}")
-        return json.dumps({"error": f"Failed to retrieve group memberships: {str(e)}"})
-
-
-@mcp.tool()
-def get_group_ps_remote_rights(group_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the remote PowerShell rights of a specific group within the domain.
-    Remote PowerShell rights allow a group to execute PowerShell commands on a remote computer.
-    These rights can be abused for lateral movement and privilege escalation within the domain.
-
-    Args:
-        group_id: The ID of the group to query
-        limit: Maximum number of remote PowerShell rights to return (default: 100)
-        skip: Number of remote PowerShell rights to skip for pagination (default: 0)
-    """
-    try:
-        group_ps_remote_rights = bloodhound_api.groups.get_ps_remote_rights(
-            group_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {group_ps_remote_rights.get('count', 0)} remote PowerShell rights for the group",
-                "group_ps_remote_rights": group_ps_remote_rights.get("data", []),
-                "count": group_ps_remote_rights.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving group remote PowerShell rights: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve group remote PowerShell rights: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_group_rdp_rights(group_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the RDP rights of a specific group within the domain.
-    RDP rights allow a group to remotely connect to another computer using the Remote Desktop Protocol.
-    These rights can be abused for lateral movement and privilege escalation within the domain.
-
-    Args:
-        group_id: The ID of the group to query
-        limit: Maximum number of RDP rights to return (default: 100)
-        skip: Number of RDP rights to skip for pagination (default: 0)
-    """
-    try:
-        group_rdp_rights = bloodhound_api.groups.get_rdp_rights(
-            group_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {group_rdp_rights.get('count', 0)} RDP rights for the group",
-                "group_rdp_rights": group_rdp_rights.get("data", []),
-                "count": group_rdp_rights.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving group RDP rights: {e}")
-        return json.dumps({"error": f"Failed to retrieve group RDP rights: {str(e)}"})
-
-
-@mcp.tool()
-def get_group_sessions(group_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the active sessions of the members of a specific group within the domain.
-    Active sessions are the current sessions that hte members of this group have within the domain.
-    These sessions can be used to identify potential targets for lateral movement and privilege escalation.
-
-    Args:
-        group_id: The ID of the group to query
-        limit: Maximum number of sessions to return (default: 100)
-        skip: Number of sessions to skip for pagination (default: 0)
-    """
-    try:
-        group_sessions = bloodhound_api.groups.get_sessions(
-            group_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {group_sessions.get('count', 0)} sessions for the group",
-                "group_sessions": group_sessions.get("data", []),
-                "count": group_sessions.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving group sessions: {e}")
-        return json.dumps({"error": f"Failed to retrieve group sessions: {str(e)}"})
-
-
-# mcp tools for the /computers apis
-@mcp.tool()
-def get_computer_info(computer_id: str):
-    """
-    Retrieves information about a specific computer in a specific domain.
-    This provides a general overview of a computer's information including their name, domain, and other attributes.
-    It can be used to conduct reconnaissance and start formulating and targeting computers within the domain
-    Args:
-        computer_id: The ID of the computer to query
-    """
-    try:
-        computer_info = bloodhound_api.computers.get_info(computer_id)
-        return json.dumps(
-            {
-                "message": f"Computer information for {computer_info.get('name')}",
-                "computer_info": computer_info,
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving computer information: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve computer information: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_computer_admin_rights(computer_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the administrative rights of a specific computer in the domain.
-    Administrative rights are privileges that allow a computer to perform administrative tasks on a Security Principal (user, group, or computer) in Active Directory.
-    These rights can be abused in a variety of ways include lateral movement, persistence, and privilege escalation.
-
-    Args:
-        computer_id: The ID of the computer to query
-        limit: Maximum number of administrative rights to return (default: 100)
-        skip: Number of administrative rights to skip for pagination (default: 0)
-    """
-    try:
-        computer_admin_rights = bloodhound_api.computers.get_admin_rights(
-            computer_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {computer_admin_rights.get('count', 0)} administrative rights for the computer",
-                "computer_admin_rights": computer_admin_rights.get("data", []),
-                "count": computer_admin_rights.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving computer administrative rights: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve computer administrative rights: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_computer_admin_users(computer_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the administrative users of a specific computer in the domain.
-    Administrative users are the users that have administrative access to the specified computer.
-    These users can be used to identify potential targets for lateral movement and privilege escalation.
-
-    Args:
-        computer_id: The ID of the computer to query
-        limit: Maximum number of administrative users to return (default: 100)
-        skip: Number of administrative users to skip for pagination (default: 0)
-    """
-    try:
-        computer_admin_users = bloodhound_api.computers.get_admin_users(
-            computer_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {computer_admin_users.get('count', 0)} administrative users for the computer",
-                "computer_admin_users": computer_admin_users.get("data", []),
-                "count": computer_admin_users.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving computer administrative users: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve computer administrative users: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_computer_constrained_delegation_rights(
-    computer_id: str, limit: int = 100, skip: int = 0
-):
-    """
-    Retrieves the constrained delegation rights of a specific computer within the domain.
-    Constrained delegation rights allow a computer to impersonate another user or service when communicating with a service on another computer.
-    These rights can be abused for privilege escalation and lateral movement within the domain.
-
-    Args:
-        computer_id: The ID of the computer to query
-        limit: Maximum number of constrained delegation rights to return (default: 100)
-        skip: Number of constrained delegation rights to skip for pagination (default: 0)
-    """
-    try:
-        computer_constrained_delegation_rights = (
-            bloodhound_api.computers.get_constrained_delegation_rights(
-                computer_id, limit=limit, skip=skip
-            )
-        )
-        return json.dumps(
-            {
-                "message": f"Found {computer_constrained_delegation_rights.get('count', 0)} constrained delegation rights for the computer",
-                "computer_constrained_delegation_rights": computer_constrained_delegation_rights.get(
-                    "data", []
-                ),
-                "count": computer_constrained_delegation_rights.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving computer constrained delegation rights: {e}")
-        return json.dumps(
-            {
-                "error": f"Failed to retrieve computer constrained delegation rights: {str(e)}"
-            }
-        )
-
-
-@mcp.tool()
-def get_computer_constrained_users(computer_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the constrained users of a specific computer in the domain.
-    Constrained users are the users that have constrained delegation access to the specified computer.
-    These users can be used to identify potential targets for lateral movement and privilege escalation.
-
-    Args:
-        computer_id: The ID of the computer to query
-        limit: Maximum number of constrained users to return (default: 100)
-        skip: Number of constrained users to skip for pagination (default: 0)
-    """
-    try:
-        computer_constrained_users = bloodhound_api.computers.get_constrained_users(
-            computer_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {computer_constrained_users.get('count', 0)} constrained users for the computer",
-                "computer_constrained_users": computer_constrained_users.get(
-                    "data", []
-                ),
-                "count": computer_constrained_users.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving computer constrained users: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve computer constrained users: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_computer_controllables(computer_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the Security Princiapls within the domain that a specific computer has administrative control over in the domain.
-    These are entities that the computer can control and manipulate within the domain.
-    These are potential targets for lateral movement, privilege escalation, and persistence.
-
-    Args:
-        computer_id: The ID of the computer to query
-        limit: Maximum number of controllables to return (default: 100)
-        skip: Number of controllables to skip for pagination (default: 0)
-    """
-    try:
-        computer_controlables = bloodhound_api.computers.get_controllables(
-            computer_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {computer_controlables.get('count', 0)} controlables for the computer",
-                "computer_controlables": computer_controlables.get("data", []),
-                "count": computer_controlables.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving computer controlables: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve computer controlables: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_computer_controllers(computer_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the controllers of a specific computer in the domain.
-    Controllers are entities that have control over the specified computer
-    This can be used to help identify paths to gain access to a specific computer.
-    Args:
-        computer_id: The ID of the computer to query
-        limit: Maximum number of controllers to return (default: 100)
-        skip: Number of controllers to skip for pagination (default: 0)
-    """
-    try:
-        computer_controllers = bloodhound_api.computers.get_controllers(
-            computer_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {computer_controllers.get('count', 0)} controllers for the computer",
-                "computer_controllers": computer_controllers.get("data", []),
-                "count": computer_controllers.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving computer controllers: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve computer controllers: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_computer_dcom_rights(computer_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the a list of security principals that a specific computer to execute COM on
-    DCOM rights allow a computer to communicate with COM objects on another computer in the network.
-    These rights can be abused for privilege escalation and lateral movement within the domain.
-    """
-    try:
-        computer_dcom_rights = bloodhound_api.computers.get_dcom_rights(
-            computer_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {computer_dcom_rights.get('count', 0)} DCOM rights for the computer",
-                "computer_dcom_rights": computer_dcom_rights.get("data", []),
-                "count": computer_dcom_rights.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving computer DCOM rights: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve computer DCOM rights: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_computer_dcom_users(computer_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the users that have DCOM rights to a specific computer in the domain.
-    DCOM rights allow a user to communicate with COM objects on another computer in the network.
-    These rights can be abused for privilege escalation and lateral movement within the domain.
-
-    Args:
-        computer_id: The ID of the computer to query
-        limit: Maximum number of DCOM rights to return (default: 100)
-        skip: Number of DCOM rights to skip for pagination (default: 0)
-    """
-    try:
-        computer_dcom_users = bloodhound_api.computers.get_dcom_users(
-            computer_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {computer_dcom_users.get('count', 0)} DCOM users for the computer",
-                "computer_dcom_users": computer_dcom_users.get("data", []),
-                "count": computer_dcom_users.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving computer DCOM users: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve computer DCOM users: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_computer_memberships(computer_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the group memberships of a specific computer within the domain.
-    Group memberships are the groups that the specified computer is a member of within the domain.
-    These memberships can be used to identify potential targets for lateral movement and privilege escalation.
-
-    Args:
-        computer_id: The ID of the computer to query
-        limit: Maximum number of memberships to return (default: 100)
-        skip: Number of memberships to skip for pagination (default: 0)
-    """
-    try:
-        computer_memberships = bloodhound_api.computers.get_memberships(
-            computer_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {computer_memberships.get('count', 0)} memberships for the computer",
-                "computer_memberships": computer_memberships.get("data", []),
-                "count": computer_memberships.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving computer memberships: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve computer memberships: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_computer_ps_remote_rights(computer_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves a list of hosts that this specific computer has the right to PS remote to
-    Remote PowerShell rights allow a computer to execute PowerShell commands on a remote computer.
-    These rights can be abused for lateral movement and privilege escalation within the domain.
-    Args:
-        computer_id: The ID of the computer to query
-        limit: Maximum number of remote PowerShell rights to return (default: 100)
-        skip: Number of remote PowerShell rights to skip for pagination (default: 0)
-    """
-    try:
-        computer_ps_remote_rights = bloodhound_api.computers.get_ps_remote_rights(
-            computer_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {computer_ps_remote_rights.get('count', 0)} remote PowerShell rights for the computer",
-                "computer_ps_remote_rights": computer_ps_remote_rights.get("data", []),
-                "count": computer_ps_remote_rights.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving computer remote PowerShell rights: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve computer remote PowerShell rights: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_computer_ps_remote_users(computer_id: str, limit: int = 100, skip: int = 0):
-    """
-    This retieves the users that have PS remote rights to this specific computer in the domain.
-    Remote PowerShell rights allow a user to execute PowerShell commands on a remote computer.
-    These rights can be abused for lateral movement and privilege escalation within the domain.
-    Args:
-        computer_id: The ID of the computer to query
-        limit: Maximum number of remote PowerShell rights to return (default: 100)
-        skip: Number of remote PowerShell rights to skip for pagination (default: 0)
-    """
-    try:
-        computer_ps_remote_users = bloodhound_api.computers.get_ps_remote_users(
-            computer_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {computer_ps_remote_users.get('count', 0)} remote PowerShell users for the computer",
-                "computer_ps_remote_users": computer_ps_remote_users.get("data", []),
-                "count": computer_ps_remote_users.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving computer remote PowerShell users: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve computer remote PowerShell users: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_computer_rdp_rights(computer_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves a list of hosts that this specific computer has the right to RDP to
-    RDP rights allow a computer to remotely connect to another computer using the Remote Desktop Protocol.
-    These rights can be abused for lateral movement and privilege escalation within the domain.
-    Args:
-        computer_id: The ID of the computer to query
-        limit: Maximum number of RDP rights to return (default: 100)
-        skip: Number of RDP rights to skip for pagination (default: 0)
-    """
-    try:
-        computer_rdp_rights = bloodhound_api.computers.get_rdp_rights(
-            computer_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {computer_rdp_rights.get('count', 0)} RDP rights for the computer",
-                "computer_rdp_rights": computer_rdp_rights.get("data", []),
-                "count": computer_rdp_rights.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving computer RDP rights: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve computer RDP rights: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_computer_rdp_users(computer_id: str, limit: int = 100, skip: int = 0):
-    """
-    This retieves the users that have RDP rights to this specific computer in the domain.
-    RDP rights allow a user to remotely connect to another computer using the Remote Desktop Protocol.
-    These rights can be abused for lateral movement and privilege escalation within the domain.
-
-    Args:
-        computer_id: The ID of the computer to query
-        limit: Maximum number of RDP rights to return (default: 100)
-        skip: Number of RDP rights to skip for pagination (default: 0)
-    """
-    try:
-        computer_rdp_users = bloodhound_api.computers.get_rdp_users(
-            computer_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {computer_rdp_users.get('count', 0)} RDP users for the computer",
-                "computer_rdp_users": computer_rdp_users.get("data", []),
-                "count": computer_rdp_users.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving computer RDP users: {e}")
-        return json.dumps({"error": f"Failed to retrieve computer RDP users: {str(e)}"})
-
-
-@mcp.tool()
-def get_computer_sessions(computer_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the active sessions of a specific computer within the domain.
-    Active sessions are the current sessions that a computer has within the domain.
-    These sessions can be used to identify potential targets for lateral movement and privilege escalation.
-    These sessions can also be used to formulate and inform on attack paths because if a user has an active session on a host their credentials are cached in memory
-
-    Args:
-        computer_id: The ID of the computer to query
-        limit: Maximum number of sessions to return (default: 100)
-        skip: Number of sessions to skip for pagination (default: 0)
-    """
-    try:
-        computer_sessions = bloodhound_api.computers.get_sessions(
-            computer_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {computer_sessions.get('count', 0)} sessions for the computer",
-                "computer_sessions": computer_sessions.get("data", []),
-                "count": computer_sessions.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving computer sessions: {e}")
-        return json.dumps({"error": f"Failed to retrieve computer sessions: {str(e)}"})
-
-
-@mcp.tool()
-def get_computer_sql_admin_rights(computer_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the SQL administrative rights of a specific computer within the domain.
-    SQL administrative rights allow a computer to perform administrative tasks on a SQL Server.
-    These rights can be abused for lateral movement and privilege escalation within the domain.
-
-    Args:
-        computer_id: The ID of the computer to query
-        limit: Maximum number of SQL administrative rights to return (default: 100)
-        skip: Number of SQL administrative rights to skip for pagination (default: 0)
-    """
-    try:
-        computer_sql_admin_rights = bloodhound_api.computers.get_sql_admin_rights(
-            computer_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {computer_sql_admin_rights.get('count', 0)} SQL administrative rights for the computer",
-                "computer_sql_admin_rights": computer_sql_admin_rights.get("data", []),
-                "count": computer_sql_admin_rights.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving computer SQL administrative rights: {e}")
-        return json.dumps(
-            {
-                "error": f"Failed to retrieve computer SQL administrative rights: {str(e)}"
-            }
-        )
-
-
-# mcp tools for the OUs apis
-@mcp.tool()
-def get_ou_info(ou_id: str):
-    """
-    Retrieves information about a specific OU in a specific domain.
-    This provides a general overview of an OU's information including their name, domain, and other attributes.
-    It can be used to conduct reconnaissance and start formulating and targeting OUs within the domain
-    Args:
-        ou_id: The ID of the OU to query
-    """
-    try:
-        ou_info = bloodhound_api.ous.get_info(ou_id)
-        return json.dumps(
-            {"message": f"OU information for {ou_info.get('name')}", "ou_info": ou_info}
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving OU information: {e}")
-        return json.dumps({"error": f"Failed to retrieve OU information: {str(e)}"})
-
-
-@mcp.tool()
-def get_ou_computers(ou_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the computers within a specific OU in the domain.
-    This can be used to identify potential targets for lateral movement and privilege escalation.
-
-    Args:
-        ou_id: The ID of the OU to query
-        limit: Maximum number of computers to return (default: 100)
-        skip: Number of computers to skip for pagination (default: 0)
-    """
-    try:
-        ou_computers = bloodhound_api.ous.get_computers(ou_id, limit=limit, skip=skip)
-        return json.dumps(
-            {
-                "message": f"Found {ou_computers.get('count', 0)} computers for the OU",
-                "ou_computers": ou_computers.get("data", []),
-                "count": ou_computers.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving OU computers: {e}")
-        return json.dumps({"error": f"Failed to retrieve OU computers: {str(e)}"})
-
-
-@mcp.tool()
-def get_ou_groups(ou_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the groups within a specific OU in the domain.
-    This can be used to identify potential targets for lateral movement and privilege escalation.
-
-    Args:
-        ou_id: The ID of the OU to query
-        limit: Maximum number of groups to return (default: 100)
-        skip: Number of groups to skip for pagination (default: 0)
-    """
-    try:
-        ou_groups = bloodhound_api.ous.get_groups(ou_id, limit=limit, skip=skip)
-        return json.dumps(
-            {
-                "message": f"Found {ou_groups.get('count', 0)} groups for the OU",
-                "ou_groups": ou_groups.get("data", []),
-                "count": ou_groups.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving OU groups: {e}")
-        return json.dumps({"error": f"Failed to retrieve OU groups: {str(e)}"})
-
-
-@mcp.tool()
-def get_ou_gpos(ou_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the GPOs within a specific OU in the domain.
-    This can be used to identify potential targets for lateral movement and privilege escalation.
-
-    Args:
-        ou_id: The ID of the OU to query
-        limit: Maximum number of GPOs to return (default: 100)
-        skip: Number of GPOs to skip for pagination (default: 0)
-    """
-    try:
-        ou_gpos = bloodhound_api.ous.get_gpos(ou_id, limit=limit, skip=skip)
-        return json.dumps(
-            {
-                "message": f"Found {ou_gpos.get('count', 0)} GPOs for the OU",
-                "ou_gpos": ou_gpos.get("data", []),
-                "count": ou_gpos.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving OU GPOs: {e}")
-        return json.dumps({"error": f"Failed to retrieve OU GPOs: {str(e)}"})
-
-
-@mcp.tool()
-def get_ou_groups(ou_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the list of groups contained within the specific Organizational Unit
-    This can be used to identify potential targets for lateral movemner and privilege escalation
-    This can also be used to help identify attack paths
-
-    Args:
-        ou_id: The ID of the OU to query
-        limit: Maximum number of groups to return (default: 100)
-        skip: Number of groups to skip for pagination (default: 0)
-    """
-    try:
-        ou_groups = bloodhound_api.ous.get_groups(ou_id, limit=limit, skip=skip)
-        return json.dumps(
-            {
-                "message": f"Found {ou_groups.get('count', 0)} groups for the OU",
-                "ou_groups": ou_groups.get("data", []),
-                "count": ou_groups.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving OU groups: {e}")
-        return json.dumps({"error": f"Failed to retrieve OU groups: {str(e)}"})
-
-
-@mcp.tool()
-def get_ou_users(ou_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the users within a specific OU in the domain.
-    This can be used to identify potential targets for lateral movement and privilege escalation.
-
-    Args:
-        ou_id: The ID of the OU to query
-        limit: Maximum number of users to return (default: 100)
-        skip: Number of users to skip for pagination (default: 0)
-    """
-    try:
-        ou_users = bloodhound_api.ous.get_users(ou_id, limit=limit, skip=skip)
-        return json.dumps(
-            {
-                "message": f"Found {ou_users.get('count', 0)} users for the OU",
-                "ou_users": ou_users.get("data", []),
-                "count": ou_users.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving OU users: {e}")
-        return json.dumps({"error": f"Failed to retrieve OU users: {str(e)}"})
-
-
-# GPO tools
-@mcp.tool()
-def get_gpo_info(gpo_id: str):
-    """
-    Retrieves information about a specific GPO in a specific domain.
-    This provides a general overview of a GPO's information including their name, domain, and other attributes.
-    It can be used to conduct reconnaissance and start formulating and targeting GPOs within the domain
-    Args:
-        gpo_id: The ID of the GPO to query
-    """
-    try:
-        gpo_info = bloodhound_api.gpos.get_info(gpo_id)
-        return json.dumps(
-            {
-                "message": f"GPO information for {gpo_info.get('name')}",
-                "gpo_info": gpo_info,
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving GPO information: {e}")
-        return json.dumps({"error": f"Failed to retrieve GPO information: {str(e)}"})
-
-
-@mcp.tool()
-def get_gpo_computers(gpo_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the computers within a specific GPO in the domain.
-    This can be used to identify potential targets for lateral movement and privilege escalation.
-
-    Args:
-        gpo_id: The ID of the GPO to query
-        limit: Maximum number of computers to return (default: 100)
-        skip: Number of computers to skip for pagination (default: 0)
-    """
-    try:
-        gpo_computers = bloodhound_api.gpos.get_computers(
-            gpo_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {gpo_computers.get('count', 0)} computers for the GPO",
-                "gpo_computers": gpo_computers.get("data", []),
-                "count": gpo_computers.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving GPO computers: {e}")
-        return json.dumps({"error": f"Failed to retrieve GPO computers: {str(e)}"})
-
-
-@mcp.tool()
-def get_gpo_controllers(gpo_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the controllers of a specific GPO in the domain.
-    Controllers are entities that have control over the specified GPO
-    This can be used to help identify paths to gain access to a specific GPO.
-
-    Args:
-        gpo_id: The ID of the GPO to query
-        limit: Maximum number of controllers to return (default: 100)
-        skip: Number of controllers to skip for pagination (default: 0)
-    """
-    try:
-        gpo_controllers = bloodhound_api.gpos.get_controllers(
-            gpo_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {gpo_controllers.get('count', 0)} controllers for the GPO",
-                "gpo_controllers": gpo_controllers.get("data", []),
-                "count": gpo_controllers.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving GPO controllers: {e}")
-        return json.dumps({"error": f"Failed to retrieve GPO controllers: {str(e)}"})
-
-
-@mcp.tool()
-def get_gpo_ous(gpo_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the OUs that are linked to a specific GPO in the domain.
-    This can be used to identify potential targets for lateral movement and privilege escalation.
-
-    Args:
-        gpo_id: The ID of the GPO to query
-        limit: Maximum number of OUs to return (default: 100)
-        skip: Number of OUs to skip for pagination (default: 0)
-    """
-    try:
-        gpo_ous = bloodhound_api.gpos.get_ous(gpo_id, limit=limit, skip=skip)
-        return json.dumps(
-            {
-                "message": f"Found {gpo_ous.get('count', 0)} OUs for the GPO",
-                "gpo_ous": gpo_ous.get("data", []),
-                "count": gpo_ous.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving GPO OUs: {e}")
-        return json.dumps({"error": f"Failed to retrieve GPO OUs: {str(e)}"})
-
-
-@mcp.tool()
-def get_gpo_tier_zeros(gpo_id: str, limit: 100, skip: int = 0):
-    """
-    Retrieves the Tier 0 groups that are linked to a specific GPO in the domain.
-    Tier 0 groups are the highest privileged groups in the domain and have access to all resources.
-    This can be used to identify potential targets for lateral movement and privilege escalation.
-
-    Args:
-        gpo_id: The ID of the GPO to query
-        limit: Maximum number of Tier 0 groups to return (default: 100)
-        skip: Number of Tier 0 groups to skip for pagination (default: 0)
-    """
-    try:
-        gpo_tier_zeros = bloodhound_api.gpos.get_tier_zeros(
-            gpo_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {gpo_tier_zeros.get('count', 0)} Tier 0 groups for the GPO",
-                "gpo_tier_zeros": gpo_tier_zeros.get("data", []),
-                "count": gpo_tier_zeros.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving GPO Tier 0 groups: {e}")
-        return json.dumps({"error": f"Failed to retrieve GPO Tier 0 groups: {str(e)}"})
-
-
-@mcp.tool()
-def get_gpo_users(gpo_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the users within a specific GPO in the domain.
-    This can be used to identify potential targets for lateral movement and privilege escalation.
-
-    Args:
-        gpo_id: The ID of the GPO to query
-        limit: Maximum number of users to return (default: 100)
-        skip: Number of users to skip for pagination (default: 0)
-    """
-    try:
-        gpo_users = bloodhound_api.gpos.get_users(gpo_id, limit=limit, skip=skip)
-        return json.dumps(
-            {
-                "message": f"Found {gpo_users.get('count', 0)} users for the GPO",
-                "gpo_users": gpo_users.get("data", []),
-                "count": gpo_users.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving GPO users: {e}")
-        return json.dumps({"error": f"Failed to retrieve GPO users: {str(e)}"})
-
-
-# MCP tools for the /graph apis except for cypher queries to be implemented later
-@mcp.tool()
-def search_graph(query: str, search_type: str = "fuzzy"):
-    """
-    Search for nodes in the Bloodhound graph by name.
-    This function lets you find specific nodes in the graph based on a search query.
-    Results are typically returned as matches on node names.
-
-    Args:
-        query: Search text to find nodes by name
-        search_type: Type of search to perform - "fuzzy" (default) for approximate matches, "exact" for exact matches
-    """
-    try:
-        results = bloodhound_api.graph.search(query, search_type)
-        return json.dumps(
-            {
-                "message": f"Search results for '{query}'",
-                "results": results.get("data", []),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error searching graph: {e}")
-        return json.dumps({"error": f"Failed to search graph: {str(e)}"})
-
-
-@mcp.tool()
-def get_shortest_path(start_node: str, end_node: str, relationship_kinds: str = None):
-    """
-    Find the shortest path between two nodes in the Bloodhound graph.
-    This is useful for attack path analysis, showing the most direct route between two security principals.
-    The path will show all the intermediary nodes and the types of relationships connecting them.
-    If this returns a 500 or 404 error it is likely that the path does not exist within bloodhound
-
-    Args:
-        start_node: Object ID of the starting node (source)
-        end_node: Object ID of the ending node (target)
-        relationship_kinds: Optional comma-separated list of relationship types to include in the path
-    """
-    try:
-        path = bloodhound_api.graph.get_shortest_path(
-            start_node, end_node, relationship_kinds
-        )
-        return json.dumps(
-            {
-                "message": f"Shortest path from {start_node} to {end_node}",
-                "path": path.get("data", {}),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error getting shortest path: {e}")
-        return json.dumps({"error": f"Failed to get shortest path: {str(e)}"})
-
-
-@mcp.tool()
-def get_edge_composition(source_node: int, target_node: int, edge_type: str):
-    """
-    Analyze the components of a complex edge between two nodes.
-    In Bloodhound, many high-level edges (like "HasPath" or "AdminTo") are composed of multiple
-    individual relationships. This function reveals those underlying components.
-    This is useful for understanding exactly how security principals are connected.
-
-    Args:
-        source_node: ID of the source node
-        target_node: ID of the target node
-        edge_type: Type of edge to analyze (e.g., "MemberOf", "AdminTo", "CanRDP")
-    """
-    try:
-        composition = bloodhound_api.graph.get_edge_composition(
-            source_node, target_node, edge_type
-        )
-        return json.dumps(
-            {
-                "message": f"Edge composition for {edge_type} edge from {source_node} to {target_node}",
-                "composition": composition.get("data", {}),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error getting edge composition: {e}")
-        return json.dumps({"error": f"Failed to get edge composition: {str(e)}"})
-
-
-@mcp.tool()
-def get_relay_targets(source_node: int, target_node: int, edge_type: str):
-    """
-    Find valid relay targets for a given edge in the Bloodhound graph.
-    Relay targets represent potential nodes that could be used to relay an attack or
-    privilege escalation between two nodes. This is critical for advanced attack path planning.
-
-    Args:
-        source_node: ID of the source node
-        target_node: ID of the target node
-        edge_type: Type of edge (relationship) between the nodes
-    """
-    try:
-        targets = bloodhound_api.graph.get_relay_targets(
-            source_node, target_node, edge_type
-        )
-        return json.dumps(
-            {
-                "message": f"Relay targets for {edge_type} edge from {source_node} to {target_node}",
-                "targets": targets.get("data", {}),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error getting relay targets: {e}")
-        return json.dumps({"error": f"Failed to get relay targets: {str(e)}"})
-
-
-# MCP Tools for Active Directory Certificate Services (AD CS) APIs
-@mcp.tool()
-def get_cert_template_info(template_id: str):
-    """
-    Retrieves information about a specific Certificate Template.
-    Certificate Templates define the properties and security settings for certificates that can be issued.
-    They can be abused for privilege escalation if misconfigured.
-
-    Args:
-        template_id: The ID of the Certificate Template to query
-    """
-    try:
-        cert_template_info = bloodhound_api.adcs.get_cert_template_info(template_id)
-        return json.dumps(
-            {
-                "message": f"Certificate Template information for {cert_template_info.get('name', template_id)}",
-                "cert_template_info": cert_template_info,
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving Certificate Template information: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve Certificate Template information: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_cert_template_controllers(template_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the controllers of a specific Certificate Template.
-    Controllers are security principals that can modify the Certificate Template or its properties.
-    This is critical for identifying ESC2 vulnerabilities (vulnerable Certificate Template access control).
-
-    Args:
-        template_id: The ID of the Certificate Template to query
-        limit: Maximum number of controllers to return (default: 100)
-        skip: Number of controllers to skip for pagination (default: 0)
-    """
-    try:
-        cert_template_controllers = bloodhound_api.adcs.get_cert_template_controllers(
-            template_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {cert_template_controllers.get('count', 0)} controllers for the Certificate Template",
-                "cert_template_controllers": cert_template_controllers.get("data", []),
-                "count": cert_template_controllers.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving Certificate Template controllers: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve Certificate Template controllers: {str(e)}"}
-        )
-
-
-# MCP tools for Root CAs
-@mcp.tool()
-def get_root_ca_info(ca_id: str):
-    """
-    Retrieves information about a specific Root Certificate Authority.
-    Root CAs are the foundation of trust in a PKI infrastructure.
-    Controlling a Root CA allows an attacker to issue trusted certificates.
-
-    Args:
-        ca_id: The ID of the Root CA to query
-    """
-    try:
-        root_ca_info = bloodhound_api.adcs.get_root_ca_info(ca_id)
-        return json.dumps(
-            {
-                "message": f"Root CA information for {root_ca_info.get('name', ca_id)}",
-                "root_ca_info": root_ca_info,
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving Root CA information: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve Root CA information: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_root_ca_controllers(ca_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the controllers of a specific Root Certificate Authority.
-    Controllers of a Root CA can compromise the entire PKI infrastructure.
-    This is critical for identifying ESC4 and ESC5 attack paths.
-
-    Args:
-        ca_id: The ID of the Root CA to query
-        limit: Maximum number of controllers to return (default: 100)
-        skip: Number of controllers to skip for pagination (default: 0)
-    """
-    try:
-        root_ca_controllers = bloodhound_api.adcs.get_root_ca_controllers(
-            ca_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {root_ca_controllers.get('count', 0)} controllers for the Root CA",
-                "root_ca_controllers": root_ca_controllers.get("data", []),
-                "count": root_ca_controllers.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving Root CA controllers: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve Root CA controllers: {str(e)}"}
-        )
-
-
-# MCP tools for Enterprise CAs
-@mcp.tool()
-def get_enterprise_ca_info(ca_id: str):
-    """
-    Retrieves information about a specific Enterprise Certificate Authority.
-    Enterprise CAs issue certificates within the organization based on Certificate Templates.
-    They are critical components in the Active Directory PKI infrastructure.
-
-    Args:
-        ca_id: The ID of the Enterprise CA to query
-    """
-    try:
-        enterprise_ca_info = bloodhound_api.adcs.get_enterprise_ca_info(ca_id)
-        return json.dumps(
-            {
-                "message": f"Enterprise CA information for {enterprise_ca_info.get('name', ca_id)}",
-                "enterprise_ca_info": enterprise_ca_info,
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving Enterprise CA information: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve Enterprise CA information: {str(e)}"}
-        )
-
-
-@mcp.tool()
-def get_enterprise_ca_controllers(ca_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the controllers of a specific Enterprise Certificate Authority.
-    Controllers of an Enterprise CA can issue arbitrary certificates and potentially compromise the domain.
-    This is critical for identifying ESC3 and ESC6 attack paths.
-
-    Args:
-        ca_id: The ID of the Enterprise CA to query
-        limit: Maximum number of controllers to return (default: 100)
-        skip: Number of controllers to skip for pagination (default: 0)
-    """
-    try:
-        enterprise_ca_controllers = bloodhound_api.adcs.get_enterprise_ca_controllers(
-            ca_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {enterprise_ca_controllers.get('count', 0)} controllers for the Enterprise CA",
-                "enterprise_ca_controllers": enterprise_ca_controllers.get("data", []),
-                "count": enterprise_ca_controllers.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving Enterprise CA controllers: {e}")
-        return json.dumps(
-            {"error": f"Failed to retrieve Enterprise CA controllers: {str(e)}"}
-        )
-
-
-# MCP tools for AIA CAs
-@mcp.tool()
-def get_aia_ca_controllers(ca_id: str, limit: int = 100, skip: int = 0):
-    """
-    Retrieves the controllers of a specific AIA Certificate Authority.
-    AIA (Authority Information Access) CAs provide additional trust information.
-    Controllers of an AIA CA may be able to perform certificate-based attacks.
-
-    Args:
-        ca_id: The ID of the AIA CA to query
-        limit: Maximum number of controllers to return (default: 100)
-        skip: Number of controllers to skip for pagination (default: 0)
-    """
-    try:
-        aia_ca_controllers = bloodhound_api.adcs.get_aia_ca_controllers(
-            ca_id, limit=limit, skip=skip
-        )
-        return json.dumps(
-            {
-                "message": f"Found {aia_ca_controllers.get('count', 0)} controllers for the AIA CA",
-                "aia_ca_controllers": aia_ca_controllers.get("data", []),
-                "count": aia_ca_controllers.get("count", 0),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving AIA CA controllers: {e}")
-        return json.dumps({"error": f"Failed to retrieve AIA CA controllers: {str(e)}"})
-
-
-# MCP tools for getting the AI to leverage Cypher Queries
-@mcp.tool()
-def run_cypher_query(query: str, include_properties: bool = True):
-    """
-    Run a custom Cypher query on the BloodHound Neo4j database.
-
-    Args:
-        query: The Cypher query to execute
-        include_properties: Whether to include node/edge properties in the response
-
-    Returns:
-        JSON response with graph data (nodes and edges)
-    """
-    try:
-        result = bloodhound_api.cypher.run_query(query, include_properties)
-        return json.dumps(
-            {
-                "message": "Cypher query executed successfully",
-                "result": result.get("data", {}),
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error executing Cypher query: {e}")
-        return json.dumps({"error": f"Failed to execute Cypher query: {str(e)}"})
-
-
-# Create saved query management tools
-@mcp.tool()
-def create_saved_query(name: str, query: str):
-    """
-    Create a new saved Cypher query.
-
-    Args:
-        name: Name for the saved query
-        query: The Cypher query to save
-
-    Returns:
-        JSON response with the created saved query data
-    """
-    try:
-        saved_query = bloodhound_api.cypher.create_saved_query(name, query)
-        return json.dumps(
-            {
-                "message": f"Successfully created saved query: {name}",
-                "query": saved_query,
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error creating saved query: {e}")
-        return json.dumps({"error": f"Failed to create saved query: {str(e)}"})
-
-
-# list already saved queries
-@mcp.tool()
-def list_saved_queries(skip: int = 0, limit: int = 100, name: str = None):
-    """
-    List saved Cypher queries.
-
-    Args:
-        skip: Number of queries to skip for pagination
-        limit: Maximum number of queries to return
-        name: Filter by query name
-
-    Returns:
-        JSON response with list of saved queries
-    """
-    try:
-        queries = bloodhound_api.cypher.list_saved_queries(skip, limit, name)
-        return json.dumps(
-            {"message": f"Found {len(queries)} saved queries", "queries": queries}
-        )
-    except Exception as e:
-        logger.error(f"Error listing saved queries: {e}")
-        return json.dumps({"error": f"Failed to list saved queries: {str(e)}"})
-
-
-# main function to start the server
-async def main():
-    """Main function to start the server"""
-    # Test connection to Bloodhound API
-    try:
-        version_info = bloodhound_api.test_connection()
-        if version_info:
-            logger.info(
-                f"Successfully connected to Bloodhound API. Version: {version_info}"
-            )
-        else:
-            logger.error("Failed to connect to Bloodhound API")
-    except Exception as e:
-        logger.error(f"Error connecting to Bloodhound API: {e}")
-
-    # Run the MCP server
-    await mcp.run_stdio_async()
+    return args
 
 
 if __name__ == "__main__":
     import asyncio
 
-    parser = argparse.ArgumentParser(description="Bloodhound CE MCP Server")
-    # Add any command line arguments you need
+    args = parse_args()
 
-    args = parser.parse_args()
+    if args.workers > 1:
+        run_workers(args)
+    else:
+        mcp.settings.host = args.host
+        mcp.settings.port = args.port
+        # Read by create_bloodhound_api() when the client is first used
+        os.environ["BLOODHOUND_CACHE_URL"] = args.cache
+        os.environ["BLOODHOUND_CACHE_TTL"] = str(args.cache_ttl)
 
-    # Start the server
-    asyncio.run(main())
+        # Start the server
+        asyncio.run(main(args.transport))
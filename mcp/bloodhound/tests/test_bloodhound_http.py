@@ -1,4 +1,5 @@
 import json
+import re
 from unittest.mock import MagicMock, Mock, patch
 
 import pytest
@@ -11,6 +12,7 @@ from lib.bloodhound_api import (
     BloodhoundBaseClient,
     BloodhoundConnectionError,
 )
+from lib.endpoints import ENDPOINTS
 
 
 class TestHTTPRequestFormation:
@@ -354,6 +356,57 @@ class TestBloodhoundAPIClientMethods:
         print(f"   Found {result['count']} users")
         print(f"   Kerberoastable users: {len(kerberoastable)}")
 
+    @patch.object(BloodhoundBaseClient, "request")
+    def test_endpoint_table_methods(self, mock_request):
+        """
+        Every client method generated from the endpoint table hits its path
+        """
+        mock_request.return_value = {"data": [], "count": 0}
+        api = BloodhoundAPI(
+            domain="test.domain.com", token_id="test_id", token_key="test_key"
+        )
+
+        for endpoint in ENDPOINTS:
+            resource, name = endpoint.method.split(".")
+            method = getattr(getattr(api, resource), name)
+            mock_request.reset_mock()
+
+            if endpoint.paginated:
+                method("OBJECT-1", limit=25, skip=50)
+                expected_params = {"limit": 25, "skip": 50, "type": "list"}
+            else:
+                method("OBJECT-1")
+                expected_params = {"counts": "true"} if endpoint.counts else None
+
+            call = mock_request.call_args
+            expected_path = re.sub(r"\{\w+\}", "OBJECT-1", endpoint.path)
+            assert call.args == ("GET", expected_path)
+            assert call.kwargs.get("params") == expected_params
+
+        print(f"✅ {len(ENDPOINTS)} generated client methods build the right requests")
+
+    @patch.object(BloodhoundBaseClient, "request")
+    def test_endpoint_table_methods_take_keyword_arguments(self, mock_request):
+        """
+        Generated methods accept their ID by the name they advertise
+        """
+        mock_request.return_value = {"data": [], "count": 0}
+        api = BloodhoundAPI(
+            domain="test.domain.com", token_id="test_id", token_key="test_key"
+        )
+
+        api.users.get_info(user_id="S-1")
+        assert mock_request.call_args.args == ("GET", "/api/v2/users/S-1")
+
+        api.groups.get_members(group_id="S-2", limit=5, skip=10)
+        assert mock_request.call_args.args == ("GET", "/api/v2/groups/S-2/members")
+        assert mock_request.call_args.kwargs["params"]["limit"] == 5
+
+        with pytest.raises(TypeError):
+            api.users.get_info(object_id="S-1")
+
+        print("✅ Generated client methods take their advertised keyword arguments")
+
 
 class TestOffensiveSecurityHTTPScenarios:
     """
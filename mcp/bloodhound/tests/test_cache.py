@@ -0,0 +1,132 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from lib.bloodhound_api import BloodhoundBaseClient
+from lib.cache import MemoryCache, SqliteCache, create_cache
+
+
+class TestCacheBackends:
+    """
+    Test the response cache backends used by the API client
+    """
+
+    def test_memory_cache_roundtrip_and_expiry(self):
+        """
+        Values come back until their TTL runs out
+        """
+        cache = MemoryCache(default_ttl=60)
+        cache.set("key", {"data": [1, 2, 3]})
+        assert cache.get("key") == {"data": [1, 2, 3]}
+
+        cache.set("stale", {"data": []}, ttl=-1)
+        assert cache.get("stale") is None
+        assert cache.get("missing") is None
+
+        print("✅ Memory cache stores and expires entries")
+
+    def test_memory_cache_evicts_oldest(self):
+        """
+        The memory cache is bounded and drops the least recently used entry
+        """
+        cache = MemoryCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now the least recently used
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+        print("✅ Memory cache evicts the least recently used entry")
+
+    def test_sqlite_cache_is_shared_between_instances(self, tmp_path):
+        """
+        Two SqliteCache objects on one file behave like two worker processes
+        """
+        path = str(tmp_path / "cache.sqlite3")
+        worker_a = SqliteCache(path)
+        worker_b = SqliteCache(path)
+
+        worker_a.set("GET /api/v2/available-domains", {"data": [{"name": "X"}]})
+        assert worker_b.get("GET /api/v2/available-domains") == {
+            "data": [{"name": "X"}]
+        }
+
+        worker_b.set("expired", {"data": []}, ttl=-1)
+        assert worker_a.get("expired") is None
+
+        worker_a.clear()
+        assert worker_b.get("GET /api/v2/available-domains") is None
+
+        print("✅ SQLite cache is shared across instances")
+
+    def test_create_cache_from_url(self, tmp_path):
+        """
+        Cache URLs select the right backend
+        """
+        assert create_cache(None) is None
+        assert create_cache("none") is None
+        assert isinstance(create_cache("memory://"), MemoryCache)
+
+        sqlite_cache = create_cache(f"sqlite://{tmp_path}/c.sqlite3")
+        assert isinstance(sqlite_cache, SqliteCache)
+        assert sqlite_cache.path == f"{tmp_path}/c.sqlite3"
+
+        with pytest.raises(ValueError):
+            create_cache("redis://localhost")
+
+        print("✅ Cache URLs are parsed correctly")
+
+
+class TestClientCaching:
+    """
+    Test that the base client serves repeated reads from the cache
+    """
+
+    def _client(self, cache):
+        return BloodhoundBaseClient(
+            domain="test.bloodhound.local",
+            token_id="fake_id",
+            token_key="fake_key",
+            cache=cache,
+        )
+
+    @patch("requests.request")
+    def test_get_requests_are_cached(self, mock_request):
+        mock_response = Mock()
+        mock_response.json.return_value = {"data": [], "count": 0}
+        mock_response.raise_for_status.return_value = None
+        mock_request.return_value = mock_response
+
+        client = self._client(MemoryCache())
+        params = {"limit": 10, "skip": 0, "type": "list"}
+        first = client.request("GET", "/api/v2/domains/D/users", params=params)
+        second = client.request("GET", "/api/v2/domains/D/users", params=params)
+
+        assert first == second == {"data": [], "count": 0}
+        assert mock_request.call_count == 1
+
+        # A different page is a different cache entry
+        client.request("GET", "/api/v2/domains/D/users", params={"skip": 10})
+        assert mock_request.call_count == 2
+
+        print("✅ Repeated GET requests hit the cache")
+
+    @patch("requests.request")
+    def test_writes_and_opt_outs_bypass_cache(self, mock_request):
+        mock_response = Mock()
+        mock_response.json.return_value = {"data": {}}
+        mock_response.raise_for_status.return_value = None
+        mock_request.return_value = mock_response
+
+        client = self._client(MemoryCache())
+        client.request("POST", "/api/v2/graphs/cypher", data={"query": "RETURN 1"})
+        client.request("POST", "/api/v2/graphs/cypher", data={"query": "RETURN 1"})
+        client.request("GET", "/api/version", cacheable=False)
+        client.request("GET", "/api/version", cacheable=False)
+
+        assert mock_request.call_count == 4
+
+        print("✅ POST requests and cacheable=False are never cached")
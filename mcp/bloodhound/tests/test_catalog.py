@@ -0,0 +1,58 @@
+from mcp.server.fastmcp import FastMCP
+
+from lib.catalog import CAPABILITY, advertise_tool_fingerprint, tool_fingerprint
+
+
+def make_server():
+    server = FastMCP("catalog-test")
+
+    @server.tool()
+    def get_users(domain: str) -> str:
+        """List the users of a domain"""
+        return domain
+
+    @server.tool()
+    def get_groups(domain: str) -> str:
+        """List the groups of a domain"""
+        return domain
+
+    return server
+
+
+def advertised(server):
+    options = server._mcp_server.create_initialization_options()
+    return options.capabilities.experimental[CAPABILITY]["fingerprint"]
+
+
+class TestToolFingerprint:
+    """
+    Test the tool catalog fingerprint advertised on initialize
+    """
+
+    def test_fingerprint_follows_the_catalog(self):
+        tools = make_server()._tool_manager.list_tools()
+        fingerprint = tool_fingerprint(tools)
+
+        assert tool_fingerprint(reversed(tools)) == fingerprint
+        changed = [tools[0].model_copy(update={"description": "Changed"}), tools[1]]
+        assert tool_fingerprint(changed) != fingerprint
+
+        print("✅ Fingerprint ignores tool order and changes with any schema")
+
+    def test_initialize_advertises_fingerprint(self):
+        server = make_server()
+        source = advertise_tool_fingerprint(server)
+        before = advertised(server)
+
+        assert before == tool_fingerprint(server._tool_manager.list_tools())
+        assert advertised(server) == source() == before
+
+        @server.tool()
+        def get_computers(domain: str) -> str:
+            """List the computers of a domain"""
+            return domain
+
+        # Tools registered after the server was wrapped are covered too
+        assert advertised(server) != before
+
+        print(f"✅ Initialize advertises tool catalog {before[:12]}...")
@@ -186,6 +186,30 @@ class TestDomainMCPTools:
         print(f"   Found {result['count']} users")
         print(f"   Service accounts: {len(service_accounts)}")
 
+    @pytest.mark.skipif(not MAIN_IMPORTED, reason="main.py could not be imported")
+    @patch("main.bloodhound_api")
+    def test_result_keys_are_unchanged(self, mock_api):
+        """
+        Test that tools whose names differ from their result keys keep the keys
+        """
+        fake_data = {"data": [{"name": "admin@testdomain.local"}], "count": 1}
+        mock_api.domains.get_controllers.return_value = fake_data
+        mock_api.users.get_controllables.return_value = fake_data
+        mock_api.groups.get_controllables.return_value = fake_data
+        mock_api.computers.get_controllables.return_value = fake_data
+
+        expected = {
+            "get_security_controllers": "controllers",
+            "get_user_controllables": "user_controlables",
+            "get_group_controllables": "group_controlables",
+            "get_computer_controllables": "computer_controlables",
+        }
+        for tool, key in expected.items():
+            result = json.loads(getattr(main, tool)("S-1-5-21-1", limit=10, skip=0))
+            assert result[key] == fake_data["data"], tool
+
+        print("✅ Result keys match the original tools")
+
 
 class TestManualFunctionTesting:
     """
@@ -0,0 +1,215 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from lib.bloodhound_api import BloodhoundAuthError
+from lib.health import (
+    STATUS_MISCONFIGURED,
+    STATUS_OK,
+    STATUS_STARTING,
+    STATUS_UNREACHABLE,
+    HealthProbe,
+)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Wall-clock budget from spawning the stdio server to its initialize response.
+# Generous enough for slow CI machines, far below a TCP connect timeout.
+COLD_START_BUDGET_SECONDS = 5.0
+
+# Budget for `import main` once the MCP SDK itself is loaded. Registering the
+# tool table used to dominate this; it now takes a few tens of milliseconds.
+IMPORT_BUDGET_SECONDS = 0.5
+
+IMPORT_TIMER = """
+import json, sys, time
+import mcp.server.fastmcp
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "elapsed": elapsed,
+    "requests_loaded": "requests" in sys.modules,
+    "tools": [tool.name for tool in main.mcp._tool_manager.list_tools()],
+}))
+"""
+
+
+class TestHealthProbe:
+    """
+    Test the background health probe without a BloodHound instance
+    """
+
+    def test_start_does_not_wait_for_check(self):
+        """
+        A hanging BloodHound must not delay the caller of start()
+        """
+        probe = HealthProbe(lambda: time.sleep(2), interval=60)
+
+        started = time.perf_counter()
+        probe.start()
+        elapsed = time.perf_counter() - started
+        probe.stop()
+
+        assert elapsed < 0.5
+        assert probe.status["status"] == STATUS_STARTING
+
+        print(f"✅ start() returned in {elapsed * 1000:.1f} ms")
+
+    def test_probe_outcomes(self):
+        """
+        Each kind of check result maps to a status
+        """
+        result = HealthProbe(lambda: {"server_version": "v7"}).probe_once()
+        assert result["status"] == STATUS_OK
+        assert result["version"] == {"server_version": "v7"}
+
+        def unreachable():
+            raise ConnectionError("connection refused")
+
+        result = HealthProbe(unreachable).probe_once()
+        assert result["status"] == STATUS_UNREACHABLE
+        assert "connection refused" in result["error"]
+
+        def misconfigured():
+            raise BloodhoundAuthError("BloodHound domain must be provided")
+
+        result = HealthProbe(misconfigured).probe_once()
+        assert result["status"] == STATUS_MISCONFIGURED
+
+        print("✅ Health probe reports ok, unreachable and misconfigured")
+
+
+class TestImportTime:
+    """
+    Test that importing the server module stays cheap
+    """
+
+    def test_import_within_budget(self):
+        """
+        Import main.py in a fresh interpreter and time it
+        """
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_TIMER],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+
+        print(f"✅ import main: {report['elapsed'] * 1000:.1f} ms")
+
+        assert report["elapsed"] < IMPORT_BUDGET_SECONDS
+        # The HTTP stack is only needed once a tool actually calls BloodHound
+        assert not report["requests_loaded"]
+
+    def test_endpoint_table_is_registered(self):
+        """
+        Every endpoint in the table becomes a tool with the generated docs
+        """
+        from lib.endpoints import ENDPOINTS
+        import main
+
+        tools = {tool.name: tool for tool in main.mcp._tool_manager.list_tools()}
+        for endpoint in ENDPOINTS:
+            assert endpoint.tool in tools
+            assert tools[endpoint.tool].description == endpoint.description
+            assert callable(getattr(main, endpoint.tool))
+
+        users = tools["get_users"].parameters
+        assert users["required"] == ["domain_id"]
+        assert set(users["properties"]) == {"domain_id", "limit", "skip"}
+        assert tools["get_user_info"].parameters["required"] == ["user_id"]
+
+        print(f"✅ {len(ENDPOINTS)} endpoint tools registered from the table")
+
+
+class TestColdStart:
+    """
+    Test that the stdio server answers quickly even when BloodHound is down
+    """
+
+    def _rpc(self, proc, message):
+        proc.stdin.write(json.dumps(message) + "\n")
+        proc.stdin.flush()
+
+    def _read_response(self, proc, request_id):
+        while True:
+            line = proc.stdout.readline()
+            if not line:
+                pytest.fail(f"Server exited early: {proc.stderr.read()}")
+            message = json.loads(line)
+            if message.get("id") == request_id:
+                return message
+
+    def test_cold_start_within_budget(self):
+        """
+        Spawn main.py with an unroutable BloodHound host and time the handshake
+        """
+        env = dict(os.environ)
+        env.update(
+            {
+                # Non-routable address: a blocking connection check would hang
+                "BLOODHOUND_DOMAIN": "10.255.255.1",
+                "BLOODHOUND_TOKEN_ID": "fake_id",
+                "BLOODHOUND_TOKEN_KEY": "fake_key",
+            }
+        )
+
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "main.py"],
+            cwd=PROJECT_ROOT,
+            env=env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            self._rpc(
+                proc,
+                {
+                    "jsonrpc": "2.0",
+                    "id": 1,
+                    "method": "initialize",
+                    "params": {
+                        "protocolVersion": "2025-03-26",
+                        "capabilities": {},
+                        "clientInfo": {"name": "startup-test", "version": "0"},
+                    },
+                },
+            )
+            response = self._read_response(proc, 1)
+            elapsed = time.perf_counter() - started
+            assert "result" in response
+            experimental = response["result"]["capabilities"]["experimental"]
+            assert experimental["toolCatalog"]["fingerprint"]
+
+            self._rpc(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+            self._rpc(
+                proc,
+                {
+                    "jsonrpc": "2.0",
+                    "id": 2,
+                    "method": "resources/read",
+                    "params": {"uri": "bloodhound://status"},
+                },
+            )
+            status = json.loads(
+                self._read_response(proc, 2)["result"]["contents"][0]["text"]
+            )
+        finally:
+            proc.kill()
+            proc.wait()
+
+        print(f"✅ Cold start to initialize response: {elapsed:.2f} s")
+        print(f"   BloodHound status: {status['status']}")
+
+        assert elapsed < COLD_START_BUDGET_SECONDS
+        assert status["status"] in (STATUS_STARTING, STATUS_UNREACHABLE)
@@ -0,0 +1,380 @@
+# ad_changes.py
+"""
+Batched Active Directory change plans for the AutoFortify MCP server.
+
+Changes are applied in two steps so large remediations cost two tool calls
+instead of one per account:
+
+1. plan_operations() checks a batch. Each operation must be well formed, must
+   not repeat or contradict another one, and must name objects that exist.
+   The current state of each object is read in one directory request, so
+   operations that would change nothing are marked "unchanged" up front.
+2. apply_plan() runs the planned operations through the directory backend.
+   Operations on the same object stay in order within one request, and at
+   most `parallelism` requests run at a time. It returns a result per
+   operation and an undo plan, the inverse of every applied operation in
+   reverse order, which can itself be planned and applied.
+
+Only reversible operations are supported, so every applied batch can be
+undone.
+"""
+
+import contextvars
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, Field, model_validator
+
+from lib.powershell import DEFAULT_TIMEOUT
+
+# Each operation and the operation that undoes it
+INVERSE_OPERATIONS = {
+    "add_group_member": "remove_group_member",
+    "remove_group_member": "add_group_member",
+    "disable_account": "enable_account",
+    "enable_account": "disable_account",
+    "add_constrained_delegation": "remove_constrained_delegation",
+    "remove_constrained_delegation": "add_constrained_delegation",
+}
+
+# Operations per directory request; operations on one object are never split
+CHUNK_SIZE = 25
+
+# Seconds allowed per operation, so requests with many operations do not hit
+# the pool's default timeout
+OPERATION_TIMEOUT = 5.0
+
+ADOperationName = Literal[
+    "add_group_member",
+    "remove_group_member",
+    "disable_account",
+    "enable_account",
+    "add_constrained_delegation",
+    "remove_constrained_delegation",
+]
+
+
+class ADOperation(BaseModel):
+    """One Active Directory change"""
+
+    operation: ADOperationName = Field(description="Change to make")
+    identity: str = Field(
+        description="Group for group membership operations, otherwise the account (e.g. username)"
+    )
+    member: Optional[str] = Field(
+        default=None,
+        description="Account to add or remove (group membership operations only)",
+    )
+    target: Optional[str] = Field(
+        default=None,
+        description="SPN to add or remove, e.g. 'cifs/server' (constrained delegation operations only)",
+    )
+
+    @model_validator(mode="after")
+    def _check_arguments(self) -> "ADOperation":
+        if self.operation.endswith("_group_member") and not self.member:
+            raise ValueError(f"{self.operation} requires member")
+        if self.operation.endswith("_constrained_delegation") and not self.target:
+            raise ValueError(f"{self.operation} requires target")
+        return self
+
+    @property
+    def subject(self) -> Tuple[str, str, str]:
+        """The object and value the operation changes, case-insensitively"""
+        return (
+            self.identity.lower(),
+            (self.member or "").lower(),
+            (self.target or "").lower(),
+        )
+
+    def inverse(self) -> "ADOperation":
+        """The operation that undoes this one"""
+        return self.model_copy(update={"operation": INVERSE_OPERATIONS[self.operation]})
+
+
+@dataclass
+class OperationResult:
+    """Outcome of one operation in a plan"""
+
+    operation: ADOperation
+    # "planned", "unchanged" or "invalid", then "applied" or "failed"
+    status: str
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = self.operation.model_dump(exclude_none=True)
+        data["status"] = self.status
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+@dataclass
+class ADChangePlan:
+    """A checked batch of operations, ready to apply"""
+
+    plan_id: str
+    results: List[OperationResult] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        return all(result.status != "invalid" for result in self.results)
+
+    def summary(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for result in self.results:
+            counts[result.status] = counts.get(result.status, 0) + 1
+        return counts
+
+
+# Finds a user, computer or group by sAMAccountName or DN. Delegation
+# operations pass the user and computer cmdlets only, since the delegation
+# inventory (lib.delegation) lists computer accounts as well as users.
+GET_ACCOUNT_FUNCTION = """
+function Get-Account($Identity, $Properties, $Commands = @('Get-ADUser', 'Get-ADComputer', 'Get-ADGroup')) {
+    $arguments = @{ Identity = $Identity }
+    if ($Properties) { $arguments.Properties = $Properties }
+    foreach ($command in $Commands) {
+        try { return & $command @arguments } catch { }
+    }
+    throw "Account '$Identity' not found"
+}
+"""
+
+# Reads the state each operation would change. Groups' direct members are read
+# once per group rather than once per operation.
+CHECK_OPERATIONS_SCRIPT = (
+    """
+param($Operations)
+"""
+    + GET_ACCOUNT_FUNCTION
+    + """
+$members = @{}
+foreach ($operation in @($Operations)) {
+    $check = [ordered]@{ exists = $true; changes = $true; error = $null }
+    try {
+        switch -Wildcard ($operation.operation) {
+            '*_group_member' {
+                $group = Get-ADGroup -Identity $operation.identity -Properties member
+                if (-not $members.ContainsKey($group.DistinguishedName)) {
+                    $members[$group.DistinguishedName] = @($group.member)
+                }
+                $account = Get-Account $operation.member
+                $isMember = $members[$group.DistinguishedName] -contains $account.DistinguishedName
+                $check.changes = ($operation.operation -eq 'add_group_member') -ne $isMember
+            }
+            '*_account' {
+                $account = Get-Account $operation.identity
+                $check.changes = [bool]$account.Enabled -ne ($operation.operation -eq 'enable_account')
+            }
+            '*_constrained_delegation' {
+                $account = Get-Account $operation.identity 'msDS-AllowedToDelegateTo' @('Get-ADUser', 'Get-ADComputer')
+                $delegates = @($account.'msDS-AllowedToDelegateTo') -contains $operation.target
+                $check.changes = ($operation.operation -eq 'add_constrained_delegation') -ne $delegates
+            }
+        }
+    }
+    catch {
+        $check.exists = $false
+        $check.error = $_.Exception.Message
+    }
+    [pscustomobject]$check
+}
+"""
+)
+
+# Runs operations in order and reports each one; a failure does not stop the
+# rest because operations in a batch are independent of each other
+APPLY_OPERATIONS_SCRIPT = (
+    """
+param($Operations)
+"""
+    + GET_ACCOUNT_FUNCTION
+    + """
+foreach ($operation in @($Operations)) {
+    $result = [ordered]@{ ok = $true; error = $null }
+    try {
+        switch -Wildcard ($operation.operation) {
+            'add_group_member' { Add-ADGroupMember -Identity $operation.identity -Members $operation.member }
+            'remove_group_member' { Remove-ADGroupMember -Identity $operation.identity -Members $operation.member -Confirm:$false }
+            'disable_account' { Disable-ADAccount -Identity $operation.identity }
+            'enable_account' { Enable-ADAccount -Identity $operation.identity }
+            '*_constrained_delegation' {
+                # By DN, so user and computer accounts are changed alike
+                $account = Get-Account $operation.identity $null @('Get-ADUser', 'Get-ADComputer')
+                if ($operation.operation -eq 'add_constrained_delegation') {
+                    Set-ADObject -Identity $account.DistinguishedName -Add @{'msDS-AllowedToDelegateTo' = $operation.target}
+                }
+                else {
+                    Set-ADObject -Identity $account.DistinguishedName -Remove @{'msDS-AllowedToDelegateTo' = $operation.target}
+                }
+            }
+        }
+    }
+    catch {
+        $result.ok = $false
+        $result.error = $_.Exception.Message
+    }
+    [pscustomobject]$result
+}
+"""
+)
+
+
+def _timeout(operations: int) -> float:
+    return max(DEFAULT_TIMEOUT, operations * OPERATION_TIMEOUT)
+
+
+def _check_batch(operations: Sequence[ADOperation]) -> List[OperationResult]:
+    """Mark repeated and contradicting operations invalid"""
+    seen: Dict[Tuple[str, Tuple[str, str, str]], int] = {}
+    results = []
+    for number, operation in enumerate(operations, 1):
+        result = OperationResult(operation, "planned")
+        inverse = (INVERSE_OPERATIONS[operation.operation], operation.subject)
+        if (operation.operation, operation.subject) in seen:
+            first = seen[(operation.operation, operation.subject)]
+            result.status = "invalid"
+            result.error = f"Repeats operation {first}"
+        elif inverse in seen:
+            result.status = "invalid"
+            result.error = f"Contradicts operation {seen[inverse]}"
+        else:
+            seen[(operation.operation, operation.subject)] = number
+        results.append(result)
+    return results
+
+
+def plan_operations(
+    directory,
+    operations: Sequence[ADOperation],
+) -> ADChangePlan:
+    """
+    Check a batch and record what each operation would do
+
+    Args:
+        directory: AD backend (lib.directory) used to read the current state,
+            or None to skip that check (e.g. when modifications are simulated)
+        operations: Operations in the order they should be applied
+
+    Returns:
+        A plan whose results are "planned", "unchanged" or "invalid"
+    """
+    plan = ADChangePlan(uuid.uuid4().hex[:12], _check_batch(operations))
+    if directory is None:
+        return plan
+    res = directory.check_operations(
+        [operation.model_dump() for operation in operations],
+        timeout=_timeout(len(operations)),
+    )
+    if not res.ok:
+        for result in plan.results:
+            result.status = "invalid"
+            result.error = res.error or "Could not read Active Directory"
+        return plan
+    for result, check in zip(plan.results, res.output):
+        if result.status != "planned":
+            continue
+        if not check.get("exists"):
+            result.status = "invalid"
+            result.error = check.get("error") or "Object not found"
+        elif not check.get("changes"):
+            result.status = "unchanged"
+    return plan
+
+
+def _chunks(
+    results: Sequence[OperationResult], size: int
+) -> List[List[OperationResult]]:
+    """Split results into requests, keeping each object's operations together"""
+    by_object: Dict[str, List[OperationResult]] = OrderedDict()
+    for result in results:
+        by_object.setdefault(result.operation.subject[0], []).append(result)
+    chunks: List[List[OperationResult]] = [[]]
+    for group in by_object.values():
+        if chunks[-1] and len(chunks[-1]) + len(group) > size:
+            chunks.append([])
+        chunks[-1].extend(group)
+    return [chunk for chunk in chunks if chunk]
+
+
+def apply_plan(
+    directory,
+    plan: ADChangePlan,
+    parallelism: int = 2,
+    chunk_size: int = CHUNK_SIZE,
+) -> List[ADOperation]:
+    """
+    Apply the planned operations of a valid plan
+
+    Results are updated in place to "applied" or "failed"; operations that
+    were unchanged stay as they are.
+
+    Args:
+        directory: AD backend (lib.directory), or None to simulate every
+            operation succeeding
+        plan: Plan returned by plan_operations()
+        parallelism: Maximum number of requests running at the same time
+        chunk_size: Operations per request
+
+    Returns:
+        The undo plan: the inverse of every applied operation, last one first
+    """
+    pending = [result for result in plan.results if result.status == "planned"]
+    if directory is None:
+        for result in pending:
+            result.status = "applied"
+    else:
+        chunks = _chunks(pending, chunk_size)
+
+        def run(chunk: List[OperationResult]) -> None:
+            res = directory.apply_operations(
+                [result.operation.model_dump() for result in chunk],
+                timeout=_timeout(len(chunk)),
+            )
+            outcomes = res.output if res.ok else []
+            for index, result in enumerate(chunk):
+                if index < len(outcomes) and outcomes[index].get("ok"):
+                    result.status = "applied"
+                else:
+                    result.status = "failed"
+                    result.error = (
+                        outcomes[index].get("error")
+                        if index < len(outcomes)
+                        else res.error or "Directory request failed"
+                    )
+
+        # Each request runs in a copy of the caller's context, so it keeps the
+        # tool call's deadline (lib.powershell.call_deadline)
+        contexts = [contextvars.copy_context() for _ in chunks]
+        workers = max(1, min(parallelism, len(chunks)))
+        with ThreadPoolExecutor(workers, thread_name_prefix="ad-apply") as executor:
+            list(executor.map(lambda c, chunk: c.run(run, chunk), contexts, chunks))
+    return [
+        result.operation.inverse()
+        for result in reversed(plan.results)
+        if result.status == "applied"
+    ]
+
+
+class PlanStore:
+    """Recent plans by ID; a plan is removed once it is applied"""
+
+    def __init__(self, max_plans: int = 32):
+        self.max_plans = max_plans
+        self._plans: "OrderedDict[str, ADChangePlan]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, plan: ADChangePlan) -> None:
+        with self._lock:
+            self._plans[plan.plan_id] = plan
+            while len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+
+    def pop(self, plan_id: str) -> Optional[ADChangePlan]:
+        with self._lock:
+            return self._plans.pop(plan_id, None)
@@ -0,0 +1,195 @@
+# delegation.py
+"""
+Constrained delegation inventory for the AutoFortify MCP server.
+
+One paged directory query returns every user and computer whose
+msDS-AllowedToDelegateTo is set. The result is kept as an index in both
+directions, account to SPNs and SPN to accounts, so audits across thousands of
+accounts are answered from memory.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from lib.powershell import PowerShellPool
+
+# userAccountControl flag for protocol transition (delegation without Kerberos)
+TRUSTED_TO_AUTH_FOR_DELEGATION = 0x1000000
+
+# Only accounts with delegation are returned; ResultPageSize makes the AD module
+# page through the results instead of hitting the server's size limit
+LIST_DELEGATION_SCRIPT = """
+param($PageSize)
+Get-ADObject -LDAPFilter '(&(|(objectCategory=person)(objectCategory=computer))(msDS-AllowedToDelegateTo=*))' `
+    -Properties sAMAccountName, objectClass, userAccountControl, msDS-AllowedToDelegateTo `
+    -ResultPageSize $PageSize |
+ForEach-Object {
+    [pscustomobject]@{
+        Account = $_.sAMAccountName
+        Class = @($_.objectClass)[-1]
+        UserAccountControl = [int]$_.userAccountControl
+        Spns = @($_.'msDS-AllowedToDelegateTo')
+    }
+}
+"""
+
+PAGE_SIZE = 1000
+
+
+class DelegationError(Exception):
+    """The delegations could not be read from the directory"""
+
+
+@dataclass
+class Delegation:
+    """One account allowed to delegate to other services"""
+
+    account: str  # sAMAccountName
+    account_type: str  # "user" or "computer"
+    spns: Tuple[str, ...]
+    protocol_transition: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "account": self.account,
+            "type": self.account_type,
+            "spns": list(self.spns),
+            "protocol_transition": self.protocol_transition,
+        }
+
+
+@dataclass
+class DelegationIndex:
+    """Delegations by account and by SPN, both case-insensitive"""
+
+    by_account: Dict[str, Delegation] = field(default_factory=dict)
+    by_spn: Dict[str, List[str]] = field(default_factory=dict)
+    loaded_at: float = 0.0
+
+    @classmethod
+    def build(cls, delegations: Iterable[Delegation]) -> "DelegationIndex":
+        index = cls(loaded_at=time.time())
+        for delegation in delegations:
+            index.by_account[delegation.account.lower()] = delegation
+            for spn in delegation.spns:
+                index.by_spn.setdefault(spn.lower(), []).append(delegation.account)
+        return index
+
+    def account(self, name: str) -> Optional[Delegation]:
+        return self.by_account.get(name.lower())
+
+    def accounts_for(self, spn: str) -> List[str]:
+        """Accounts that may delegate to an SPN"""
+        return list(self.by_spn.get(spn.lower(), ()))
+
+    def search(
+        self, account: Optional[str] = None, spn: Optional[str] = None
+    ) -> List[Delegation]:
+        """
+        Delegations matching both filters, by account name
+
+        Args:
+            account: Case-insensitive substring of the account name
+            spn: Case-insensitive substring of an SPN, e.g. 'cifs/' or a host
+        """
+        if spn is None:
+            names = self.by_account
+        else:
+            spn = spn.lower()
+            names = {
+                name.lower()
+                for key, accounts in self.by_spn.items()
+                if spn in key
+                for name in accounts
+            }
+        account = account.lower() if account else None
+        return [
+            self.by_account[name]
+            for name in sorted(names)
+            if account is None or account in name
+        ]
+
+
+def _delegation_from_record(record: Dict[str, Any]) -> Delegation:
+    flags = int(record.get("UserAccountControl") or 0)
+    spns = record.get("Spns") or []
+    if isinstance(spns, str):
+        spns = [spns]
+    return Delegation(
+        account=record.get("Account") or "",
+        account_type=record.get("Class") or "user",
+        spns=tuple(spn for spn in spns if spn),
+        protocol_transition=bool(flags & TRUSTED_TO_AUTH_FOR_DELEGATION),
+    )
+
+
+class PowerShellDelegationSource:
+    """Lists delegations with a paged Get-ADObject query on the pooled hosts"""
+
+    def __init__(self, pool: PowerShellPool, page_size: int = PAGE_SIZE):
+        self.pool = pool
+        self.page_size = page_size
+
+    def list_delegations(self) -> List[Delegation]:
+        res = self.pool.run(LIST_DELEGATION_SCRIPT, {"PageSize": self.page_size})
+        if not res.ok:
+            raise DelegationError(res.error or "Get-ADObject failed")
+        return [_delegation_from_record(record) for record in res.output]
+
+
+class DelegationInventory:
+    """
+    Cached DelegationIndex, reloaded when older than max_age seconds
+
+    Changes made by the server's own tools are applied without a reload.
+    """
+
+    def __init__(self, source, max_age: float = 300.0):
+        """
+        Initialize the inventory; delegations are loaded on first use
+
+        Args:
+            source: Delegation source with a list_delegations() method
+            max_age: Seconds before the index is reloaded
+        """
+        self.source = source
+        self.max_age = max_age
+        self.loads = 0
+        self._index: Optional[DelegationIndex] = None
+        self._loaded = 0.0
+        self._lock = threading.Lock()
+
+    def index(self, refresh: bool = False) -> DelegationIndex:
+        """The current index, reloading it if it is stale or refresh is set"""
+        with self._lock:
+            now = time.monotonic()
+            if refresh or self._index is None or now - self._loaded >= self.max_age:
+                self._index = DelegationIndex.build(self.source.list_delegations())
+                self._loaded = now
+                self.loads += 1
+            return self._index
+
+    def invalidate(self) -> None:
+        """Force a reload on next use"""
+        with self._lock:
+            self._index = None
+
+    def remove_spn(self, account: str, spn: str) -> None:
+        """Record an SPN removed from an account by this server"""
+        with self._lock:
+            if self._index is None:
+                return
+            delegation = self._index.account(account)
+            if delegation is None:
+                return
+            delegations = [
+                d for d in self._index.by_account.values() if d is not delegation
+            ]
+            spns = tuple(s for s in delegation.spns if s.lower() != spn.lower())
+            if spns:
+                delegations.append(replace(delegation, spns=spns))
+            loaded_at = self._index.loaded_at
+            self._index = DelegationIndex.build(delegations)
+            self._index.loaded_at = loaded_at
@@ -0,0 +1,157 @@
+# directory.py
+"""
+Active Directory backends for the AutoFortify MCP server.
+
+The AD tools call a directory object instead of building PowerShell scripts
+themselves. Two backends implement the same methods:
+
+- PowerShellDirectory runs the ActiveDirectory module cmdlets on the pooled
+  PowerShell hosts (needs Windows and RSAT).
+- LdapDirectory (lib.ldap_directory) talks LDAP to a domain controller over
+  pooled, persistent binds and needs neither.
+
+AD_BACKEND selects one. Both return PowerShellResult, so the tools handle a
+failed LDAP modify exactly like a failed cmdlet.
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+from lib.ad_changes import APPLY_OPERATIONS_SCRIPT, CHECK_OPERATIONS_SCRIPT
+from lib.delegation import Delegation, PowerShellDelegationSource
+from lib.powershell import PowerShellPool, PowerShellResult
+
+
+class PowerShellDirectory:
+    """AD operations as ActiveDirectory module cmdlets on the pooled hosts"""
+
+    def __init__(self, pool: PowerShellPool):
+        self.pool = pool
+        self._delegations = PowerShellDelegationSource(pool)
+
+    def list_delegation(self, identity: str) -> PowerShellResult:
+        """SPNs one account may delegate to"""
+        return self.pool.run(
+            "param($Identity) "
+            "Get-ADUser -Identity $Identity -Properties msDS-AllowedToDelegateTo | "
+            "Select-Object -ExpandProperty msDS-AllowedToDelegateTo",
+            {"Identity": identity},
+        )
+
+    def list_delegations(self) -> List[Delegation]:
+        """Every account with constrained delegation"""
+        return self._delegations.list_delegations()
+
+    def check_operations(
+        self, operations: List[Dict[str, Any]], timeout: Optional[float] = None
+    ) -> PowerShellResult:
+        """Current state for lib.ad_changes operations, one check per operation"""
+        return self.pool.run(
+            CHECK_OPERATIONS_SCRIPT, {"Operations": operations}, timeout=timeout
+        )
+
+    def apply_operations(
+        self, operations: List[Dict[str, Any]], timeout: Optional[float] = None
+    ) -> PowerShellResult:
+        """Apply lib.ad_changes operations in order, one outcome per operation"""
+        return self.pool.run(
+            APPLY_OPERATIONS_SCRIPT, {"Operations": operations}, timeout=timeout
+        )
+
+    def remove_delegation(self, identity: str, target: str) -> PowerShellResult:
+        return self.pool.run(
+            "param($Identity, $Target) "
+            "Set-ADUser -Identity $Identity -Remove @{'msDS-AllowedToDelegateTo' = $Target}",
+            {"Identity": identity, "Target": target},
+        )
+
+    def add_group_member(self, identity: str, member: str) -> PowerShellResult:
+        return self.pool.run(
+            "param($Identity, $Member) Add-ADGroupMember -Identity $Identity -Members $Member",
+            {"Identity": identity, "Member": member},
+        )
+
+    def remove_group_member(self, identity: str, member: str) -> PowerShellResult:
+        return self.pool.run(
+            "param($Identity, $Member) "
+            "Remove-ADGroupMember -Identity $Identity -Members $Member -Confirm:$false",
+            {"Identity": identity, "Member": member},
+        )
+
+    def new_user(
+        self, name: str, sam_account_name: str, password: str, enabled: bool
+    ) -> PowerShellResult:
+        # Sets the password and requires the user to change it at next logon
+        return self.pool.run(
+            "param($Name, $SamAccountName, $Password, $Enabled) "
+            "New-ADUser -Name $Name -SamAccountName $SamAccountName "
+            "-AccountPassword (ConvertTo-SecureString -String $Password -AsPlainText -Force) "
+            "-Enabled $Enabled -ChangePasswordAtLogon $true",
+            {
+                "Name": name,
+                "SamAccountName": sam_account_name,
+                "Password": password,
+                "Enabled": enabled,
+            },
+        )
+
+    def remove_user(self, identity: str) -> PowerShellResult:
+        return self.pool.run(
+            "param($Identity) Remove-ADUser -Identity $Identity -Confirm:$false",
+            {"Identity": identity},
+        )
+
+    def disable_account(self, identity: str) -> PowerShellResult:
+        return self.pool.run(
+            "param($Identity) Disable-ADAccount -Identity $Identity",
+            {"Identity": identity},
+        )
+
+    def enable_account(self, identity: str) -> PowerShellResult:
+        return self.pool.run(
+            "param($Identity) Enable-ADAccount -Identity $Identity",
+            {"Identity": identity},
+        )
+
+    def set_password(self, identity: str, password: str) -> PowerShellResult:
+        return self.pool.run(
+            "param($Identity, $Password) Set-ADAccountPassword -Identity $Identity "
+            "-NewPassword (ConvertTo-SecureString -String $Password -AsPlainText -Force) "
+            "-Reset:$true",
+            {"Identity": identity, "Password": password},
+        )
+
+    def new_group(
+        self, name: str, group_scope: str, group_category: str
+    ) -> PowerShellResult:
+        return self.pool.run(
+            "param($Name, $GroupScope, $GroupCategory) "
+            "New-ADGroup -Name $Name -GroupScope $GroupScope -GroupCategory $GroupCategory",
+            {"Name": name, "GroupScope": group_scope, "GroupCategory": group_category},
+        )
+
+    def remove_group(self, identity: str) -> PowerShellResult:
+        return self.pool.run(
+            "param($Identity) Remove-ADGroup -Identity $Identity -Confirm:$false",
+            {"Identity": identity},
+        )
+
+
+def create_directory(pool: PowerShellPool, name: Optional[str] = None):
+    """
+    Create the AD backend named by name or AD_BACKEND
+
+    Args:
+        pool: PowerShell hosts used by the powershell backend
+        name: "powershell" (default) or "ldap"; the ldap backend is configured
+            with the LDAP_* variables (see lib.ldap_directory.from_env)
+    """
+    name = (name or os.getenv("AD_BACKEND", "powershell")).lower()
+    if name == "powershell":
+        return PowerShellDirectory(pool)
+    if name == "ldap":
+        # ldap3 is only needed, and only imported, when this backend is used
+        from lib.ldap_directory import from_env
+
+        return from_env()
+    raise ValueError(f"Unsupported AD backend '{name}'. Use 'powershell' or 'ldap'")
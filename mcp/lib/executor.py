@@ -0,0 +1,127 @@
+# executor.py
+"""
+Bounded execution of blocking tool bodies for the AutoFortify MCP server.
+
+FastMCP calls synchronous tools directly on its event loop, so one slow
+directory query would stall every connected client. Tools decorated with
+ToolExecutor.offload() become coroutines that run their body on a fixed-size
+thread pool instead; calls beyond the pool size wait their turn without
+blocking the loop.
+
+Each call gets a deadline (lib.powershell.call_deadline). Scripts the call runs on
+the pooled PowerShell hosts are given only the time left before it, so a tool
+that times out also has its hung host killed and restarted rather than left
+running in the background.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from lib.powershell import call_deadline
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TOOL_TIMEOUT = 120.0
+
+
+class ToolExecutor:
+    """A thread pool shared by all tools, with a timeout per tool call"""
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TOOL_TIMEOUT,
+    ):
+        """
+        Initialize the executor; threads are started on demand
+
+        Args:
+            max_workers: Tool calls that can run at the same time
+            timeout: Default seconds a call may take, including time spent
+                waiting for a free thread
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.running = 0
+        self.waiting = 0
+        self.timeouts = 0
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="tool")
+        self._lock = threading.Lock()
+
+    def offload(self, timeout: Optional[float] = None):
+        """
+        Decorator turning a blocking tool function into a coroutine
+
+        The wrapper keeps the function's name, docstring and signature, so
+        FastMCP builds the same tool schema from it.
+
+        Args:
+            timeout: Seconds this tool may take (default: the executor's)
+        """
+
+        def decorator(fn: Callable[..., str]) -> Callable[..., Any]:
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                return await self.run(fn, *args, timeout=timeout, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _call(self, fn: Callable[..., str], *args, **kwargs) -> str:
+        with self._lock:
+            self.waiting -= 1
+            self.running += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    async def run(
+        self, fn: Callable[..., str], *args, timeout: Optional[float] = None, **kwargs
+    ) -> str:
+        """
+        Run fn on the pool and return its result
+
+        Returns:
+            fn's result, or a message saying the call timed out
+        """
+        seconds = timeout or self.timeout
+        context = contextvars.copy_context()
+        context.run(call_deadline.set, time.monotonic() + seconds)
+        with self._lock:
+            self.waiting += 1
+        future = self._executor.submit(context.run, self._call, fn, *args, **kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), seconds)
+        except asyncio.TimeoutError:
+            if future.cancel():  # Never started, so _call never ran
+                with self._lock:
+                    self.waiting -= 1
+            with self._lock:
+                self.timeouts += 1
+            name = getattr(fn, "__name__", "tool")
+            logger.warning(f"{name} timed out after {seconds:g}s")
+            return f"The {name} tool timed out after {seconds:g} seconds."
+
+    def status(self) -> Dict[str, Any]:
+        """Summary of the executor for logging and diagnostics"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "running": self.running,
+                "waiting": self.waiting,
+                "timeouts": self.timeouts,
+            }
+
+    def shutdown(self) -> None:
+        """Drop queued calls and stop accepting new ones"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,370 @@
+# exposure.py
+"""
+Deterministic firewall gap analysis.
+
+Works on FirewallRule records from lib.firewall and reports, per protocol and
+profile, with findings that only differ in their profile merged:
+
+- exposure: the local ports inbound Allow rules open to any program once Block
+  rules, which always win over Allow rules, are taken into account
+- shadowed: Allow rules whose ports are all blocked, so they have no effect
+- redundant: Allow rules whose ports are already opened by other rules that
+  apply at least as broadly
+- broad: Allow rules that open every port, every protocol or a wide range
+
+Rules whose local port is a keyword for dynamic ports ("RPC", "RPCEPMap",
+"IPHTTPSIn", ...) have no port ranges to compare and are never reported as
+shadowed or redundant.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from lib.firewall import (
+    ALL_PROFILES,
+    PORT_RANGE,
+    FirewallRule,
+    normalize_protocol,
+    parse_ports,
+)
+from lib.intervals import IntervalTree
+
+# Protocols with local ports; other protocols (ICMP, IGMP, ...) are only
+# reported when a rule allows every protocol
+PORT_PROTOCOLS = ("TCP", "UDP")
+
+# Allow rules opening more ports than this are reported as broad
+BROAD_RANGE_THRESHOLD = 1000
+
+# Scope fields a rule must leave open ("Any" or empty) or share with another
+# rule to apply wherever that rule applies
+_SCOPE_FIELDS = ("program", "local_ip", "remote_ip", "remote_port")
+
+# Stand-in for "all traffic" when deciding which Block rules close a port for
+# everyone rather than for one program or address
+_UNSCOPED = FirewallRule("", True, "In", "Allow")
+
+Ranges = List[Tuple[int, int]]
+Key = Tuple[str, str]  # (protocol, profile)
+
+
+@dataclass
+class Finding:
+    """One result of the analysis"""
+
+    kind: str  # "exposure", "shadowed", "redundant" or "broad"
+    detail: str
+    rules: Tuple[str, ...] = ()
+    protocol: str = ""
+    profiles: Tuple[str, ...] = ()
+    ports: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Non-empty fields only, to keep tool output compact"""
+        data: Dict[str, Any] = {"kind": self.kind, "detail": self.detail}
+        for field in ("rules", "protocol", "profiles", "ports"):
+            value = getattr(self, field)
+            if value:
+                data[field] = list(value) if isinstance(value, tuple) else value
+        return data
+
+
+def merge_ranges(ranges: Iterable[Tuple[int, int]]) -> Ranges:
+    """Sort ranges and join those that overlap or touch"""
+    merged: Ranges = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            if last > merged[-1][1]:
+                merged[-1] = (merged[-1][0], last)
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def subtract_ranges(ranges: Iterable[Tuple[int, int]], removed: Iterable) -> Ranges:
+    """
+    Parts of ranges not covered by removed
+
+    Args:
+        ranges: (first, last) pairs
+        removed: (first, last, ...) tuples, e.g. interval tree entries
+    """
+    holes = merge_ranges((item[0], item[1]) for item in removed)
+    left: Ranges = []
+    for first, last in merge_ranges(ranges):
+        for hole_first, hole_last in holes:
+            if hole_last < first or hole_first > last:
+                continue
+            if hole_first > first:
+                left.append((first, hole_first - 1))
+            first = hole_last + 1
+            if first > last:
+                break
+        if first <= last:
+            left.append((first, last))
+    return left
+
+
+def format_ranges(ranges: Sequence[Tuple[int, int]]) -> str:
+    """Ranges written the way rules write ports, e.g. 80,443,5000-5100"""
+    if list(ranges) == [PORT_RANGE]:
+        return "Any"
+    return ",".join(
+        str(first) if first == last else f"{first}-{last}" for first, last in ranges
+    )
+
+
+def merge_profiles(findings: Iterable[Finding]) -> List[Finding]:
+    """Join findings that only differ in their profiles, keeping the first's place"""
+    merged: Dict[tuple, Finding] = {}
+    for finding in findings:
+        key = (
+            finding.kind,
+            finding.detail,
+            finding.rules,
+            finding.protocol,
+            finding.ports,
+        )
+        first = merged.get(key)
+        if first is None:
+            merged[key] = finding
+        else:
+            first.profiles = tuple(dict.fromkeys(first.profiles + finding.profiles))
+    return list(merged.values())
+
+
+def _port_count(ranges: Sequence[Tuple[int, int]]) -> int:
+    return sum(last - first + 1 for first, last in ranges)
+
+
+def _covers(outer: FirewallRule, inner: FirewallRule) -> bool:
+    """True if outer applies to all traffic inner applies to, ports aside"""
+    for field in _SCOPE_FIELDS:
+        value = getattr(outer, field)
+        if value not in ("", "Any") and value.lower() != getattr(inner, field).lower():
+            return False
+    return True
+
+
+def _keys(
+    rule: FirewallRule, protocols: Sequence[str], profiles: Sequence[str]
+) -> List[Key]:
+    """(protocol, profile) pairs a rule applies to within the analysis"""
+    protocol = normalize_protocol(rule.protocol)
+    rule_protocols = protocols if protocol == "Any" else (protocol,)
+    return [
+        (p, profile)
+        for p in rule_protocols
+        if p in protocols
+        for profile in rule.profiles
+        if profile in profiles
+    ]
+
+
+class ExposureAnalyzer:
+    """
+    Analyzes one set of rules; build a new analyzer when the rules change
+
+    Enabled inbound rules are indexed into one interval tree of Allow rules and
+    one of Block rules per (protocol, profile), with rule positions as values.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[FirewallRule],
+        protocols: Sequence[str] = PORT_PROTOCOLS,
+        profiles: Sequence[str] = ALL_PROFILES,
+        broad_threshold: int = BROAD_RANGE_THRESHOLD,
+    ):
+        """
+        Index the rules
+
+        Args:
+            rules: Every rule; disabled and outbound rules are ignored
+            protocols: Protocols to analyze, from PORT_PROTOCOLS
+            profiles: Profiles to analyze
+            broad_threshold: Port count above which an Allow rule is broad
+        """
+        self.rules = [rule for rule in rules if rule.enabled and rule.direction == "In"]
+        self.protocols = tuple(protocols)
+        self.profiles = tuple(profiles)
+        self.broad_threshold = broad_threshold
+        self._ports = [parse_ports(rule.local_port) for rule in self.rules]
+        allowed: Dict[Key, list] = {}
+        blocked: Dict[Key, list] = {}
+        for position, rule in enumerate(self.rules):
+            if rule.action == "Allow":
+                target = allowed
+            elif rule.action == "Block":
+                target = blocked
+            else:
+                continue
+            for key in _keys(rule, self.protocols, self.profiles):
+                target.setdefault(key, []).extend(
+                    (first, last, position) for first, last in self._ports[position]
+                )
+        self.allowed = {key: IntervalTree(items) for key, items in allowed.items()}
+        self.blocked = {key: IntervalTree(items) for key, items in blocked.items()}
+
+    def exposure(self) -> Dict[Key, Ranges]:
+        """
+        Open ports per (protocol, profile), after Block rules
+
+        Allow rules limited to a program only open a port while that program
+        listens on it; they are left out here and reported as broad instead
+        when they open many ports.
+        """
+        open_ports = {}
+        for key, tree in self.allowed.items():
+            ranges = merge_ranges(
+                (item[0], item[1])
+                for item in tree.intervals
+                if self.rules[item[2]].program in ("", "Any")
+            )
+            blocked = self.blocked.get(key)
+            if blocked is not None:
+                # Block rules limited to a program or address leave the port open
+                ranges = subtract_ranges(
+                    ranges,
+                    [
+                        item
+                        for item in blocked.intervals
+                        if _covers(self.rules[item[2]], _UNSCOPED)
+                    ],
+                )
+            if ranges:
+                open_ports[key] = ranges
+        return open_ports
+
+    def analyze(self) -> List[Finding]:
+        """Every finding, exposure first"""
+        findings = []
+        for (protocol, profile), ranges in sorted(self.exposure().items()):
+            count = _port_count(ranges)
+            findings.append(
+                Finding(
+                    kind="exposure",
+                    detail=f"{count} {protocol} port{'' if count == 1 else 's'} open",
+                    protocol=protocol,
+                    profiles=(profile,),
+                    ports=format_ranges(ranges),
+                )
+            )
+
+        allows = [
+            position
+            for position, rule in enumerate(self.rules)
+            if rule.action == "Allow" and _keys(rule, self.protocols, self.profiles)
+        ]
+        # Keyword ports ("RPC", ...) name no ranges that could be covered
+        comparable = [position for position in allows if self._ports[position]]
+        shadowed = set()
+        for position in comparable:
+            blocker = self._shadowed_by(position)
+            if blocker is not None:
+                shadowed.add(position)
+                findings.append(self._rule_finding(position, "shadowed", blocker))
+
+        # Broadest rules first, so a rule is only redundant against rules kept
+        kept = set()
+        order = sorted((p for p in comparable if p not in shadowed), key=self._breadth)
+        for position in order:
+            covering = self._redundant_with(position, kept)
+            if covering is None:
+                kept.add(position)
+            else:
+                findings.append(self._rule_finding(position, "redundant", covering))
+
+        findings.extend(self._broad(allows))
+        return merge_profiles(findings)
+
+    def _breadth(self, position: int) -> Tuple[int, int, int]:
+        """Sort key putting rules that allow more traffic first"""
+        rule = self.rules[position]
+        keys = len(_keys(rule, self.protocols, self.profiles))
+        unscoped = sum(getattr(rule, f) in ("", "Any") for f in _SCOPE_FIELDS)
+        return (-_port_count(self._ports[position]) * keys, -unscoped, position)
+
+    def _covered_by(self, position: int, trees: Dict[Key, IntervalTree], accept):
+        """Rules in trees that together cover position's ports, or None"""
+        rule = self.rules[position]
+        ranges = self._ports[position]
+        if not ranges:
+            return None
+        used = set()
+        for key in _keys(rule, self.protocols, self.profiles):
+            tree = trees.get(key)
+            if tree is None:
+                return None
+            covering = [
+                item
+                for first, last in ranges
+                for item in tree.overlapping(first, last)
+                if item[2] != position and accept(item[2])
+            ]
+            if subtract_ranges(ranges, covering):
+                return None
+            used.update(item[2] for item in covering)
+        return sorted(used) or None
+
+    def _shadowed_by(self, position: int) -> Optional[List[int]]:
+        rule = self.rules[position]
+        return self._covered_by(
+            position, self.blocked, lambda other: _covers(self.rules[other], rule)
+        )
+
+    def _redundant_with(self, position: int, kept: set) -> Optional[List[int]]:
+        rule = self.rules[position]
+        return self._covered_by(
+            position,
+            self.allowed,
+            lambda other: other in kept and _covers(self.rules[other], rule),
+        )
+
+    def _rule_finding(self, position: int, kind: str, others: List[int]) -> Finding:
+        rule = self.rules[position]
+        names = [self.rules[other].name for other in others]
+        if kind == "shadowed":
+            detail = f"All ports are blocked by {', '.join(names)}"
+        else:
+            detail = f"Ports are already allowed by {', '.join(names)}"
+        return Finding(
+            kind=kind,
+            detail=detail,
+            rules=(rule.name,),
+            protocol=rule.protocol,
+            profiles=rule.profiles,
+            ports=rule.local_port,
+        )
+
+    def _broad(self, allows: List[int]) -> List[Finding]:
+        findings = []
+        for position in allows:
+            rule = self.rules[position]
+            protocol = normalize_protocol(rule.protocol)
+            count = _port_count(self._ports[position])
+            if protocol == "Any":
+                detail = "Allows every protocol"
+                if count == _port_count([PORT_RANGE]):
+                    detail += " on every port"
+            elif count == _port_count([PORT_RANGE]):
+                detail = f"Allows every {protocol} port"
+            elif count > self.broad_threshold:
+                detail = f"Allows {count} {protocol} ports"
+            else:
+                continue
+            if rule.program not in ("", "Any"):
+                detail += f" for {rule.program}"
+            if rule.remote_ip not in ("", "Any"):
+                detail += f" from {rule.remote_ip}"
+            findings.append(
+                Finding(
+                    kind="broad",
+                    detail=detail,
+                    rules=(rule.name,),
+                    protocol=rule.protocol,
+                    profiles=rule.profiles,
+                    ports=rule.local_port,
+                )
+            )
+        return findings
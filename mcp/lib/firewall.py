@@ -0,0 +1,591 @@
+# firewall.py
+"""
+Windows Firewall rule inventory for the AutoFortify MCP server.
+
+Rules are returned as FirewallRule records from one of two backends:
+
+- PowerShellBackend asks Get-NetFirewallRule for structured objects on the
+  pooled PowerShell hosts and lets the cmdlet filter by direction, action and
+  state before anything is serialized.
+- NetshBackend streams `netsh advfirewall firewall show rule` and parses it
+  line by line, one rule at a time, for hosts without the NetSecurity module.
+
+RuleSnapshot keeps every rule in memory and only goes back to the backend when
+the rule store has changed. RuleIndex answers filtered queries over a snapshot,
+looking ports up in per-protocol interval trees.
+"""
+
+import functools
+import os
+import subprocess
+import threading
+import time
+from dataclasses import asdict, dataclass, replace
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from lib.intervals import IntervalTree
+from lib.powershell import PowerShellPool
+
+ALL_PROFILES = ("Domain", "Private", "Public")
+
+
+@dataclass
+class FirewallRule:
+    """One firewall rule, normalized across backends"""
+
+    name: str  # Display name ("Rule Name" in netsh)
+    enabled: bool
+    direction: str  # "In" or "Out"
+    action: str  # "Allow", "Block" or "Bypass"
+    group: str = ""
+    profiles: Tuple[str, ...] = ALL_PROFILES
+    protocol: str = "Any"
+    local_port: str = "Any"
+    remote_port: str = "Any"
+    local_ip: str = "Any"
+    remote_ip: str = "Any"
+    program: str = ""
+    rule_id: str = ""  # Unique rule name used by the NetSecurity cmdlets
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["profiles"] = list(self.profiles)
+        return data
+
+    def project(self, fields: Sequence[str]) -> Dict[str, Any]:
+        """The named fields only, in the given order"""
+        data = {field: getattr(self, field) for field in fields}
+        if "profiles" in data:
+            data["profiles"] = list(self.profiles)
+        return data
+
+
+# Every FirewallRule field name, in declaration order
+RULE_FIELDS = tuple(FirewallRule.__dataclass_fields__)
+
+
+class FirewallError(Exception):
+    """The firewall rules could not be read"""
+
+
+@functools.lru_cache(maxsize=64)
+def _profiles(value: str) -> Tuple[str, ...]:
+    """Normalize "Any", "Domain,Private" or "Domain, Private" to a tuple"""
+    names = tuple(p.strip() for p in value.split(",") if p.strip())
+    if not names or "Any" in names or "All" in names:
+        return ALL_PROFILES
+    return names
+
+
+def _matches(
+    rule: FirewallRule,
+    direction: Optional[str],
+    action: Optional[str],
+    enabled: Optional[bool],
+) -> bool:
+    return (
+        (direction is None or rule.direction == direction)
+        and (action is None or rule.action == action)
+        and (enabled is None or rule.enabled == enabled)
+    )
+
+
+# netsh "show rule" keys and the FirewallRule field each one fills
+NETSH_FIELDS = {
+    "Rule Name": "name",
+    "Enabled": "enabled",
+    "Direction": "direction",
+    "Profiles": "profiles",
+    "Grouping": "group",
+    "LocalIP": "local_ip",
+    "RemoteIP": "remote_ip",
+    "Protocol": "protocol",
+    "LocalPort": "local_port",
+    "RemotePort": "remote_port",
+    "Action": "action",
+    "Program": "program",
+}
+
+
+def _rule_from_netsh(fields: Dict[str, Any]) -> FirewallRule:
+    fields["enabled"] = fields.get("enabled") == "Yes"
+    fields["profiles"] = _profiles(fields.get("profiles", "Any"))
+    fields.setdefault("name", "")
+    fields.setdefault("direction", "")
+    fields.setdefault("action", "")
+    return FirewallRule(**fields)
+
+
+def parse_netsh_rules(lines: Iterable[str]) -> Iterator[FirewallRule]:
+    """
+    Parse `netsh advfirewall firewall show rule` output one line at a time
+
+    A rule starts at its "Rule Name:" line and ends at the next blank line or
+    rule header. Only one rule's fields are held in memory at a time.
+
+    Args:
+        lines: Output lines, e.g. a file object or a process's stdout
+
+    Yields:
+        A FirewallRule per rule block
+    """
+    fields: Optional[Dict[str, Any]] = None
+    for line in lines:
+        # Field lines are "Key:<padding>value" with the key at column 0
+        key, sep, value = line.partition(":")
+        if not sep:
+            # Blank line ends a rule; "-----" underlines and "Ok." are skipped
+            if fields and not line.strip():
+                yield _rule_from_netsh(fields)
+                fields = None
+            continue
+        attribute = NETSH_FIELDS.get(key)
+        if attribute is None:
+            continue
+        if attribute == "name":
+            if fields:
+                yield _rule_from_netsh(fields)
+            fields = {}
+        elif fields is None:
+            continue
+        fields[attribute] = value.strip()
+    if fields:
+        yield _rule_from_netsh(fields)
+
+
+class NetshBackend:
+    """Reads rules by streaming netsh output"""
+
+    def __init__(self, command: Optional[List[str]] = None):
+        self.command = command or [
+            "netsh",
+            "advfirewall",
+            "firewall",
+            "show",
+            "rule",
+            "name=all",
+        ]
+
+    def list_rules(
+        self,
+        direction: Optional[str] = None,
+        action: Optional[str] = None,
+        enabled: Optional[bool] = None,
+    ) -> List[FirewallRule]:
+        command = list(self.command)
+        if direction is not None:
+            command.append(f"dir={direction.lower()}")
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+        try:
+            rules = [
+                rule
+                for rule in parse_netsh_rules(process.stdout)
+                if _matches(rule, direction, action, enabled)
+            ]
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+        if returncode != 0:
+            raise FirewallError(f"netsh exited with code {returncode}")
+        return rules
+
+
+# Joins each rule with its port and application filters. The filters are read
+# once and indexed by InstanceID; querying them per rule is far slower.
+LIST_RULES_SCRIPT = """
+param($Direction, $Action, $Enabled)
+$filter = @{}
+if ($Direction) { $filter.Direction = $Direction }
+if ($Action) { $filter.Action = $Action }
+if ($Enabled) { $filter.Enabled = $Enabled }
+$ports = @{}
+Get-NetFirewallPortFilter -All | ForEach-Object { $ports[$_.InstanceID] = $_ }
+$programs = @{}
+Get-NetFirewallApplicationFilter -All | ForEach-Object { $programs[$_.InstanceID] = $_.Program }
+Get-NetFirewallRule @filter | ForEach-Object {
+    $port = $ports[$_.InstanceID]
+    [pscustomobject]@{
+        Id = $_.Name
+        Name = $_.DisplayName
+        Group = $_.DisplayGroup
+        Enabled = "$($_.Enabled)"
+        Direction = "$($_.Direction)"
+        Action = "$($_.Action)"
+        Profile = "$($_.Profile)"
+        Protocol = "$($port.Protocol)"
+        LocalPort = $port.LocalPort -join ','
+        RemotePort = $port.RemotePort -join ','
+        Program = "$($programs[$_.InstanceID])"
+    }
+}
+"""
+
+# FirewallRule uses netsh's short direction names
+_DIRECTIONS = {"In": "Inbound", "Out": "Outbound"}
+_SHORT_DIRECTIONS = {"Inbound": "In", "Outbound": "Out"}
+
+
+def _rule_from_powershell(record: Dict[str, Any]) -> FirewallRule:
+    direction = record.get("Direction") or ""
+    return FirewallRule(
+        name=record.get("Name") or "",
+        enabled=record.get("Enabled") == "True",
+        direction=_SHORT_DIRECTIONS.get(direction, direction),
+        action=record.get("Action") or "",
+        group=record.get("Group") or "",
+        profiles=_profiles(record.get("Profile") or "Any"),
+        protocol=record.get("Protocol") or "Any",
+        local_port=record.get("LocalPort") or "Any",
+        remote_port=record.get("RemotePort") or "Any",
+        program=record.get("Program") or "",
+        rule_id=record.get("Id") or "",
+    )
+
+
+class PowerShellBackend:
+    """Reads rules with Get-NetFirewallRule on the pooled PowerShell hosts"""
+
+    def __init__(self, pool: PowerShellPool):
+        self.pool = pool
+
+    def list_rules(
+        self,
+        direction: Optional[str] = None,
+        action: Optional[str] = None,
+        enabled: Optional[bool] = None,
+    ) -> List[FirewallRule]:
+        params = {}
+        if direction is not None:
+            params["Direction"] = _DIRECTIONS.get(direction, direction)
+        if action is not None:
+            params["Action"] = action
+        if enabled is not None:
+            params["Enabled"] = str(enabled)
+        result = self.pool.run(LIST_RULES_SCRIPT, params)
+        if not result.ok:
+            raise FirewallError(result.error or "Get-NetFirewallRule failed")
+        return [_rule_from_powershell(record) for record in result.output]
+
+
+def create_backend(pool: PowerShellPool, name: Optional[str] = None):
+    """
+    Create the rule backend named by name or FIREWALL_BACKEND
+
+    Args:
+        pool: PowerShell hosts used by the powershell backend
+        name: "powershell" (default) or "netsh"
+    """
+    name = (name or os.getenv("FIREWALL_BACKEND", "powershell")).lower()
+    if name == "powershell":
+        return PowerShellBackend(pool)
+    if name == "netsh":
+        return NetshBackend()
+    raise ValueError(
+        f"Unsupported firewall backend '{name}'. Use 'powershell' or 'netsh'"
+    )
+
+
+# Registry keys holding the local and group policy firewall rules. Windows
+# updates a key's last-write time whenever one of its rules is added, changed
+# or removed, which makes a signal far cheaper than listing the rules.
+FIREWALL_RULE_KEYS = (
+    r"SYSTEM\CurrentControlSet\Services\SharedAccess\Parameters\FirewallPolicy\FirewallRules",
+    r"SOFTWARE\Policies\Microsoft\WindowsFirewall\FirewallRules",
+)
+
+
+def registry_fingerprint() -> Optional[str]:
+    """
+    Cheap change signal for the firewall rule store
+
+    Returns:
+        A string that changes whenever a rule changes, or None when the
+        registry is unavailable (e.g. not running on Windows)
+    """
+    try:
+        import winreg
+    except ImportError:
+        return None
+    parts = []
+    for path in FIREWALL_RULE_KEYS:
+        try:
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, path) as key:
+                _, value_count, modified = winreg.QueryInfoKey(key)
+        except OSError:
+            continue
+        parts.append(f"{path}:{value_count}:{modified}")
+    return "|".join(parts)
+
+
+PORT_RANGE = (0, 65535)
+
+# Protocol numbers netsh prints for the protocols rules are indexed by
+_PROTOCOL_NAMES = {"6": "TCP", "17": "UDP", "TCP": "TCP", "UDP": "UDP", "ANY": "Any"}
+
+
+def normalize_protocol(value: str) -> str:
+    """ "TCP", "UDP" or "Any" for those protocols in any spelling, else value"""
+    return _PROTOCOL_NAMES.get(value.strip().upper(), value)
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_ports(value: str) -> Tuple[Tuple[int, int], ...]:
+    """
+    Parse a rule's port field into inclusive ranges
+
+    Args:
+        value: "Any", "3389", "80,443" or "5000-5100"; keywords such as "RPC"
+            or "IPHTTPSIn" name dynamic ports and are skipped
+
+    Returns:
+        (first, last) port pairs; every port for "Any" or an empty value
+    """
+    ranges = []
+    for part in value.split(","):
+        part = part.strip()
+        if part in ("", "Any", "*"):
+            return (PORT_RANGE,)
+        first, sep, last = part.partition("-")
+        if first.isdigit() and (not sep or last.isdigit()):
+            ranges.append((int(first), int(last) if sep else int(first)))
+    return tuple(ranges)
+
+
+class RuleIndex:
+    """
+    Filterable view of a rule tuple
+
+    Port filters go through one interval tree per protocol (TCP, UDP and rules
+    for any protocol) so a port query only touches the rules that open it.
+    Rules for other protocols (ICMP, GRE, ...) have no ports and are never
+    returned by a port query.
+    """
+
+    def __init__(self, rules: Sequence[FirewallRule]):
+        self.rules = tuple(rules)
+        intervals: Dict[str, List[Tuple[int, int, int]]] = {
+            "TCP": [],
+            "UDP": [],
+            "Any": [],
+        }
+        for position, rule in enumerate(self.rules):
+            protocol = normalize_protocol(rule.protocol)
+            if protocol in intervals:
+                for first, last in parse_ports(rule.local_port):
+                    intervals[protocol].append((first, last, position))
+        self._trees = {
+            protocol: IntervalTree(items) for protocol, items in intervals.items()
+        }
+
+    def _with_port(self, port: str, protocol: Optional[str]) -> List[int]:
+        ranges = parse_ports(port)
+        if not ranges:
+            raise ValueError(
+                f"Invalid port '{port}'. Use a number such as 3389 "
+                "or a range such as 5000-5100"
+            )
+        if protocol is None or protocol == "Any":
+            trees = self._trees.values()
+        elif protocol in self._trees:
+            trees = (self._trees[protocol], self._trees["Any"])
+        else:
+            return []
+        positions = set()
+        for tree in trees:
+            for first, last in ranges:
+                positions.update(item[2] for item in tree.overlapping(first, last))
+        return sorted(positions)
+
+    def query(
+        self,
+        port: Optional[str] = None,
+        protocol: Optional[str] = None,
+        program: Optional[str] = None,
+        profile: Optional[str] = None,
+        group: Optional[str] = None,
+        name: Optional[str] = None,
+        direction: Optional[str] = None,
+        action: Optional[str] = None,
+        enabled: Optional[bool] = None,
+    ) -> List[FirewallRule]:
+        """
+        Rules matching every given filter, in snapshot order
+
+        Args:
+            port: Port or range the rule must open, e.g. "3389" or "5000-5100";
+                rules for any port match
+            protocol: Protocol name or number; rules for any protocol match
+            program: Case-insensitive substring of the program path
+            profile: "Domain", "Private" or "Public"
+            group: Case-insensitive substring of the rule group
+            name: Case-insensitive substring of the display name or rule ID
+            direction: "In" or "Out"
+            action: "Allow", "Block" or "Bypass"
+            enabled: Rule state
+
+        Raises:
+            ValueError: If port is not a port number or range
+        """
+        protocol = normalize_protocol(protocol) if protocol else None
+        if port is not None:
+            candidates = [self.rules[i] for i in self._with_port(port, protocol)]
+        else:
+            candidates = self.rules
+        program = program.lower() if program else None
+        group = group.lower() if group else None
+        name = name.lower() if name else None
+        return [
+            rule
+            for rule in candidates
+            if _matches(rule, direction, action, enabled)
+            and (
+                protocol is None
+                or protocol == "Any"
+                or normalize_protocol(rule.protocol) in (protocol, "Any")
+            )
+            and (profile is None or profile in rule.profiles)
+            and (program is None or program in rule.program.lower())
+            and (group is None or group in rule.group.lower())
+            and (
+                name is None
+                or name in rule.name.lower()
+                or name in rule.rule_id.lower()
+            )
+        ]
+
+
+class RuleSnapshot:
+    """
+    In-memory copy of every firewall rule, reloaded only when rules change
+
+    The change signal is checked at most once per max_age seconds; in between,
+    rules() returns the cached records without any I/O. Without a signal
+    (fingerprint returns None) the snapshot is reloaded every max_age seconds.
+    """
+
+    def __init__(
+        self,
+        backend,
+        fingerprint: Callable[[], Optional[str]] = registry_fingerprint,
+        max_age: float = 2.0,
+    ):
+        """
+        Initialize the snapshot; rules are loaded on first use
+
+        Args:
+            backend: Rule source with a list_rules() method
+            fingerprint: Returns a value that changes when the rules change
+            max_age: Seconds between change-signal checks
+        """
+        self.backend = backend
+        self.fingerprint = fingerprint
+        self.max_age = max_age
+        self.loads = 0
+        self._rules: Optional[Tuple[FirewallRule, ...]] = None
+        self._signal: Optional[str] = None
+        self._checked = 0.0
+        self._index: Optional[RuleIndex] = None
+        self._lock = threading.Lock()
+
+    def rules(self) -> Tuple[FirewallRule, ...]:
+        """Every rule, in backend order"""
+        with self._lock:
+            now = time.monotonic()
+            if self._rules is not None and now - self._checked < self.max_age:
+                return self._rules
+            signal = self.fingerprint()
+            if self._rules is None or signal is None or signal != self._signal:
+                self._rules = tuple(self.backend.list_rules())
+                self.loads += 1
+            self._signal = signal
+            self._checked = now
+            return self._rules
+
+    def index(self) -> RuleIndex:
+        """Index over rules(), rebuilt only when the rules change"""
+        rules = self.rules()
+        index = self._index
+        if index is None or index.rules is not rules:
+            index = self._index = RuleIndex(rules)
+        return index
+
+    def invalidate(self) -> None:
+        """Force a reload on next use"""
+        with self._lock:
+            self._rules = None
+
+    def add(self, rule: FirewallRule) -> None:
+        """Record a rule created by this server"""
+        with self._lock:
+            if self._rules is not None:
+                self._rules = self._rules + (rule,)
+                self._resync()
+
+    def update(self, rule_name: str, **changes: Any) -> int:
+        """
+        Apply changes made by this server to matching rules
+
+        Args:
+            rule_name: Rule ID or display name
+            **changes: FirewallRule fields to overwrite, e.g. enabled=False
+
+        Returns:
+            Number of rules updated
+        """
+        with self._lock:
+            if self._rules is None:
+                return 0
+            updated = 0
+            rules = []
+            for rule in self._rules:
+                if rule_name in (rule.rule_id, rule.name):
+                    rule = replace(rule, **changes)
+                    updated += 1
+                rules.append(rule)
+            self._rules = tuple(rules)
+            self._resync()
+            return updated
+
+    def remove(self, rule_name: str) -> int:
+        """
+        Drop rules deleted by this server
+
+        Args:
+            rule_name: Rule ID or display name
+
+        Returns:
+            Number of rules removed
+        """
+        with self._lock:
+            if self._rules is None:
+                return 0
+            rules = tuple(
+                rule
+                for rule in self._rules
+                if rule_name not in (rule.rule_id, rule.name)
+            )
+            removed = len(self._rules) - len(rules)
+            self._rules = rules
+            self._resync()
+            return removed
+
+    def _resync(self) -> None:
+        # Our own change moved the signal; adopt it so it does not trigger a reload
+        if self._signal is not None:
+            self._signal = self.fingerprint()
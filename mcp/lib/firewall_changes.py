@@ -0,0 +1,308 @@
+# firewall_changes.py
+"""
+Batched firewall rule changes for the AutoFortify MCP server.
+
+A batch of create/disable/delete changes is first planned against the rule
+snapshot, which validates every change and produces a before/after diff without
+touching the firewall. Applying the batch runs all changes in one request on
+one pooled PowerShell host. That host records how to undo each step, and if any
+change fails it rolls back the steps that already ran, so the batch is applied
+completely or not at all.
+"""
+
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Literal, Optional, Sequence
+
+from pydantic import BaseModel, Field, model_validator
+
+from lib.firewall import FirewallRule, RuleSnapshot
+from lib.powershell import DEFAULT_TIMEOUT, PowerShellPool
+
+# Seconds allowed per change, including rolling it back, so large batches do
+# not hit the pool's default timeout and get killed before the rollback runs
+CHANGE_TIMEOUT = 2.0
+
+# Most changes in one batch, so a full batch stays within the 300 second
+# deadline of the apply_firewall_changes tool
+MAX_CHANGES = 100
+
+# Rule fields shown in a change's before/after diff
+DIFF_FIELDS = (
+    "name",
+    "rule_id",
+    "enabled",
+    "direction",
+    "action",
+    "protocol",
+    "local_port",
+)
+
+
+class FirewallChange(BaseModel):
+    """One change in a batch"""
+
+    operation: Literal["create", "disable", "delete"] = Field(
+        description="'create' a new enabled rule, 'disable' or 'delete' an existing rule"
+    )
+    rule_name: str = Field(
+        description="Name of the rule to create, or name or display name of the rule to change"
+    )
+    display_name: Optional[str] = Field(
+        default=None, description="Display name for the rule (create only)"
+    )
+    action: Optional[Literal["Allow", "Block"]] = Field(
+        default=None, description="Action for the rule (create only)"
+    )
+    local_port: Optional[int] = Field(
+        default=None, description="Local port number (create only)"
+    )
+    protocol: Optional[Literal["TCP", "UDP"]] = Field(
+        default=None, description="Protocol for the rule (create only)"
+    )
+    direction: Optional[Literal["Inbound", "Outbound"]] = Field(
+        default=None, description="Direction of the rule (create only)"
+    )
+
+    @model_validator(mode="after")
+    def _check_create_fields(self) -> "FirewallChange":
+        if self.operation == "create":
+            missing = [
+                name
+                for name in ("action", "local_port", "protocol", "direction")
+                if getattr(self, name) is None
+            ]
+            if missing:
+                raise ValueError(f"create requires {', '.join(missing)}")
+        return self
+
+    def to_rule(self) -> FirewallRule:
+        """The rule a create change adds"""
+        return FirewallRule(
+            name=self.display_name or self.rule_name,
+            enabled=True,
+            direction="In" if self.direction == "Inbound" else "Out",
+            action=self.action,
+            protocol=self.protocol,
+            local_port=str(self.local_port),
+            rule_id=self.rule_name,
+        )
+
+
+@dataclass
+class ChangeResult:
+    """Outcome of one change in a batch"""
+
+    operation: str
+    rule_name: str
+    # "planned", "applied", "rolled_back", "rollback_failed", "failed",
+    # "invalid" or "skipped"
+    status: str
+    error: Optional[str] = None
+    before: List[Dict[str, Any]] = field(default_factory=list)
+    after: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "operation": self.operation,
+            "rule_name": self.rule_name,
+            "status": self.status,
+        }
+        if self.error:
+            data["error"] = self.error
+        if self.before or self.after:
+            data["before"] = self.before
+            data["after"] = self.after
+        return data
+
+
+def _named(rule: FirewallRule, rule_name: str) -> bool:
+    return rule_name in (rule.rule_id, rule.name)
+
+
+def plan_changes(
+    rules: Sequence[FirewallRule], changes: Sequence[FirewallChange]
+) -> List[ChangeResult]:
+    """
+    Validate a batch against the current rules and diff each change
+
+    Changes are planned in order, so a later change sees the rules earlier
+    changes create, disable or delete.
+
+    Returns:
+        One result per change: "planned" when the change is valid, "invalid"
+        with an error when it is not
+    """
+    current = list(rules)
+    results = []
+    for change in changes:
+        result = ChangeResult(change.operation, change.rule_name, "planned")
+        matching = [rule for rule in current if _named(rule, change.rule_name)]
+        if change.operation == "create":
+            if matching:
+                result.status = "invalid"
+                result.error = f"Rule '{change.rule_name}' already exists"
+            else:
+                rule = change.to_rule()
+                current.append(rule)
+                result.after = [rule.project(DIFF_FIELDS)]
+        elif not matching:
+            result.status = "invalid"
+            result.error = f"Rule '{change.rule_name}' not found"
+        else:
+            result.before = [rule.project(DIFF_FIELDS) for rule in matching]
+            if change.operation == "disable":
+                current = [
+                    (
+                        replace(rule, enabled=False)
+                        if _named(rule, change.rule_name)
+                        else rule
+                    )
+                    for rule in current
+                ]
+                result.after = [
+                    {**before, "enabled": False} for before in result.before
+                ]
+            else:
+                current = [
+                    rule for rule in current if not _named(rule, change.rule_name)
+                ]
+        results.append(result)
+    return results
+
+
+# Runs a batch in one request. Each step pushes a script block that undoes it;
+# on the first failure the completed steps are undone in reverse order and the
+# remaining changes are skipped. Deleted rules are re-created from their rule,
+# port, address and application filter settings.
+APPLY_CHANGES_SCRIPT = """
+param($Changes)
+function Find-Rule($Name) {
+    $rule = @(Get-NetFirewallRule -Name $Name -ErrorAction SilentlyContinue)
+    if (-not $rule) { $rule = @(Get-NetFirewallRule -DisplayName $Name -ErrorAction SilentlyContinue) }
+    if (-not $rule) { throw "Rule '$Name' not found" }
+    $rule
+}
+$undo = New-Object System.Collections.Stack
+$results = New-Object System.Collections.ArrayList
+$failed = $false
+foreach ($change in @($Changes)) {
+    $result = [ordered]@{ rule_name = $change.rule_name; status = 'skipped'; error = $null; undo = 0 }
+    [void]$results.Add($result)
+    if ($failed) { continue }
+    $before = $undo.Count
+    try {
+        switch ($change.operation) {
+            'create' {
+                if (Get-NetFirewallRule -Name $change.rule_name -ErrorAction SilentlyContinue) {
+                    throw "Rule '$($change.rule_name)' already exists"
+                }
+                $displayName = if ($change.display_name) { $change.display_name } else { $change.rule_name }
+                New-NetFirewallRule -Name $change.rule_name -DisplayName $displayName -Action $change.action `
+                    -LocalPort $change.local_port -Protocol $change.protocol -Direction $change.direction -Enabled True | Out-Null
+                $name = $change.rule_name
+                $undo.Push({ Remove-NetFirewallRule -Name $name }.GetNewClosure())
+            }
+            'disable' {
+                foreach ($rule in Find-Rule $change.rule_name) {
+                    $name = $rule.Name
+                    $enabled = "$($rule.Enabled)"
+                    Set-NetFirewallRule -Name $name -Enabled False
+                    $undo.Push({ Set-NetFirewallRule -Name $name -Enabled $enabled }.GetNewClosure())
+                }
+            }
+            'delete' {
+                foreach ($rule in Find-Rule $change.rule_name) {
+                    $port = $rule | Get-NetFirewallPortFilter
+                    $address = $rule | Get-NetFirewallAddressFilter
+                    $program = ($rule | Get-NetFirewallApplicationFilter).Program
+                    $copy = @{
+                        Name = $rule.Name; DisplayName = $rule.DisplayName; Group = $rule.Group
+                        Description = $rule.Description; Enabled = "$($rule.Enabled)"
+                        Direction = "$($rule.Direction)"; Action = "$($rule.Action)"; Profile = "$($rule.Profile)"
+                        Protocol = $port.Protocol; LocalPort = $port.LocalPort; RemotePort = $port.RemotePort
+                        LocalAddress = $address.LocalAddress; RemoteAddress = $address.RemoteAddress; Program = $program
+                    }
+                    foreach ($key in @($copy.Keys)) {
+                        if ($null -eq $copy[$key] -or "$($copy[$key])" -in @('', 'Any')) { $copy.Remove($key) }
+                    }
+                    Remove-NetFirewallRule -Name $rule.Name
+                    $undo.Push({ New-NetFirewallRule @copy | Out-Null }.GetNewClosure())
+                }
+            }
+        }
+        $result.status = 'applied'
+        $result.undo = $undo.Count - $before
+    }
+    catch {
+        $failed = $true
+        $result.status = 'failed'
+        $result.error = $_.Exception.Message
+        # Undo what this change did before it failed, then earlier changes
+        $result.undo = $undo.Count - $before
+    }
+}
+if ($failed) {
+    $results.Reverse()
+    foreach ($result in $results) {
+        $errors = @()
+        for ($i = 0; $i -lt $result.undo; $i++) {
+            try { & $undo.Pop() } catch { $errors += $_.Exception.Message }
+        }
+        if ($result.status -eq 'applied') {
+            $result.status = if ($errors) { 'rollback_failed' } else { 'rolled_back' }
+        }
+        if ($errors) { $result.error = (@($result.error) + $errors | Where-Object { $_ }) -join '; ' }
+    }
+    $results.Reverse()
+}
+$results | ForEach-Object { [pscustomobject]@{ rule_name = $_.rule_name; status = $_.status; error = $_.error } }
+"""
+
+
+def apply_changes(
+    pool: PowerShellPool,
+    changes: Sequence[FirewallChange],
+    planned: Optional[Sequence[ChangeResult]] = None,
+) -> List[ChangeResult]:
+    """
+    Apply a batch on one PowerShell host, rolling back on any failure
+
+    Args:
+        pool: PowerShell hosts; the whole batch runs in one request
+        changes: Changes in the order they are applied
+        planned: Results of plan_changes() for the batch, whose diffs are kept
+
+    Returns:
+        One result per change. If the host itself failed (e.g. it timed out)
+        every result is "failed" with the host error, and the firewall may be
+        partially changed.
+    """
+    results = [
+        ChangeResult(change.operation, change.rule_name, "failed") for change in changes
+    ]
+    for result, plan in zip(results, planned or ()):
+        result.before, result.after = plan.before, plan.after
+    res = pool.run(
+        APPLY_CHANGES_SCRIPT,
+        {"Changes": [change.model_dump() for change in changes]},
+        timeout=max(DEFAULT_TIMEOUT, len(changes) * CHANGE_TIMEOUT),
+    )
+    if not res.ok:
+        for result in results:
+            result.error = res.error or "PowerShell host failed"
+        return results
+    for result, outcome in zip(results, res.output):
+        result.status = outcome.get("status") or "failed"
+        result.error = outcome.get("error")
+    return results
+
+
+def record_changes(snapshot: RuleSnapshot, changes: Sequence[FirewallChange]) -> None:
+    """Apply a batch that succeeded to the in-memory rules"""
+    for change in changes:
+        if change.operation == "create":
+            snapshot.add(change.to_rule())
+        elif change.operation == "disable":
+            snapshot.update(change.rule_name, enabled=False)
+        else:
+            snapshot.remove(change.rule_name)
@@ -0,0 +1,94 @@
+# intervals.py
+"""
+Static interval tree for port ranges.
+
+Built once from (start, end, value) triples with inclusive bounds, then
+answers "which intervals overlap [start, end]" in O(log n + k).
+"""
+
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Tuple
+
+Interval = Tuple[int, int, Any]
+
+
+@dataclass
+class _Node:
+    center: int
+    by_start: List[Interval]  # Intervals containing center, ascending start
+    by_end: List[Interval]  # The same intervals, descending end
+    left: Optional["_Node"] = None
+    right: Optional["_Node"] = None
+
+
+class IntervalTree:
+    """Centered interval tree over closed integer intervals"""
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        """
+        Build the tree
+
+        Args:
+            intervals: (start, end, value) triples with start <= end
+        """
+        self.intervals = list(intervals)
+        self._root = self._build(self.intervals)
+
+    @classmethod
+    def _build(cls, intervals: List[Interval]) -> Optional[_Node]:
+        if not intervals:
+            return None
+        endpoints = sorted(p for start, end, _ in intervals for p in (start, end))
+        center = endpoints[len(endpoints) // 2]
+        left, right, here = [], [], []
+        for interval in intervals:
+            if interval[1] < center:
+                left.append(interval)
+            elif interval[0] > center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        return _Node(
+            center=center,
+            by_start=sorted(here, key=lambda i: i[0]),
+            by_end=sorted(here, key=lambda i: i[1], reverse=True),
+            left=cls._build(left),
+            right=cls._build(right),
+        )
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    def overlapping(self, start: int, end: Optional[int] = None) -> List[Interval]:
+        """
+        Intervals that share at least one point with [start, end]
+
+        Args:
+            start: First point of the query range
+            end: Last point of the query range (default: start)
+        """
+        end = start if end is None else end
+        found: List[Interval] = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if end < node.center:
+                # Every interval here reaches center, so only its start matters
+                for interval in node.by_start:
+                    if interval[0] > end:
+                        break
+                    found.append(interval)
+                stack.append(node.left)
+            elif start > node.center:
+                for interval in node.by_end:
+                    if interval[1] < start:
+                        break
+                    found.append(interval)
+                stack.append(node.right)
+            else:
+                found.extend(node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+        return found
@@ -0,0 +1,186 @@
+# job_descriptions.py
+"""
+Job descriptions for the AutoFortify MCP server.
+
+The agent weighs each remediation against what a user's job requires. The
+descriptions file is parsed once into an index by username and by role and
+kept in memory; it is parsed again only when its modification time or size
+changes, so lookups for a handful of users cost no file I/O and return only
+those users' descriptions.
+
+The file is plain text with one block per person, separated by blank lines.
+A block holds "Key: value" lines; the username is read from a Username, User,
+Account or sAMAccountName line and the role from a Role, Title, Job Title or
+Position line. A block whose first line has no key is headed by the username,
+e.g. "jdoe" or "jdoe - Database Administrator". Each entry keeps its block's
+text as written.
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Keys naming the person and their role, lower case
+USERNAME_KEYS = ("username", "user", "account", "samaccountname", "user name")
+ROLE_KEYS = ("role", "title", "job title", "position")
+NAME_KEYS = ("name", "full name", "display name")
+
+_KEY_VALUE = re.compile(r"^\s*([A-Za-z][A-Za-z ]{0,30}?)\s*:\s*(.*)$")
+_HEADING = re.compile(
+    r"^\s*#*\s*(?P<user>[^\s:()]+)"
+    r"(?:\s+[-–]\s+(?P<role>.+?)|\s*\((?P<paren>[^)]*)\))?\s*$"
+)
+
+
+class JobDescriptionError(Exception):
+    """The job descriptions file could not be read"""
+
+
+def normalize_username(username: str) -> str:
+    """
+    Lower-cased account name without a domain
+
+    'CORP\\jdoe', 'jdoe@corp.local' and BloodHound's 'JDOE@CORP.LOCAL' all
+    become 'jdoe'.
+    """
+    name = username.strip().split("\\")[-1].split("@")[0]
+    return name.lower()
+
+
+@dataclass
+class JobDescription:
+    """One person's entry in the descriptions file"""
+
+    username: str
+    role: Optional[str]
+    text: str
+    name: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "username": self.username,
+            "name": self.name,
+            "role": self.role,
+            "description": self.text,
+        }
+
+
+def _parse_block(block: str) -> Optional[JobDescription]:
+    lines = [line for line in block.splitlines() if line.strip()]
+    if not lines:
+        return None
+    fields: Dict[str, str] = {}
+    for line in lines:
+        match = _KEY_VALUE.match(line)
+        if match:
+            fields.setdefault(match.group(1).strip().lower(), match.group(2).strip())
+    username = next((fields[k] for k in USERNAME_KEYS if fields.get(k)), None)
+    role = next((fields[k] for k in ROLE_KEYS if fields.get(k)), None)
+    if username is None and not _KEY_VALUE.match(lines[0]):
+        heading = _HEADING.match(lines[0])
+        if heading:
+            username = heading.group("user")
+            role = role or heading.group("role") or heading.group("paren") or None
+    if username is None:
+        return None
+    return JobDescription(
+        username=username,
+        role=role,
+        text=block.strip(),
+        name=next((fields[k] for k in NAME_KEYS if fields.get(k)), None),
+    )
+
+
+def parse_job_descriptions(text: str) -> List[JobDescription]:
+    """Entries in file order; blocks without a username are skipped"""
+    entries = []
+    for block in re.split(r"\n\s*\n", text.replace("\r\n", "\n")):
+        entry = _parse_block(block)
+        if entry is not None:
+            entries.append(entry)
+    return entries
+
+
+@dataclass
+class JobDescriptionIndex:
+    """Entries by normalized username and by lower-cased role"""
+
+    entries: List[JobDescription] = field(default_factory=list)
+    by_user: Dict[str, JobDescription] = field(default_factory=dict)
+    by_role: Dict[str, List[JobDescription]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, entries: Iterable[JobDescription]) -> "JobDescriptionIndex":
+        index = cls()
+        for entry in entries:
+            index.entries.append(entry)
+            index.by_user.setdefault(normalize_username(entry.username), entry)
+            if entry.role:
+                index.by_role.setdefault(entry.role.lower(), []).append(entry)
+        return index
+
+    def lookup(
+        self, usernames: Iterable[str]
+    ) -> Tuple[List[JobDescription], List[str]]:
+        """Entries for the usernames, and the usernames without one"""
+        found, missing = [], []
+        for username in dict.fromkeys(usernames):
+            entry = self.by_user.get(normalize_username(username))
+            if entry is None:
+                missing.append(username)
+            elif entry not in found:
+                found.append(entry)
+        return found, missing
+
+    def with_role(self, role: str) -> List[JobDescription]:
+        """Entries whose role contains role, case-insensitively"""
+        role = role.lower()
+        return [
+            entry
+            for key, entries in self.by_role.items()
+            if role in key
+            for entry in entries
+        ]
+
+
+class JobDescriptionStore:
+    """The parsed descriptions file, re-parsed when the file changes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.loads = 0
+        self._index = JobDescriptionIndex()
+        self._text = ""
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        try:
+            stat = os.stat(self.path)
+        except OSError as e:
+            raise JobDescriptionError(str(e)) from e
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return
+        try:
+            with open(self.path, encoding="utf-8-sig") as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            raise JobDescriptionError(str(e)) from e
+        self._index = JobDescriptionIndex.build(parse_job_descriptions(text))
+        self._text, self._stamp = text, stamp
+        self.loads += 1
+
+    def index(self) -> JobDescriptionIndex:
+        """The current index, re-parsing the file if it changed"""
+        with self._lock:
+            self._load()
+            return self._index
+
+    def text(self) -> str:
+        """The whole file as last read"""
+        with self._lock:
+            self._load()
+            return self._text
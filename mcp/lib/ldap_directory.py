@@ -0,0 +1,637 @@
+# ldap_directory.py
+"""
+LDAP backend for the AD tools, selected with AD_BACKEND=ldap.
+
+Talks to a domain controller with ldap3 instead of running the ActiveDirectory
+cmdlets, so it needs neither powershell.exe nor RSAT. Binds are pooled and
+kept open between tool calls, bulk reads use paged searches, and batched
+changes to one attribute of one object are sent as a single modify.
+
+Configuration (from_env):
+    LDAP_SERVER          Host name or URL, e.g. ldaps://dc01.corp.local
+    LDAP_USER            Bind user (DN, user@domain or DOMAIN\\user for NTLM)
+    LDAP_PASSWORD        Bind password
+    LDAP_BASE_DN         Search base, e.g. DC=corp,DC=local
+    LDAP_USER_CONTAINER  Where new users and groups go (default CN=Users,<base>)
+    LDAP_POOL_SIZE       Number of pooled binds (default 4)
+
+Password changes (new users, resets) need an encrypted connection (ldaps://).
+"""
+
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ldap3 import (
+    BASE,
+    MODIFY_ADD,
+    MODIFY_DELETE,
+    MODIFY_REPLACE,
+    NTLM,
+    SIMPLE,
+    SUBTREE,
+    Connection,
+    Server,
+)
+from ldap3.core.exceptions import LDAPCommunicationError, LDAPException
+from ldap3.utils.conv import escape_filter_chars
+from ldap3.utils.dn import escape_rdn
+
+from lib.delegation import (
+    PAGE_SIZE,
+    TRUSTED_TO_AUTH_FOR_DELEGATION,
+    Delegation,
+    DelegationError,
+)
+from lib.powershell import PowerShellResult
+
+ACCOUNTDISABLE = 0x2
+NORMAL_ACCOUNT = 0x200
+
+# groupType flags for New-ADGroup's scope and category
+GROUP_SCOPES = {"Global": 0x2, "DomainLocal": 0x4, "Universal": 0x8}
+SECURITY_ENABLED = -0x80000000  # 0x80000000 as the signed value AD stores
+
+# Seconds a pooled bind may sit unused before it is bound again; AD closes
+# idle LDAP connections after MaxConnIdleTime, 900 seconds by default
+MAX_IDLE = 600
+
+# sAMAccountNames per search when resolving a batch
+RESOLVE_CHUNK = 100
+
+DELEGATION_FILTER = (
+    "(&(|(objectCategory=person)(objectCategory=computer))"
+    "(msDS-AllowedToDelegateTo=*))"
+)
+
+# lib.ad_changes operations that add or remove one attribute value
+_VALUE_OPERATIONS = {
+    "add_group_member": ("member", MODIFY_ADD),
+    "remove_group_member": ("member", MODIFY_DELETE),
+    "add_constrained_delegation": ("msDS-AllowedToDelegateTo", MODIFY_ADD),
+    "remove_constrained_delegation": ("msDS-AllowedToDelegateTo", MODIFY_DELETE),
+}
+
+
+class DirectoryError(Exception):
+    """An LDAP request failed or named an object that does not exist"""
+
+
+def _values(attributes: Dict[str, Any], name: str) -> List[Any]:
+    """Attribute values as a list, whether the server sent one value or many"""
+    value = attributes.get(name)
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _first(attributes: Dict[str, Any], name: str, default: Any = None) -> Any:
+    values = _values(attributes, name)
+    return values[0] if values else default
+
+
+class LdapConnectionPool:
+    """A fixed number of bound connections shared by all tool calls"""
+
+    def __init__(
+        self,
+        connect: Callable[[], Connection],
+        size: int = 4,
+        max_idle: float = MAX_IDLE,
+    ):
+        """
+        Initialize the pool; connections are bound lazily
+
+        Args:
+            connect: Returns a new, unbound ldap3 Connection
+            size: Number of connections, i.e. requests that can run at once
+            max_idle: Seconds a connection may sit unused before it is bound
+                again rather than trusted to still be open
+        """
+        self.connect = connect
+        self.size = size
+        self.max_idle = max_idle
+        self.binds = 0
+        self._idle: "queue.LifoQueue[Tuple[Optional[Connection], float]]" = (
+            queue.LifoQueue()
+        )
+        for _ in range(size):
+            self._idle.put((None, 0.0))
+        self._lock = threading.Lock()
+
+    def _bind(self) -> Connection:
+        try:
+            connection = self.connect()
+            bound = connection.bind()
+        except LDAPCommunicationError:
+            # Nothing was sent yet, so a failed connect is safe to try again
+            connection = self.connect()
+            bound = connection.bind()
+        if not bound:
+            raise DirectoryError(
+                f"LDAP bind failed: {connection.result.get('description')}"
+            )
+        with self._lock:
+            self.binds += 1
+        return connection
+
+    @staticmethod
+    def _set_timeout(connection: Connection, seconds: Optional[float]) -> None:
+        if connection.socket is not None:
+            try:
+                connection.socket.settimeout(seconds)
+            except OSError:
+                pass
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Connection]:
+        """
+        Borrow a bound connection, binding a new one if it was dropped
+
+        Args:
+            timeout: Seconds to wait for each response, instead of the
+                connection's receive_timeout
+        """
+        connection, last_used = self._idle.get()
+        try:
+            if (
+                connection is not None
+                and connection.bound
+                and time.monotonic() - last_used > self.max_idle
+            ):
+                # The server may have closed it without us noticing
+                connection.unbind()
+            if connection is None or connection.closed or not connection.bound:
+                connection = self._bind()
+            if timeout is None:
+                yield connection
+            else:
+                self._set_timeout(connection, timeout)
+                try:
+                    yield connection
+                finally:
+                    self._set_timeout(connection, connection.receive_timeout)
+        except LDAPCommunicationError:
+            # The server closed the socket; bind again on next use
+            connection = None
+            raise
+        finally:
+            self._idle.put((connection, time.monotonic()))
+
+    def run(
+        self,
+        request: Callable[[Connection], Any],
+        retry: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Run request on a pooled connection
+
+        Args:
+            request: Called with a bound connection
+            retry: Run request again on a fresh bind if the kept-open
+                connection turns out to be dropped. Only for reads: a change
+                may have reached the server before the connection broke.
+            timeout: Seconds to wait for each response (default: the
+                connection's receive_timeout)
+        """
+        try:
+            with self.connection(timeout) as connection:
+                return request(connection)
+        except LDAPCommunicationError:
+            if not retry:
+                raise
+            with self.connection(timeout) as connection:
+                return request(connection)
+
+    def close(self) -> None:
+        """Unbind every idle connection"""
+        for _ in range(self.size):
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if connection is not None and connection.bound:
+                connection.unbind()
+            self._idle.put((None, 0.0))
+
+
+class LdapDirectory:
+    """AD operations over LDAP; same methods as lib.directory.PowerShellDirectory"""
+
+    def __init__(
+        self,
+        pool: LdapConnectionPool,
+        base_dn: str,
+        user_container: Optional[str] = None,
+        page_size: int = PAGE_SIZE,
+    ):
+        self.pool = pool
+        self.base_dn = base_dn
+        self.user_container = user_container or f"CN=Users,{base_dn}"
+        self.page_size = page_size
+
+    # Helpers
+
+    def _find(
+        self, connection: Connection, identity: str, attributes: Tuple[str, ...] = ()
+    ) -> Tuple[str, Dict[str, Any]]:
+        """DN and attributes of the object with this DN or sAMAccountName"""
+        if "=" in identity and "," in identity:
+            found = connection.search(
+                identity, "(objectClass=*)", BASE, attributes=list(attributes)
+            )
+        else:
+            name = escape_filter_chars(identity)
+            found = connection.search(
+                self.base_dn,
+                f"(|(sAMAccountName={name})(sAMAccountName={name}$))",
+                SUBTREE,
+                attributes=list(attributes),
+                size_limit=1,
+            )
+        entries = [
+            e for e in connection.response or () if e.get("type") == "searchResEntry"
+        ]
+        if not found or not entries:
+            raise DirectoryError(f"Object '{identity}' not found")
+        return entries[0]["dn"], entries[0].get("attributes") or {}
+
+    @staticmethod
+    def _check(connection: Connection, succeeded: bool) -> None:
+        if not succeeded:
+            result = connection.result or {}
+            message = result.get("message") or ""
+            raise DirectoryError(
+                f"{result.get('description', 'LDAP error')} {message}".strip()
+            )
+
+    def _call(
+        self,
+        request: Callable[[Connection], Any],
+        retry: bool = False,
+        timeout: Optional[float] = None,
+    ) -> PowerShellResult:
+        try:
+            output = self.pool.run(request, retry=retry, timeout=timeout)
+        except (DirectoryError, LDAPException) as e:
+            return PowerShellResult(ok=False, error=str(e))
+        return PowerShellResult(ok=True, output=output or [])
+
+    def _modify_values(
+        self, identity: str, attribute: str, operation: str, value: str, resolve: bool
+    ) -> PowerShellResult:
+        def request(connection):
+            dn, _ = self._find(connection, identity)
+            target = self._find(connection, value)[0] if resolve else value
+            self._check(
+                connection, connection.modify(dn, {attribute: [(operation, [target])]})
+            )
+
+        return self._call(request)
+
+    def _disable(self, connection: Connection, identity: str, disabled: bool) -> None:
+        dn, attributes = self._find(connection, identity, ("userAccountControl",))
+        flags = int(_first(attributes, "userAccountControl", NORMAL_ACCOUNT))
+        flags = flags | ACCOUNTDISABLE if disabled else flags & ~ACCOUNTDISABLE
+        self._check(
+            connection,
+            connection.modify(dn, {"userAccountControl": [(MODIFY_REPLACE, [flags])]}),
+        )
+
+    def _delete(self, identity: str) -> PowerShellResult:
+        def request(connection):
+            dn, _ = self._find(connection, identity)
+            self._check(connection, connection.delete(dn))
+
+        return self._call(request)
+
+    @staticmethod
+    def _password(connection: Connection, dn: str, password: str) -> None:
+        # AD takes the quoted password encoded as UTF-16LE in unicodePwd
+        encoded = f'"{password}"'.encode("utf-16-le")
+        LdapDirectory._check(
+            connection,
+            connection.modify(dn, {"unicodePwd": [(MODIFY_REPLACE, [encoded])]}),
+        )
+
+    # Reads
+
+    def list_delegation(self, identity: str) -> PowerShellResult:
+        def request(connection):
+            _, attributes = self._find(
+                connection, identity, ("msDS-AllowedToDelegateTo",)
+            )
+            return _values(attributes, "msDS-AllowedToDelegateTo")
+
+        return self._call(request, retry=True)
+
+    def list_delegations(self) -> List[Delegation]:
+        def request(connection):
+            delegations = []
+            for entry in connection.extend.standard.paged_search(
+                self.base_dn,
+                DELEGATION_FILTER,
+                SUBTREE,
+                attributes=[
+                    "sAMAccountName",
+                    "objectClass",
+                    "userAccountControl",
+                    "msDS-AllowedToDelegateTo",
+                ],
+                paged_size=self.page_size,
+                generator=True,
+            ):
+                if entry.get("type") != "searchResEntry":
+                    continue
+                attributes = entry["attributes"]
+                classes = _values(attributes, "objectClass")
+                flags = int(_first(attributes, "userAccountControl", 0))
+                delegations.append(
+                    Delegation(
+                        account=_first(attributes, "sAMAccountName", ""),
+                        account_type=classes[-1] if classes else "user",
+                        spns=tuple(_values(attributes, "msDS-AllowedToDelegateTo")),
+                        protocol_transition=bool(
+                            flags & TRUSTED_TO_AUTH_FOR_DELEGATION
+                        ),
+                    )
+                )
+            return delegations
+
+        try:
+            return self.pool.run(request, retry=True)
+        except (DirectoryError, LDAPException) as e:
+            raise DelegationError(str(e)) from e
+
+    # Batches (lib.ad_changes)
+
+    def _resolve(
+        self,
+        connection: Connection,
+        identities: Iterable[str],
+        attributes: Tuple[str, ...] = (),
+    ) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """
+        DN and attributes of many objects, by lower-cased identity
+
+        sAMAccountNames are looked up RESOLVE_CHUNK at a time with one OR
+        filter, instead of one search per name. Identities that do not exist
+        are left out.
+        """
+        found: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        names = []
+        for identity in dict.fromkeys(i.lower() for i in identities):
+            if "=" in identity and "," in identity:
+                try:
+                    found[identity] = self._find(connection, identity, attributes)
+                except DirectoryError:
+                    pass
+            else:
+                names.append(identity)
+        wanted = list(dict.fromkeys(("sAMAccountName",) + attributes))
+        for start in range(0, len(names), RESOLVE_CHUNK):
+            terms = "".join(
+                f"(sAMAccountName={escape_filter_chars(name)})"
+                f"(sAMAccountName={escape_filter_chars(name)}$)"
+                for name in names[start : start + RESOLVE_CHUNK]
+            )
+            connection.search(self.base_dn, f"(|{terms})", SUBTREE, attributes=wanted)
+            for entry in connection.response or ():
+                if entry.get("type") != "searchResEntry":
+                    continue
+                account = str(_first(entry["attributes"], "sAMAccountName", ""))
+                account = account.lower()
+                for key in (account, account.rstrip("$")):
+                    found.setdefault(key, (entry["dn"], entry["attributes"]))
+        return found
+
+    def check_operations(
+        self, operations: List[Dict[str, Any]], timeout: Optional[float] = None
+    ) -> PowerShellResult:
+        """Same checks as CHECK_OPERATIONS_SCRIPT, resolving the batch at once"""
+
+        def request(connection):
+            objects = self._resolve(
+                connection,
+                [o["identity"] for o in operations]
+                + [o["member"] for o in operations if o.get("member")],
+                ("member", "userAccountControl", "msDS-AllowedToDelegateTo"),
+            )
+
+            def find(identity):
+                if identity.lower() not in objects:
+                    raise DirectoryError(f"Object '{identity}' not found")
+                return objects[identity.lower()]
+
+            checks = []
+            for operation in operations:
+                check = {"exists": True, "changes": True, "error": None}
+                name = operation["operation"]
+                try:
+                    _, attributes = find(operation["identity"])
+                    if name.endswith("_group_member"):
+                        members = {v.lower() for v in _values(attributes, "member")}
+                        is_member = find(operation["member"])[0].lower() in members
+                        check["changes"] = (name == "add_group_member") != is_member
+                    elif name.endswith("_account"):
+                        flags = int(_first(attributes, "userAccountControl", 0))
+                        enabled = not flags & ACCOUNTDISABLE
+                        check["changes"] = enabled != (name == "enable_account")
+                    else:
+                        spns = {
+                            v.lower()
+                            for v in _values(attributes, "msDS-AllowedToDelegateTo")
+                        }
+                        delegates = operation["target"].lower() in spns
+                        check["changes"] = (
+                            name == "add_constrained_delegation"
+                        ) != delegates
+                except DirectoryError as e:
+                    check.update(exists=False, error=str(e))
+                checks.append(check)
+            return checks
+
+        return self._call(request, retry=True, timeout=timeout)
+
+    def apply_operations(
+        self, operations: List[Dict[str, Any]], timeout: Optional[float] = None
+    ) -> PowerShellResult:
+        """
+        Apply operations in order, one outcome per operation
+
+        Value changes to the same attribute of the same object, e.g. removing
+        200 members from one group, are sent as one modify. If that modify is
+        rejected, its operations are retried one by one so each gets its own
+        result.
+        """
+
+        def request(connection):
+            objects = self._resolve(
+                connection,
+                [o["identity"] for o in operations]
+                + [o["member"] for o in operations if o.get("member")],
+                ("userAccountControl",),
+            )
+            outcomes: List[Dict[str, Any]] = [
+                {"ok": False, "error": None} for _ in operations
+            ]
+            batches: Dict[Tuple[str, str, str], List[Tuple[int, str]]] = {}
+            for index, operation in enumerate(operations):
+                name = operation["operation"]
+                missing = [
+                    identity
+                    for identity in (operation["identity"], operation.get("member"))
+                    if identity and identity.lower() not in objects
+                ]
+                if missing:
+                    outcomes[index]["error"] = f"Object '{missing[0]}' not found"
+                    continue
+                dn, attributes = objects[operation["identity"].lower()]
+                if name in _VALUE_OPERATIONS:
+                    attribute, change = _VALUE_OPERATIONS[name]
+                    if attribute == "member":
+                        value = objects[operation["member"].lower()][0]
+                    else:
+                        value = operation["target"]
+                    batches.setdefault((dn, attribute, change), []).append(
+                        (index, value)
+                    )
+                    continue
+                flags = int(_first(attributes, "userAccountControl", NORMAL_ACCOUNT))
+                if name == "disable_account":
+                    flags |= ACCOUNTDISABLE
+                else:
+                    flags &= ~ACCOUNTDISABLE
+                batches.setdefault(
+                    (dn, "userAccountControl", MODIFY_REPLACE), []
+                ).append((index, flags))
+            for (dn, attribute, change), items in batches.items():
+                values = [value for _, value in items]
+                if connection.modify(dn, {attribute: [(change, values)]}):
+                    for index, _ in items:
+                        outcomes[index] = {"ok": True, "error": None}
+                    continue
+                for index, value in items:
+                    try:
+                        self._check(
+                            connection,
+                            connection.modify(dn, {attribute: [(change, [value])]}),
+                        )
+                        outcomes[index] = {"ok": True, "error": None}
+                    except DirectoryError as e:
+                        outcomes[index]["error"] = str(e)
+            return outcomes
+
+        return self._call(request, timeout=timeout)
+
+    # Single operations
+
+    def remove_delegation(self, identity: str, target: str) -> PowerShellResult:
+        return self._modify_values(
+            identity, "msDS-AllowedToDelegateTo", MODIFY_DELETE, target, resolve=False
+        )
+
+    def add_group_member(self, identity: str, member: str) -> PowerShellResult:
+        return self._modify_values(identity, "member", MODIFY_ADD, member, resolve=True)
+
+    def remove_group_member(self, identity: str, member: str) -> PowerShellResult:
+        return self._modify_values(
+            identity, "member", MODIFY_DELETE, member, resolve=True
+        )
+
+    def new_user(
+        self, name: str, sam_account_name: str, password: str, enabled: bool
+    ) -> PowerShellResult:
+        def request(connection):
+            dn = f"CN={escape_rdn(name)},{self.user_container}"
+            self._check(
+                connection,
+                connection.add(
+                    dn,
+                    ["top", "person", "organizationalPerson", "user"],
+                    {
+                        "cn": name,
+                        "sAMAccountName": sam_account_name,
+                        "userAccountControl": NORMAL_ACCOUNT | ACCOUNTDISABLE,
+                    },
+                ),
+            )
+            # Like New-ADUser: set the password, then enable the account and
+            # require a password change at next logon
+            self._password(connection, dn, password)
+            flags = NORMAL_ACCOUNT if enabled else NORMAL_ACCOUNT | ACCOUNTDISABLE
+            self._check(
+                connection,
+                connection.modify(
+                    dn,
+                    {
+                        "pwdLastSet": [(MODIFY_REPLACE, [0])],
+                        "userAccountControl": [(MODIFY_REPLACE, [flags])],
+                    },
+                ),
+            )
+
+        return self._call(request)
+
+    def remove_user(self, identity: str) -> PowerShellResult:
+        return self._delete(identity)
+
+    def disable_account(self, identity: str) -> PowerShellResult:
+        return self._call(lambda connection: self._disable(connection, identity, True))
+
+    def enable_account(self, identity: str) -> PowerShellResult:
+        return self._call(lambda connection: self._disable(connection, identity, False))
+
+    def set_password(self, identity: str, password: str) -> PowerShellResult:
+        def request(connection):
+            dn, _ = self._find(connection, identity)
+            self._password(connection, dn, password)
+
+        return self._call(request)
+
+    def new_group(
+        self, name: str, group_scope: str, group_category: str
+    ) -> PowerShellResult:
+        def request(connection):
+            group_type = GROUP_SCOPES[group_scope]
+            if group_category == "Security":
+                group_type |= SECURITY_ENABLED
+            self._check(
+                connection,
+                connection.add(
+                    f"CN={escape_rdn(name)},{self.user_container}",
+                    ["top", "group"],
+                    {"cn": name, "sAMAccountName": name, "groupType": group_type},
+                ),
+            )
+
+        return self._call(request)
+
+    def remove_group(self, identity: str) -> PowerShellResult:
+        return self._delete(identity)
+
+
+def from_env() -> LdapDirectory:
+    """LdapDirectory configured from the LDAP_* environment variables"""
+    url = os.environ["LDAP_SERVER"]
+    user = os.environ["LDAP_USER"]
+    password = os.environ["LDAP_PASSWORD"]
+    base_dn = os.environ["LDAP_BASE_DN"]
+    server = Server(url, use_ssl=url.lower().startswith("ldaps://"), connect_timeout=10)
+    authentication = NTLM if "\\" in user else SIMPLE
+
+    def connect() -> Connection:
+        return Connection(
+            server,
+            user=user,
+            password=password,
+            authentication=authentication,
+            receive_timeout=60,
+        )
+
+    pool = LdapConnectionPool(connect, size=int(os.getenv("LDAP_POOL_SIZE", "4")))
+    return LdapDirectory(pool, base_dn, os.getenv("LDAP_USER_CONTAINER"))
@@ -0,0 +1,360 @@
+# powershell.py
+"""
+Pooled, long-lived PowerShell hosts for the AutoFortify MCP server.
+
+Starting powershell.exe and importing the ActiveDirectory module costs one to
+three seconds, so the server keeps a few hosts running and sends them scripts
+over stdin/stdout. Each message is one line of JSON (see powershell_host.ps1).
+Any program that speaks the same protocol can stand in for PowerShell, which
+is how the tests run on Linux.
+"""
+
+import itertools
+import json
+import logging
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HOST_SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "powershell_host.ps1"
+)
+
+DEFAULT_COMMAND = [
+    "powershell.exe",
+    "-NoLogo",
+    "-NoProfile",
+    "-NonInteractive",
+    "-ExecutionPolicy",
+    "Bypass",
+    "-File",
+    HOST_SCRIPT,
+]
+
+DEFAULT_TIMEOUT = 60.0
+STARTUP_TIMEOUT = 30.0
+PING_TIMEOUT = 5.0
+
+# time.monotonic() by which the current tool call must finish, set per call by
+# lib.executor. Scripts started under a deadline are killed when it passes.
+call_deadline: ContextVar[Optional[float]] = ContextVar("call_deadline", default=None)
+
+
+class PowerShellError(Exception):
+    """The PowerShell host could not be started or stopped responding"""
+
+
+@dataclass
+class PowerShellResult:
+    """Outcome of one script run on a PowerShell host"""
+
+    ok: bool
+    output: List[Any] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def default_command() -> List[str]:
+    """Host command line, overridable with POWERSHELL_HOST_COMMAND"""
+    override = os.getenv("POWERSHELL_HOST_COMMAND")
+    if override:
+        return shlex.split(override, posix=os.name != "nt")
+    return list(DEFAULT_COMMAND)
+
+
+class PowerShellWorker:
+    """One PowerShell host process and the framing around it"""
+
+    def __init__(self, command: List[str], startup_timeout: float = STARTUP_TIMEOUT):
+        """
+        Initialize the worker; the process is started on first use
+
+        Args:
+            command: Command line that starts a host speaking the JSON protocol
+            startup_timeout: Seconds to wait for the host's ready message
+        """
+        self.command = command
+        self.startup_timeout = startup_timeout
+        self.pid: Optional[int] = None
+        self.starts = 0
+        self._process: Optional[subprocess.Popen] = None
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._exited = False
+        self._ids = itertools.count(1)
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self) -> None:
+        """Start the host and wait until it reports ready"""
+        self.stop()
+        self._lines = queue.Queue()
+        self._exited = False
+        self._process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+        )
+        threading.Thread(
+            target=self._read_lines,
+            args=(self._process.stdout, self._lines),
+            name="powershell-reader",
+            daemon=True,
+        ).start()
+        self.starts += 1
+
+        ready = self._read_message(lambda m: m.get("ready"), self.startup_timeout)
+        if ready is None:
+            self.stop(graceful=False)
+            raise PowerShellError(
+                f"PowerShell host did not become ready within {self.startup_timeout}s"
+            )
+        self.pid = ready.get("pid")
+        logger.info(f"PowerShell host started (pid {self.pid})")
+
+    def stop(self, graceful: bool = True) -> None:
+        """
+        Terminate the host process if it is running
+
+        Args:
+            graceful: Close stdin and give the host a moment to exit on its own;
+                otherwise kill it right away (for hosts stuck in a script)
+        """
+        process, self._process = self._process, None
+        if process is None:
+            return
+        if not graceful:
+            process.kill()
+            process.wait()
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def run(
+        self,
+        script: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> PowerShellResult:
+        """
+        Run a script block on the host
+
+        Args:
+            script: PowerShell script block; declare inputs with param(...)
+            params: Values splatted into the script block's parameters
+            timeout: Seconds to wait before the host is killed
+
+        Returns:
+            The result reported by the host
+
+        Raises:
+            PowerShellError: If the host died or timed out. The host is stopped
+                and will be restarted on next use.
+        """
+        if not self.alive:
+            self.start()
+
+        request_id = next(self._ids)
+        request = {"id": request_id, "script": script, "params": params or {}}
+        try:
+            self._process.stdin.write(json.dumps(request) + "\n")
+            self._process.stdin.flush()
+        except OSError as e:
+            self.stop(graceful=False)
+            raise PowerShellError(f"PowerShell host is not accepting input: {e}")
+
+        response = self._read_message(lambda m: m.get("id") == request_id, timeout)
+        if response is None:
+            reason = "exited" if self._exited else "timed out"
+            self.stop(graceful=False)
+            raise PowerShellError(f"PowerShell host {reason} while running script")
+
+        output = response.get("output")
+        if output is None:
+            output = []
+        elif not isinstance(output, list):
+            output = [output]
+        return PowerShellResult(
+            ok=bool(response.get("ok")), output=output, error=response.get("error")
+        )
+
+    def ping(self, timeout: float = PING_TIMEOUT) -> bool:
+        """Check that the host answers a trivial script"""
+        try:
+            return self.run("'pong'", timeout=timeout).output == ["pong"]
+        except PowerShellError:
+            return False
+
+    def _read_message(self, matches, timeout: float) -> Optional[Dict[str, Any]]:
+        """Return the next JSON message accepted by matches, skipping stray output"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            if line is None:  # EOF: the host exited
+                self._exited = True
+                return None
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                logger.debug(f"Ignoring PowerShell output: {line.rstrip()}")
+                continue
+            if isinstance(message, dict) and matches(message):
+                return message
+
+    @staticmethod
+    def _read_lines(stream, lines: "queue.Queue[Optional[str]]") -> None:
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+
+
+class PowerShellPool:
+    """A fixed number of PowerShell hosts shared by all tool calls"""
+
+    def __init__(
+        self,
+        command: Optional[List[str]] = None,
+        size: int = 2,
+        timeout: float = DEFAULT_TIMEOUT,
+        startup_timeout: float = STARTUP_TIMEOUT,
+    ):
+        """
+        Initialize the pool; hosts are started lazily
+
+        Args:
+            command: Host command line (default: default_command())
+            size: Number of hosts, i.e. scripts that can run at the same time
+            timeout: Default per-script timeout in seconds
+            startup_timeout: Seconds to wait for a host to become ready
+        """
+        self.command = command or default_command()
+        self.size = size
+        self.timeout = timeout
+        self.workers = [
+            PowerShellWorker(self.command, startup_timeout) for _ in range(size)
+        ]
+        self._idle: "queue.Queue[PowerShellWorker]" = queue.Queue()
+        for worker in self.workers:
+            self._idle.put(worker)
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+
+    def run(
+        self,
+        script: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> PowerShellResult:
+        """
+        Run a script on the next free host
+
+        Host failures are reported as an unsuccessful result rather than raised,
+        so tools handle them like any other PowerShell error. Scripts are never
+        retried because most of them change state.
+
+        Under a deadline, waiting for a free host and running the script
+        together take no longer than the time left.
+        """
+        timeout = timeout or self.timeout
+        limit = call_deadline.get()
+        if limit is None:
+            worker = self._idle.get()
+        else:
+            remaining = limit - time.monotonic()
+            try:
+                worker = self._idle.get(timeout=max(remaining, 0))
+            except queue.Empty:
+                return PowerShellResult(
+                    ok=False, error="Timed out waiting for a free PowerShell host"
+                )
+            timeout = min(timeout, max(limit - time.monotonic(), 0.01))
+        try:
+            return worker.run(script, params, timeout)
+        except PowerShellError as e:
+            logger.error(str(e))
+            return PowerShellResult(ok=False, error=str(e))
+        finally:
+            self._idle.put(worker)
+
+    def health_check(self) -> Dict[str, Any]:
+        """
+        Ping every idle host and restart the ones that do not answer
+
+        Hosts busy running a script are skipped. Hosts that were never started
+        are left alone so an idle server does not spawn PowerShell.
+        """
+        checked, restarted = 0, 0
+        for _ in range(self.size):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if worker.starts == 0:
+                    continue
+                checked += 1
+                if worker.alive and worker.ping():
+                    continue
+                logger.warning("PowerShell host failed its health check")
+                try:
+                    worker.start()
+                    restarted += 1
+                except PowerShellError as e:
+                    logger.error(str(e))
+            finally:
+                self._idle.put(worker)
+        return {"checked": checked, "restarted": restarted, **self.status()}
+
+    def status(self) -> Dict[str, Any]:
+        """Summary of the pool for logging and diagnostics"""
+        return {
+            "size": self.size,
+            "alive": sum(worker.alive for worker in self.workers),
+            "starts": sum(worker.starts for worker in self.workers),
+        }
+
+    def start_health_checks(self, interval: float = 30.0) -> None:
+        """Run health_check() every interval seconds on a daemon thread"""
+        if self._health_thread is not None and self._health_thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                self.health_check()
+
+        self._health_thread = threading.Thread(
+            target=loop, name="powershell-health", daemon=True
+        )
+        self._health_thread.start()
+
+    def shutdown(self) -> None:
+        """Stop health checks and every host"""
+        self._stop.set()
+        for worker in self.workers:
+            worker.stop()
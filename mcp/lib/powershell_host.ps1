@@ -0,0 +1,51 @@
+# powershell_host.ps1
+#
+# Long-lived PowerShell host for the AutoFortify MCP server.
+#
+# Protocol (one JSON object per line, UTF-8):
+#   startup:  host writes  {"ready": true, "pid": <pid>}
+#   request:  server sends {"id": <int>, "script": "<script block>", "params": {...}}
+#   response: host writes  {"id": <int>, "ok": <bool>, "output": [...], "error": <string|null>}
+#
+# Parameters are splatted into the script block instead of being pasted into
+# the script text, so values never need quoting. Anything else a cmdlet writes
+# to stdout is ignored by the server because it is not a response line.
+
+$ErrorActionPreference = 'Stop'
+$ProgressPreference = 'SilentlyContinue'
+[Console]::InputEncoding = New-Object System.Text.UTF8Encoding $false
+[Console]::OutputEncoding = New-Object System.Text.UTF8Encoding $false
+
+# Loaded once for the lifetime of the host; missing on machines without RSAT
+Import-Module ActiveDirectory -ErrorAction SilentlyContinue
+
+function Send-Response($Response) {
+    [Console]::Out.WriteLine(($Response | ConvertTo-Json -Compress -Depth 6))
+    [Console]::Out.Flush()
+}
+
+Send-Response @{ ready = $true; pid = $PID }
+
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($null -eq $line) { break }
+    if (-not $line.Trim()) { continue }
+
+    $request = $line | ConvertFrom-Json
+    $response = @{ id = $request.id; ok = $true; output = @(); error = $null }
+    try {
+        $parameters = @{}
+        if ($request.params) {
+            foreach ($property in $request.params.PSObject.Properties) {
+                $parameters[$property.Name] = $property.Value
+            }
+        }
+        $block = [ScriptBlock]::Create($request.script)
+        $response.output = @(& $block @parameters)
+    }
+    catch {
+        $response.ok = $false
+        $response.error = $_.Exception.Message
+    }
+    Send-Response $response
+}
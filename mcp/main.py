@@ -1,73 +1,177 @@
 from fastmcp.server import FastMCP
-from typing import Annotated, Literal
+from typing import Annotated, List, Literal, Optional
 from pydantic import Field
+import atexit
 import os
-import subprocess
 import json
-import re
+import time
+
+from lib.ad_changes import ADOperation, PlanStore, apply_plan, plan_operations
+from lib.delegation import DelegationError, DelegationInventory
+from lib.directory import create_directory
+from lib.executor import ToolExecutor
+from lib.exposure import BROAD_RANGE_THRESHOLD, PORT_PROTOCOLS, ExposureAnalyzer
+from lib.firewall import (
+    ALL_PROFILES,
+    RULE_FIELDS,
+    FirewallError,
+    FirewallRule,
+    RuleSnapshot,
+    create_backend,
+)
+from lib.firewall_changes import (
+    MAX_CHANGES,
+    FirewallChange,
+    apply_changes,
+    plan_changes,
+    record_changes,
+)
+from lib.job_descriptions import JobDescriptionError, JobDescriptionStore
+from lib.powershell import PowerShellPool, PowerShellResult
 
 
 SIMULATE_MODIFICATIONS = False
 
 mcp = FastMCP()
 
+# Long-lived PowerShell hosts shared by the firewall and AD tools. Hosts are
+# started on first use, so importing this module never spawns PowerShell.
+powershell = PowerShellPool(size=int(os.getenv("POWERSHELL_POOL_SIZE", "2")))
+atexit.register(powershell.shutdown)
+
+# Tool bodies run on a bounded thread pool so a slow call does not stall other
+# clients. TOOL_CONCURRENCY calls run at once; each may take TOOL_TIMEOUT
+# seconds unless its decorator allows longer.
+tools = ToolExecutor(
+    max_workers=int(os.getenv("TOOL_CONCURRENCY", "8")),
+    timeout=float(os.getenv("TOOL_TIMEOUT", "120")),
+)
+atexit.register(tools.shutdown)
+
+# Active Directory backend, selected with AD_BACKEND ("powershell" or "ldap")
+directory = create_directory(powershell)
+
+# AD change plans waiting for apply_ad_changes
+ad_plans = PlanStore()
+
+# Every account with constrained delegation, from one paged directory query
+delegations = DelegationInventory(directory)
+
+# Firewall rule source, selected with FIREWALL_BACKEND ("powershell" or "netsh"),
+# and the in-memory copy the tools read from. The snapshot is reloaded only
+# when the rule store changes; changes made by the tools are applied in place.
+firewall = create_backend(powershell)
+firewall_rules = RuleSnapshot(firewall)
+
+# Job descriptions, parsed once and again only when the file changes
+job_descriptions = JobDescriptionStore(
+    os.getenv(
+        "JOB_DESCRIPTIONS_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "context", "job_descriptions.txt"),
+    )
+)
+
+# Rule fields list_inbound_firewall_rules returns unless asked for others
+DEFAULT_RULE_FIELDS = ("name", "group", "local_port", "protocol")
+
 
 @mcp.tool(
     name="list_inbound_firewall_rules",
-    description="Lists all inbound firewall rules that are enabled and allow traffic. Returns a JSON array of objects with properties: 'Rule Name', 'Grouping', 'LocalPort', and 'Protocol'.",
+    description="Lists enabled firewall rules; by default, inbound rules that allow traffic. Optional filters narrow the list: port (a number such as '3389' or a range such as '5000-5100'), protocol, program, profile, group, name, direction and action. Rules for any port or any protocol match port and protocol filters. Returns a JSON object with 'total' (number of matching rules), 'offset', 'count' and 'rules', a page of rule objects holding the requested 'fields' (default: name, group, local_port, protocol).",
     annotations={"title": "List Inbound Firewall Rules"},
 )
-def list_inbound_firewall_rules() -> str:
+@tools.offload()
+def list_inbound_firewall_rules(
+    port: Annotated[
+        Optional[str],
+        Field(description="Local port or port range, e.g. '3389' or '5000-5100'"),
+    ] = None,
+    protocol: Annotated[
+        Optional[Literal["TCP", "UDP"]],
+        Field(description="Protocol ('TCP' or 'UDP')"),
+    ] = None,
+    program: Annotated[
+        Optional[str],
+        Field(description="Part of the program path, e.g. 'svchost.exe'"),
+    ] = None,
+    profile: Annotated[
+        Optional[Literal["Domain", "Private", "Public"]],
+        Field(description="Profile the rule must apply to"),
+    ] = None,
+    group: Annotated[
+        Optional[str], Field(description="Part of the rule group name")
+    ] = None,
+    name: Annotated[Optional[str], Field(description="Part of the rule name")] = None,
+    direction: Annotated[
+        Literal["In", "Out"], Field(description="Rule direction ('In' or 'Out')")
+    ] = "In",
+    action: Annotated[
+        Literal["Allow", "Block"],
+        Field(description="Rule action ('Allow' or 'Block')"),
+    ] = "Allow",
+    fields: Annotated[
+        Optional[List[str]],
+        Field(description=f"Rule fields to return, any of: {', '.join(RULE_FIELDS)}"),
+    ] = None,
+    limit: Annotated[
+        int, Field(description="Maximum number of rules to return", ge=1, le=1000)
+    ] = 100,
+    offset: Annotated[
+        int, Field(description="Number of matching rules to skip", ge=0)
+    ] = 0,
+) -> str:
+    fields = fields or list(DEFAULT_RULE_FIELDS)
+    unknown = [field for field in fields if field not in RULE_FIELDS]
+    if unknown:
+        return (
+            f"Failed to list firewall rules. Unknown fields: {', '.join(unknown)}. "
+            f"Use any of: {', '.join(RULE_FIELDS)}"
+        )
     try:
-        out_bytes = subprocess.check_output(
-            "netsh advfirewall firewall show rule name=all", shell=True
+        rules = firewall_rules.index().query(
+            port=port,
+            protocol=protocol,
+            program=program,
+            profile=profile,
+            group=group,
+            name=name,
+            direction=direction,
+            action=action,
+            enabled=True,
         )
-        out_str = out_bytes.decode("utf-8").replace("Ok.", "")
-        temp = [k for x in re.split(r"\n\s*\n", out_str) if (k := x.strip())]
-        rule_lines = [
-            {
-                z[0].strip(): z[1].strip()
-                for k in x.split("\n")
-                if (y := k.strip())
-                and not y.startswith("------")
-                and len(z := y.split(": ", 1)) == 2
-            }
-            for x in temp
-        ]
-
-        filtered_rules = [
-            rule
-            for rule in rule_lines
-            if rule.get("Enabled", "") == "Yes"
-            and rule.get("Direction", "") == "In"
-            and rule.get("Action", "") == "Allow"
-        ]
-
-        filtered_rules = [
-            rule
-            for rule in filtered_rules
-            if not (
-                (rname := rule.get("Rule Name", "")).startswith("@")
-                or rname.startswith("{")
-                or (rgroup := rule.get("Grouping", "")).startswith("@")
-                or rgroup.startswith("{")
-            )
-        ]
-
-        target_properties = ["Rule Name", "Grouping", "LocalPort", "Protocol"]
-        final_rules = [
-            {k: v for k, v in rule.items() if k in target_properties}
-            for rule in filtered_rules
-        ]
-        return json.dumps(final_rules)
+    except ValueError as e:
+        return f"Failed to list firewall rules. {e}"
     except Exception as e:
         return f"Failed to list inbound firewall rules."
 
+    # Skip rules whose names are unresolved resource strings or GUIDs
+    rules = [
+        rule
+        for rule in rules
+        if not (
+            rule.name.startswith("@")
+            or rule.name.startswith("{")
+            or rule.group.startswith("@")
+            or rule.group.startswith("{")
+        )
+    ]
+    page = rules[offset : offset + limit]
+    return json.dumps(
+        {
+            "total": len(rules),
+            "offset": offset,
+            "count": len(page),
+            "rules": [rule.project(fields) for rule in page],
+        }
+    )
+
+
 @mcp.tool(
     name="create_firewall_rule",
     description="Creates and enables a firewall rule with the specified parameters.",
     annotations={"title": "Create Firewall Rule"},
 )
+@tools.offload()
 def create_firewall_rule(
     rule_name: Annotated[str, Field(description="Name of the firewall rule")],
     display_name: Annotated[str, Field(description="Display name for the rule")],
@@ -95,15 +199,34 @@ def create_firewall_rule(
         f"Direction: {direction}"
     )
     if SIMULATE_MODIFICATIONS:
-        res = 0
+        res = PowerShellResult(ok=True)
     else:
-        # DISCLAIMER: Yes, we know what command injection is. Don't do this. This was hacked together quickly for demonstration purposes.
-        res = os.system(
-            "powershell.exe -Command "
-            f"New-NetFirewallRule -Name '{rule_name}' -DisplayName '{display_name}' "
-            f"-Action {action} -LocalPort {local_port} -Protocol {protocol} -Direction {direction} -Enabled True"
+        res = powershell.run(
+            "param($Name, $DisplayName, $Action, $LocalPort, $Protocol, $Direction) "
+            "New-NetFirewallRule -Name $Name -DisplayName $DisplayName -Action $Action "
+            "-LocalPort $LocalPort -Protocol $Protocol -Direction $Direction -Enabled True "
+            "| Out-Null",
+            {
+                "Name": rule_name,
+                "DisplayName": display_name,
+                "Action": action,
+                "LocalPort": local_port,
+                "Protocol": protocol,
+                "Direction": direction,
+            },
+        )
+    if res.ok:
+        firewall_rules.add(
+            FirewallRule(
+                name=display_name,
+                enabled=True,
+                direction="In" if direction == "Inbound" else "Out",
+                action=action,
+                protocol=protocol,
+                local_port=str(local_port),
+                rule_id=rule_name,
+            )
         )
-    if res == 0:
         return f"Firewall rule '{rule_name}' created successfully."
     else:
         return f"Failed to create firewall rule '{rule_name}'. Please check the parameters and try again."
@@ -114,6 +237,7 @@ def create_firewall_rule(
     description="Disables a firewall rule with the specified name.",
     annotations={"title": "Disable Firewall Rule"},
 )
+@tools.offload()
 def disable_firewall_rule(
     rule_name: Annotated[
         str, Field(description="Name of the firewall rule to disable")
@@ -121,33 +245,167 @@ def disable_firewall_rule(
 ) -> str:
     print(f"Disabling firewall rule with name: {rule_name}")
     if SIMULATE_MODIFICATIONS:
-        res = 0
+        res = PowerShellResult(ok=True)
     else:
-        # DISCLAIMER: Yes, we know what command injection is. Don't do this. This was hacked together quickly for demonstration purposes.
-        res = os.system(
-            "powershell.exe -Command "
-            f"Set-NetFirewallRule -Name '{rule_name}' -Enabled False"
+        res = powershell.run(
+            "param($Name) Set-NetFirewallRule -Name $Name -Enabled False",
+            {"Name": rule_name},
         )
-    if res == 0:
+    if res.ok:
+        firewall_rules.update(rule_name, enabled=False)
         return f"Firewall rule '{rule_name}' disabled successfully."
     else:
         return f"Failed to disable firewall rule '{rule_name}'. Please check the parameters and try again."
 
 
+@mcp.tool(
+    name="apply_firewall_changes",
+    description="Creates, disables and deletes firewall rules as one batch. All changes are validated before any is made, then applied in order in a single PowerShell session. If a change fails, the changes already made are rolled back, so the batch is applied completely or not at all. Set dry_run to only validate the batch and see each change's before/after rule state. Returns a JSON object with 'applied' (true when every change was made), 'dry_run' and 'results', one per change with 'operation', 'rule_name', 'status' ('planned', 'applied', 'rolled_back', 'rollback_failed', 'failed', 'invalid' or 'skipped'), 'error', 'before' and 'after'.",
+    annotations={"title": "Apply Firewall Changes"},
+)
+@tools.offload(timeout=300)
+def apply_firewall_changes(
+    changes: Annotated[
+        List[FirewallChange],
+        Field(
+            description="Changes to apply, in order",
+            min_length=1,
+            max_length=MAX_CHANGES,
+        ),
+    ],
+    dry_run: Annotated[
+        bool,
+        Field(description="Only validate the changes and return the planned diff"),
+    ] = False,
+) -> str:
+    print(f"Applying {len(changes)} firewall changes (dry run: {dry_run})")
+    results = plan_changes(firewall_rules.rules(), changes)
+    valid = all(result.status == "planned" for result in results)
+    applied = False
+    if dry_run:
+        pass  # The planned results are the diff
+    elif not valid:
+        # Nothing is changed unless every change is valid
+        for result in results:
+            if result.status == "planned":
+                result.status = "skipped"
+    elif SIMULATE_MODIFICATIONS:
+        for result in results:
+            result.status = "applied"
+        applied = True
+    else:
+        results = apply_changes(powershell, changes, results)
+        applied = all(result.status == "applied" for result in results)
+        if not applied:
+            # A failed rollback or host error can leave the rules partially changed
+            firewall_rules.invalidate()
+    if applied:
+        record_changes(firewall_rules, changes)
+    return json.dumps(
+        {
+            "applied": applied,
+            "dry_run": dry_run,
+            "results": [result.to_dict() for result in results],
+        }
+    )
+
+
+@mcp.tool(
+    name="analyze_firewall_exposure",
+    description="Analyzes the enabled inbound firewall rules and returns findings without changing anything. Returns a JSON object with 'summary' (number of findings of each kind) and 'findings', objects with 'kind', 'detail' and, where relevant, 'rules', 'protocol', 'profiles' and 'ports'. Kinds: 'exposure' (local ports open to any program per protocol, after block rules, listing the profiles with the same open ports), 'shadowed' (allow rules that block rules fully override), 'redundant' (allow rules whose ports broader allow rules already open) and 'broad' (allow rules opening every protocol, every port or more than broad_threshold ports).",
+    annotations={"title": "Analyze Firewall Exposure"},
+)
+@tools.offload()
+def analyze_firewall_exposure(
+    profile: Annotated[
+        Optional[Literal["Domain", "Private", "Public"]],
+        Field(description="Only analyze this profile"),
+    ] = None,
+    protocol: Annotated[
+        Optional[Literal["TCP", "UDP"]],
+        Field(description="Only analyze this protocol"),
+    ] = None,
+    kinds: Annotated[
+        Optional[List[Literal["exposure", "shadowed", "redundant", "broad"]]],
+        Field(description="Only return findings of these kinds"),
+    ] = None,
+    broad_threshold: Annotated[
+        int,
+        Field(description="Port count above which a rule is reported as broad", ge=1),
+    ] = BROAD_RANGE_THRESHOLD,
+    limit: Annotated[
+        int, Field(description="Maximum number of findings to return", ge=1)
+    ] = 100,
+) -> str:
+    try:
+        analyzer = ExposureAnalyzer(
+            firewall_rules.rules(),
+            protocols=(protocol,) if protocol else PORT_PROTOCOLS,
+            profiles=(profile,) if profile else ALL_PROFILES,
+            broad_threshold=broad_threshold,
+        )
+        findings = [
+            finding
+            for finding in analyzer.analyze()
+            if kinds is None or finding.kind in kinds
+        ]
+    except FirewallError as e:
+        return f"Failed to analyze firewall exposure. Error: {e}"
+
+    summary = {}
+    for finding in findings:
+        summary[finding.kind] = summary.get(finding.kind, 0) + 1
+    return json.dumps(
+        {
+            "summary": summary,
+            "findings": [finding.to_dict() for finding in findings[:limit]],
+        }
+    )
+
+
 @mcp.tool(
     name="get_job_descriptions",
-    description="Returns a description of the available tools and their usage.",
+    description="Returns the whole job descriptions file. Use lookup_job_descriptions to get only the users being remediated.",
     annotations={"title": "Get Job Descriptions"},
 )
+@tools.offload()
 def get_job_descriptions() -> str:
     try:
-        with open("context/job_descriptions.txt", "r") as file:
-            descriptions = file.read()
+        return job_descriptions.text()
+    except JobDescriptionError:
+        return "Failed to retrieve job descriptions."
 
-        return descriptions
-    except Exception:
+
+@mcp.tool(
+    name="lookup_job_descriptions",
+    description="Returns the job descriptions of specific users, to decide whether they need the access being remediated. Prefer this over get_job_descriptions. Usernames may include a domain (e.g. 'CORP\\jdoe' or 'JDOE@CORP.LOCAL'). Optionally also returns everyone whose role contains one of the given roles. Returns a JSON object with 'descriptions' (objects with 'username', 'name', 'role' and 'description') and 'missing' (usernames without a description).",
+    annotations={"title": "Lookup Job Descriptions"},
+)
+@tools.offload()
+def lookup_job_descriptions(
+    usernames: Annotated[
+        List[str], Field(description="Usernames to look up, e.g. ['jdoe', 'asmith']")
+    ],
+    roles: Annotated[
+        Optional[List[str]],
+        Field(description="Also return users whose role contains one of these, e.g. ['Database']"),
+    ] = None,
+) -> str:
+    try:
+        index = job_descriptions.index()
+    except JobDescriptionError:
         return "Failed to retrieve job descriptions."
 
+    found, missing = index.lookup(usernames)
+    for role in roles or ():
+        found.extend(entry for entry in index.with_role(role) if entry not in found)
+    return json.dumps(
+        {
+            "descriptions": [entry.to_dict() for entry in found],
+            "missing": missing,
+        }
+    )
+
 
 """
 ## ACTIVE DIRECTORY TOOLS
@@ -159,6 +417,7 @@ def get_job_descriptions() -> str:
     description="Lists the 'AllowedToDelegate' permissions for an Active Directory account.",
     annotations={"title": "List Constrained Delegation"},
 )
+@tools.offload()
 def list_constrained_delegation(
     identity: Annotated[
         str, Field(description="Account Identity (e.g., username or samAccountName)")
@@ -166,43 +425,58 @@ def list_constrained_delegation(
 ) -> str:
     print(f"Listing constrained delegation for account: {identity}")
 
-    try:
-        # Use subprocess to capture the output
-        # DISCLAIMER: Yes, we know what command injection is. Don't do this. This was hacked together quickly for demonstration purposes.
-        result = subprocess.run(
-            [
-                "powershell.exe",
-                "-Command",
-                f"Get-ADUser -Identity '{identity}' -Properties msDS-AllowedToDelegateTo | "
-                "Select-Object -ExpandProperty msDS-AllowedToDelegateTo",
-            ],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
+    result = directory.list_delegation(identity)
+    if not result.ok:
+        error_msg = result.error or "Unknown error"
+        return f"Failed to list constrained delegation for account '{identity}'. Error: {error_msg}"
 
-        # Parse the output
-        output = result.stdout.strip()
-        if output:
-            # Split by newlines and filter out empty lines
-            spns = [line.strip() for line in output.split("\n") if line.strip()]
-            if spns:
-                spn_list = "\n".join([f"  - {spn}" for spn in spns])
-                return (
-                    f"Constrained delegation SPNs for account '{identity}':\n{spn_list}"
-                )
-            else:
-                return f"No constrained delegation permissions found for account '{identity}'."
-        else:
-            return (
-                f"No constrained delegation permissions found for account '{identity}'."
-            )
+    # Filter out empty values
+    spns = [str(spn).strip() for spn in result.output if str(spn).strip()]
+    if spns:
+        spn_list = "\n".join([f"  - {spn}" for spn in spns])
+        return f"Constrained delegation SPNs for account '{identity}':\n{spn_list}"
+    else:
+        return f"No constrained delegation permissions found for account '{identity}'."
 
-    except subprocess.CalledProcessError as e:
-        error_msg = e.stderr.strip() if e.stderr else "Unknown error"
-        return f"Failed to list constrained delegation for account '{identity}'. Error: {error_msg}"
-    except Exception as e:
-        return f"Failed to list constrained delegation for account '{identity}'. Error: {str(e)}"
+
+@mcp.tool(
+    name="list_all_constrained_delegation",
+    description="Lists every user and computer account with constrained delegation ('AllowedToDelegate' SPNs) from one directory query. Results are cached for a few minutes; set refresh to query the directory again. Optional filters: account (part of the account name) and spn (part of a target SPN, e.g. 'cifs/' or a host name). Returns a JSON object with 'total' (matching accounts), 'offset', 'count', 'age_seconds' (age of the cached data) and 'delegations', objects with 'account', 'type', 'spns' and 'protocol_transition' (true when the account may delegate without the user authenticating with Kerberos).",
+    annotations={"title": "List All Constrained Delegation"},
+)
+@tools.offload(timeout=300)
+def list_all_constrained_delegation(
+    account: Annotated[
+        Optional[str], Field(description="Part of the account name")
+    ] = None,
+    spn: Annotated[
+        Optional[str], Field(description="Part of a target SPN, e.g. 'cifs/'")
+    ] = None,
+    refresh: Annotated[
+        bool, Field(description="Query the directory instead of using cached data")
+    ] = False,
+    limit: Annotated[
+        int, Field(description="Maximum number of accounts to return", ge=1, le=1000)
+    ] = 200,
+    offset: Annotated[
+        int, Field(description="Number of matching accounts to skip", ge=0)
+    ] = 0,
+) -> str:
+    try:
+        index = delegations.index(refresh=refresh)
+    except DelegationError as e:
+        return f"Failed to list constrained delegation. Error: {e}"
+    matches = index.search(account=account, spn=spn)
+    page = matches[offset : offset + limit]
+    return json.dumps(
+        {
+            "total": len(matches),
+            "offset": offset,
+            "count": len(page),
+            "age_seconds": round(time.time() - index.loaded_at),
+            "delegations": [delegation.to_dict() for delegation in page],
+        }
+    )
 
 
 @mcp.tool(
@@ -210,6 +484,7 @@ def list_constrained_delegation(
     description="Removes the 'AllowedToDelegate' permission from an Active Directory account.",
     annotations={"title": "Add AD Group Member"},
 )
+@tools.offload()
 def remove_constrained_delegation(
     identity: Annotated[
         str, Field(description="Account Identity (e.g., username or samAccountName)")
@@ -227,24 +502,86 @@ def remove_constrained_delegation(
         f"Target: {target}"
     )
     if SIMULATE_MODIFICATIONS:
-        res = 0
+        res = PowerShellResult(ok=True)
     else:
-        # DISCLAIMER: Yes, we know what command injection is. Don't do this. This was hacked together quickly for demonstration purposes.
-        res = os.system(
-            "powershell.exe -Command "
-            f"Set-ADUser -Identity '{identity}' -Remove @{{'msDS-AllowedToDelegateTo'='{target}'}}"
-        )
-    if res == 0:
+        res = directory.remove_delegation(identity, target)
+    if res.ok:
+        delegations.remove_spn(identity, target)
         return f"Removed constrained delegation for account '{identity}' targeting '{target}' successfully."
     else:
         return f"Failed to remove constrained delegation for account '{identity}' targeting '{target}'. Please check the parameters and try again."
 
 
+@mcp.tool(
+    name="plan_ad_changes",
+    description="Checks a batch of Active Directory changes without making them: adding or removing group members, disabling or enabling accounts, and adding or removing constrained delegation SPNs. Every operation is validated up front: it must not repeat or contradict another operation and the objects it names must exist. Operations that would not change anything are marked 'unchanged'. Returns a JSON object with 'plan_id', 'valid', 'summary' (operations per status) and 'results', one per operation with its 'status' ('planned', 'unchanged' or 'invalid') and 'error'. Pass the plan_id of a valid plan to apply_ad_changes to make the changes.",
+    annotations={"title": "Plan AD Changes"},
+)
+@tools.offload(timeout=300)
+def plan_ad_changes(
+    operations: Annotated[
+        List[ADOperation],
+        Field(description="Operations to apply, in order", min_length=1),
+    ],
+) -> str:
+    print(f"Planning {len(operations)} AD operations")
+    plan = plan_operations(None if SIMULATE_MODIFICATIONS else directory, operations)
+    if plan.valid:
+        ad_plans.add(plan)
+    return json.dumps(
+        {
+            "plan_id": plan.plan_id if plan.valid else None,
+            "valid": plan.valid,
+            "summary": plan.summary(),
+            "results": [result.to_dict() for result in plan.results],
+        }
+    )
+
+
+@mcp.tool(
+    name="apply_ad_changes",
+    description="Applies a plan created by plan_ad_changes. Operations on the same object run in order and independent operations run in parallel. A plan can be applied once. Returns a JSON object with 'plan_id', 'summary' (operations per status), 'results', one per operation with its 'status' ('applied', 'failed' or 'unchanged') and 'error', and 'undo', the operations that reverse every applied change, which can be passed to plan_ad_changes.",
+    annotations={"title": "Apply AD Changes"},
+)
+@tools.offload(timeout=600)
+def apply_ad_changes(
+    plan_id: Annotated[str, Field(description="ID returned by plan_ad_changes")],
+    parallelism: Annotated[
+        int,
+        Field(
+            description="Maximum number of PowerShell requests running at the same time",
+            ge=1,
+            le=16,
+        ),
+    ] = powershell.size,
+) -> str:
+    plan = ad_plans.pop(plan_id)
+    if plan is None:
+        return f"Plan '{plan_id}' not found. Plans can only be applied once; create a new one with plan_ad_changes."
+    print(f"Applying AD change plan {plan_id}")
+    undo = apply_plan(None if SIMULATE_MODIFICATIONS else directory, plan, parallelism)
+    if any(
+        result.status == "applied"
+        and result.operation.operation.endswith("_constrained_delegation")
+        for result in plan.results
+    ):
+        delegations.invalidate()
+    return json.dumps(
+        {
+            "plan_id": plan_id,
+            "summary": plan.summary(),
+            "results": [result.to_dict() for result in plan.results],
+            "undo": [operation.model_dump(exclude_none=True) for operation in undo],
+        }
+    )
+
+
 @mcp.tool(
     name="add_ad_group_member",
     description="Adds a member to an Active Directory group.",
     annotations={"title": "Add AD Group Member"},
 )
+@tools.offload()
 def add_ad_group_member(
     identity: Annotated[str, Field(description="Group Identity (e.g., group name)")],
     member: Annotated[
@@ -257,14 +594,10 @@ def add_ad_group_member(
         f"Member: {member}"
     )
     if SIMULATE_MODIFICATIONS:
-        res = 0
+        res = PowerShellResult(ok=True)
     else:
-        # DISCLAIMER: Yes, we know what command injection is. Don't do this. This was hacked together quickly for demonstration purposes.
-        res = os.system(
-            "powershell.exe -Command "
-            f"Add-ADGroupMember -Identity '{identity}' -Members '{member}'"
-        )
-    if res == 0:
+        res = directory.add_group_member(identity, member)
+    if res.ok:
         return f"Added member '{member}' to group '{identity}' successfully."
     else:
         return f"Failed to add member '{member}' to group '{identity}'. Please check the parameters and try again."
@@ -275,6 +608,7 @@ def add_ad_group_member(
     description="Removes a member from an Active Directory group.",
     annotations={"title": "Remove AD Group Member"},
 )
+@tools.offload()
 def remove_ad_group_member(
     identity: Annotated[str, Field(description="Group Identity (e.g., group name)")],
     member: Annotated[
@@ -287,14 +621,10 @@ def remove_ad_group_member(
         f"Member: {member}"
     )
     if SIMULATE_MODIFICATIONS:
-        res = 0
+        res = PowerShellResult(ok=True)
     else:
-        # DISCLAIMER: Yes, we know what command injection is. Don't do this. This was hacked together quickly for demonstration purposes.
-        res = os.system(
-            "powershell.exe -Command "
-            f"Remove-ADGroupMember -Identity '{identity}' -Members '{member}' -Confirm:$false"
-        )
-    if res == 0:
+        res = directory.remove_group_member(identity, member)
+    if res.ok:
         return f"Removed member '{member}' from group '{identity}' successfully."
     else:
         return f"Failed to remove member '{member}' from group '{identity}'. Please check the parameters and try again."
@@ -305,6 +635,7 @@ def remove_ad_group_member(
     description="Creates a new Active Directory user.",
     annotations={"title": "New AD User"},
 )
+@tools.offload()
 def new_ad_user(
     name: Annotated[str, Field(description="User's full name (e.g., 'John Smith')")],
     sam_account_name: Annotated[
@@ -330,18 +661,11 @@ def new_ad_user(
         f"Enabled: {enabled}"
     )
     if SIMULATE_MODIFICATIONS:
-        res = 0
+        res = PowerShellResult(ok=True)
     else:
         # Note: Passing passwords directly can be a security risk.
-        # This command sets the password and requires the user to change it at next logon.
-        pw_command = f'$Password = ConvertTo-SecureString -String \\"{password}\\" -AsPlainText -Force'
-        command = (
-            f'{pw_command}; New-ADUser -Name "{name}" -SamAccountName "{sam_account_name}" '
-            f"-AccountPassword $Password -Enabled ${str(enabled).lower()} -ChangePasswordAtLogon $true"
-        )
-        # DISCLAIMER: Yes, we know what command injection is. Don't do this. This was hacked together quickly for demonstration purposes.
-        res = os.system(f'powershell.exe -Command "{command}"')
-    if res == 0:
+        res = directory.new_user(name, sam_account_name, password, enabled)
+    if res.ok:
         return f"AD user '{name}' created successfully."
     else:
         return f"Failed to create AD user '{name}'. Please check the parameters and try again."
@@ -352,6 +676,7 @@ def new_ad_user(
     description="Removes an Active Directory user.",
     annotations={"title": "Remove AD User"},
 )
+@tools.offload()
 def remove_ad_user(
     identity: Annotated[
         str, Field(description="User Identity (e.g., username or distinguished name)")
@@ -359,14 +684,10 @@ def remove_ad_user(
 ) -> str:
     print(f"Removing AD user with identity: {identity}")
     if SIMULATE_MODIFICATIONS:
-        res = 0
+        res = PowerShellResult(ok=True)
     else:
-        # DISCLAIMER: Yes, we know what command injection is. Don't do this. This was hacked together quickly for demonstration purposes.
-        res = os.system(
-            "powershell.exe -Command "
-            f"Remove-ADUser -Identity '{identity}' -Confirm:$false"
-        )
-    if res == 0:
+        res = directory.remove_user(identity)
+    if res.ok:
         return f"Removed user '{identity}' successfully."
     else:
         return f"Failed to remove user '{identity}'. Please check the parameters and try again."
@@ -377,18 +698,16 @@ def remove_ad_user(
     description="Disables an Active Directory account.",
     annotations={"title": "Disable AD Account"},
 )
+@tools.offload()
 def disable_ad_account(
     identity: Annotated[str, Field(description="Account Identity (e.g., username)")],
 ) -> str:
     print(f"Disabling AD account with identity: {identity}")
     if SIMULATE_MODIFICATIONS:
-        res = 0
+        res = PowerShellResult(ok=True)
     else:
-        # DISCLAIMER: Yes, we know what command injection is. Don't do this. This was hacked together quickly for demonstration purposes.
-        res = os.system(
-            "powershell.exe -Command " f"Disable-ADAccount -Identity '{identity}'"
-        )
-    if res == 0:
+        res = directory.disable_account(identity)
+    if res.ok:
         return f"Disabled account '{identity}' successfully."
     else:
         return f"Failed to disable account '{identity}'. Please check the parameters and try again."
@@ -399,18 +718,16 @@ def disable_ad_account(
     description="Enables an Active Directory account.",
     annotations={"title": "Enable AD Account"},
 )
+@tools.offload()
 def enable_ad_account(
     identity: Annotated[str, Field(description="Account Identity (e.g., username)")],
 ) -> str:
     print(f"Enabling AD account with identity: {identity}")
     if SIMULATE_MODIFICATIONS:
-        res = 0
+        res = PowerShellResult(ok=True)
     else:
-        # DISCLAIMER: Yes, we know what command injection is. Don't do this. This was hacked together quickly for demonstration purposes.
-        res = os.system(
-            "powershell.exe -Command " f"Enable-ADAccount -Identity '{identity}'"
-        )
-    if res == 0:
+        res = directory.enable_account(identity)
+    if res.ok:
         return f"Enabled account '{identity}' successfully."
     else:
         return f"Failed to enable account '{identity}'. Please check the parameters and try again."
@@ -421,6 +738,7 @@ def enable_ad_account(
     description="Resets the password for an Active Directory user account.",
     annotations={"title": "Reset AD Account Password"},
 )
+@tools.offload()
 def set_ad_account_password(
     identity: Annotated[str, Field(description="Account Identity (e.g., username)")],
     new_password: Annotated[
@@ -429,16 +747,10 @@ def set_ad_account_password(
 ) -> str:
     print(f"Resetting password for AD account: {identity}")
     if SIMULATE_MODIFICATIONS:
-        res = 0
+        res = PowerShellResult(ok=True)
     else:
-        pw_command = f'$Password = ConvertTo-SecureString -String \\"{new_password}\\" -AsPlainText -Force'
-        command = (
-            f'{pw_command}; Set-ADAccountPassword -Identity "{identity}" '
-            f"-NewPassword $Password -Reset:$true"
-        )
-        # DISCLAIMER: Yes, we know what command injection is. Don't do this. This was hacked together quickly for demonstration purposes.
-        res = os.system(f'powershell.exe -Command "{command}"')
-    if res == 0:
+        res = directory.set_password(identity, new_password)
+    if res.ok:
         return f"Password for account '{identity}' has been reset successfully."
     else:
         return f"Failed to reset password for account '{identity}'. Please check the parameters and try again."
@@ -449,6 +761,7 @@ def set_ad_account_password(
     description="Creates a new Active Directory group.",
     annotations={"title": "New AD Group"},
 )
+@tools.offload()
 def new_ad_group(
     name: Annotated[str, Field(description="Name for the new group")],
     group_scope: Annotated[
@@ -466,14 +779,10 @@ def new_ad_group(
         f"Category: {group_category}"
     )
     if SIMULATE_MODIFICATIONS:
-        res = 0
+        res = PowerShellResult(ok=True)
     else:
-        # DISCLAIMER: Yes, we know what command injection is. Don't do this. This was hacked together quickly for demonstration purposes.
-        res = os.system(
-            "powershell.exe -Command "
-            f"New-ADGroup -Name '{name}' -GroupScope {group_scope} -GroupCategory {group_category}"
-        )
-    if res == 0:
+        res = directory.new_group(name, group_scope, group_category)
+    if res.ok:
         return f"AD group '{name}' created successfully."
     else:
         return f"Failed to create AD group '{name}'. Please check the parameters and try again."
@@ -484,23 +793,23 @@ def new_ad_group(
     description="Removes an Active Directory group.",
     annotations={"title": "Remove AD Group"},
 )
+@tools.offload()
 def remove_ad_group(
     identity: Annotated[str, Field(description="Group Identity (e.g., group name)")],
 ) -> str:
     print(f"Removing AD group with identity: {identity}")
     if SIMULATE_MODIFICATIONS:
-        res = 0
+        res = PowerShellResult(ok=True)
     else:
-        # DISCLAIMER: Yes, we know what command injection is. Don't do this. This was hacked together quickly for demonstration purposes.
-        res = os.system(
-            "powershell.exe -Command "
-            f"Remove-ADGroup -Identity '{identity}' -Confirm:$false"
-        )
-    if res == 0:
+        res = directory.remove_group(identity)
+    if res.ok:
         return f"Removed group '{identity}' successfully."
     else:
         return f"Failed to remove group '{identity}'. Please check the parameters and try again."
 
 
 if __name__ == "__main__":
+    powershell.start_health_checks(
+        interval=float(os.getenv("POWERSHELL_HEALTH_INTERVAL", "30"))
+    )
     mcp.run(transport="sse", host="127.0.0.1", port=8081, path="/mcp")
@@ -0,0 +1,58 @@
+"""
+Stand-in for powershell_host.ps1 used by the tests on machines without PowerShell.
+
+Speaks the same line-delimited JSON protocol. Scripts are not interpreted;
+a few patterns trigger test behaviour and everything else succeeds:
+
+    'pong'                 -> output ["pong"]
+    Start-Sleep -Seconds N -> sleeps N seconds first
+    throw 'message'        -> ok = false, error = message
+    exit                   -> the host process exits without answering
+
+Every request is appended to the file named by FAKE_POWERSHELL_LOG, if set.
+"""
+import json
+import os
+import re
+import sys
+import time
+
+
+def handle(request):
+    script = request.get("script", "")
+    response = {"id": request.get("id"), "ok": True, "output": [], "error": None}
+
+    sleep = re.search(r"Start-Sleep -Seconds ([\d.]+)", script)
+    if sleep:
+        time.sleep(float(sleep.group(1)))
+    if re.match(r"\s*exit\b", script):
+        sys.exit(1)
+
+    error = re.search(r"throw '([^']*)'", script)
+    if error:
+        response.update(ok=False, error=error.group(1))
+    elif script.strip() == "'pong'":
+        response["output"] = ["pong"]
+    else:
+        response["output"] = [{"pid": os.getpid(), "params": request.get("params")}]
+    return response
+
+
+def main():
+    log_path = os.getenv("FAKE_POWERSHELL_LOG")
+    # Stray host output must be ignored by the server
+    print("WARNING: stand-in PowerShell host", flush=True)
+    print(json.dumps({"ready": True, "pid": os.getpid()}), flush=True)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        if log_path:
+            with open(log_path, "a", encoding="utf-8") as log:
+                log.write(json.dumps(request) + "\n")
+        print(json.dumps(handle(request)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
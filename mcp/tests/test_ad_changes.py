@@ -0,0 +1,250 @@
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+from pydantic import ValidationError
+
+from lib.ad_changes import (
+    APPLY_OPERATIONS_SCRIPT,
+    CHECK_OPERATIONS_SCRIPT,
+    ADOperation,
+    apply_plan,
+    plan_operations,
+)
+from lib.directory import PowerShellDirectory
+from lib.powershell import PowerShellResult
+
+
+def remove_member(user, group="Domain Admins"):
+    return ADOperation(operation="remove_group_member", identity=group, member=user)
+
+
+class FakeDirectory:
+    """
+    Answers the check and apply scripts like a small directory would
+    """
+
+    def __init__(self, missing=(), unchanged=(), failing=()):
+        self.missing = set(missing)
+        self.unchanged = set(unchanged)
+        self.failing = set(failing)
+        self.requests = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def run(self, script, params, timeout=None):
+        operations = params["Operations"]
+        if script == CHECK_OPERATIONS_SCRIPT:
+            return PowerShellResult(
+                ok=True,
+                output=[
+                    {
+                        "exists": self._name(op) not in self.missing,
+                        "changes": self._name(op) not in self.unchanged,
+                        "error": f"Account '{self._name(op)}' not found",
+                    }
+                    for op in operations
+                ],
+            )
+        assert script == APPLY_OPERATIONS_SCRIPT
+        with self._lock:
+            self.requests.append(operations)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.01)
+        with self._lock:
+            self.running -= 1
+        return PowerShellResult(
+            ok=True,
+            output=[
+                {"ok": self._name(op) not in self.failing, "error": "Access denied"}
+                for op in operations
+            ],
+        )
+
+    @staticmethod
+    def _name(operation):
+        return operation["member"] or operation["identity"]
+
+
+class TestPlanOperations:
+    """
+    Test that a batch is validated before anything is changed
+    """
+
+    def test_operations_need_their_arguments(self):
+        with pytest.raises(ValidationError):
+            ADOperation(operation="add_group_member", identity="Domain Admins")
+        with pytest.raises(ValidationError):
+            ADOperation(operation="remove_constrained_delegation", identity="svc")
+
+    def test_repeated_and_contradicting_operations(self):
+        plan = plan_operations(
+            None,
+            [
+                remove_member("alice"),
+                remove_member("ALICE"),
+                ADOperation(
+                    operation="add_group_member",
+                    identity="domain admins",
+                    member="alice",
+                ),
+                remove_member("bob"),
+            ],
+        )
+
+        assert [r.status for r in plan.results] == [
+            "planned",
+            "invalid",
+            "invalid",
+            "planned",
+        ]
+        assert plan.results[1].error == "Repeats operation 1"
+        assert plan.results[2].error == "Contradicts operation 1"
+        assert not plan.valid
+
+    def test_state_is_read_in_one_request(self):
+        directory = FakeDirectory(missing={"ghost"}, unchanged={"carol"})
+        pool = Mock()
+        pool.run.side_effect = directory.run
+
+        plan = plan_operations(
+            PowerShellDirectory(pool),
+            [remove_member("alice"), remove_member("ghost"), remove_member("carol")],
+        )
+
+        assert pool.run.call_count == 1
+        assert [r.status for r in plan.results] == ["planned", "invalid", "unchanged"]
+        assert plan.results[1].error == "Account 'ghost' not found"
+        assert plan.summary() == {"planned": 1, "invalid": 1, "unchanged": 1}
+
+        print("✅ Validated 3 operations in one PowerShell request")
+
+    def test_delegation_targets_can_be_computers(self):
+        directory = FakeDirectory()
+        pool = Mock()
+        pool.run.side_effect = directory.run
+        remove = ADOperation(
+            operation="remove_constrained_delegation",
+            identity="WEB01$",
+            target="HTTP/app01.corp.local",
+        )
+
+        plan = plan_operations(PowerShellDirectory(pool), [remove])
+        apply_plan(PowerShellDirectory(pool), plan)
+
+        assert plan.results[0].status == "applied"
+        # Both scripts look delegating accounts up as users or computers and
+        # change them by DN rather than through the user-only cmdlets
+        for script in (CHECK_OPERATIONS_SCRIPT, APPLY_OPERATIONS_SCRIPT):
+            branch = script[script.index("'*_constrained_delegation'") :]
+            assert "@('Get-ADUser', 'Get-ADComputer')" in branch
+            assert "Set-ADUser" not in script and "Get-ADUser -Identity" not in script
+        assert "switch -Wildcard" in APPLY_OPERATIONS_SCRIPT
+
+        print("✅ Delegation changes resolve computer accounts too")
+
+
+class TestApplyPlan:
+    """
+    Test bounded parallel execution, per-operation results and undo plans
+    """
+
+    def test_parallel_apply(self):
+        users = [f"user{i:03d}" for i in range(200)]
+        directory = FakeDirectory(failing={"user007"})
+        pool = Mock()
+        pool.run.side_effect = directory.run
+        operations = [remove_member(user) for user in users] + [
+            ADOperation(operation="disable_account", identity=user)
+            for user in users[:50]
+        ]
+        plan = plan_operations(None, operations)
+
+        undo = apply_plan(PowerShellDirectory(pool), plan, parallelism=3, chunk_size=20)
+
+        assert directory.max_running <= 3
+        # All 200 membership changes touch one group, so they stay in one request
+        group_requests = [
+            r for r in directory.requests if r[0]["operation"] == "remove_group_member"
+        ]
+        assert len(group_requests) == 1
+        assert [op["member"] for op in group_requests[0]] == users
+        assert len(directory.requests) == 1 + 50 // 20 + 1
+
+        failed = [r for r in plan.results if r.status == "failed"]
+        assert [r.operation for r in failed] == [
+            remove_member("user007"),
+            ADOperation(operation="disable_account", identity="user007"),
+        ]
+        assert failed[0].error == "Access denied"
+
+        # Undo reverses every applied operation, last one first
+        assert len(undo) == 248
+        assert undo[0] == ADOperation(operation="enable_account", identity="user049")
+        assert undo[-1].operation == "add_group_member"
+        assert undo[-1].member == "user000"
+
+        print(f"✅ Applied 250 operations in {len(directory.requests)} requests")
+
+    def test_host_failure_fails_its_operations(self):
+        pool = Mock()
+        pool.run.return_value = PowerShellResult(ok=False, error="PowerShell timed out")
+        plan = plan_operations(None, [remove_member("alice")])
+
+        assert apply_plan(PowerShellDirectory(pool), plan) == []
+        assert plan.results[0].status == "failed"
+        assert plan.results[0].error == "PowerShell timed out"
+
+
+class TestADChangeTools:
+    """
+    Test the plan/apply tool pair
+    """
+
+    def test_plan_then_apply_once(self, monkeypatch):
+        import main
+
+        monkeypatch.setattr(main, "SIMULATE_MODIFICATIONS", True)
+        operations = [
+            remove_member("alice"),
+            ADOperation(operation="disable_account", identity="alice"),
+        ]
+
+        plan = json.loads(asyncio.run(main.plan_ad_changes.fn(operations)))
+        assert plan["valid"] is True
+        assert plan["summary"] == {"planned": 2}
+
+        result = json.loads(asyncio.run(main.apply_ad_changes.fn(plan["plan_id"])))
+        assert [r["status"] for r in result["results"]] == ["applied", "applied"]
+        assert result["undo"] == [
+            {"operation": "enable_account", "identity": "alice"},
+            {
+                "operation": "add_group_member",
+                "identity": "Domain Admins",
+                "member": "alice",
+            },
+        ]
+
+        assert "not found" in asyncio.run(main.apply_ad_changes.fn(plan["plan_id"]))
+
+        print("✅ Plan applied once and returned its undo plan")
+
+    def test_invalid_plan_cannot_be_applied(self, monkeypatch):
+        import main
+
+        monkeypatch.setattr(main, "SIMULATE_MODIFICATIONS", True)
+        plan = json.loads(
+            asyncio.run(
+                main.plan_ad_changes.fn(
+                    [remove_member("alice"), remove_member("alice")]
+                )
+            )
+        )
+
+        assert plan["valid"] is False
+        assert plan["plan_id"] is None
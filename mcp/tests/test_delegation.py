@@ -0,0 +1,151 @@
+import asyncio
+import json
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from lib.delegation import (
+    LIST_DELEGATION_SCRIPT,
+    DelegationError,
+    DelegationInventory,
+    PowerShellDelegationSource,
+)
+from lib.powershell import PowerShellResult
+
+
+def directory_records(count):
+    """Accounts delegating to one of 50 file servers, every tenth via S4U"""
+    records = [
+        {
+            "Account": f"svc{i:05d}",
+            "Class": "user",
+            "UserAccountControl": 0x1000200 if i % 10 == 0 else 0x200,
+            "Spns": [f"cifs/fs{i % 50:02d}.corp.local", f"HOST/fs{i % 50:02d}"],
+        }
+        for i in range(count)
+    ]
+    records.append(
+        {
+            "Account": "WEB01$",
+            "Class": "computer",
+            "UserAccountControl": 0x1000,
+            "Spns": "http/intranet.corp.local",
+        }
+    )
+    return records
+
+
+def inventory(records, **kwargs):
+    pool = Mock()
+    pool.run.return_value = PowerShellResult(ok=True, output=records)
+    return DelegationInventory(PowerShellDelegationSource(pool), **kwargs), pool
+
+
+class TestDelegationInventory:
+    """
+    Test the account and SPN index built from one directory query
+    """
+
+    def test_one_paged_query(self):
+        delegations, pool = inventory(directory_records(5000))
+
+        started = time.perf_counter()
+        index = delegations.index()
+        elapsed = time.perf_counter() - started
+
+        script, params = pool.run.call_args.args
+        assert script == LIST_DELEGATION_SCRIPT
+        assert params == {"PageSize": 1000}
+        assert "-ResultPageSize $PageSize" in script
+        assert len(index.by_account) == 5001
+
+        print(f"✅ Indexed 5001 accounts in {elapsed * 1000:.0f} ms")
+
+    def test_lookups_in_both_directions(self):
+        delegations, _ = inventory(directory_records(500))
+        index = delegations.index()
+
+        svc = index.account("SVC00010")
+        assert svc.spns == ("cifs/fs10.corp.local", "HOST/fs10")
+        assert svc.protocol_transition is True
+        assert index.account("web01$").account_type == "computer"
+        assert index.account("web01$").spns == ("http/intranet.corp.local",)
+
+        assert len(index.accounts_for("CIFS/fs10.corp.local")) == 10
+        assert [d.account for d in index.search(spn="intranet")] == ["WEB01$"]
+        assert [d.account for d in index.search(account="svc0001", spn="fs10")] == [
+            "svc00010"
+        ]
+
+    def test_cached_until_stale_or_refreshed(self):
+        delegations, pool = inventory(directory_records(10), max_age=60)
+
+        for _ in range(100):
+            delegations.index()
+        assert pool.run.call_count == 1
+
+        delegations.index(refresh=True)
+        assert pool.run.call_count == 2
+
+    def test_removed_spns_update_the_index(self):
+        delegations, pool = inventory(directory_records(10))
+        delegations.index()
+
+        delegations.remove_spn("WEB01$", "HTTP/intranet.corp.local")
+        delegations.remove_spn("svc00001", "cifs/fs01.corp.local")
+
+        index = delegations.index()
+        assert index.account("WEB01$") is None
+        assert index.accounts_for("http/intranet.corp.local") == []
+        assert index.account("svc00001").spns == ("HOST/fs01",)
+        assert pool.run.call_count == 1
+
+    def test_query_failure(self):
+        pool = Mock()
+        pool.run.return_value = PowerShellResult(ok=False, error="No domain")
+
+        with pytest.raises(DelegationError):
+            DelegationInventory(PowerShellDelegationSource(pool)).index()
+
+
+class TestListAllConstrainedDelegation:
+    """
+    Test the bulk MCP tool on top of the inventory
+    """
+
+    def test_tool_output(self, monkeypatch):
+        import main
+
+        delegations, pool = inventory(directory_records(300))
+        monkeypatch.setattr(main, "delegations", delegations)
+
+        result = json.loads(
+            asyncio.run(main.list_all_constrained_delegation.fn(limit=10))
+        )
+        assert result["total"] == 301
+        assert result["count"] == 10
+        assert result["delegations"][0] == {
+            "account": "svc00000",
+            "type": "user",
+            "spns": ["cifs/fs00.corp.local", "HOST/fs00"],
+            "protocol_transition": True,
+        }
+
+        result = json.loads(
+            asyncio.run(main.list_all_constrained_delegation.fn(spn="fs07."))
+        )
+        assert result["total"] == 6
+        assert pool.run.call_count == 1
+
+        print("✅ Bulk delegation audit answered from one directory query")
+
+    def test_tool_reports_failure(self, monkeypatch):
+        import main
+
+        pool = Mock()
+        pool.run.return_value = PowerShellResult(ok=False, error="No domain")
+        inventory = DelegationInventory(PowerShellDelegationSource(pool))
+        monkeypatch.setattr(main, "delegations", inventory)
+
+        assert "No domain" in asyncio.run(main.list_all_constrained_delegation.fn())
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from lib.directory import PowerShellDirectory
+from lib.executor import ToolExecutor
+from lib.powershell import PowerShellPool
+
+FAKE_POWERSHELL = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "fake_powershell.py"
+)
+FAKE_COMMAND = [sys.executable, FAKE_POWERSHELL]
+
+
+@pytest.fixture
+def pool():
+    pool = PowerShellPool(FAKE_COMMAND, size=4, timeout=5)
+    yield pool
+    pool.shutdown()
+
+
+class SlowDirectory(PowerShellDirectory):
+    """Every lookup takes half a second on a stand-in host"""
+
+    def list_delegation(self, identity):
+        return self.pool.run("Start-Sleep -Seconds 0.5; 'cifs/fs01'")
+
+
+class TestToolExecutor:
+    """
+    Test bounded concurrency and per-call timeouts
+    """
+
+    def test_concurrency_is_bounded(self):
+        tools = ToolExecutor(max_workers=2, timeout=5)
+        running, peak = [], []
+        lock = threading.Lock()
+
+        @tools.offload()
+        def slow(n: int) -> str:
+            with lock:
+                running.append(n)
+                peak.append(len(running))
+            time.sleep(0.2)
+            with lock:
+                running.remove(n)
+            return str(n)
+
+        async def main():
+            return await asyncio.gather(*(slow(n) for n in range(6)))
+
+        started = time.perf_counter()
+        results = asyncio.run(main())
+        elapsed = time.perf_counter() - started
+
+        assert results == [str(n) for n in range(6)]
+        assert max(peak) == 2
+        assert 0.55 < elapsed < 1.2
+        assert tools.status()["running"] == tools.status()["waiting"] == 0
+        tools.shutdown()
+
+    def test_timeout_kills_hung_host(self, pool):
+        tools = ToolExecutor(max_workers=2, timeout=5)
+
+        @tools.offload(timeout=0.5)
+        def hung() -> str:
+            return str(pool.run("Start-Sleep -Seconds 10").ok)
+
+        started = time.perf_counter()
+        message = asyncio.run(hung())
+        elapsed = time.perf_counter() - started
+
+        assert message == "The hung tool timed out after 0.5 seconds."
+        assert elapsed < 1.5
+        assert tools.status()["timeouts"] == 1
+
+        # The host was killed at the deadline, not left running the script
+        time.sleep(0.2)
+        assert pool.status()["alive"] == 0
+        assert pool.run("Get-Date").ok
+        tools.shutdown()
+
+        print(f"✅ Hung tool returned after {elapsed:.2f} s and its host was killed")
+
+
+class TestConcurrentClients:
+    """
+    Load test: many MCP clients calling slow tools at once
+    """
+
+    def test_slow_calls_do_not_stall_other_clients(self, pool, monkeypatch):
+        fastmcp = pytest.importorskip("fastmcp")
+        import main
+
+        monkeypatch.setattr(main, "directory", SlowDirectory(pool))
+        for _ in range(pool.size):  # Start the hosts before timing
+            pool.run("Get-Date")
+
+        async def slow_client(n):
+            async with fastmcp.Client(main.mcp) as client:
+                started = time.perf_counter()
+                await client.call_tool(
+                    "list_constrained_delegation", {"identity": f"svc{n}"}
+                )
+                return time.perf_counter() - started
+
+        async def fast_client():
+            await asyncio.sleep(0.1)  # Once the slow calls are running
+            async with fastmcp.Client(main.mcp) as client:
+                started = time.perf_counter()
+                await client.call_tool("lookup_job_descriptions", {"usernames": []})
+                return time.perf_counter() - started
+
+        async def load():
+            started = time.perf_counter()
+            *slow, fast = await asyncio.gather(
+                *(slow_client(n) for n in range(6)), fast_client()
+            )
+            return time.perf_counter() - started, slow, fast
+
+        elapsed, slow, fast = asyncio.run(load())
+
+        # 6 half-second calls on 4 hosts take two rounds, not six, and leave
+        # threads free (TOOL_CONCURRENCY is 8) for the fast call
+        assert elapsed < 2.0
+        assert fast < 0.4
+
+        print(
+            f"✅ 6 slow calls in {elapsed:.2f} s (max {max(slow):.2f} s); "
+            f"a fast call meanwhile took {fast * 1000:.0f} ms"
+        )
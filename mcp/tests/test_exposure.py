@@ -0,0 +1,214 @@
+import asyncio
+import json
+import random
+import time
+from unittest.mock import Mock
+
+from lib.exposure import ExposureAnalyzer, format_ranges, subtract_ranges
+from lib.firewall import ALL_PROFILES, FirewallError, FirewallRule, RuleSnapshot
+
+
+def rule(name, ports, action="Allow", **fields):
+    fields.setdefault("protocol", "TCP")
+    return FirewallRule(name, True, "In", action, local_port=ports, **fields)
+
+
+def by_kind(findings, kind):
+    return {
+        f.rules[0] if f.rules else f.profiles[0]: f for f in findings if f.kind == kind
+    }
+
+
+class TestRanges:
+    """
+    Test the port range arithmetic behind the findings
+    """
+
+    def test_subtract_ranges(self):
+        assert subtract_ranges([(0, 100)], [(10, 20, "a"), (15, 30, "b")]) == [
+            (0, 9),
+            (31, 100),
+        ]
+        assert subtract_ranges([(80, 80), (443, 443)], [(0, 65535)]) == []
+        assert subtract_ranges([(5, 10)], []) == [(5, 10)]
+
+    def test_format_ranges(self):
+        assert format_ranges([(0, 65535)]) == "Any"
+        assert format_ranges([(80, 80), (5000, 5100)]) == "80,5000-5100"
+
+
+class TestExposureAnalyzer:
+    """
+    Test the deterministic firewall findings
+    """
+
+    def test_exposure_after_block_rules(self):
+        findings = ExposureAnalyzer(
+            [
+                rule("Web", "80,443"),
+                rule("Range", "8000-8100"),
+                rule("Block 8080", "8080", action="Block", profiles=("Public",)),
+                rule("App", "Any", program=r"C:\App\app.exe"),
+                FirewallRule("Disabled", False, "In", "Allow", local_port="22"),
+            ],
+            protocols=("TCP",),
+        ).analyze()
+        exposure = by_kind(findings, "exposure")
+
+        # Program-scoped rules do not open ports to everyone
+        assert exposure["Domain"].ports == "80,443,8000-8100"
+        assert exposure["Public"].ports == "80,443,8000-8079,8081-8100"
+        assert exposure["Public"].detail == "102 TCP ports open"
+
+        print("✅ Exposure accounts for block rules and program scope")
+
+    def test_shadowed_and_redundant_rules(self):
+        findings = ExposureAnalyzer(
+            [
+                rule("Telnet", "23", profiles=("Public",)),
+                rule("Block Telnet", "23", action="Block"),
+                rule("Block for one app", "3389", action="Block", program="x.exe"),
+                rule("RDP", "3389"),
+                rule("RDP copy", "3389"),
+                rule("Web", "80", profiles=("Domain",)),
+                rule("Web and TLS", "80,443"),
+                rule("Web for app", "80", program="app.exe"),
+            ]
+        ).analyze()
+
+        shadowed = by_kind(findings, "shadowed")
+        assert list(shadowed) == ["Telnet"]
+        assert shadowed["Telnet"].detail == "All ports are blocked by Block Telnet"
+
+        # One of two identical rules is kept; narrower rules are redundant
+        redundant = by_kind(findings, "redundant")
+        assert sorted(redundant) == ["RDP copy", "Web", "Web for app"]
+        assert redundant["Web"].detail == "Ports are already allowed by Web and TLS"
+
+        print("✅ Shadowed and redundant rules found")
+
+    def test_keyword_ports_and_per_profile_copies(self):
+        findings = ExposureAnalyzer(
+            [
+                rule("RPC EPM", "RPCEPMap"),
+                rule("RPC", "RPC"),
+                rule("Block SMB", "445", action="Block"),
+                rule("Block all", "Any", action="Block", profiles=("Public",)),
+                # Windows keeps one copy of some rules per profile
+                rule("Telnet", "23", profiles=("Domain",)),
+                rule("Telnet", "23", profiles=("Private",)),
+                rule("Block Telnet", "23", action="Block"),
+            ]
+        ).analyze()
+
+        # Dynamic ports are not compared against port ranges
+        shadowed = [f for f in findings if f.kind == "shadowed"]
+        assert [f.rules for f in shadowed] == [("Telnet",)]
+        assert shadowed[0].profiles == ("Domain", "Private")
+        assert not [f for f in findings if f.kind == "redundant"]
+
+        exposure = by_kind(findings, "exposure")
+        assert list(exposure) == []  # Nothing numeric is left open
+
+        print("✅ Keyword ports were skipped and per-profile copies merged")
+
+    def test_broad_rules(self):
+        findings = ExposureAnalyzer(
+            [
+                rule("Everything", "Any", protocol="Any"),
+                rule("All TCP", "Any", remote_ip="10.0.0.0/8"),
+                rule("RPC", "49152-65535"),
+                rule("Small", "5000-5100"),
+            ],
+            broad_threshold=1000,
+        ).analyze()
+        broad = by_kind(findings, "broad")
+
+        assert broad["Everything"].detail == "Allows every protocol on every port"
+        assert broad["All TCP"].detail == "Allows every TCP port from 10.0.0.0/8"
+        assert broad["RPC"].detail == "Allows 16384 TCP ports"
+        assert "Small" not in broad
+
+    def test_large_rule_set(self):
+        random.seed(7)
+        rules = []
+        for i in range(5000):
+            first = random.randint(1, 60000)
+            last = first + random.choice([0, 0, 10, 500])
+            rules.append(
+                rule(
+                    f"Rule {i}",
+                    f"{first}-{last}",
+                    action="Block" if i % 10 == 0 else "Allow",
+                    protocol=random.choice(["TCP", "UDP"]),
+                    profiles=random.choice([ALL_PROFILES, ("Domain",), ("Public",)]),
+                )
+            )
+
+        started = time.perf_counter()
+        findings = ExposureAnalyzer(rules).analyze()
+        elapsed = time.perf_counter() - started
+
+        assert findings
+        assert elapsed < 5
+
+        print(f"✅ Analyzed {len(rules)} rules in {elapsed * 1000:.0f} ms")
+
+
+class TestAnalyzeFirewallExposure:
+    """
+    Test the MCP tool output on top of the rule snapshot
+    """
+
+    def test_tool_output(self, monkeypatch):
+        import main
+
+        backend = Mock()
+        backend.list_rules.return_value = [
+            rule("RDP", "3389"),
+            rule("RDP copy", "3389"),
+            rule("DNS", "53", protocol="UDP"),
+        ]
+        snapshot = RuleSnapshot(backend, fingerprint=lambda: "v1")
+        monkeypatch.setattr(main, "firewall_rules", snapshot)
+
+        result = json.loads(
+            asyncio.run(main.analyze_firewall_exposure.fn(protocol="TCP"))
+        )
+        # The same open port in every profile is one finding
+        assert result["summary"] == {"exposure": 1, "redundant": 1}
+        assert result["findings"][0] == {
+            "kind": "exposure",
+            "detail": "1 TCP port open",
+            "protocol": "TCP",
+            "profiles": list(ALL_PROFILES),
+            "ports": "3389",
+        }
+
+        result = json.loads(
+            asyncio.run(main.analyze_firewall_exposure.fn(kinds=["redundant"], limit=1))
+        )
+        assert result["findings"] == [
+            {
+                "kind": "redundant",
+                "detail": "Ports are already allowed by RDP",
+                "rules": ["RDP copy"],
+                "protocol": "TCP",
+                "profiles": list(ALL_PROFILES),
+                "ports": "3389",
+            }
+        ]
+
+        print("✅ Tool returned a summary and compact findings")
+
+    def test_backend_failure_keeps_its_cause(self, monkeypatch):
+        import main
+
+        backend = Mock()
+        backend.list_rules.side_effect = FirewallError("Get-NetFirewallRule failed")
+        monkeypatch.setattr(main, "firewall_rules", RuleSnapshot(backend))
+
+        result = asyncio.run(main.analyze_firewall_exposure.fn())
+        assert result == (
+            "Failed to analyze firewall exposure. Error: Get-NetFirewallRule failed"
+        )
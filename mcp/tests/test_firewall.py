@@ -0,0 +1,392 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from lib.firewall import (
+    ALL_PROFILES,
+    FirewallError,
+    FirewallRule,
+    NetshBackend,
+    PowerShellBackend,
+    RuleIndex,
+    RuleSnapshot,
+    parse_netsh_rules,
+    parse_ports,
+)
+from lib.intervals import IntervalTree
+from lib.powershell import PowerShellResult
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+NETSH_FIXTURE = os.path.join(FIXTURES, "netsh_show_rule.txt")
+
+# Prints the fixture regardless of the arguments netsh would receive
+FAKE_NETSH = [
+    sys.executable,
+    "-c",
+    "import sys; sys.stdout.write(open(sys.argv[1]).read())",
+    NETSH_FIXTURE,
+]
+
+
+class TestNetshParser:
+    """
+    Test the line-oriented netsh parser against captured output
+    """
+
+    def test_parses_rule_blocks(self):
+        """
+        Every block becomes a typed record
+        """
+        with open(NETSH_FIXTURE, encoding="utf-8") as f:
+            rules = list(parse_netsh_rules(f))
+
+        assert len(rules) == 8
+        rdp = rules[0]
+        assert rdp.name == "Remote Desktop - User Mode (TCP-In)"
+        assert rdp.enabled is True
+        assert (rdp.direction, rdp.action) == ("In", "Allow")
+        assert rdp.profiles == ALL_PROFILES
+        assert (rdp.protocol, rdp.local_port) == ("TCP", "3389")
+
+        smb = rules[1]
+        assert smb.profiles == ("Domain",)
+
+        # Values containing colons are kept whole
+        assert rules[2].local_ip == "fe80::/64"
+        assert rules[2].group == ""
+
+        # Rules without ports fall back to "Any"
+        assert rules[7].protocol == "2"
+        assert rules[7].local_port == "Any"
+
+        print(f"✅ Parsed {len(rules)} rules from netsh output")
+
+    def test_yields_before_reading_everything(self):
+        """
+        The first rule is available as soon as its block has been read
+        """
+        consumed = []
+
+        def lines():
+            with open(NETSH_FIXTURE, encoding="utf-8") as f:
+                for line in f:
+                    consumed.append(line)
+                    yield line
+
+        first = next(parse_netsh_rules(lines()))
+        assert first.name.startswith("Remote Desktop")
+        assert len(consumed) < 20
+
+        print(f"✅ First rule parsed after {len(consumed)} lines")
+
+
+class TestBackends:
+    """
+    Test that both backends filter and normalize rules the same way
+    """
+
+    def test_netsh_backend_filters(self):
+        rules = NetshBackend(FAKE_NETSH).list_rules(
+            direction="In", action="Allow", enabled=True
+        )
+        names = [rule.name for rule in rules]
+
+        assert "Remote Desktop - User Mode (TCP-In)" in names
+        assert "Block Telnet" not in names
+        assert "Windows Remote Management (HTTP-In)" not in names
+        assert "Core Networking - Teredo (UDP-Out)" not in names
+
+        print(f"✅ netsh backend returned {len(rules)} inbound allow rules")
+
+    def test_netsh_backend_reports_failure(self):
+        with pytest.raises(FirewallError):
+            NetshBackend([sys.executable, "-c", "raise SystemExit(1)"]).list_rules()
+
+    def test_powershell_backend_filters_at_source(self):
+        """
+        Filters are passed to Get-NetFirewallRule and records are normalized
+        """
+        pool = Mock()
+        pool.run.return_value = PowerShellResult(
+            ok=True,
+            output=[
+                {
+                    "Id": "RemoteDesktop-UserMode-In-TCP",
+                    "Name": "Remote Desktop - User Mode (TCP-In)",
+                    "Group": "Remote Desktop",
+                    "Enabled": "True",
+                    "Direction": "Inbound",
+                    "Action": "Allow",
+                    "Profile": "Domain, Private",
+                    "Protocol": "TCP",
+                    "LocalPort": "3389",
+                    "RemotePort": "Any",
+                    "Program": "%SystemRoot%\\system32\\svchost.exe",
+                }
+            ],
+        )
+
+        rules = PowerShellBackend(pool).list_rules(
+            direction="In", action="Allow", enabled=True
+        )
+
+        script, params = pool.run.call_args.args
+        assert "Get-NetFirewallRule @filter" in script
+        assert params == {"Direction": "Inbound", "Action": "Allow", "Enabled": "True"}
+
+        rule = rules[0]
+        assert rule.rule_id == "RemoteDesktop-UserMode-In-TCP"
+        assert (rule.direction, rule.enabled) == ("In", True)
+        assert rule.profiles == ("Domain", "Private")
+        assert rule.local_port == "3389"
+
+        print("✅ PowerShell backend filters at the source")
+
+
+class TestRuleSnapshot:
+    """
+    Test that the rule snapshot only reloads when the rule store changes
+    """
+
+    def _snapshot(self, signal):
+        backend = Mock()
+        backend.list_rules.return_value = [
+            FirewallRule("Remote Desktop", True, "In", "Allow", rule_id="RDP-In"),
+            FirewallRule("Block Telnet", True, "In", "Block", rule_id="Telnet-In"),
+        ]
+        snapshot = RuleSnapshot(backend, fingerprint=lambda: signal[0], max_age=0)
+        return snapshot, backend
+
+    def test_reloads_only_on_change(self):
+        signal = ["v1"]
+        snapshot, backend = self._snapshot(signal)
+
+        started = time.perf_counter()
+        for _ in range(1000):
+            rules = snapshot.rules()
+        elapsed = time.perf_counter() - started
+
+        assert len(rules) == 2
+        assert backend.list_rules.call_count == 1
+
+        signal[0] = "v2"
+        snapshot.rules()
+        assert backend.list_rules.call_count == 2
+
+        print(f"✅ 1000 listings with one load, {elapsed / 1000 * 1e6:.1f} µs each")
+
+    def test_max_age_skips_signal_checks(self):
+        fingerprint = Mock(return_value="v1")
+        snapshot = RuleSnapshot(Mock(), fingerprint=fingerprint, max_age=60)
+        snapshot.backend.list_rules.return_value = []
+
+        for _ in range(10):
+            snapshot.rules()
+
+        assert fingerprint.call_count == 1
+
+    def test_no_signal_reloads_every_time_it_expires(self):
+        snapshot, backend = self._snapshot([None])
+        snapshot.rules()
+        snapshot.rules()
+        assert backend.list_rules.call_count == 2
+
+    def test_local_changes_are_applied_in_place(self):
+        """
+        Rules created or disabled by the tools do not force a reload
+        """
+        signal = ["v1"]
+        snapshot, backend = self._snapshot(signal)
+        snapshot.rules()
+
+        # Our change moves the signal; the snapshot adopts the new value
+        signal[0] = "v2"
+        snapshot.add(FirewallRule("Web", True, "In", "Allow", local_port="8080"))
+        signal[0] = "v3"
+        assert snapshot.update("RDP-In", enabled=False) == 1
+
+        rules = {rule.name: rule for rule in snapshot.rules()}
+        assert rules["Web"].local_port == "8080"
+        assert rules["Remote Desktop"].enabled is False
+        assert backend.list_rules.call_count == 1
+
+        print("✅ Created and disabled rules were applied without a reload")
+
+
+class TestRuleIndex:
+    """
+    Test port lookups and filters over a rule snapshot
+    """
+
+    RULES = [
+        FirewallRule("RDP", True, "In", "Allow", protocol="TCP", local_port="3389"),
+        FirewallRule("Web", True, "In", "Allow", protocol="6", local_port="80,443"),
+        FirewallRule("RPC", True, "In", "Allow", protocol="TCP", local_port="RPC"),
+        FirewallRule(
+            "High", True, "In", "Allow", protocol="TCP", local_port="5000-5100"
+        ),
+        FirewallRule("DNS", True, "In", "Allow", protocol="UDP", local_port="53"),
+        FirewallRule("All", True, "In", "Allow", program=r"C:\Tools\agent.exe"),
+        FirewallRule(
+            "IGMP", True, "In", "Allow", protocol="2", group="Core Networking"
+        ),
+        FirewallRule(
+            "Public Web",
+            True,
+            "In",
+            "Allow",
+            profiles=("Public",),
+            protocol="TCP",
+            local_port="8080",
+            rule_id="Web-Public",
+        ),
+    ]
+
+    def _names(self, rules):
+        return [rule.name for rule in rules]
+
+    def test_parse_ports(self):
+        assert parse_ports("Any") == ((0, 65535),)
+        assert parse_ports("80, 443,5000-5100") == ((80, 80), (443, 443), (5000, 5100))
+        assert parse_ports("RPC") == ()
+
+    def test_interval_tree_matches_brute_force(self):
+        intervals = [(i * 7 % 300, i * 7 % 300 + i % 40, i) for i in range(500)]
+        tree = IntervalTree(intervals)
+
+        for first, last in ((0, 0), (17, 17), (100, 180), (299, 400), (500, 600)):
+            expected = {i[2] for i in intervals if i[0] <= last and first <= i[1]}
+            assert {i[2] for i in tree.overlapping(first, last)} == expected
+
+    def test_port_queries(self):
+        index = RuleIndex(self.RULES)
+
+        # Rules for any port or protocol open every port
+        assert self._names(index.query(port="3389")) == ["RDP", "All"]
+        assert self._names(index.query(port="5050-6000")) == ["High", "All"]
+        assert self._names(index.query(port="443", protocol="TCP")) == ["Web", "All"]
+        assert self._names(index.query(port="53", protocol="TCP")) == ["All"]
+        assert self._names(index.query(port="53", protocol="17")) == ["DNS", "All"]
+
+        with pytest.raises(ValueError):
+            index.query(port="http")
+
+        print("✅ Port queries matched exact, listed, ranged and any-port rules")
+
+    def test_filters(self):
+        index = RuleIndex(self.RULES)
+
+        assert self._names(index.query(program="AGENT.EXE")) == ["All"]
+        assert self._names(index.query(group="core")) == ["IGMP"]
+        assert self._names(index.query(name="web-public")) == ["Public Web"]
+        assert self._names(index.query(profile="Public", port="8080")) == [
+            "All",
+            "Public Web",
+        ]
+        assert "Public Web" not in self._names(index.query(profile="Domain"))
+        assert self._names(index.query(protocol="UDP")) == ["DNS", "All"]
+
+    def test_snapshot_reuses_index(self):
+        snapshot = RuleSnapshot(Mock(), fingerprint=lambda: "v1")
+        snapshot.backend.list_rules.return_value = self.RULES
+
+        index = snapshot.index()
+        assert snapshot.index() is index
+
+        snapshot.add(
+            FirewallRule("SSH", True, "In", "Allow", protocol="TCP", local_port="22")
+        )
+        assert self._names(snapshot.index().query(port="22")) == ["All", "SSH"]
+
+
+class TestListInboundFirewallRules:
+    """
+    Test the MCP tool output on top of a backend
+    """
+
+    @pytest.fixture
+    def tool(self, monkeypatch):
+        import main
+
+        snapshot = RuleSnapshot(NetshBackend(FAKE_NETSH), fingerprint=lambda: "v1")
+        monkeypatch.setattr(main, "firewall_rules", snapshot)
+        return lambda **kwargs: asyncio.run(
+            main.list_inbound_firewall_rules.fn(**kwargs)
+        )
+
+    def test_tool_output(self, tool):
+        result = json.loads(tool())
+        rules = result["rules"]
+
+        assert rules[0] == {
+            "name": "Remote Desktop - User Mode (TCP-In)",
+            "group": "Remote Desktop",
+            "local_port": "3389",
+            "protocol": "TCP",
+        }
+        # Unresolved resource-string names are hidden from the agent
+        assert not any(rule["name"].startswith("@") for rule in rules)
+        assert result["total"] == result["count"] == len(rules) == 4
+
+        print(f"✅ Tool listed {len(rules)} inbound allow rules")
+
+    def test_tool_filters_pages_and_projects(self, tool):
+        result = json.loads(tool(port="49200", protocol="TCP"))
+        assert [rule["name"] for rule in result["rules"]] == ["Dynamic RPC Range"]
+
+        result = json.loads(tool(profile="Public", fields=["name", "profiles"]))
+        assert result["rules"] == [
+            {
+                "name": "Remote Desktop - User Mode (TCP-In)",
+                "profiles": ["Domain", "Private", "Public"],
+            },
+            {
+                "name": "Core Networking - Internet Group Management Protocol (IGMP-In)",
+                "profiles": ["Domain", "Private", "Public"],
+            },
+        ]
+
+        result = json.loads(tool(limit=1, offset=1))
+        assert (result["total"], result["offset"], result["count"]) == (4, 1, 1)
+        assert result["rules"][0]["name"] == "File and Printer Sharing (SMB-In)"
+
+        blocked = json.loads(tool(action="Block"))
+        assert [rule["name"] for rule in blocked["rules"]] == ["Block Telnet"]
+
+        print("✅ Tool filtered, paged and projected rules")
+
+    def test_tool_rejects_bad_arguments(self, tool):
+        assert "Unknown fields: color" in tool(fields=["name", "color"])
+        assert "Invalid port 'rdp'" in tool(port="rdp")
+
+    def test_tool_changes_show_up_in_listing(self, monkeypatch):
+        import main
+
+        snapshot = RuleSnapshot(NetshBackend(FAKE_NETSH), fingerprint=lambda: "v1")
+        monkeypatch.setattr(main, "firewall_rules", snapshot)
+        monkeypatch.setattr(main, "SIMULATE_MODIFICATIONS", True)
+
+        asyncio.run(main.list_inbound_firewall_rules.fn())
+        asyncio.run(
+            main.create_firewall_rule.fn(
+                "Web-In", "Web Server", "Allow", 8080, "TCP", "Inbound"
+            )
+        )
+        asyncio.run(
+            main.disable_firewall_rule.fn("Remote Desktop - User Mode (TCP-In)")
+        )
+        result = json.loads(
+            asyncio.run(main.list_inbound_firewall_rules.fn(port="8080"))
+        )
+        names = [rule["name"] for rule in result["rules"]]
+
+        assert "Web Server" in names
+        assert "Remote Desktop - User Mode (TCP-In)" not in names
+        assert snapshot.loads == 1
+
+        print("✅ Listing reflects created and disabled rules without netsh")
@@ -0,0 +1,268 @@
+import asyncio
+import json
+from unittest.mock import Mock
+
+import pytest
+from pydantic import ValidationError
+
+from lib.firewall import FirewallRule, RuleSnapshot
+from lib.firewall_changes import (
+    APPLY_CHANGES_SCRIPT,
+    CHANGE_TIMEOUT,
+    MAX_CHANGES,
+    FirewallChange,
+    apply_changes,
+    plan_changes,
+)
+from lib.powershell import DEFAULT_TIMEOUT, PowerShellResult
+
+RULES = [
+    FirewallRule(
+        "Remote Desktop",
+        True,
+        "In",
+        "Allow",
+        protocol="TCP",
+        local_port="3389",
+        rule_id="RDP-In",
+    ),
+    FirewallRule(
+        "Telnet",
+        True,
+        "In",
+        "Allow",
+        protocol="TCP",
+        local_port="23",
+        rule_id="Telnet-In",
+    ),
+]
+
+CREATE_WEB = FirewallChange(
+    operation="create",
+    rule_name="Web-In",
+    display_name="Web Server",
+    action="Allow",
+    local_port=8080,
+    protocol="TCP",
+    direction="Inbound",
+)
+
+
+class TestPlanChanges:
+    """
+    Test validation and diffs of a batch before anything is changed
+    """
+
+    def test_create_requires_rule_settings(self):
+        with pytest.raises(ValidationError):
+            FirewallChange(operation="create", rule_name="Web-In")
+
+    def test_diff(self):
+        results = plan_changes(
+            RULES,
+            [
+                CREATE_WEB,
+                FirewallChange(operation="disable", rule_name="Remote Desktop"),
+                FirewallChange(operation="delete", rule_name="Telnet-In"),
+            ],
+        )
+
+        assert [r.status for r in results] == ["planned"] * 3
+        assert results[0].before == []
+        assert results[0].after[0]["name"] == "Web Server"
+        assert results[1].before[0]["enabled"] is True
+        assert results[1].after[0]["enabled"] is False
+        assert results[2].before[0]["rule_id"] == "Telnet-In"
+        assert results[2].after == []
+
+        print("✅ Planned a create, disable and delete with before/after state")
+
+    def test_changes_see_earlier_changes(self):
+        results = plan_changes(
+            RULES,
+            [
+                FirewallChange(operation="delete", rule_name="Telnet-In"),
+                FirewallChange(operation="disable", rule_name="Telnet-In"),
+                CREATE_WEB,
+                CREATE_WEB,
+            ],
+        )
+
+        assert [r.status for r in results] == [
+            "planned",
+            "invalid",
+            "planned",
+            "invalid",
+        ]
+        assert results[1].error == "Rule 'Telnet-In' not found"
+        assert results[3].error == "Rule 'Web-In' already exists"
+
+
+class TestApplyChanges:
+    """
+    Test that a batch runs as one PowerShell request
+    """
+
+    def test_one_request_per_batch(self):
+        pool = Mock()
+        pool.run.return_value = PowerShellResult(
+            ok=True,
+            output=[
+                {"rule_name": "Web-In", "status": "rolled_back", "error": None},
+                {
+                    "rule_name": "Missing",
+                    "status": "failed",
+                    "error": "Rule 'Missing' not found",
+                },
+                {"rule_name": "Telnet-In", "status": "skipped", "error": None},
+            ],
+        )
+        changes = [
+            CREATE_WEB,
+            FirewallChange(operation="disable", rule_name="Missing"),
+            FirewallChange(operation="delete", rule_name="Telnet-In"),
+        ]
+
+        results = apply_changes(pool, changes)
+
+        assert pool.run.call_count == 1
+        script, params = pool.run.call_args.args
+        assert script == APPLY_CHANGES_SCRIPT
+        assert [c["operation"] for c in params["Changes"]] == [
+            "create",
+            "disable",
+            "delete",
+        ]
+        assert params["Changes"][0]["local_port"] == 8080
+        assert [r.status for r in results] == ["rolled_back", "failed", "skipped"]
+        assert results[1].error == "Rule 'Missing' not found"
+
+        print("✅ Batch of 3 changes sent as one request")
+
+    def test_timeout_grows_with_the_batch(self):
+        pool = Mock()
+        pool.run.return_value = PowerShellResult(ok=True, output=[])
+
+        apply_changes(pool, [CREATE_WEB] * 3)
+        assert pool.run.call_args.kwargs["timeout"] == DEFAULT_TIMEOUT
+
+        apply_changes(pool, [CREATE_WEB] * MAX_CHANGES)
+        timeout = pool.run.call_args.kwargs["timeout"]
+        assert timeout == MAX_CHANGES * CHANGE_TIMEOUT
+        # A full batch, rollback included, ends before the tool's deadline
+        assert DEFAULT_TIMEOUT < timeout < 300
+
+    def test_host_failure_fails_every_change(self):
+        pool = Mock()
+        pool.run.return_value = PowerShellResult(ok=False, error="PowerShell timed out")
+
+        results = apply_changes(pool, [CREATE_WEB])
+
+        assert results[0].status == "failed"
+        assert results[0].error == "PowerShell timed out"
+
+
+class TestApplyFirewallChangesTool:
+    """
+    Test the MCP tool on top of the rule snapshot
+    """
+
+    @pytest.fixture
+    def snapshot(self, monkeypatch):
+        import main
+
+        backend = Mock()
+        backend.list_rules.return_value = list(RULES)
+        snapshot = RuleSnapshot(backend, fingerprint=lambda: "v1")
+        monkeypatch.setattr(main, "firewall_rules", snapshot)
+        return snapshot
+
+    def _apply(self, changes, **kwargs):
+        import main
+
+        return json.loads(
+            asyncio.run(main.apply_firewall_changes.fn(changes, **kwargs))
+        )
+
+    def test_batch_size_is_capped(self):
+        import main
+
+        schema = main.apply_firewall_changes.parameters["properties"]["changes"]
+        assert schema["maxItems"] == MAX_CHANGES
+
+    def test_dry_run_changes_nothing(self, snapshot, monkeypatch):
+        import main
+
+        pool = Mock()
+        monkeypatch.setattr(main, "powershell", pool)
+
+        result = self._apply(
+            [CREATE_WEB, FirewallChange(operation="disable", rule_name="RDP-In")],
+            dry_run=True,
+        )
+
+        assert result["applied"] is False
+        assert [r["status"] for r in result["results"]] == ["planned", "planned"]
+        assert result["results"][1]["after"][0]["enabled"] is False
+        assert pool.run.call_count == 0
+        assert len(snapshot.rules()) == 2
+
+        print("✅ Dry run returned the diff without running PowerShell")
+
+    def test_invalid_batch_is_not_applied(self, snapshot, monkeypatch):
+        import main
+
+        pool = Mock()
+        monkeypatch.setattr(main, "powershell", pool)
+
+        result = self._apply(
+            [CREATE_WEB, FirewallChange(operation="delete", rule_name="Missing")]
+        )
+
+        assert result["applied"] is False
+        assert [r["status"] for r in result["results"]] == ["skipped", "invalid"]
+        assert pool.run.call_count == 0
+
+    def test_simulated_batch_updates_snapshot(self, snapshot, monkeypatch):
+        import main
+
+        monkeypatch.setattr(main, "SIMULATE_MODIFICATIONS", True)
+
+        result = self._apply(
+            [
+                CREATE_WEB,
+                FirewallChange(operation="disable", rule_name="RDP-In"),
+                FirewallChange(operation="delete", rule_name="Telnet"),
+            ]
+        )
+
+        assert result["applied"] is True
+        rules = {rule.name: rule for rule in snapshot.rules()}
+        assert set(rules) == {"Remote Desktop", "Web Server"}
+        assert rules["Remote Desktop"].enabled is False
+        assert snapshot.loads == 1
+
+        print("✅ Simulated batch applied to the rule snapshot")
+
+    def test_rolled_back_batch_reloads_rules(self, snapshot, monkeypatch):
+        import main
+
+        pool = Mock()
+        pool.run.return_value = PowerShellResult(
+            ok=True,
+            output=[
+                {"rule_name": "Web-In", "status": "rolled_back", "error": None},
+                {"rule_name": "RDP-In", "status": "failed", "error": "Access denied"},
+            ],
+        )
+        monkeypatch.setattr(main, "powershell", pool)
+        monkeypatch.setattr(main, "SIMULATE_MODIFICATIONS", False)
+
+        result = self._apply(
+            [CREATE_WEB, FirewallChange(operation="disable", rule_name="RDP-In")]
+        )
+
+        assert result["applied"] is False
+        assert result["results"][1]["error"] == "Access denied"
+        snapshot.rules()
+        assert snapshot.loads == 2
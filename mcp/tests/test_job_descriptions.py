@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from lib.job_descriptions import (
+    JobDescriptionError,
+    JobDescriptionStore,
+    parse_job_descriptions,
+)
+
+DESCRIPTIONS = """\
+jdoe - Database Administrator
+Maintains the SQL Server estate and needs sysadmin on the database servers.
+
+Username: asmith
+Name: Alice Smith
+Role: Helpdesk Technician
+Resets passwords and unlocks accounts. No server administration.
+
+## svc-backup (Service Account)
+Runs the nightly backup jobs on the file servers.
+
+Notes: blocks without a username are ignored
+"""
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "job_descriptions.txt"
+    path.write_text(DESCRIPTIONS, encoding="utf-8")
+    return path
+
+
+class TestParseJobDescriptions:
+    """
+    Test the block formats of the descriptions file
+    """
+
+    def test_formats(self):
+        entries = parse_job_descriptions(DESCRIPTIONS)
+
+        assert [(e.username, e.role) for e in entries] == [
+            ("jdoe", "Database Administrator"),
+            ("asmith", "Helpdesk Technician"),
+            ("svc-backup", "Service Account"),
+        ]
+        assert entries[1].name == "Alice Smith"
+        assert entries[0].text.endswith("sysadmin on the database servers.")
+
+
+class TestJobDescriptionStore:
+    """
+    Test indexed lookups and reloading when the file changes
+    """
+
+    def test_lookup(self, path):
+        index = JobDescriptionStore(str(path)).index()
+
+        found, missing = index.lookup(["CORP\\JDOE", "asmith@corp.local", "ghost"])
+        assert [e.username for e in found] == ["jdoe", "asmith"]
+        assert missing == ["ghost"]
+        assert [e.username for e in index.with_role("service")] == ["svc-backup"]
+
+    def test_parsed_once_until_changed(self, path):
+        store = JobDescriptionStore(str(path))
+        for _ in range(50):
+            store.index().lookup(["jdoe"])
+        assert store.loads == 1
+
+        path.write_text(DESCRIPTIONS + "\nbob - Developer\n", encoding="utf-8")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert store.index().lookup(["bob"])[0][0].role == "Developer"
+        assert store.loads == 2
+
+        print("✅ 50 lookups parsed the file once; an edit reloaded it")
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(JobDescriptionError):
+            JobDescriptionStore(str(tmp_path / "missing.txt")).index()
+
+
+class TestLookupJobDescriptionsTool:
+    """
+    Test that the tool returns only the requested descriptions
+    """
+
+    def test_tool_output(self, path, monkeypatch):
+        import main
+
+        monkeypatch.setattr(main, "job_descriptions", JobDescriptionStore(str(path)))
+
+        result = json.loads(
+            asyncio.run(
+                main.lookup_job_descriptions.fn(
+                    ["asmith", "nobody"], roles=["database"]
+                )
+            )
+        )
+        assert [d["username"] for d in result["descriptions"]] == ["asmith", "jdoe"]
+        assert result["descriptions"][0]["role"] == "Helpdesk Technician"
+        assert result["missing"] == ["nobody"]
+
+        assert asyncio.run(main.get_job_descriptions.fn()) == DESCRIPTIONS
+
+    def test_tool_reports_failure(self, tmp_path, monkeypatch):
+        import main
+
+        monkeypatch.setattr(
+            main, "job_descriptions", JobDescriptionStore(str(tmp_path / "none.txt"))
+        )
+
+        assert asyncio.run(main.lookup_job_descriptions.fn(["jdoe"])) == (
+            "Failed to retrieve job descriptions."
+        )
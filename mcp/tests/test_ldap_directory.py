@@ -0,0 +1,265 @@
+from unittest.mock import Mock
+
+import pytest
+
+ldap3 = pytest.importorskip("ldap3")
+
+from ldap3.core.exceptions import LDAPCommunicationError  # noqa: E402
+
+from lib.ad_changes import ADOperation, apply_plan, plan_operations  # noqa: E402
+from lib.delegation import DelegationInventory  # noqa: E402
+from lib.ldap_directory import (  # noqa: E402
+    LdapConnectionPool,
+    LdapDirectory,
+)
+
+BASE_DN = "DC=corp,DC=local"
+USERS = f"CN=Users,{BASE_DN}"
+ADMIN = f"CN=admin,{USERS}"
+
+
+def user_dn(name):
+    return f"CN={name},{USERS}"
+
+
+def seed(connection):
+    """A bind account, a group, a few users and a computer, two delegating"""
+    strategy = connection.strategy
+    strategy.add_entry(ADMIN, {"userPassword": "secret", "sAMAccountName": "admin"})
+    for name in ("alice", "bob", "carol"):
+        strategy.add_entry(
+            user_dn(name),
+            {
+                "objectClass": ["top", "person", "user"],
+                "objectCategory": "person",
+                "sAMAccountName": name,
+                "userAccountControl": "512",
+            },
+        )
+    strategy.add_entry(
+        user_dn("svc-web"),
+        {
+            "objectClass": ["top", "person", "user"],
+            "objectCategory": "person",
+            "sAMAccountName": "svc-web",
+            "userAccountControl": str(0x1000200),
+            "msDS-AllowedToDelegateTo": ["cifs/fs01.corp.local", "HOST/fs01"],
+        },
+    )
+    strategy.add_entry(
+        f"CN=WEB01,CN=Computers,{BASE_DN}",
+        {
+            "objectClass": ["top", "person", "user", "computer"],
+            "objectCategory": "computer",
+            "sAMAccountName": "WEB01$",
+            "userAccountControl": "4096",
+            "msDS-AllowedToDelegateTo": ["HTTP/app01.corp.local"],
+        },
+    )
+    strategy.add_entry(
+        f"CN=Domain Admins,{USERS}",
+        {
+            "objectClass": ["top", "group"],
+            "sAMAccountName": "Domain Admins",
+            "member": [user_dn("alice"), user_dn("bob")],
+        },
+    )
+
+
+@pytest.fixture
+def directory():
+    server = ldap3.Server("mock-dc")
+    seeded = []
+
+    def connect():
+        connection = ldap3.Connection(
+            server, user=ADMIN, password="secret", client_strategy=ldap3.MOCK_SYNC
+        )
+        # Every mock connection has its own store; share the first one's
+        if seeded:
+            connection.strategy.entries = seeded[0].strategy.entries
+        else:
+            seed(connection)
+            seeded.append(connection)
+        return connection
+
+    pool = LdapConnectionPool(connect, size=2)
+    yield LdapDirectory(pool, BASE_DN)
+    pool.close()
+
+
+def attribute(directory, dn, name):
+    """Values of one attribute as strings (the mock server has no schema)"""
+
+    def read(connection):
+        connection.search(dn, "(objectClass=*)", ldap3.BASE, attributes=[name])
+        return [str(v) for v in connection.response[0]["attributes"][name]]
+
+    return directory.pool.run(read)
+
+
+class TestLdapConnectionPool:
+    """
+    Test that binds are kept open and re-established when dropped
+    """
+
+    def test_binds_are_reused(self, directory):
+        for _ in range(20):
+            assert directory.list_delegation("svc-web").ok
+        assert directory.pool.binds == 1
+
+        print("✅ 20 lookups on one LDAP bind")
+
+    def test_dropped_connection_is_rebound(self, directory):
+        assert directory.list_delegation("alice").ok
+        with directory.pool.connection() as connection:
+            connection.unbind()
+
+        assert directory.list_delegation("alice").ok
+        assert directory.pool.binds == 2
+
+    def test_only_reads_are_retried(self, directory):
+        calls = []
+
+        def dropped(connection):
+            calls.append(connection)
+            if len(calls) == 1:
+                raise LDAPCommunicationError("connection closed by the server")
+            return "ok"
+
+        assert directory.pool.run(dropped, retry=True) == "ok"
+        assert len(calls) == 2
+
+        # A change may have reached the server before the connection broke
+        calls.clear()
+        with pytest.raises(LDAPCommunicationError):
+            directory.pool.run(dropped)
+        assert len(calls) == 1
+
+        # The dropped bind is replaced on next use
+        assert directory.disable_account("carol").ok
+        assert directory.pool.binds == 3
+
+        print("✅ Reads retried on a fresh bind, changes reported once")
+
+    def test_idle_connections_are_rebound(self, directory):
+        assert directory.list_delegation("alice").ok
+        directory.pool.max_idle = 0
+
+        assert directory.list_delegation("alice").ok
+        assert directory.pool.binds == 2
+
+    def test_timeout_applies_to_one_request(self):
+        connection = Mock(closed=False, bound=False, receive_timeout=60)
+        connection.bind.return_value = True
+        pool = LdapConnectionPool(lambda: connection, size=1)
+
+        pool.run(lambda c: None, timeout=5)
+
+        assert [c.args for c in connection.socket.settimeout.call_args_list] == [
+            (5,),
+            (60,),
+        ]
+
+
+class TestLdapDirectory:
+    """
+    Test the LDAP backend against ldap3's mock server
+    """
+
+    def test_single_operations(self, directory):
+        assert directory.list_delegation("svc-web").output == [
+            "cifs/fs01.corp.local",
+            "HOST/fs01",
+        ]
+
+        assert directory.disable_account("carol").ok
+        assert attribute(directory, user_dn("carol"), "userAccountControl") == ["514"]
+        assert directory.enable_account("carol").ok
+        assert attribute(directory, user_dn("carol"), "userAccountControl") == ["512"]
+
+        assert directory.add_group_member("Domain Admins", "carol").ok
+        assert user_dn("carol") in attribute(
+            directory, f"CN=Domain Admins,{USERS}", "member"
+        )
+
+        assert directory.remove_delegation("svc-web", "HOST/fs01").ok
+        assert directory.list_delegation("svc-web").output == ["cifs/fs01.corp.local"]
+
+    def test_unknown_identity_is_an_error(self, directory):
+        res = directory.disable_account("ghost")
+        assert not res.ok
+        assert res.error == "Object 'ghost' not found"
+
+        res = directory.disable_account("x)(sAMAccountName=*")
+        assert not res.ok
+
+    def test_delegation_inventory(self, directory):
+        index = DelegationInventory(directory).index()
+
+        delegation = index.account("svc-web")
+        assert delegation.spns == ("cifs/fs01.corp.local", "HOST/fs01")
+        assert delegation.protocol_transition
+        assert index.accounts_for("host/fs01") == ["svc-web"]
+
+    def test_plan_and_apply(self, directory):
+        operations = [
+            ADOperation(
+                operation="remove_group_member", identity="Domain Admins", member=user
+            )
+            for user in ("alice", "bob", "carol")
+        ] + [
+            ADOperation(operation="disable_account", identity="bob"),
+            ADOperation(operation="disable_account", identity="ghost"),
+        ]
+
+        plan = plan_operations(directory, operations)
+        assert [r.status for r in plan.results] == [
+            "planned",
+            "planned",
+            "unchanged",
+            "planned",
+            "invalid",
+        ]
+
+        plan.results.pop()
+        undo = apply_plan(directory, plan)
+
+        assert [r.status for r in plan.results] == [
+            "applied",
+            "applied",
+            "unchanged",
+            "applied",
+        ]
+        assert attribute(directory, f"CN=Domain Admins,{USERS}", "member") == []
+        assert attribute(directory, user_dn("bob"), "userAccountControl") == ["514"]
+        assert [op.operation for op in undo] == [
+            "enable_account",
+            "add_group_member",
+            "add_group_member",
+        ]
+
+        print("✅ Planned and applied an AD batch over LDAP")
+
+    def test_computer_delegation_plan_and_apply(self, directory):
+        # Computers are in the delegation inventory, so they can be remediated
+        index = DelegationInventory(directory).index()
+        assert index.account("WEB01$").account_type == "computer"
+
+        remove = ADOperation(
+            operation="remove_constrained_delegation",
+            identity="WEB01",
+            target="HTTP/app01.corp.local",
+        )
+        plan = plan_operations(directory, [remove])
+        assert plan.results[0].status == "planned"
+
+        undo = apply_plan(directory, plan)
+
+        assert plan.results[0].status == "applied"
+        dn = f"CN=WEB01,CN=Computers,{BASE_DN}"
+        assert attribute(directory, dn, "msDS-AllowedToDelegateTo") == []
+        assert plan_operations(directory, [remove]).results[0].status == "unchanged"
+        assert [op.operation for op in undo] == ["add_constrained_delegation"]
+
+        print("✅ Removed a computer account's constrained delegation")
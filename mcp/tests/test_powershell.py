@@ -0,0 +1,172 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from lib.directory import PowerShellDirectory
+from lib.powershell import PowerShellPool, PowerShellWorker
+
+FAKE_POWERSHELL = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "fake_powershell.py"
+)
+FAKE_COMMAND = [sys.executable, FAKE_POWERSHELL]
+
+
+@pytest.fixture
+def pool():
+    pool = PowerShellPool(FAKE_COMMAND, size=2, timeout=5)
+    yield pool
+    pool.shutdown()
+
+
+class TestPowerShellWorker:
+    """
+    Test the framed JSON protocol against the stand-in shell
+    """
+
+    def test_run_passes_parameters(self):
+        """
+        Parameters travel as JSON, not pasted into the script text
+        """
+        worker = PowerShellWorker(FAKE_COMMAND)
+        try:
+            result = worker.run(
+                "param($Identity) Disable-ADAccount -Identity $Identity",
+                {"Identity": "o'brien; Remove-ADUser x"},
+            )
+        finally:
+            worker.stop()
+
+        assert result.ok
+        assert result.output[0]["params"] == {"Identity": "o'brien; Remove-ADUser x"}
+
+        print("✅ Script parameters are passed through unchanged")
+
+    def test_script_errors_are_results(self):
+        """
+        A failing script is reported without restarting the host
+        """
+        worker = PowerShellWorker(FAKE_COMMAND)
+        try:
+            result = worker.run("throw 'Cannot find an object with identity'")
+            pid = worker.pid
+            assert worker.ping()
+            assert worker.pid == pid
+        finally:
+            worker.stop()
+
+        assert not result.ok
+        assert result.error == "Cannot find an object with identity"
+
+        print("✅ Script errors come back as unsuccessful results")
+
+
+class TestPowerShellPool:
+    """
+    Test reuse, restart and health checks of the pooled hosts
+    """
+
+    def test_hosts_are_reused(self, pool):
+        """
+        Consecutive calls do not start new processes
+        """
+        started = time.perf_counter()
+        pids = {pool.run("Get-Date").output[0]["pid"] for _ in range(20)}
+        elapsed = time.perf_counter() - started
+
+        assert len(pids) <= pool.size
+        assert pool.status()["starts"] <= pool.size
+
+        print(f"✅ 20 calls on {len(pids)} host(s) in {elapsed * 1000:.0f} ms")
+
+    def test_timeout_kills_and_restarts_host(self, pool):
+        """
+        A hung script is killed and the next call gets a fresh host
+        """
+        result = pool.run("Start-Sleep -Seconds 10", timeout=0.5)
+        assert not result.ok
+        assert "timed out" in result.error
+
+        result = pool.run("Get-Date")
+        assert result.ok
+
+        print("✅ Hung host was killed and replaced")
+
+    def test_crashed_host_is_restarted(self, pool):
+        """
+        A host that exits mid-request is reported and replaced
+        """
+        result = pool.run("exit")
+        assert not result.ok
+        assert "exited" in result.error
+
+        assert pool.run("Get-Date").ok
+
+        print("✅ Crashed host was restarted on next use")
+
+    def test_health_check_restarts_dead_hosts(self, pool):
+        """
+        Health checks replace hosts that died while idle
+        """
+        assert pool.health_check()["checked"] == 0  # Nothing started yet
+
+        pool.run("Get-Date")
+        worker = next(w for w in pool.workers if w.alive)
+        worker._process.kill()
+        worker._process.wait()
+
+        report = pool.health_check()
+        assert report["restarted"] == 1
+        assert worker.alive
+
+        print("✅ Health check restarted the dead host")
+
+    def test_calls_run_in_parallel(self, pool):
+        """
+        Two slow scripts take one slot each instead of queueing
+        """
+        pool.run("Get-Date")
+        pool.run("Get-Date")
+        results = []
+
+        def call():
+            results.append(pool.run("Start-Sleep -Seconds 0.5"))
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=call) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        assert all(result.ok for result in results)
+        assert elapsed < 0.9
+
+        print(f"✅ Two 0.5 s scripts finished in {elapsed:.2f} s")
+
+
+class TestToolsUsePool:
+    """
+    Test that the AD and firewall tools run through the shared pool
+    """
+
+    def test_disable_ad_account(self, pool, monkeypatch, tmp_path):
+        import main
+
+        log = tmp_path / "requests.jsonl"
+        monkeypatch.setenv("FAKE_POWERSHELL_LOG", str(log))
+        monkeypatch.setattr(main, "directory", PowerShellDirectory(pool))
+
+        message = asyncio.run(main.disable_ad_account.fn("jdoe"))
+        assert message == "Disabled account 'jdoe' successfully."
+
+        request = json.loads(log.read_text().splitlines()[-1])
+        assert "Disable-ADAccount" in request["script"]
+        assert request["params"] == {"Identity": "jdoe"}
+
+        print("✅ disable_ad_account ran on the pooled host")